@@ -3,6 +3,7 @@ const API_BASE = "/api/admin";
 const state = {
   admin: null,
   clinics: [],
+  clinicsCursor: null,
   selectedClinicId: null,
   toastTimer: null,
 };
@@ -20,6 +21,7 @@ const clinicSearchInput = document.getElementById("clinicSearchInput");
 const clinicSearchBtn = document.getElementById("clinicSearchBtn");
 const clinicRefreshBtn = document.getElementById("clinicRefreshBtn");
 const clinicsBody = document.getElementById("clinicsBody");
+const clinicMoreBtn = document.getElementById("clinicMoreBtn");
 
 const clinicDetailEmpty = document.getElementById("clinicDetailEmpty");
 const clinicDetailPanel = document.getElementById("clinicDetailPanel");
@@ -232,10 +234,13 @@ async function loadOverview() {
   renderOverview(response.overview || {});
 }
 
-async function loadClinics() {
+async function loadClinics({ append = false } = {}) {
   const q = clinicSearchInput.value.trim();
-  const response = await api(`/clinics?limit=150&q=${encodeURIComponent(q)}`);
-  state.clinics = response.clinics || [];
+  const before = append && state.clinicsCursor ? `&before=${encodeURIComponent(state.clinicsCursor)}` : "";
+  const response = await api(`/clinics?limit=150&q=${encodeURIComponent(q)}${before}`);
+  state.clinics = append ? [...state.clinics, ...(response.clinics || [])] : response.clinics || [];
+  state.clinicsCursor = response.nextCursor || null;
+  clinicMoreBtn.classList.toggle("hidden", !state.clinicsCursor);
 
   if (
     state.selectedClinicId !== null
@@ -365,6 +370,7 @@ function bindEvents() {
   clinicSubscriptionForm.addEventListener("submit", handleSubscriptionSave);
   clinicSearchBtn.addEventListener("click", () => loadClinics().catch((error) => showToast(error.message)));
   clinicRefreshBtn.addEventListener("click", () => refreshAdminData().catch((error) => showToast(error.message)));
+  clinicMoreBtn.addEventListener("click", () => loadClinics({ append: true }).catch((error) => showToast(error.message)));
   leadsRefreshBtn.addEventListener("click", () => loadLeads().catch((error) => showToast(error.message)));
   clinicSearchInput.addEventListener("keydown", (event) => {
     if (event.key !== "Enter") return;
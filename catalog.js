@@ -1047,8 +1047,12 @@ async function handleImportWebsite() {
   importWebsiteBtn.textContent = "Wird übernommen …";
   try {
     const response = await apiRequest("/clinic/catalog/import-from-website", { method: "POST", body: {} });
-    renderCatalog(response.catalog || {});
-    const n = Number(response.websiteSync?.importedTreatments || 0);
+    const result = await window.CuraboJobs.waitForWebsiteImport(apiRequest, (response.job || {}).id, (progress) => {
+      const pages = Number(progress.pagesFetched || 0);
+      if (pages) importWebsiteBtn.textContent = `${pages} Seiten gelesen …`;
+    });
+    renderCatalog(result.catalog || {});
+    const n = Number(result.websiteSync?.importedTreatments || 0);
     showToast(n ? `${n} Behandlungen übernommen` : "Website übernommen");
   } catch (error) {
     showToast(error.message || "Website-Import fehlgeschlagen");
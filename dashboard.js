@@ -3437,12 +3437,21 @@ function setTxnFilter(filter) {
   renderTransactions();
 }
 
+// The table filters client-side; totals come from the server and cover all entries.
+const TXN_MAX_PAGES = 10;
+
 async function loadTransactions() {
   if (txnBody && !state.transactions.length) {
     txnBody.innerHTML = `<tr><td colspan="7" class="txn-empty">Transaktionen werden geladen ...</td></tr>`;
   }
-  const response = await apiRequest("/clinic/transactions");
-  state.transactions = Array.isArray(response.transactions) ? response.transactions : [];
+  const transactions = [];
+  let response = await apiRequest("/clinic/transactions?limit=500");
+  for (let page = 1; ; page += 1) {
+    if (Array.isArray(response.transactions)) transactions.push(...response.transactions);
+    if (!response.nextCursor || page >= TXN_MAX_PAGES) break;
+    response = await apiRequest(`/clinic/transactions?limit=500&before=${encodeURIComponent(response.nextCursor)}`);
+  }
+  state.transactions = transactions;
   state.transactionSummary = response.summary && typeof response.summary === "object" ? response.summary : {};
   renderTransactions();
 }
@@ -3535,6 +3544,8 @@ function navigateDashboardRoute(targetView, filter = "") {
   showView(target);
 }
 
+// Calendar keeps the whole list in memory; cap the cursor walk for very large clinics.
+const APPOINTMENT_MAX_PAGES = 10;
 const APPOINTMENT_STATUS = {
   confirmed: { label: "Bestätigt", cls: "ok" },
   pending_confirmation: { label: "Offen", cls: "warn" },
@@ -3581,6 +3592,10 @@ function customerEmpty(text) {
   return `<p class="customer-empty">${escapeHtml(text)}</p>`;
 }
 
+function customerLoading() {
+  return '<div class="customer-loading">Wird geladen ...</div>';
+}
+
 function customerSummaryCard(label, value, detail = "", extraClass = "") {
   const className = extraClass ? ` ${escapeAttr(extraClass)}` : "";
   return `<div class="customer-summary-card${className}">
@@ -3753,10 +3768,10 @@ function renderCustomerDrawer(profile) {
     </div>
     ${customerDrawerSection("Membership", renderCustomerMembership(membership))}
     ${customerDrawerSection("Notizen", renderCustomerNotes(profile?.notes || {}))}
-    ${customerDrawerSection("Timeline", renderCustomerTimeline(profile?.timeline || []))}
+    ${customerDrawerSection("Timeline", profile?.timeline ? renderCustomerTimeline(profile.timeline) : customerLoading())}
     ${customerDrawerSection("Zahlungen", renderCustomerTransactions(transactions))}
     ${customerDrawerSection("Termine", renderCustomerAppointments(appointments))}
-    ${customerDrawerSection("Check-ins & Kampagnen", renderCustomerOperationalBlocks(profile))}
+    ${customerDrawerSection("Check-ins & Kampagnen", profile?.checkins ? renderCustomerOperationalBlocks(profile) : customerLoading())}
   `;
 }
 
@@ -3774,6 +3789,31 @@ function closeCustomerDrawer() {
   window.setTimeout(() => customerDrawer.classList.add("hidden"), 220);
 }
 
+const CUSTOMER_DRAWER_SECTIONS = "membership,notes,transactions,appointments";
+const CUSTOMER_DRAWER_LAZY_SECTIONS = "timeline,checkins,campaignContacts";
+
+function customerProfileUrl(email, sections) {
+  return `/clinic/customer?email=${encodeURIComponent(email)}&sections=${sections}`;
+}
+
+function mergeCustomerProfile(profile, partial) {
+  return {
+    ...(profile || {}),
+    ...(partial || {}),
+    summary: { ...(profile?.summary || {}), ...(partial?.summary || {}) },
+  };
+}
+
+async function loadCustomerDrawerSections(email, sections) {
+  const response = await apiRequest(customerProfileUrl(email, sections));
+  if (state.activeCustomerEmail !== email) return;
+  // Keep an unsaved note draft when only other sections were reloaded.
+  const draft = response.notes ? null : customerDrawerBody?.querySelector("[data-customer-notes]")?.value;
+  renderCustomerDrawer(mergeCustomerProfile(state.activeCustomerProfile, response));
+  const field = customerDrawerBody?.querySelector("[data-customer-notes]");
+  if (typeof draft === "string" && field instanceof HTMLTextAreaElement) field.value = draft;
+}
+
 async function openCustomerDrawer(email) {
   const clean = String(email || "").trim();
   if (!clean || !customerDrawer || !customerDrawerBody) return;
@@ -3784,10 +3824,15 @@ async function openCustomerDrawer(email) {
   window.requestAnimationFrame(() => customerDrawer.classList.add("open"));
   haptics("light");
   try {
-    const response = await apiRequest(`/clinic/customer?email=${encodeURIComponent(clean)}`);
+    const response = await apiRequest(customerProfileUrl(clean, CUSTOMER_DRAWER_SECTIONS));
     if (state.activeCustomerEmail !== clean) return;
     renderCustomerDrawer(response);
+    await loadCustomerDrawerSections(clean, CUSTOMER_DRAWER_LAZY_SECTIONS);
   } catch (error) {
+    if (state.activeCustomerProfile) {
+      showToast(error.message || "Timeline konnte nicht geladen werden.");
+      return;
+    }
     customerDrawerBody.innerHTML = `<div class="customer-empty">Kundenakte konnte nicht geladen werden. ${escapeHtml(error.message || "")}</div>`;
   }
 }
@@ -3806,8 +3851,7 @@ async function saveCustomerDrawerNotes() {
       method: "PUT",
       body: { patientEmail: email, notes: field.value.trim() },
     });
-    const response = await apiRequest(`/clinic/customer?email=${encodeURIComponent(email)}`);
-    if (state.activeCustomerEmail === email) renderCustomerDrawer(response);
+    await loadCustomerDrawerSections(email, "notes,timeline");
     showToast("Kundennotiz gespeichert");
   } catch (error) {
     showToast(error.message || "Notiz konnte nicht gespeichert werden.");
@@ -3882,8 +3926,14 @@ function renderAppointments() {
 }
 
 async function loadAppointments() {
-  const response = await apiRequest("/clinic/appointments?limit=200");
-  state.appointments = Array.isArray(response.appointments) ? response.appointments : [];
+  const appointments = [];
+  let response = await apiRequest("/clinic/appointments?limit=500");
+  for (let page = 1; ; page += 1) {
+    if (Array.isArray(response.appointments)) appointments.push(...response.appointments);
+    if (!response.nextCursor || page >= APPOINTMENT_MAX_PAGES) break;
+    response = await apiRequest(`/clinic/appointments?limit=500&cursor=${encodeURIComponent(response.nextCursor)}`);
+  }
+  state.appointments = appointments;
   if (response.summary && typeof response.summary === "object") {
     state.appointmentSummary = response.summary;
   }
@@ -4311,11 +4361,14 @@ async function importCatalogFromWebsite() {
       method: "POST",
       body: {},
     });
-    state.catalog = normalizeCatalogPayload(response.catalog || {});
+    const result = await window.CuraboJobs.waitForWebsiteImport(apiRequest, (response.job || {}).id, (progress) => {
+      importCatalogBtn.textContent = formatWebsiteImportProgress(progress);
+    });
+    state.catalog = normalizeCatalogPayload(result.catalog || {});
     renderCatalog();
     await Promise.all([loadAuditLogs(), loadSettings()]);
-    showToast(formatWebsiteImportSuccess(response.websiteSync));
-    await maybeAdoptWebsiteBranding(response.websiteSync);
+    showToast(formatWebsiteImportSuccess(result.websiteSync));
+    await maybeAdoptWebsiteBranding(result.websiteSync);
   } catch (error) {
     showToast(humanizeImportError(error.message || "Website-Import fehlgeschlagen"));
   } finally {
@@ -4381,6 +4434,15 @@ async function handleCreateCampaign(event) {
   }
 }
 
+function formatWebsiteImportProgress(progress) {
+  const fetched = Number(progress?.pagesFetched || 0);
+  const services = Number(progress?.servicesFound || 0);
+  if (progress?.phase === "saving") return "Behandlungen werden gespeichert ...";
+  if (progress?.phase === "branding") return `${fetched} Seiten gelesen · ${services} Behandlungen gefunden`;
+  if (!fetched) return "Website wird gelesen ...";
+  return `${fetched} Seiten gelesen · ${services} Behandlungen ...`;
+}
+
 async function runCampaign(campaignId) {
   if (!state.isOwner) {
     showToast("Nur Owner können Kampagnen starten.");
@@ -4394,7 +4456,7 @@ async function runCampaign(campaignId) {
   let count = Number(campaign.totalAudience || 0);
   let recipients = [];
   try {
-    const audience = await apiRequest(`/clinic/campaigns/${campaignId}/audience`);
+    const audience = await apiRequest(`/clinic/campaigns/${campaignId}/audience?limit=5`);
     count = Number(audience.count || 0);
     recipients = Array.isArray(audience.recipients) ? audience.recipients : [];
   } catch (_) {
@@ -4417,8 +4479,12 @@ async function runCampaign(campaignId) {
       method: "POST",
       body: {},
     });
+    showToast("Kampagne eingeplant – Versand läuft …");
+    const job = await window.CuraboJobs.waitForBackgroundJob(apiRequest, (response.job || {}).id, {
+      timeoutMessage: "Der Versand läuft noch im Hintergrund – Ergebnis später im Versandprotokoll.",
+    });
     await Promise.all([loadCampaigns(), loadAuditLogs()]);
-    const delivery = (response.run || {}).delivery || {};
+    const delivery = ((job.result || {}).run || {}).delivery || {};
     const sent = Number(delivery.sent || 0);
     const failed = Number(delivery.failed || 0);
     const sentLabel = sent === 1 ? "1 Kunde erreicht" : `${sent} Kunden erreicht`;
@@ -4445,8 +4511,8 @@ async function runDueCampaigns() {
       body: { limit: 20 },
     });
     await Promise.all([loadCampaigns(), loadAuditLogs(), loadAnalyticsSummary()]);
-    const executed = Number(response.executed || 0);
-    showToast(`Fällige Kampagnen ausgeführt: ${executed}`);
+    const queued = Number(response.queued || 0);
+    showToast(`Fällige Kampagnen eingeplant: ${queued}`);
   } catch (error) {
     showToast(error.message);
   } finally {
@@ -4615,17 +4681,22 @@ async function handleSettingsSave(event) {
   try {
     saveSettingsBtn.disabled = true;
     const response = await apiRequest("/clinic/settings", { method: "PUT", body: payload });
-    await Promise.all([
-      loadSettings(),
-      loadAuditLogs(),
-      response.websiteSync?.success ? loadCatalog() : Promise.resolve(),
-    ]);
-
-    const importedTreatments = Number(response.websiteSync?.importedTreatments || 0);
-    if (response.websiteSync?.success && websiteValue) {
-      showToast(`Einstellungen gespeichert · ${formatWebsiteImportSuccess(response.websiteSync)}`);
+    await Promise.all([loadSettings(), loadAuditLogs()]);
+
+    if (response.websiteSync?.queued && websiteValue) {
+      showToast("Einstellungen gespeichert · Website wird übernommen ...");
+      let websiteSync;
+      try {
+        const result = await window.CuraboJobs.waitForWebsiteImport(apiRequest, response.websiteSync.job?.id);
+        websiteSync = result.websiteSync;
+      } catch (error) {
+        showToast(`Einstellungen gespeichert · ${humanizeImportError(error.message)}`);
+        return;
+      }
+      await Promise.all([loadCatalog(), loadAuditLogs()]);
+      showToast(`Einstellungen gespeichert · ${formatWebsiteImportSuccess(websiteSync)}`);
       if (shouldOfferWebsiteBranding) {
-        await maybeAdoptWebsiteBranding(response.websiteSync);
+        await maybeAdoptWebsiteBranding(websiteSync);
       }
       return;
     }
@@ -0,0 +1,41 @@
+(() => {
+  // Polls /clinic/jobs/:id until the worker has a final result. `request` is the page's
+  // apiRequest, so session handling and error messages stay the same as for other calls.
+  async function waitForBackgroundJob(
+    request,
+    jobId,
+    {
+      intervalMs = 1000,
+      timeoutMs = 120000,
+      onProgress = null,
+      failureMessage = "Job fehlgeschlagen.",
+      timeoutMessage = "Der Job läuft noch im Hintergrund – Ergebnis bitte später neu laden.",
+    } = {},
+  ) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const response = await request(`/clinic/jobs/${jobId}`);
+      const job = response.job || {};
+      if (job.status === "succeeded") return job;
+      if (job.status === "dead") throw new Error(job.lastError || failureMessage);
+      if (onProgress) onProgress(job.progress || {});
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+    throw new Error(timeoutMessage);
+  }
+
+  async function waitForWebsiteImport(request, jobId, onProgress) {
+    const job = await waitForBackgroundJob(request, jobId, {
+      timeoutMs: 180000,
+      onProgress,
+      failureMessage: "Website-Import fehlgeschlagen",
+      timeoutMessage: "Der Website-Import läuft noch im Hintergrund – bitte später neu laden.",
+    });
+    return job.result || {};
+  }
+
+  window.CuraboJobs = {
+    waitForBackgroundJob,
+    waitForWebsiteImport,
+  };
+})();
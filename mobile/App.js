@@ -1054,6 +1054,29 @@ async function verifyPhoneOtp(baseUrl, payload) {
   return parseJsonPayload(text) || {};
 }
 
+async function fetchPhoneOtpStatus(baseUrl, payload) {
+  const safeBaseUrl = normalizeUrl(baseUrl);
+  const params = new URLSearchParams();
+  Object.entries(payload || {}).forEach(([key, value]) => {
+    const safeValue = String(value || '').trim();
+    if (safeValue) {
+      params.set(key, safeValue);
+    }
+  });
+  const response = await fetchWithRetry(`${safeBaseUrl}/api/mobile/auth/otp/status?${params.toString()}`, {
+    method: 'GET',
+    headers: {
+      Accept: 'application/json',
+    },
+  }, { timeoutMs: 6000, retries: 0, retryDelayMs: 450 });
+
+  const text = await response.text();
+  if (!response.ok) {
+    throw buildApiError('OTP-Status konnte nicht geladen werden.', response.status, text);
+  }
+  return parseJsonPayload(text) || {};
+}
+
 async function fetchBackendHealth(baseUrl) {
   const safeBaseUrl = normalizeUrl(baseUrl);
   const response = await fetchWithRetry(`${safeBaseUrl}/api/health`, {
@@ -1499,6 +1522,7 @@ export default function App() {
   const liquidShineAnim = useRef(new Animated.Value(-220)).current;
   const floatingAuraAnim = useRef(new Animated.Value(0)).current;
   const clinicSearchRequestRef = useRef(0);
+  const otpDeliveryWatchRef = useRef('');
   const mainScrollRef = useRef(null);
   const checkoutReturnHandledRef = useRef('');
   const analyticsBaseUrlRef = useRef('');
@@ -2429,7 +2453,30 @@ function selectClinicFromSearch(clinic) {
     setOtpFeedback(fallbackMessage || `Code an ${phoneLabel} gesendet.`, 'success');
   }
 
+  async function watchOtpDelivery(baseUrl, statusPayload) {
+    // The SMS is sent in the background; surface provider failures instead of a silent wait.
+    const requestId = String(statusPayload?.requestId || '').trim();
+    if (!baseUrl || !requestId) return;
+    otpDeliveryWatchRef.current = requestId;
+    for (let attempt = 0; attempt < 8; attempt += 1) {
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+      if (otpDeliveryWatchRef.current !== requestId) return;
+      try {
+        const status = await fetchPhoneOtpStatus(baseUrl, statusPayload);
+        if (otpDeliveryWatchRef.current !== requestId) return;
+        if (status.delivery === 'sent') return;
+        if (status.delivery === 'failed') {
+          setOtpFeedback('SMS-Zustellung aktuell nicht möglich. Bitte später erneut versuchen oder als Gast fortfahren.', 'error');
+          return;
+        }
+      } catch {
+        return;
+      }
+    }
+  }
+
   function resetOtpFlow() {
+    otpDeliveryWatchRef.current = '';
     setOtpCode('');
     setOtpRequestId('');
     setOtpRequestedPhone('');
@@ -2699,6 +2746,14 @@ function continueToAccessStep() {
         setOtpExpiresAt(String(response.expiresAt || '').trim());
         setOtpCode('');
         applyOtpSuccessFeedback(response, `Code gesendet an ${String(response.maskedPhone || normalizedPhone).trim()}.`);
+        if (response.delivery === 'pending') {
+          watchOtpDelivery(baseUrl, {
+            clinicId: resolvedClinicId,
+            clinicName: resolvedClinicName,
+            phone: normalizedPhone,
+            requestId: response.requestId,
+          });
+        }
       } catch (error) {
         applyOtpApiError(error, 'OTP-Code konnte nicht angefordert werden.');
       } finally {
@@ -2738,6 +2793,7 @@ function continueToAccessStep() {
       setPatientGuestMode(false);
       await writeSecureValue(STORAGE_KEYS.patientPhone, normalizedPhone);
       await writeSecureValue(STORAGE_KEYS.patientGuestMode, '0');
+      otpDeliveryWatchRef.current = '';
       setOtpFeedback('Telefonnummer bestätigt. Verbinde MedSpa ...', 'success');
       setOtpCooldownUntil(0);
       setOtpCountdown(0);
@@ -2806,6 +2862,14 @@ function continueToAccessStep() {
       setOtpExpiresAt(String(response.expiresAt || '').trim());
       setOtpCode('');
       applyOtpSuccessFeedback(response, `Neuer Code an ${String(response.maskedPhone || normalizedPhone).trim()} gesendet.`);
+      if (response.delivery === 'pending') {
+        watchOtpDelivery(baseUrl, {
+          clinicId: resolvedClinicId,
+          clinicName: resolvedClinicName,
+          phone: normalizedPhone,
+          requestId: response.requestId,
+        });
+      }
     } catch (error) {
       applyOtpApiError(error, 'Code konnte nicht erneut gesendet werden.');
     } finally {
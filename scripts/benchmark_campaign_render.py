@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import CompiledCampaignTemplate  # noqa: E402
+
+
+DEFAULT_TITLE = "Update von {{clinic}}"
+DEFAULT_BODY = "Hallo {{name}}, dein Status: {{membership_status}}. Neues Angebot bei {{clinic}} wartet auf dich ({{email}})."
+
+
+def legacy_render(template_text: str, profile: dict, clinic_name: str) -> str:
+  # Previous implementation: replacements dict + str.replace chain per call.
+  rendered = str(template_text or "")
+  replacements = {
+    "{{name}}": str(profile.get("name") or "Patient"),
+    "{{email}}": str(profile.get("email") or ""),
+    "{{clinic}}": str(clinic_name or "deine Klinik"),
+    "{{membership_status}}": str(profile.get("membershipStatus") or "inactive"),
+  }
+  for key, value in replacements.items():
+    rendered = rendered.replace(key, value)
+  return rendered
+
+
+def build_profiles(count: int) -> list[dict]:
+  return [
+    {
+      "key": f"patient{index}@example.com",
+      "email": f"patient{index}@example.com",
+      "name": f"Patient {index}",
+      "membershipStatus": "active" if index % 3 else "past_due",
+    }
+    for index in range(count)
+  ]
+
+
+def run_legacy(profiles: list[dict], title: str, body: str, clinic_name: str) -> float:
+  started = time.perf_counter()
+  for profile in profiles:
+    legacy_render(title, profile, clinic_name)
+    legacy_render(body, profile, clinic_name)
+  return time.perf_counter() - started
+
+
+def run_compiled(profiles: list[dict], title: str, body: str, clinic_name: str) -> float:
+  started = time.perf_counter()
+  title_template = CompiledCampaignTemplate(title, clinic_name)
+  body_template = CompiledCampaignTemplate(body, clinic_name)
+  for profile in profiles:
+    title_template.render(profile)
+    body_template.render(profile)
+  return time.perf_counter() - started
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description="Render-Durchsatz fuer Kampagnen-Templates messen.")
+  parser.add_argument("--recipients", type=int, default=100_000)
+  parser.add_argument("--title", default=DEFAULT_TITLE)
+  parser.add_argument("--body", default=DEFAULT_BODY)
+  parser.add_argument("--clinic", default="Moser Milani Medical Spa")
+  args = parser.parse_args()
+
+  profiles = build_profiles(max(1, args.recipients))
+  sample = profiles[min(42, len(profiles) - 1)]
+  expected = (legacy_render(args.title, sample, args.clinic), legacy_render(args.body, sample, args.clinic))
+  actual = (
+    CompiledCampaignTemplate(args.title, args.clinic).render(sample),
+    CompiledCampaignTemplate(args.body, args.clinic).render(sample),
+  )
+  if expected != actual:
+    raise SystemExit(f"Ausgabe weicht ab: {expected!r} != {actual!r}")
+
+  legacy_seconds = run_legacy(profiles, args.title, args.body, args.clinic)
+  compiled_seconds = run_compiled(profiles, args.title, args.body, args.clinic)
+  for label, seconds in (("str.replace-Kette", legacy_seconds), ("kompiliert", compiled_seconds)):
+    print(f"{label:>18}: {seconds:.3f}s  ({len(profiles) / seconds:,.0f} Empfaenger/s)")
+  print(f"{'Speedup':>18}: {legacy_seconds / compiled_seconds:.2f}x")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
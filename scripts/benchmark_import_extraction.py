@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from server import (  # noqa: E402
+  EMAIL_PATTERN,
+  IMPORT_SERVICE_PATH_KEYWORDS,
+  clean_import_text,
+  extract_address_from_import_soup,
+  extract_contacts_from_import_soup,
+  extract_import_data_from_pages,
+  extract_import_link_hrefs,
+  extract_import_page_facts,
+  extract_name_from_import_soup,
+  extract_prices_from_import_soup,
+  extract_services_from_import_soup,
+  is_service_like_import_url,
+  lxml,
+  normalize_keyword_text,
+  normalize_phone_for_import,
+)
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PAGES = [
+  REPO_DIR / "index.html",
+  REPO_DIR / "portfolio-site" / "index.html",
+  REPO_DIR / "portfolio-site" / "wp-live-content.html",
+  REPO_DIR / "wix-export" / "index-wix.html",
+]
+
+
+def load_pages(paths: list[Path], base_url: str) -> list[tuple[str, str]]:
+  # The first file is the root page; the others are served as service pages unless their
+  # file name already reads like one of the crawler's path keywords.
+  pages = []
+  for index, path in enumerate(paths):
+    html_text = path.read_text(encoding="utf-8", errors="replace")
+    stem = path.stem.lower()
+    if index == 0:
+      page_path = "/"
+    elif any(keyword.strip("/") in stem for keyword in IMPORT_SERVICE_PATH_KEYWORDS):
+      page_path = f"/{stem}"
+    else:
+      page_path = f"/leistungen/{stem}"
+    pages.append((base_url.rstrip("/") + page_path, html_text))
+  return pages
+
+
+def legacy_extract(pages: list[dict]) -> dict:
+  # Previous implementation: every soup stays alive until the end, then each extractor walks it again.
+  extracted_name = None
+  extracted_address = None
+  phones: list[str] = []
+  emails: list[str] = []
+  services: list[dict] = []
+  prices: list[dict] = []
+  seen_phone: set[str] = set()
+  seen_email: set[str] = set()
+  seen_service: set[str] = set()
+  seen_price: set[tuple[str, str]] = set()
+  root_page_url = str(pages[0]["url"]) if pages else ""
+  has_service_like_pages = any(is_service_like_import_url(str(page["url"])) for page in pages)
+  for page in pages:
+    soup = page["soup"]
+    page_url = str(page["url"])
+    if extracted_name is None:
+      extracted_name = extract_name_from_import_soup(soup)
+    if extracted_address is None:
+      extracted_address = extract_address_from_import_soup(soup)
+    page_phones, page_emails = extract_contacts_from_import_soup(soup)
+    for phone in page_phones:
+      normalized = normalize_phone_for_import(phone)
+      if normalized and normalized not in seen_phone:
+        seen_phone.add(normalized)
+        phones.append(normalized)
+    for email in page_emails:
+      normalized = clean_import_text(email, 180).lower()
+      if EMAIL_PATTERN.fullmatch(normalized) and normalized not in seen_email:
+        seen_email.add(normalized)
+        emails.append(normalized)
+    include_services = is_service_like_import_url(page_url) or (
+      (not has_service_like_pages) and (page_url == root_page_url or len(pages) == 1)
+    )
+    if include_services:
+      for item in extract_services_from_import_soup(soup, page_url):
+        key = normalize_keyword_text(item["title"])
+        if key not in seen_service:
+          seen_service.add(key)
+          services.append(item)
+      for item in extract_prices_from_import_soup(soup, page_url):
+        key = (normalize_keyword_text(item["title"]), str(item["price"]).lower())
+        if key not in seen_price:
+          seen_price.add(key)
+          prices.append(item)
+  return {
+    "name": extracted_name,
+    "address": extracted_address,
+    "phone": phones[0] if phones else None,
+    "email": emails[0] if emails else None,
+    "services": services,
+    "prices": prices,
+  }
+
+
+def run_legacy(pages: list[tuple[str, str]]) -> dict:
+  parsed = [{"url": url, "soup": BeautifulSoup(html_text, "html.parser")} for url, html_text in pages]
+  return legacy_extract(parsed)
+
+
+def run_streaming(pages: list[tuple[str, str]], parser: str) -> dict:
+  extracted_pages = []
+  for index, (url, html_text) in enumerate(pages):
+    soup = BeautifulSoup(html_text, parser)
+    hrefs = extract_import_link_hrefs(soup)
+    extracted_pages.append({"url": url, "facts": extract_import_page_facts(soup, url, hrefs, index == 0)})
+    soup.decompose()
+  return extract_import_data_from_pages(extracted_pages)
+
+
+def measure(label: str, runner, repeat: int, page_count: int) -> dict:
+  # Peak memory comes from a separate traced run; tracemalloc would distort the timing.
+  tracemalloc.start()
+  result = runner()
+  _current, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  started = time.perf_counter()
+  for _ in range(repeat):
+    runner()
+  seconds = time.perf_counter() - started
+  print(
+    f"{label:>22}: {seconds / repeat * 1000:8.1f} ms/Import  "
+    f"({page_count * repeat / seconds:,.0f} Seiten/s, Spitze {peak / 1024 / 1024:.1f} MB)"
+  )
+  return {"seconds": seconds, "result": result}
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description="Extraktion des Website-Imports auf gespeicherten Klinik-Seiten messen.")
+  parser.add_argument("pages", nargs="*", type=Path, help="Gespeicherte HTML-Dateien, die erste ist die Startseite.")
+  parser.add_argument("--repeat", type=int, default=20)
+  parser.add_argument("--base-url", default="https://www.beispiel-klinik.de")
+  args = parser.parse_args()
+
+  paths = args.pages or [path for path in DEFAULT_PAGES if path.exists()]
+  if not paths:
+    raise SystemExit("Keine HTML-Dateien gefunden.")
+  pages = load_pages(paths, args.base_url)
+  repeat = max(1, args.repeat)
+  total_kb = sum(len(html_text.encode("utf-8")) for _url, html_text in pages) / 1024
+  print(f"{len(pages)} Seiten, {total_kb:,.0f} KB HTML, {repeat} Wiederholungen")
+
+  legacy = measure("html.parser, alle Baeume", lambda: run_legacy(pages), repeat, len(pages))
+  streaming = measure("html.parser, streamend", lambda: run_streaming(pages, "html.parser"), repeat, len(pages))
+  if streaming["result"] != legacy["result"]:
+    raise SystemExit("Streaming-Extraktion weicht von der bisherigen Extraktion ab.")
+
+  if lxml is None:
+    print(f"{'lxml':>22}: nicht installiert (pip install lxml)")
+    return 0
+  fast = measure("lxml, streamend", lambda: run_streaming(pages, "lxml"), repeat, len(pages))
+  if fast["result"] != legacy["result"]:
+    print(f"{'Hinweis':>22}: lxml liefert fuer diese Seiten leicht abweichende Treffer")
+  print(f"{'Speedup':>22}: {legacy['seconds'] / fast['seconds']:.2f}x")
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
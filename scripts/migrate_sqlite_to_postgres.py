@@ -5,6 +5,7 @@ import argparse
 import os
 import sqlite3
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -279,6 +280,13 @@ def truncate_target_tables(cur: psycopg.Cursor) -> None:
   cur.execute(sql.SQL("TRUNCATE TABLE {} RESTART IDENTITY CASCADE").format(names))
 
 
+def to_pg_value(column: str, value: object) -> object:
+  # SQLite stores timestamp columns as epoch milliseconds; Postgres uses TIMESTAMPTZ.
+  if isinstance(value, int) and (column.endswith("_at") or column == "current_period_end"):
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+  return value
+
+
 def copy_table(cur: psycopg.Cursor, table: TableSpec, rows: list[sqlite3.Row], selected_columns: tuple[str, ...]) -> int:
   if not rows:
     return 0
@@ -313,7 +321,7 @@ def copy_table(cur: psycopg.Cursor, table: TableSpec, rows: list[sqlite3.Row], s
       values=sql.SQL(", ").join(placeholders),
     )
 
-  payload = [tuple(row[c] for c in selected_columns) for row in rows]
+  payload = [tuple(to_pg_value(c, row[c]) for c in selected_columns) for row in rows]
   cur.executemany(query, payload)
   return len(payload)
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from server import (  # noqa: E402
+  collect_import_bundle_from_website,
+  get_db,
+  resolve_import_target,
+  write_imported_clinic_record,
+)
+
+
+URL_COLUMNS = ("url", "website", "webseite", "website_url")
+REPORT_FIELDS = [
+  "url",
+  "domain",
+  "status",
+  "clinic_id",
+  "services",
+  "prices",
+  "pages_fetched",
+  "pages_cached",
+  "seconds",
+  "error",
+]
+
+
+def read_urls(path: Path) -> list[str]:
+  # Accepts a column named url/website (any case) or, without such a header, the first column.
+  with path.open(newline="", encoding="utf-8-sig") as handle:
+    rows = [row for row in csv.reader(handle) if row and row[0].strip() and not row[0].lstrip().startswith("#")]
+  if not rows:
+    return []
+  header = [cell.strip().lower() for cell in rows[0]]
+  column = next((header.index(name) for name in URL_COLUMNS if name in header), None)
+  if column is not None:
+    rows = rows[1:]
+  else:
+    column = 0
+  return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+def plan_imports(urls: list[str]) -> tuple[list[dict], list[dict]]:
+  # One crawl per canonical domain: duplicates would hit the same site twice and race on the same clinic row.
+  jobs: list[dict] = []
+  rejected: list[dict] = []
+  seen_domains: dict[str, str] = {}
+  for url in urls:
+    try:
+      _normalized_url, canonical_domain, _website_url = resolve_import_target(url)
+    except ValueError as exc:
+      rejected.append(report_row(url, "", "failed", error=str(exc)))
+      continue
+    if canonical_domain in seen_domains:
+      rejected.append(
+        report_row(url, canonical_domain, "skipped", error=f"Domain kommt bereits vor: {seen_domains[canonical_domain]}")
+      )
+      continue
+    seen_domains[canonical_domain] = url
+    jobs.append({"url": url, "domain": canonical_domain})
+  return jobs, rejected
+
+
+def report_row(url: str, domain: str, status: str, **fields) -> dict:
+  row = {field: "" for field in REPORT_FIELDS}
+  row.update({"url": url, "domain": domain, "status": status})
+  row.update({key: value for key, value in fields.items() if key in row})
+  return row
+
+
+def init_worker(per_host: int) -> None:
+  # Per-domain politeness: every domain is crawled by exactly one process, at most per_host requests at a time.
+  server.IMPORT_CRAWL_CONCURRENCY = per_host
+
+
+def collect_clinic(url: str) -> dict:
+  # Runs in a pool process. Only the picklable parts of the bundle travel back; the parent does all clinic writes.
+  started = time.monotonic()
+  try:
+    bundle = collect_import_bundle_from_website(url, include_branding=False)
+  except (ValueError, RuntimeError) as exc:
+    return {"ok": False, "error": str(exc), "seconds": time.monotonic() - started}
+  except Exception as exc:
+    return {"ok": False, "error": f"{type(exc).__name__}: {exc}", "seconds": time.monotonic() - started}
+  crawl_result = bundle["crawlResult"]
+  return {
+    "ok": True,
+    "sourceUrl": bundle["sourceUrl"],
+    "websiteUrl": bundle["websiteUrl"],
+    "canonicalDomain": bundle["canonicalDomain"],
+    "extracted": bundle["extracted"],
+    "pagesFetched": crawl_result["pages_fetched"],
+    "pagesCached": crawl_result["pages_cached"],
+    "seconds": time.monotonic() - started,
+  }
+
+
+def write_clinic(conn, job: dict, result: dict) -> dict:
+  extracted = result["extracted"]
+  clinic_id, created = write_imported_clinic_record(
+    conn,
+    result["sourceUrl"],
+    result["websiteUrl"],
+    result["canonicalDomain"],
+    extracted,
+  )
+  return report_row(
+    job["url"],
+    job["domain"],
+    "created" if created else "updated",
+    clinic_id=clinic_id,
+    services=len(extracted.get("services") or []),
+    prices=len(extracted.get("prices") or []),
+    pages_fetched=result["pagesFetched"],
+    pages_cached=result["pagesCached"],
+    seconds=f"{result['seconds']:.1f}",
+  )
+
+
+def write_batch(batch: list[tuple[dict, dict]]) -> list[dict]:
+  # One transaction per batch; if it fails, retry clinic by clinic so a single bad record only fails itself.
+  try:
+    with get_db() as conn:
+      return [write_clinic(conn, job, result) for job, result in batch]
+  except Exception:
+    server.app.logger.warning("Batch of %s clinics failed to save, retrying one by one", len(batch), exc_info=True)
+  rows = []
+  for job, result in batch:
+    try:
+      with get_db() as conn:
+        rows.append(write_clinic(conn, job, result))
+    except Exception as exc:
+      rows.append(
+        report_row(job["url"], job["domain"], "failed", seconds=f"{result['seconds']:.1f}", error=f"Speichern: {exc}")
+      )
+  return rows
+
+
+def write_report(path: Path, rows: list[dict], urls: list[str]) -> None:
+  # Same order as the input CSV, whatever order the imports finished in.
+  positions = {url: index for index, url in reversed(list(enumerate(urls)))}
+  rows = sorted(rows, key=lambda row: positions.get(row["url"], len(urls)))
+  with path.open("w", newline="", encoding="utf-8") as handle:
+    writer = csv.DictWriter(handle, fieldnames=REPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description="Viele Kliniken aus einer CSV mit Website-URLs importieren.")
+  parser.add_argument("csv", type=Path, help="CSV mit Spalte url/website oder URLs in der ersten Spalte.")
+  parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1), help="Parallele Import-Prozesse.")
+  parser.add_argument("--batch-size", type=int, default=20, help="Kliniken pro Schreib-Transaktion.")
+  parser.add_argument("--per-host", type=int, default=2, help="Gleichzeitige Anfragen pro Website.")
+  parser.add_argument("--report", type=Path, default=Path("onboarding-report.csv"))
+  args = parser.parse_args()
+
+  if not args.csv.exists():
+    raise SystemExit(f"CSV nicht gefunden: {args.csv}")
+  urls = read_urls(args.csv)
+  jobs, rows = plan_imports(urls)
+  if not jobs:
+    write_report(args.report, rows, urls)
+    raise SystemExit("Keine gültigen Website-URLs in der CSV.")
+
+  workers = max(1, min(args.workers, len(jobs)))
+  batch_size = max(1, args.batch_size)
+  per_host = max(1, min(args.per_host, 16))
+  print(f"{len(jobs)} Kliniken, {workers} Prozesse, {per_host} Anfragen pro Website")
+
+  started = time.monotonic()
+  pending: list[tuple[dict, dict]] = []
+  done = 0
+  try:
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(per_host,)) as pool:
+      futures = {pool.submit(collect_clinic, job["url"]): job for job in jobs}
+      for future in as_completed(futures):
+        job = futures[future]
+        done += 1
+        try:
+          result = future.result()
+        except Exception as exc:
+          result = {"ok": False, "error": f"{type(exc).__name__}: {exc}", "seconds": 0.0}
+        if result["ok"]:
+          pending.append((job, result))
+          print(f"[{done}/{len(jobs)}] {job['domain']}: {result['pagesFetched']} Seiten, {result['seconds']:.1f} s")
+        else:
+          rows.append(report_row(job["url"], job["domain"], "failed", seconds=f"{result['seconds']:.1f}", error=result["error"]))
+          print(f"[{done}/{len(jobs)}] {job['domain']}: Fehler: {result['error']}")
+        if len(pending) >= batch_size:
+          rows.extend(write_batch(pending))
+          pending = []
+  finally:
+    # Also on Ctrl+C: everything crawled so far is stored and shows up in the report.
+    if pending:
+      rows.extend(write_batch(pending))
+    write_report(args.report, rows, urls)
+
+  seconds = time.monotonic() - started
+  counts = {status: sum(1 for row in rows if row["status"] == status) for status in ("created", "updated", "failed", "skipped")}
+  imported = counts["created"] + counts["updated"]
+  print(
+    f"{counts['created']} angelegt, {counts['updated']} aktualisiert, {counts['failed']} fehlgeschlagen, "
+    f"{counts['skipped']} übersprungen in {seconds:.1f} s ({imported / seconds * 3600:,.0f} Kliniken/h)"
+  )
+  print(f"Bericht: {args.report}")
+  return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -95,7 +95,22 @@ CAMPAIGN_ID="$(python3 -c 'import json,sys; print(json.load(open(sys.argv[1]))["
 
 curl -sS -b "${COOKIE_FILE}" \
   -X POST "${BASE_URL}/api/clinic/campaigns/${CAMPAIGN_ID}/run" \
-  > "${OUT_DIR}/campaign_run.json"
+  > "${OUT_DIR}/campaign_run_queued.json"
+
+# Campaign runs are executed by the background worker; poll the job until it is finished.
+JOB_ID="$(python3 -c 'import json,sys; print(json.load(open(sys.argv[1]))["job"]["id"])' "${OUT_DIR}/campaign_run_queued.json")"
+for _ in $(seq 1 30); do
+  curl -sS -b "${COOKIE_FILE}" \
+    "${BASE_URL}/api/clinic/jobs/${JOB_ID}" \
+    > "${OUT_DIR}/campaign_job.json"
+  JOB_STATUS="$(python3 -c 'import json,sys; print(json.load(open(sys.argv[1]))["job"]["status"])' "${OUT_DIR}/campaign_job.json")"
+  if [[ "${JOB_STATUS}" == "succeeded" || "${JOB_STATUS}" == "dead" ]]; then
+    break
+  fi
+  sleep 1
+done
+python3 -c 'import json,sys; json.dump(json.load(open(sys.argv[1]))["job"].get("result") or {}, open(sys.argv[2], "w"))' \
+  "${OUT_DIR}/campaign_job.json" "${OUT_DIR}/campaign_run.json"
 
 curl -sS -b "${COOKIE_FILE}" \
   "${BASE_URL}/api/clinic/campaigns/${CAMPAIGN_ID}/deliveries?limit=20" \
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import bisect
 import html
 import os
 import re
 import secrets
+import socket
 import sqlite3
 import hashlib
 import hmac
 import json
+import threading
+import time
+import unicodedata
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import parse_qs, quote_plus, unquote_plus, urljoin, urlparse
@@ -21,7 +27,12 @@ import stripe
 import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import Flask, jsonify, request, send_from_directory, session
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import is_resource_modified
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
@@ -38,13 +49,19 @@ try:
 except ImportError:
   segno = None
 
+try:
+  import lxml  # noqa: F401  (only used as BeautifulSoup tree builder)
+except ImportError:
+  lxml = None
+
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "clinicflow.db"
 ENV_PATH = BASE_DIR / ".env"
 
 load_dotenv(ENV_PATH)
 
+DB_PATH = Path(os.getenv("SQLITE_DB_PATH", "").strip() or BASE_DIR / "clinicflow.db")
+
 APP_SECRET_KEY = os.getenv("APP_SECRET_KEY") or secrets.token_hex(32)
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
@@ -199,6 +216,9 @@ PATIENT_APPOINTMENT_SLOT_TIMES = (
   (16, 0),
 )
 PATIENT_APPOINTMENT_LOOKAHEAD_DAYS = 21
+PATIENT_APPOINTMENT_SLOT_STEP_MINUTES = 30
+PATIENT_APPOINTMENT_DEFAULT_DURATION_MINUTES = 30
+PATIENT_APPOINTMENT_MIN_LEAD_HOURS = 2
 PATIENT_APPOINTMENT_SLOT_DAY_LIMIT = 7
 GERMAN_WEEKDAY_SHORT = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
 GERMAN_MONTH_NAMES = (
@@ -271,6 +291,146 @@ MOBILE_OTP_ALLOW_DEBUG_FALLBACK_ON_DELIVERY_FAILURE = os.getenv(
   "MOBILE_OTP_ALLOW_DEBUG_FALLBACK_ON_DELIVERY_FAILURE",
   "false",
 ).lower() in {"1", "true", "yes"}
+
+try:
+  MOBILE_OTP_SMS_MAX_ATTEMPTS = max(1, min(int(os.getenv("MOBILE_OTP_SMS_MAX_ATTEMPTS", "3")), 8))
+except ValueError:
+  MOBILE_OTP_SMS_MAX_ATTEMPTS = 3
+try:
+  GUNICORN_THREADS = max(1, min(int(os.getenv("GUNICORN_THREADS", "4")), 64))
+except ValueError:
+  GUNICORN_THREADS = 4
+
+try:
+  OUTBOUND_HTTP_POOL_MAXSIZE = max(1, min(int(os.getenv("OUTBOUND_HTTP_POOL_MAXSIZE", str(GUNICORN_THREADS))), 128))
+except ValueError:
+  OUTBOUND_HTTP_POOL_MAXSIZE = GUNICORN_THREADS
+
+try:
+  OUTBOUND_HTTP_RETRIES = max(0, min(int(os.getenv("OUTBOUND_HTTP_RETRIES", "2")), 5))
+except ValueError:
+  OUTBOUND_HTTP_RETRIES = 2
+
+try:
+  OUTBOUND_CIRCUIT_FAILURE_THRESHOLD = max(1, min(int(os.getenv("OUTBOUND_CIRCUIT_FAILURE_THRESHOLD", "5")), 100))
+except ValueError:
+  OUTBOUND_CIRCUIT_FAILURE_THRESHOLD = 5
+
+try:
+  OUTBOUND_CIRCUIT_RESET_SECONDS = max(1.0, min(float(os.getenv("OUTBOUND_CIRCUIT_RESET_SECONDS", "30")), 900.0))
+except ValueError:
+  OUTBOUND_CIRCUIT_RESET_SECONDS = 30.0
+
+try:
+  OUTBOUND_REQUEST_BUDGET_SECONDS = max(1.0, min(float(os.getenv("OUTBOUND_REQUEST_BUDGET_SECONDS", "20")), 55.0))
+except ValueError:
+  OUTBOUND_REQUEST_BUDGET_SECONDS = 20.0
+
+try:
+  IMPORT_CRAWL_CONCURRENCY = max(1, min(int(os.getenv("IMPORT_CRAWL_CONCURRENCY", "4")), 16))
+except ValueError:
+  IMPORT_CRAWL_CONCURRENCY = 4
+
+try:
+  IMPORT_CRAWL_DEADLINE_SECONDS = max(5.0, min(float(os.getenv("IMPORT_CRAWL_DEADLINE_SECONDS", "25")), 120.0))
+except ValueError:
+  IMPORT_CRAWL_DEADLINE_SECONDS = 25.0
+
+try:
+  IMPORT_CRAWL_SERVICE_PAGE_TARGET = max(1, min(int(os.getenv("IMPORT_CRAWL_SERVICE_PAGE_TARGET", "4")), 10))
+except ValueError:
+  IMPORT_CRAWL_SERVICE_PAGE_TARGET = 4
+
+try:
+  IMPORT_FETCH_CACHE_FRESH_SECONDS = max(0, min(int(os.getenv("IMPORT_FETCH_CACHE_FRESH_SECONDS", "600")), 86400))
+except ValueError:
+  IMPORT_FETCH_CACHE_FRESH_SECONDS = 600
+
+try:
+  IMPORT_FETCH_CACHE_MAX_AGE_SECONDS = max(3600, min(int(os.getenv("IMPORT_FETCH_CACHE_MAX_AGE_SECONDS", "604800")), 2592000))
+except ValueError:
+  IMPORT_FETCH_CACHE_MAX_AGE_SECONDS = 604800
+
+# BeautifulSoup tree builder for imported pages: lxml is several times faster than the
+# pure-Python html.parser and is used whenever it is installed ("auto").
+IMPORT_HTML_PARSER = os.getenv("IMPORT_HTML_PARSER", "auto").strip().lower()
+if IMPORT_HTML_PARSER not in {"lxml", "html.parser"} or (IMPORT_HTML_PARSER == "lxml" and lxml is None):
+  IMPORT_HTML_PARSER = "lxml" if lxml is not None else "html.parser"
+
+try:
+  BACKGROUND_JOB_LEASE_SECONDS = max(30, min(int(os.getenv("BACKGROUND_JOB_LEASE_SECONDS", "600")), 7200))
+except ValueError:
+  BACKGROUND_JOB_LEASE_SECONDS = 600
+
+try:
+  BACKGROUND_JOB_MAX_ATTEMPTS = max(1, min(int(os.getenv("BACKGROUND_JOB_MAX_ATTEMPTS", "5")), 20))
+except ValueError:
+  BACKGROUND_JOB_MAX_ATTEMPTS = 5
+
+try:
+  BACKGROUND_JOB_POLL_SECONDS = max(0.2, min(float(os.getenv("BACKGROUND_JOB_POLL_SECONDS", "1.0")), 60.0))
+except ValueError:
+  BACKGROUND_JOB_POLL_SECONDS = 1.0
+
+try:
+  BACKGROUND_JOB_WORKER_THREADS = max(1, min(int(os.getenv("BACKGROUND_JOB_WORKER_THREADS", "2")), 32))
+except ValueError:
+  BACKGROUND_JOB_WORKER_THREADS = 2
+
+# Imports only run on job threads, each crawling up to IMPORT_CRAWL_CONCURRENCY pages of one host at once.
+try:
+  IMPORT_HTTP_POOL_MAXSIZE = max(
+    1,
+    min(int(os.getenv("IMPORT_HTTP_POOL_MAXSIZE", str(IMPORT_CRAWL_CONCURRENCY * BACKGROUND_JOB_WORKER_THREADS))), 256),
+  )
+except ValueError:
+  IMPORT_HTTP_POOL_MAXSIZE = IMPORT_CRAWL_CONCURRENCY * BACKGROUND_JOB_WORKER_THREADS
+
+try:
+  CAMPAIGN_AUDIENCE_SNAPSHOT_TTL_SECONDS = max(10, min(int(os.getenv("CAMPAIGN_AUDIENCE_SNAPSHOT_TTL_SECONDS", "300")), 86400))
+except ValueError:
+  CAMPAIGN_AUDIENCE_SNAPSHOT_TTL_SECONDS = 300
+
+CAMPAIGN_SCHEDULER_ENABLED = os.getenv("CAMPAIGN_SCHEDULER_ENABLED", "true").lower() in {"1", "true", "yes"}
+try:
+  CAMPAIGN_SCHEDULER_INTERVAL_SECONDS = max(5, min(int(os.getenv("CAMPAIGN_SCHEDULER_INTERVAL_SECONDS", "30")), 3600))
+except ValueError:
+  CAMPAIGN_SCHEDULER_INTERVAL_SECONDS = 30
+
+try:
+  CAMPAIGN_MAX_CONSECUTIVE_FAILURES = max(1, min(int(os.getenv("CAMPAIGN_MAX_CONSECUTIVE_FAILURES", "5")), 100))
+except ValueError:
+  CAMPAIGN_MAX_CONSECUTIVE_FAILURES = 5
+CAMPAIGN_FAILURE_BACKOFF_BASE_MINUTES = 15
+CAMPAIGN_FAILURE_BACKOFF_MAX_MINUTES = 24 * 60
+
+try:
+  APPOINTMENT_AVAILABILITY_TTL_SECONDS = max(5, min(int(os.getenv("APPOINTMENT_AVAILABILITY_TTL_SECONDS", "60")), 3600))
+except ValueError:
+  APPOINTMENT_AVAILABILITY_TTL_SECONDS = 60
+
+try:
+  APPOINTMENT_DEFAULT_SLOT_CAPACITY = max(1, min(int(os.getenv("APPOINTMENT_DEFAULT_SLOT_CAPACITY", "1")), 50))
+except ValueError:
+  APPOINTMENT_DEFAULT_SLOT_CAPACITY = 1
+
+try:
+  PLATFORM_METRICS_REFRESH_SECONDS = max(30, min(int(os.getenv("PLATFORM_METRICS_REFRESH_SECONDS", "300")), 86400))
+except ValueError:
+  PLATFORM_METRICS_REFRESH_SECONDS = 300
+
+try:
+  CALENDAR_FEED_PAST_DAYS = max(0, min(int(os.getenv("CALENDAR_FEED_PAST_DAYS", "365")), 3650))
+except ValueError:
+  CALENDAR_FEED_PAST_DAYS = 365
+
+try:
+  CALENDAR_FEED_STREAM_THRESHOLD = max(100, min(int(os.getenv("CALENDAR_FEED_STREAM_THRESHOLD", "2000")), 100000))
+except ValueError:
+  CALENDAR_FEED_STREAM_THRESHOLD = 2000
+
+# Without a separate `python worker.py` process the web process drains the queue itself.
+BACKGROUND_JOB_WORKER_IN_WEB = os.getenv("BACKGROUND_JOB_WORKER_IN_WEB", "true").lower() in {"1", "true", "yes"}
 BOOTSTRAP_MEDSPA_ENABLED = os.getenv("BOOTSTRAP_MEDSPA_ENABLED", "true").lower() in {"1", "true", "yes"}
 BOOTSTRAP_MEDSPA_NAME = str(os.getenv("BOOTSTRAP_MEDSPA_NAME", "Moser Milani Medical Spa")).strip()
 BOOTSTRAP_MEDSPA_WEBSITE = str(os.getenv("BOOTSTRAP_MEDSPA_WEBSITE", "")).strip()
@@ -310,6 +470,25 @@ IMPORT_MAX_PAGE_BYTES = 1_000_000
 IMPORT_MAX_STYLESHEETS = 4
 IMPORT_MAX_STYLESHEET_BYTES = 300_000
 IMPORT_FETCH_TIMEOUT = (4, 10)
+IMPORT_PROGRESS_INTERVAL_SECONDS = 1.0
+IMPORT_FETCH_CACHE_HIT_STATES = ("fresh", "revalidated", "stale")
+IMPORT_PROGRESS_PARTIAL_ITEMS = 20
+OUTBOUND_PROVIDER_TIMEOUTS = {
+  "resend": (3.05, 12),
+  "twilio": (3.05, 12),
+  "onesignal": (3.05, 12),
+  "slack": (3.05, 10),
+  "import": IMPORT_FETCH_TIMEOUT,
+  "import_reader": IMPORT_FETCH_TIMEOUT,
+}
+OUTBOUND_DEFAULT_TIMEOUT = (3.05, 12)
+# Shared provider APIs: one breaker each. Slack webhooks belong to single clinics, so every
+# webhook URL gets its own breaker and one revoked webhook cannot silence the others.
+OUTBOUND_CIRCUIT_BREAKER_PROVIDERS = ("resend", "twilio", "onesignal")
+OUTBOUND_PER_TARGET_BREAKER_PROVIDERS = ("slack",)
+OUTBOUND_IMPORT_PROVIDERS = ("import", "import_reader")
+# A retry is only started while at least this much of the caller's outbound budget is left.
+OUTBOUND_RETRY_MIN_BUDGET_SECONDS = 1.0
 IMPORT_USER_AGENT = "Curabo-ClinicImportV1/1.0 (+https://www.curabo.app)"
 IMPORT_READER_PREFIX = "https://r.jina.ai/http://"
 IMPORT_ALLOWED_PATH_KEYWORDS = (
@@ -502,7 +681,18 @@ def normalized_database_url() -> str:
 if STRIPE_SECRET_KEY:
   stripe.api_key = STRIPE_SECRET_KEY
 
+class AppJSONProvider(DefaultJSONProvider):
+  # Timestamps come out of the database as datetimes; keep ISO 8601 on the wire
+  # instead of Flask's default HTTP-date format.
+  @staticmethod
+  def default(o):
+    if isinstance(o, datetime):
+      return format_db_timestamp(o)
+    return DefaultJSONProvider.default(o)
+
+
 app = Flask(__name__, static_folder=str(BASE_DIR), static_url_path="")
+app.json = AppJSONProvider(app)
 app.config["SECRET_KEY"] = APP_SECRET_KEY
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
@@ -515,6 +705,18 @@ if os.getenv("SESSION_COOKIE_SECURE", "false").lower() in {"1", "true", "yes"}:
   app.config["SESSION_COOKIE_SECURE"] = True
 
 
+@app.before_request
+def start_request_outbound_budget():
+  # Every web request may spend at most this much time waiting on external providers,
+  # so a degraded provider cannot pin all gunicorn threads for the full timeout.
+  start_outbound_budget(OUTBOUND_REQUEST_BUDGET_SECONDS)
+
+
+@app.teardown_request
+def clear_request_outbound_budget(_exc):
+  clear_outbound_budget()
+
+
 @app.after_request
 def add_no_cache_for_app_shell(response):
   # The HTML shell is served no-store so the browser can NEVER keep a stale copy
@@ -556,6 +758,57 @@ def verify_superadmin_password(raw_password: str) -> bool:
   return hmac.compare_digest(raw_password, SUPERADMIN_PASSWORD)
 
 
+# Timestamps are stored natively: TIMESTAMPTZ on Postgres, epoch milliseconds (INTEGER)
+# on SQLite. Every `*_at` column (plus current_period_end) is a timestamp column.
+# DBConnectionAdapter is the only place that knows the storage format: datetime parameters
+# are converted on the way in, and rows come back with aware UTC datetimes on both backends.
+# Strings are always bound as-is (a note may well look like a timestamp), so code writing or
+# comparing timestamp columns passes datetimes (utc_now(), parse_datetime_utc(...)).
+SQLITE_NOW_MS_SQL = "(CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER))"
+
+
+def is_timestamp_column(column_name: str) -> bool:
+  return column_name.endswith("_at") or column_name == "current_period_end"
+
+
+def datetime_to_epoch_ms(value: datetime) -> int:
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=timezone.utc)
+  return int(round(value.timestamp() * 1000))
+
+
+def epoch_ms_to_datetime(value: int) -> datetime:
+  return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def format_db_timestamp(value: object) -> str | None:
+  if value is None or value == "":
+    return None
+  if isinstance(value, datetime):
+    if value.tzinfo is None:
+      value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds" if value.microsecond else "seconds")
+  return str(value)
+
+
+def sqlite_timestamp_row_factory(description):
+  # Installed per cursor, and only when the result has timestamp columns.
+  names = [column[0] for column in description]
+  timestamp_names = [name for name in names if is_timestamp_column(name)]
+  if not timestamp_names:
+    return None
+
+  def build_row(_cursor, values):
+    row = dict(zip(names, values))
+    for name in timestamp_names:
+      value = row[name]
+      if isinstance(value, int):
+        row[name] = epoch_ms_to_datetime(value)
+    return row
+
+  return build_row
+
+
 class DBConnectionAdapter:
   def __init__(self, connection, backend: str):
     self._connection = connection
@@ -576,16 +829,63 @@ class DBConnectionAdapter:
 
   def _normalize_query(self, query: str) -> str:
     if self.backend != "postgres":
-      return query
+      return query.replace("CURRENT_TIMESTAMP", SQLITE_NOW_MS_SQL)
     return query.replace("?", "%s")
 
+  def _normalize_param(self, value):
+    if not isinstance(value, datetime):
+      return value
+    if value.tzinfo is None:
+      value = value.replace(tzinfo=timezone.utc)
+    if self.backend == "postgres":
+      return value
+    return datetime_to_epoch_ms(value)
+
+  def _normalize_params(self, params) -> tuple:
+    return tuple(self._normalize_param(value) for value in params or ())
+
   def execute(self, query: str, params: tuple = ()):
     normalized_query = self._normalize_query(query)
-    return self._connection.execute(normalized_query, params)
+    cursor = self._connection.execute(normalized_query, self._normalize_params(params))
+    if self.backend != "postgres" and cursor.description:
+      row_factory = sqlite_timestamp_row_factory(cursor.description)
+      if row_factory is not None:
+        cursor.row_factory = row_factory
+    return cursor
+
+  def iter_rows(self, query: str, params: tuple = (), batch_size: int = 500):
+    """Yield rows batch by batch; Postgres uses a server-side cursor so big results are never buffered."""
+    if self.backend == "postgres":
+      with self._connection.cursor(name=f"iter_{secrets.token_hex(6)}") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(self._normalize_query(query), self._normalize_params(params))
+        yield from cursor
+      return
+    cursor = self.execute(query, params)
+    while True:
+      batch = cursor.fetchmany(batch_size)
+      if not batch:
+        break
+      yield from batch
+
+  def executemany(self, query: str, params_seq: list[tuple]):
+    normalized_query = self._normalize_query(query)
+    normalized_seq = [self._normalize_params(params) for params in params_seq]
+    if self.backend == "postgres":
+      with self._connection.cursor() as cursor:
+        cursor.executemany(normalized_query, normalized_seq)
+      return None
+    return self._connection.executemany(normalized_query, normalized_seq)
+
+  def commit(self) -> None:
+    self._connection.commit()
+
+  def close(self) -> None:
+    self._connection.close()
 
   def executescript(self, script: str):
     if self.backend != "postgres":
-      return self._connection.executescript(script)
+      return self._connection.executescript(self._normalize_query(script))
 
     statements = [statement.strip() for statement in script.split(";") if statement.strip()]
     for statement in statements:
@@ -597,7 +897,8 @@ def get_db() -> DBConnectionAdapter:
   if DB_BACKEND == "postgres":
     if psycopg is None:
       raise RuntimeError("PostgreSQL aktiviert, aber psycopg ist nicht installiert.")
-    connection = psycopg.connect(normalized_database_url(), row_factory=dict_row)
+    # Session time zone UTC so TIMESTAMPTZ values come back as UTC datetimes, like on SQLite.
+    connection = psycopg.connect(normalized_database_url(), row_factory=dict_row, options="-c TimeZone=UTC")
     return DBConnectionAdapter(connection, "postgres")
 
   connection = sqlite3.connect(DB_PATH)
@@ -621,10 +922,111 @@ def ensure_columns(conn: DBConnectionAdapter, table_name: str, definitions: dict
 
   existing = {row["name"] for row in rows}
   for column, column_definition in definitions.items():
+    if column_definition.startswith("TIMESTAMP"):
+      native_type = "TIMESTAMPTZ" if conn.backend == "postgres" else "INTEGER"
+      column_definition = native_type + column_definition[len("TIMESTAMP"):]
     if column not in existing:
       conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_definition}")
 
 
+def migrate_timestamp_columns(conn: DBConnectionAdapter) -> None:
+  """Converts legacy TEXT timestamp columns (mixed CURRENT_TIMESTAMP / isoformat values) to native storage."""
+  if conn.backend == "postgres":
+    rows = conn.execute(
+      """
+      SELECT table_name, column_name, is_nullable, column_default
+      FROM information_schema.columns
+      WHERE table_schema = 'public' AND data_type = 'text'
+      ORDER BY table_name, ordinal_position
+      """
+    ).fetchall()
+    for row in rows:
+      table_name = row["table_name"]
+      column = row["column_name"]
+      if not is_timestamp_column(column):
+        continue
+      empty_value = "NULL" if row["is_nullable"] == "YES" else "'epoch'::timestamptz"
+      conn.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column} DROP DEFAULT")
+      conn.execute(
+        f"""
+        ALTER TABLE {table_name} ALTER COLUMN {column} TYPE TIMESTAMPTZ USING (
+          CASE
+            WHEN {column} IS NULL OR btrim({column}) = '' THEN {empty_value}
+            WHEN {column} ~ '(Z|[+-][0-9]{{2}}(:[0-9]{{2}}){{0,1}})$' THEN {column}::timestamptz
+            ELSE {column}::timestamp AT TIME ZONE 'UTC'
+          END
+        )
+        """
+      )
+      if row["column_default"]:
+        conn.execute(f"ALTER TABLE {table_name} ALTER COLUMN {column} SET DEFAULT CURRENT_TIMESTAMP")
+    return
+
+  pending = []
+  for table_row in conn.execute(
+    "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+  ).fetchall():
+    columns = conn.execute(f"PRAGMA table_info({table_row['name']})").fetchall()
+    legacy = {
+      column["name"]: bool(column["notnull"])
+      for column in columns
+      if is_timestamp_column(column["name"]) and str(column["type"]).upper() == "TEXT"
+    }
+    if legacy:
+      pending.append((table_row["name"], table_row["sql"], [column["name"] for column in columns], legacy))
+  if not pending:
+    return
+
+  # SQLite cannot change a column type in place; rebuild each affected table
+  # (create copy, move rows, drop, rename). Foreign keys must be off while parents are swapped.
+  conn.commit()
+  conn.execute("PRAGMA foreign_keys = OFF")
+  try:
+    for table_name, table_sql, column_names, legacy in pending:
+      temp_name = f"{table_name}__ts_migration"
+      index_sqls = [
+        row["sql"]
+        for row in conn.execute(
+          "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+          (table_name,),
+        ).fetchall()
+      ]
+      create_sql = re.sub(r"\b([a-z_]+_at|current_period_end)(\s+)TEXT\b", r"\1\2INTEGER", table_sql)
+      create_sql = re.sub(
+        r"^CREATE TABLE (IF NOT EXISTS )?[\"`]?" + re.escape(table_name) + r"[\"`]?",
+        f"CREATE TABLE {temp_name}",
+        create_sql,
+        count=1,
+      )
+      select_columns = []
+      for column in column_names:
+        if column not in legacy:
+          select_columns.append(column)
+          continue
+        empty_value = "0" if legacy[column] else "NULL"
+        select_columns.append(
+          f"""
+          CASE
+            WHEN {column} IS NULL OR TRIM({column}) = '' THEN {empty_value}
+            WHEN typeof({column}) = 'integer' THEN {column}
+            ELSE COALESCE(CAST(ROUND((julianday({column}) - 2440587.5) * 86400000) AS INTEGER), {empty_value})
+          END
+          """
+        )
+      conn.execute(f"DROP TABLE IF EXISTS {temp_name}")
+      conn.execute(create_sql)
+      conn.execute(
+        f"INSERT INTO {temp_name} ({', '.join(column_names)}) SELECT {', '.join(select_columns)} FROM {table_name}"
+      )
+      conn.execute(f"DROP TABLE {table_name}")
+      conn.execute(f"ALTER TABLE {temp_name} RENAME TO {table_name}")
+      for index_sql in index_sqls:
+        conn.execute(index_sql)
+    conn.commit()
+  finally:
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
 def insert_and_get_id(conn: DBConnectionAdapter, insert_query: str, params: tuple) -> int:
   if conn.backend == "postgres":
     query = insert_query.strip().rstrip(";")
@@ -799,7 +1201,7 @@ def init_db() -> None:
           subscription_status TEXT NOT NULL DEFAULT 'inactive',
           stripe_customer_id TEXT,
           stripe_subscription_id TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
         CREATE TABLE IF NOT EXISTS users (
@@ -823,7 +1225,7 @@ def init_db() -> None:
           subscription_status TEXT NOT NULL DEFAULT 'inactive',
           stripe_customer_id TEXT,
           stripe_subscription_id TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -839,7 +1241,7 @@ def init_db() -> None:
           amount_cents INTEGER NOT NULL,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -855,9 +1257,9 @@ def init_db() -> None:
           amount_cents INTEGER NOT NULL,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL,
-          current_period_end TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          current_period_end TIMESTAMPTZ,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -868,10 +1270,10 @@ def init_db() -> None:
           id BIGSERIAL PRIMARY KEY,
           user_id BIGINT NOT NULL,
           token_hash TEXT NOT NULL UNIQUE,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          last_used_at TEXT,
-          revoked_at TEXT,
-          expires_at TEXT NOT NULL,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          last_used_at TIMESTAMPTZ,
+          revoked_at TIMESTAMPTZ,
+          expires_at TIMESTAMPTZ NOT NULL,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -885,12 +1287,12 @@ def init_db() -> None:
           code_hash TEXT NOT NULL,
           attempt_count INTEGER NOT NULL DEFAULT 0,
           max_attempts INTEGER NOT NULL DEFAULT 5,
-          expires_at TEXT NOT NULL,
-          verified_at TEXT,
+          expires_at TIMESTAMPTZ NOT NULL,
+          verified_at TIMESTAMPTZ,
           delivery_status TEXT NOT NULL DEFAULT 'pending',
           delivery_error TEXT NOT NULL DEFAULT '',
           provider_message_id TEXT NOT NULL DEFAULT '',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -910,7 +1312,7 @@ def init_db() -> None:
           consent_marketing INTEGER NOT NULL DEFAULT 0,
           brand_color TEXT NOT NULL DEFAULT '#8A5A2F',
           font_family TEXT NOT NULL DEFAULT 'Gabarito, DM Sans, sans-serif',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
         CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at DESC);
@@ -924,7 +1326,7 @@ def init_db() -> None:
           amount_cents INTEGER,
           metadata_json TEXT NOT NULL DEFAULT '{}',
           event_source TEXT NOT NULL DEFAULT 'unknown',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
@@ -943,8 +1345,8 @@ def init_db() -> None:
           home_articles_json TEXT NOT NULL DEFAULT '[]',
           packages_json TEXT NOT NULL DEFAULT '[]',
           products_json TEXT NOT NULL DEFAULT '[]',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -955,8 +1357,8 @@ def init_db() -> None:
           clinic_id BIGINT NOT NULL UNIQUE,
           draft_theme_json TEXT NOT NULL DEFAULT '{}',
           published_theme_json TEXT NOT NULL DEFAULT '{}',
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          published_at TEXT,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          published_at TIMESTAMPTZ,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -966,19 +1368,21 @@ def init_db() -> None:
           id BIGSERIAL PRIMARY KEY,
           clinic_id BIGINT NOT NULL,
           patient_email TEXT NOT NULL,
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at TIMESTAMPTZ,
           patient_name TEXT NOT NULL DEFAULT '',
           membership_id TEXT NOT NULL,
           membership_name TEXT NOT NULL,
           monthly_amount_cents INTEGER NOT NULL DEFAULT 0,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL DEFAULT 'inactive',
-          started_at TEXT,
-          current_period_end TEXT,
-          next_charge_at TEXT,
-          canceled_at TEXT,
+          started_at TIMESTAMPTZ,
+          current_period_end TIMESTAMPTZ,
+          next_charge_at TIMESTAMPTZ,
+          canceled_at TIMESTAMPTZ,
           last_payment_status TEXT NOT NULL DEFAULT 'pending',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           UNIQUE (clinic_id, patient_email)
         );
@@ -995,29 +1399,43 @@ def init_db() -> None:
           treatment_name TEXT NOT NULL DEFAULT '',
           treatment_duration_minutes INTEGER NOT NULL DEFAULT 0,
           practitioner_name TEXT NOT NULL DEFAULT '',
-          starts_at TEXT,
-          ends_at TEXT,
+          starts_at TIMESTAMPTZ,
+          ends_at TIMESTAMPTZ,
           location_label TEXT NOT NULL DEFAULT '',
           location_address TEXT NOT NULL DEFAULT '',
           status TEXT NOT NULL DEFAULT 'pending_confirmation',
           notes TEXT NOT NULL DEFAULT '',
           order_id TEXT NOT NULL DEFAULT '',
-          canceled_at TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          canceled_at TIMESTAMPTZ,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_email ON patient_appointments(clinic_id, patient_email);
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_status ON patient_appointments(clinic_id, status);
+        CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_starts ON patient_appointments(clinic_id, starts_at, id);
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_order ON patient_appointments(order_id);
 
+        CREATE TABLE IF NOT EXISTS clinic_practitioners (
+          id BIGSERIAL PRIMARY KEY,
+          clinic_id BIGINT NOT NULL,
+          name TEXT NOT NULL,
+          weekly_hours_json TEXT NOT NULL DEFAULT '{}',
+          capacity INTEGER NOT NULL DEFAULT 1,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_practitioners_clinic_name ON clinic_practitioners(clinic_id, name);
+
         CREATE TABLE IF NOT EXISTS patient_notes (
           id BIGSERIAL PRIMARY KEY,
           clinic_id BIGINT NOT NULL,
           patient_email TEXT NOT NULL,
           notes TEXT NOT NULL DEFAULT '',
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           UNIQUE (clinic_id, patient_email),
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
@@ -1030,6 +1448,8 @@ def init_db() -> None:
           stripe_session_id TEXT UNIQUE,
           stripe_payment_intent_id TEXT,
           patient_email TEXT NOT NULL DEFAULT '',
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at TIMESTAMPTZ,
           patient_name TEXT NOT NULL DEFAULT '',
           analytics_session_id TEXT NOT NULL DEFAULT '',
           payment_method TEXT NOT NULL DEFAULT 'card',
@@ -1038,9 +1458,9 @@ def init_db() -> None:
           currency TEXT NOT NULL DEFAULT 'eur',
           total_cents INTEGER NOT NULL DEFAULT 0,
           line_items_json TEXT NOT NULL DEFAULT '[]',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          finalized_at TEXT,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          finalized_at TIMESTAMPTZ,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1048,6 +1468,48 @@ def init_db() -> None:
         CREATE INDEX IF NOT EXISTS idx_patient_checkout_sessions_email ON patient_checkout_sessions(patient_email);
         CREATE INDEX IF NOT EXISTS idx_patient_checkout_sessions_status ON patient_checkout_sessions(checkout_status, created_at DESC);
 
+        CREATE TABLE IF NOT EXISTS clinic_ledger_entries (
+          id BIGSERIAL PRIMARY KEY,
+          clinic_id BIGINT NOT NULL,
+          source TEXT NOT NULL,
+          source_id BIGINT NOT NULL,
+          entry_type TEXT NOT NULL,
+          occurred_at TIMESTAMPTZ NOT NULL,
+          customer_name TEXT NOT NULL DEFAULT '',
+          customer_email TEXT NOT NULL DEFAULT '',
+          label TEXT NOT NULL DEFAULT '',
+          item_names_json TEXT NOT NULL DEFAULT '[]',
+          amount_cents BIGINT NOT NULL DEFAULT 0,
+          currency TEXT NOT NULL DEFAULT 'eur',
+          status TEXT NOT NULL DEFAULT 'open',
+          source_status TEXT NOT NULL DEFAULT '',
+          payment_method TEXT NOT NULL DEFAULT '',
+          reference TEXT NOT NULL DEFAULT '',
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_ledger_entries_source ON clinic_ledger_entries(source, source_id);
+        CREATE INDEX IF NOT EXISTS idx_clinic_ledger_entries_clinic_occurred ON clinic_ledger_entries(clinic_id, occurred_at, id);
+
+        CREATE TABLE IF NOT EXISTS clinic_patient_directory (
+          id BIGSERIAL PRIMARY KEY,
+          clinic_id BIGINT NOT NULL,
+          patient_key TEXT NOT NULL,
+          display_name TEXT NOT NULL DEFAULT '',
+          email_canonical TEXT NOT NULL DEFAULT '',
+          phone_e164 TEXT NOT NULL DEFAULT '',
+          search_text TEXT NOT NULL DEFAULT '',
+          last_activity_at TIMESTAMPTZ NOT NULL,
+          last_activity_source TEXT NOT NULL DEFAULT '',
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_patient_directory_key ON clinic_patient_directory(clinic_id, patient_key);
+        CREATE INDEX IF NOT EXISTS idx_clinic_patient_directory_activity ON clinic_patient_directory(clinic_id, last_activity_at, id);
+
         CREATE TABLE IF NOT EXISTS clinic_campaigns (
           id BIGSERIAL PRIMARY KEY,
           clinic_id BIGINT NOT NULL,
@@ -1058,19 +1520,22 @@ def init_db() -> None:
           template_title TEXT NOT NULL DEFAULT '',
           template_body TEXT NOT NULL DEFAULT '',
           points_bonus INTEGER NOT NULL DEFAULT 0,
-          last_run_at TEXT,
-          next_run_at TEXT,
+          last_run_at TIMESTAMPTZ,
+          next_run_at TIMESTAMPTZ,
           total_runs INTEGER NOT NULL DEFAULT 0,
           total_audience INTEGER NOT NULL DEFAULT 0,
+          failed_runs INTEGER NOT NULL DEFAULT 0,
+          last_error TEXT NOT NULL DEFAULT '',
           created_by_user_id BIGINT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (created_by_user_id) REFERENCES users(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_clinic_status ON clinic_campaigns(clinic_id, status);
         CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_trigger ON clinic_campaigns(trigger_type);
+        CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_due ON clinic_campaigns(status, next_run_at);
 
         CREATE TABLE IF NOT EXISTS campaign_deliveries (
           id BIGSERIAL PRIMARY KEY,
@@ -1082,14 +1547,88 @@ def init_db() -> None:
           provider_message_id TEXT,
           error_message TEXT,
           metadata_json TEXT NOT NULL DEFAULT '{}',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_campaign ON campaign_deliveries(campaign_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_campaign_keyset ON campaign_deliveries(campaign_id, created_at DESC, id DESC);
         CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_clinic ON campaign_deliveries(clinic_id, created_at DESC);
 
+        CREATE TABLE IF NOT EXISTS campaign_runs (
+          id BIGSERIAL PRIMARY KEY,
+          clinic_id BIGINT NOT NULL,
+          campaign_id BIGINT NOT NULL,
+          status TEXT NOT NULL DEFAULT 'running',
+          trigger_type TEXT NOT NULL,
+          channel TEXT NOT NULL,
+          template_title TEXT NOT NULL DEFAULT '',
+          template_body TEXT NOT NULL DEFAULT '',
+          points_bonus INTEGER NOT NULL DEFAULT 0,
+          total_recipients INTEGER NOT NULL DEFAULT 0,
+          cursor_position INTEGER NOT NULL DEFAULT 0,
+          summary_json TEXT NOT NULL DEFAULT '{}',
+          actor_user_id BIGINT,
+          event_source TEXT NOT NULL DEFAULT 'unknown',
+          started_at TIMESTAMPTZ NOT NULL,
+          finished_at TIMESTAMPTZ,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_campaign_runs_campaign ON campaign_runs(campaign_id, id DESC);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_campaign_runs_active ON campaign_runs(campaign_id) WHERE status = 'running';
+
+        CREATE TABLE IF NOT EXISTS campaign_delivery_stats (
+          campaign_id BIGINT NOT NULL,
+          run_id BIGINT NOT NULL DEFAULT 0,
+          channel TEXT NOT NULL,
+          clinic_id BIGINT NOT NULL,
+          sent_count INTEGER NOT NULL DEFAULT 0,
+          failed_count INTEGER NOT NULL DEFAULT 0,
+          skipped_count INTEGER NOT NULL DEFAULT 0,
+          last_error TEXT NOT NULL DEFAULT '',
+          last_error_at TIMESTAMPTZ,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (campaign_id, run_id, channel)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_campaign_delivery_stats_clinic ON campaign_delivery_stats(clinic_id, run_id);
+
+        CREATE TABLE IF NOT EXISTS campaign_audience_snapshots (
+          campaign_id BIGINT PRIMARY KEY,
+          clinic_id BIGINT NOT NULL,
+          trigger_type TEXT NOT NULL,
+          total_count INTEGER NOT NULL DEFAULT 0,
+          email_count INTEGER NOT NULL DEFAULT 0,
+          phone_count INTEGER NOT NULL DEFAULT 0,
+          push_count INTEGER NOT NULL DEFAULT 0,
+          refreshed_at TIMESTAMPTZ NOT NULL,
+          expires_at_ms BIGINT NOT NULL,
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS campaign_audience_members (
+          campaign_id BIGINT NOT NULL,
+          recipient_key TEXT NOT NULL,
+          name TEXT NOT NULL DEFAULT '',
+          email TEXT NOT NULL DEFAULT '',
+          phone TEXT NOT NULL DEFAULT '',
+          external_user_id TEXT NOT NULL DEFAULT '',
+          PRIMARY KEY (campaign_id, recipient_key),
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS campaign_run_recipients (
+          run_id BIGINT NOT NULL,
+          position INTEGER NOT NULL,
+          recipient_key TEXT NOT NULL,
+          profile_json TEXT NOT NULL DEFAULT '{}',
+          PRIMARY KEY (run_id, position),
+          FOREIGN KEY (run_id) REFERENCES campaign_runs(id)
+        );
+
         CREATE TABLE IF NOT EXISTS audit_logs (
           id BIGSERIAL PRIMARY KEY,
           clinic_id BIGINT NOT NULL,
@@ -1098,7 +1637,7 @@ def init_db() -> None:
           entity_type TEXT NOT NULL,
           entity_id TEXT NOT NULL DEFAULT '',
           metadata_json TEXT NOT NULL DEFAULT '{}',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (actor_user_id) REFERENCES users(id)
         );
@@ -1111,7 +1650,7 @@ def init_db() -> None:
           title TEXT NOT NULL,
           price_text TEXT,
           source_url TEXT NOT NULL DEFAULT '',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1125,9 +1664,9 @@ def init_db() -> None:
           patient_phone TEXT NOT NULL DEFAULT '',
           patient_name TEXT NOT NULL DEFAULT '',
           patient_email TEXT NOT NULL DEFAULT '',
-          expires_at TEXT NOT NULL,
-          used_at TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          expires_at TIMESTAMPTZ NOT NULL,
+          used_at TIMESTAMPTZ,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1139,15 +1678,129 @@ def init_db() -> None:
           patient_phone TEXT NOT NULL DEFAULT '',
           patient_name TEXT NOT NULL DEFAULT '',
           patient_email TEXT NOT NULL DEFAULT '',
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          patient_phone_e164 TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at TIMESTAMPTZ,
           source TEXT NOT NULL DEFAULT 'qr',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_clinic_visits_clinic_created ON clinic_visits(clinic_id, created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS background_jobs (
+          id BIGSERIAL PRIMARY KEY,
+          job_type TEXT NOT NULL,
+          clinic_id BIGINT,
+          payload_json TEXT NOT NULL DEFAULT '{}',
+          status TEXT NOT NULL DEFAULT 'queued',
+          attempts INTEGER NOT NULL DEFAULT 0,
+          max_attempts INTEGER NOT NULL DEFAULT 5,
+          run_at_ms BIGINT NOT NULL DEFAULT 0,
+          lease_expires_ms BIGINT NOT NULL DEFAULT 0,
+          locked_by TEXT NOT NULL DEFAULT '',
+          dedupe_key TEXT,
+          last_error TEXT NOT NULL DEFAULT '',
+          result_json TEXT NOT NULL DEFAULT '{}',
+          progress_json TEXT NOT NULL DEFAULT '{}',
+          created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          finished_at TIMESTAMPTZ,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_background_jobs_claim ON background_jobs(status, run_at_ms);
+        CREATE INDEX IF NOT EXISTS idx_background_jobs_clinic ON background_jobs(clinic_id, id DESC);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_dedupe ON background_jobs(dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running');
+
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+          bucket_key TEXT PRIMARY KEY,
+          available_at_ms BIGINT NOT NULL,
+          updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS import_fetch_cache (
+          url TEXT PRIMARY KEY,
+          final_url TEXT NOT NULL,
+          content_type TEXT NOT NULL DEFAULT '',
+          body TEXT NOT NULL,
+          etag TEXT NOT NULL DEFAULT '',
+          last_modified TEXT NOT NULL DEFAULT '',
+          fetch_mode TEXT NOT NULL DEFAULT 'direct',
+          fetched_at TIMESTAMPTZ NOT NULL,
+          validated_at TIMESTAMPTZ NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_import_fetch_cache_validated ON import_fetch_cache(validated_at);
+
+        CREATE TABLE IF NOT EXISTS platform_metrics_daily (
+          metric_day TEXT PRIMARY KEY,
+          clinics_total BIGINT NOT NULL DEFAULT 0,
+          active_clinics BIGINT,
+          users_total BIGINT NOT NULL DEFAULT 0,
+          owners_total BIGINT NOT NULL DEFAULT 0,
+          staff_total BIGINT NOT NULL DEFAULT 0,
+          subscriptions_active BIGINT,
+          clinics_created BIGINT NOT NULL DEFAULT 0,
+          users_created BIGINT NOT NULL DEFAULT 0,
+          leads_created BIGINT NOT NULL DEFAULT 0,
+          leads_last_7_days BIGINT NOT NULL DEFAULT 0,
+          refreshed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS clinic_analytics_daily (
+          clinic_id BIGINT NOT NULL,
+          metric_day TEXT NOT NULL,
+          events_total BIGINT NOT NULL DEFAULT 0,
+          app_opens BIGINT NOT NULL DEFAULT 0,
+          offer_views BIGINT NOT NULL DEFAULT 0,
+          add_to_carts BIGINT NOT NULL DEFAULT 0,
+          purchases BIGINT NOT NULL DEFAULT 0,
+          membership_joins BIGINT NOT NULL DEFAULT 0,
+          gmv_cents BIGINT NOT NULL DEFAULT 0,
+          mrr_cents BIGINT,
+          active_memberships BIGINT,
+          PRIMARY KEY (clinic_id, metric_day)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_clinic_analytics_daily_day ON clinic_analytics_daily(metric_day, clinic_id);
+
+        CREATE TABLE IF NOT EXISTS clinic_analytics_monthly (
+          clinic_id BIGINT NOT NULL,
+          metric_month TEXT NOT NULL,
+          events_total BIGINT NOT NULL DEFAULT 0,
+          app_opens BIGINT NOT NULL DEFAULT 0,
+          offer_views BIGINT NOT NULL DEFAULT 0,
+          add_to_carts BIGINT NOT NULL DEFAULT 0,
+          purchases BIGINT NOT NULL DEFAULT 0,
+          membership_joins BIGINT NOT NULL DEFAULT 0,
+          gmv_cents BIGINT NOT NULL DEFAULT 0,
+          PRIMARY KEY (clinic_id, metric_month)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_clinic_analytics_monthly_month ON clinic_analytics_monthly(metric_month, clinic_id);
+
+        CREATE TABLE IF NOT EXISTS platform_analytics_daily (
+          metric_day TEXT PRIMARY KEY,
+          events_total BIGINT NOT NULL DEFAULT 0,
+          app_opens BIGINT NOT NULL DEFAULT 0,
+          offer_views BIGINT NOT NULL DEFAULT 0,
+          add_to_carts BIGINT NOT NULL DEFAULT 0,
+          purchases BIGINT NOT NULL DEFAULT 0,
+          membership_joins BIGINT NOT NULL DEFAULT 0,
+          gmv_cents BIGINT NOT NULL DEFAULT 0,
+          mrr_cents BIGINT,
+          active_memberships BIGINT
+        );
+
+        CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+          name TEXT PRIMARY KEY,
+          through_day TEXT NOT NULL
+        );
         """
       )
     else:
+      # Timestamp columns hold epoch milliseconds; the adapter rewrites CURRENT_TIMESTAMP accordingly.
       conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS clinics (
@@ -1163,7 +1816,7 @@ def init_db() -> None:
           subscription_status TEXT NOT NULL DEFAULT 'inactive',
           stripe_customer_id TEXT,
           stripe_subscription_id TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
         CREATE TABLE IF NOT EXISTS users (
@@ -1187,7 +1840,7 @@ def init_db() -> None:
           subscription_status TEXT NOT NULL DEFAULT 'inactive',
           stripe_customer_id TEXT,
           stripe_subscription_id TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1203,7 +1856,7 @@ def init_db() -> None:
           amount_cents INTEGER NOT NULL,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -1219,9 +1872,9 @@ def init_db() -> None:
           amount_cents INTEGER NOT NULL,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL,
-          current_period_end TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          current_period_end INTEGER,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -1232,10 +1885,10 @@ def init_db() -> None:
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           user_id INTEGER NOT NULL,
           token_hash TEXT NOT NULL UNIQUE,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          last_used_at TEXT,
-          revoked_at TEXT,
-          expires_at TEXT NOT NULL,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          last_used_at INTEGER,
+          revoked_at INTEGER,
+          expires_at INTEGER NOT NULL,
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
 
@@ -1249,12 +1902,12 @@ def init_db() -> None:
           code_hash TEXT NOT NULL,
           attempt_count INTEGER NOT NULL DEFAULT 0,
           max_attempts INTEGER NOT NULL DEFAULT 5,
-          expires_at TEXT NOT NULL,
-          verified_at TEXT,
+          expires_at INTEGER NOT NULL,
+          verified_at INTEGER,
           delivery_status TEXT NOT NULL DEFAULT 'pending',
           delivery_error TEXT NOT NULL DEFAULT '',
           provider_message_id TEXT NOT NULL DEFAULT '',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1274,7 +1927,7 @@ def init_db() -> None:
           consent_marketing INTEGER NOT NULL DEFAULT 0,
           brand_color TEXT NOT NULL DEFAULT '#8A5A2F',
           font_family TEXT NOT NULL DEFAULT 'Gabarito, DM Sans, sans-serif',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
         CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at DESC);
@@ -1288,7 +1941,7 @@ def init_db() -> None:
           amount_cents INTEGER,
           metadata_json TEXT NOT NULL DEFAULT '{}',
           event_source TEXT NOT NULL DEFAULT 'unknown',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (user_id) REFERENCES users(id)
         );
@@ -1307,8 +1960,8 @@ def init_db() -> None:
           home_articles_json TEXT NOT NULL DEFAULT '[]',
           packages_json TEXT NOT NULL DEFAULT '[]',
           products_json TEXT NOT NULL DEFAULT '[]',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1319,8 +1972,8 @@ def init_db() -> None:
           clinic_id INTEGER NOT NULL UNIQUE,
           draft_theme_json TEXT NOT NULL DEFAULT '{}',
           published_theme_json TEXT NOT NULL DEFAULT '{}',
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          published_at TEXT,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          published_at INTEGER,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1330,19 +1983,21 @@ def init_db() -> None:
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           clinic_id INTEGER NOT NULL,
           patient_email TEXT NOT NULL,
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at INTEGER,
           patient_name TEXT NOT NULL DEFAULT '',
           membership_id TEXT NOT NULL,
           membership_name TEXT NOT NULL,
           monthly_amount_cents INTEGER NOT NULL DEFAULT 0,
           currency TEXT NOT NULL DEFAULT 'eur',
           status TEXT NOT NULL DEFAULT 'inactive',
-          started_at TEXT,
-          current_period_end TEXT,
-          next_charge_at TEXT,
-          canceled_at TEXT,
+          started_at INTEGER,
+          current_period_end INTEGER,
+          next_charge_at INTEGER,
+          canceled_at INTEGER,
           last_payment_status TEXT NOT NULL DEFAULT 'pending',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           UNIQUE (clinic_id, patient_email)
         );
@@ -1359,29 +2014,43 @@ def init_db() -> None:
           treatment_name TEXT NOT NULL DEFAULT '',
           treatment_duration_minutes INTEGER NOT NULL DEFAULT 0,
           practitioner_name TEXT NOT NULL DEFAULT '',
-          starts_at TEXT,
-          ends_at TEXT,
+          starts_at INTEGER,
+          ends_at INTEGER,
           location_label TEXT NOT NULL DEFAULT '',
           location_address TEXT NOT NULL DEFAULT '',
           status TEXT NOT NULL DEFAULT 'pending_confirmation',
           notes TEXT NOT NULL DEFAULT '',
           order_id TEXT NOT NULL DEFAULT '',
-          canceled_at TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          canceled_at INTEGER,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_email ON patient_appointments(clinic_id, patient_email);
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_status ON patient_appointments(clinic_id, status);
+        CREATE INDEX IF NOT EXISTS idx_patient_appointments_clinic_starts ON patient_appointments(clinic_id, starts_at, id);
         CREATE INDEX IF NOT EXISTS idx_patient_appointments_order ON patient_appointments(order_id);
 
+        CREATE TABLE IF NOT EXISTS clinic_practitioners (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          clinic_id INTEGER NOT NULL,
+          name TEXT NOT NULL,
+          weekly_hours_json TEXT NOT NULL DEFAULT '{}',
+          capacity INTEGER NOT NULL DEFAULT 1,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_practitioners_clinic_name ON clinic_practitioners(clinic_id, name);
+
         CREATE TABLE IF NOT EXISTS patient_notes (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           clinic_id INTEGER NOT NULL,
           patient_email TEXT NOT NULL,
           notes TEXT NOT NULL DEFAULT '',
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           UNIQUE (clinic_id, patient_email),
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
@@ -1394,6 +2063,8 @@ def init_db() -> None:
           stripe_session_id TEXT UNIQUE,
           stripe_payment_intent_id TEXT,
           patient_email TEXT NOT NULL DEFAULT '',
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at INTEGER,
           patient_name TEXT NOT NULL DEFAULT '',
           analytics_session_id TEXT NOT NULL DEFAULT '',
           payment_method TEXT NOT NULL DEFAULT 'card',
@@ -1402,9 +2073,9 @@ def init_db() -> None:
           currency TEXT NOT NULL DEFAULT 'eur',
           total_cents INTEGER NOT NULL DEFAULT 0,
           line_items_json TEXT NOT NULL DEFAULT '[]',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          finalized_at TEXT,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          finalized_at INTEGER,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1412,6 +2083,48 @@ def init_db() -> None:
         CREATE INDEX IF NOT EXISTS idx_patient_checkout_sessions_email ON patient_checkout_sessions(patient_email);
         CREATE INDEX IF NOT EXISTS idx_patient_checkout_sessions_status ON patient_checkout_sessions(checkout_status, created_at DESC);
 
+        CREATE TABLE IF NOT EXISTS clinic_ledger_entries (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          clinic_id INTEGER NOT NULL,
+          source TEXT NOT NULL,
+          source_id INTEGER NOT NULL,
+          entry_type TEXT NOT NULL,
+          occurred_at INTEGER NOT NULL,
+          customer_name TEXT NOT NULL DEFAULT '',
+          customer_email TEXT NOT NULL DEFAULT '',
+          label TEXT NOT NULL DEFAULT '',
+          item_names_json TEXT NOT NULL DEFAULT '[]',
+          amount_cents INTEGER NOT NULL DEFAULT 0,
+          currency TEXT NOT NULL DEFAULT 'eur',
+          status TEXT NOT NULL DEFAULT 'open',
+          source_status TEXT NOT NULL DEFAULT '',
+          payment_method TEXT NOT NULL DEFAULT '',
+          reference TEXT NOT NULL DEFAULT '',
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_ledger_entries_source ON clinic_ledger_entries(source, source_id);
+        CREATE INDEX IF NOT EXISTS idx_clinic_ledger_entries_clinic_occurred ON clinic_ledger_entries(clinic_id, occurred_at, id);
+
+        CREATE TABLE IF NOT EXISTS clinic_patient_directory (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          clinic_id INTEGER NOT NULL,
+          patient_key TEXT NOT NULL,
+          display_name TEXT NOT NULL DEFAULT '',
+          email_canonical TEXT NOT NULL DEFAULT '',
+          phone_e164 TEXT NOT NULL DEFAULT '',
+          search_text TEXT NOT NULL DEFAULT '',
+          last_activity_at INTEGER NOT NULL,
+          last_activity_source TEXT NOT NULL DEFAULT '',
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clinic_patient_directory_key ON clinic_patient_directory(clinic_id, patient_key);
+        CREATE INDEX IF NOT EXISTS idx_clinic_patient_directory_activity ON clinic_patient_directory(clinic_id, last_activity_at, id);
+
         CREATE TABLE IF NOT EXISTS clinic_campaigns (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           clinic_id INTEGER NOT NULL,
@@ -1422,19 +2135,22 @@ def init_db() -> None:
           template_title TEXT NOT NULL DEFAULT '',
           template_body TEXT NOT NULL DEFAULT '',
           points_bonus INTEGER NOT NULL DEFAULT 0,
-          last_run_at TEXT,
-          next_run_at TEXT,
+          last_run_at INTEGER,
+          next_run_at INTEGER,
           total_runs INTEGER NOT NULL DEFAULT 0,
           total_audience INTEGER NOT NULL DEFAULT 0,
+          failed_runs INTEGER NOT NULL DEFAULT 0,
+          last_error TEXT NOT NULL DEFAULT '',
           created_by_user_id INTEGER,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (created_by_user_id) REFERENCES users(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_clinic_status ON clinic_campaigns(clinic_id, status);
         CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_trigger ON clinic_campaigns(trigger_type);
+        CREATE INDEX IF NOT EXISTS idx_clinic_campaigns_due ON clinic_campaigns(status, next_run_at);
 
         CREATE TABLE IF NOT EXISTS campaign_deliveries (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1446,36 +2162,110 @@ def init_db() -> None:
           provider_message_id TEXT,
           error_message TEXT,
           metadata_json TEXT NOT NULL DEFAULT '{}',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
           FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_campaign ON campaign_deliveries(campaign_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_campaign_keyset ON campaign_deliveries(campaign_id, created_at DESC, id DESC);
         CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_clinic ON campaign_deliveries(clinic_id, created_at DESC);
 
-        CREATE TABLE IF NOT EXISTS audit_logs (
+        CREATE TABLE IF NOT EXISTS campaign_runs (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           clinic_id INTEGER NOT NULL,
+          campaign_id INTEGER NOT NULL,
+          status TEXT NOT NULL DEFAULT 'running',
+          trigger_type TEXT NOT NULL,
+          channel TEXT NOT NULL,
+          template_title TEXT NOT NULL DEFAULT '',
+          template_body TEXT NOT NULL DEFAULT '',
+          points_bonus INTEGER NOT NULL DEFAULT 0,
+          total_recipients INTEGER NOT NULL DEFAULT 0,
+          cursor_position INTEGER NOT NULL DEFAULT 0,
+          summary_json TEXT NOT NULL DEFAULT '{}',
           actor_user_id INTEGER,
-          action TEXT NOT NULL,
-          entity_type TEXT NOT NULL,
-          entity_id TEXT NOT NULL DEFAULT '',
-          metadata_json TEXT NOT NULL DEFAULT '{}',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          event_source TEXT NOT NULL DEFAULT 'unknown',
+          started_at INTEGER NOT NULL,
+          finished_at INTEGER,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-          FOREIGN KEY (actor_user_id) REFERENCES users(id)
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_audit_logs_clinic_created ON audit_logs(clinic_id, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_campaign_runs_campaign ON campaign_runs(campaign_id, id DESC);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_campaign_runs_active ON campaign_runs(campaign_id) WHERE status = 'running';
 
-        CREATE TABLE IF NOT EXISTS clinic_import_services (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
+        CREATE TABLE IF NOT EXISTS campaign_delivery_stats (
+          campaign_id INTEGER NOT NULL,
+          run_id INTEGER NOT NULL DEFAULT 0,
+          channel TEXT NOT NULL,
+          clinic_id INTEGER NOT NULL,
+          sent_count INTEGER NOT NULL DEFAULT 0,
+          failed_count INTEGER NOT NULL DEFAULT 0,
+          skipped_count INTEGER NOT NULL DEFAULT 0,
+          last_error TEXT NOT NULL DEFAULT '',
+          last_error_at INTEGER,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (campaign_id, run_id, channel)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_campaign_delivery_stats_clinic ON campaign_delivery_stats(clinic_id, run_id);
+
+        CREATE TABLE IF NOT EXISTS campaign_audience_snapshots (
+          campaign_id INTEGER PRIMARY KEY,
+          clinic_id INTEGER NOT NULL,
+          trigger_type TEXT NOT NULL,
+          total_count INTEGER NOT NULL DEFAULT 0,
+          email_count INTEGER NOT NULL DEFAULT 0,
+          phone_count INTEGER NOT NULL DEFAULT 0,
+          push_count INTEGER NOT NULL DEFAULT 0,
+          refreshed_at INTEGER NOT NULL,
+          expires_at_ms INTEGER NOT NULL,
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS campaign_audience_members (
+          campaign_id INTEGER NOT NULL,
+          recipient_key TEXT NOT NULL,
+          name TEXT NOT NULL DEFAULT '',
+          email TEXT NOT NULL DEFAULT '',
+          phone TEXT NOT NULL DEFAULT '',
+          external_user_id TEXT NOT NULL DEFAULT '',
+          PRIMARY KEY (campaign_id, recipient_key),
+          FOREIGN KEY (campaign_id) REFERENCES clinic_campaigns(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS campaign_run_recipients (
+          run_id INTEGER NOT NULL,
+          position INTEGER NOT NULL,
+          recipient_key TEXT NOT NULL,
+          profile_json TEXT NOT NULL DEFAULT '{}',
+          PRIMARY KEY (run_id, position),
+          FOREIGN KEY (run_id) REFERENCES campaign_runs(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS audit_logs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          clinic_id INTEGER NOT NULL,
+          actor_user_id INTEGER,
+          action TEXT NOT NULL,
+          entity_type TEXT NOT NULL,
+          entity_id TEXT NOT NULL DEFAULT '',
+          metadata_json TEXT NOT NULL DEFAULT '{}',
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+          FOREIGN KEY (actor_user_id) REFERENCES users(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_audit_logs_clinic_created ON audit_logs(clinic_id, created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS clinic_import_services (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
           clinic_id INTEGER NOT NULL,
           title TEXT NOT NULL,
           price_text TEXT,
           source_url TEXT NOT NULL DEFAULT '',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1489,9 +2279,9 @@ def init_db() -> None:
           patient_phone TEXT NOT NULL DEFAULT '',
           patient_name TEXT NOT NULL DEFAULT '',
           patient_email TEXT NOT NULL DEFAULT '',
-          expires_at TEXT NOT NULL,
-          used_at TEXT,
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          expires_at INTEGER NOT NULL,
+          used_at INTEGER,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
@@ -1503,12 +2293,131 @@ def init_db() -> None:
           patient_phone TEXT NOT NULL DEFAULT '',
           patient_name TEXT NOT NULL DEFAULT '',
           patient_email TEXT NOT NULL DEFAULT '',
+          patient_email_canonical TEXT NOT NULL DEFAULT '',
+          patient_phone_e164 TEXT NOT NULL DEFAULT '',
+          contact_keys_checked_at INTEGER,
           source TEXT NOT NULL DEFAULT 'qr',
-          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
           FOREIGN KEY (clinic_id) REFERENCES clinics(id)
         );
 
         CREATE INDEX IF NOT EXISTS idx_clinic_visits_clinic_created ON clinic_visits(clinic_id, created_at DESC);
+
+        CREATE TABLE IF NOT EXISTS background_jobs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          job_type TEXT NOT NULL,
+          clinic_id INTEGER,
+          payload_json TEXT NOT NULL DEFAULT '{}',
+          status TEXT NOT NULL DEFAULT 'queued',
+          attempts INTEGER NOT NULL DEFAULT 0,
+          max_attempts INTEGER NOT NULL DEFAULT 5,
+          run_at_ms INTEGER NOT NULL DEFAULT 0,
+          lease_expires_ms INTEGER NOT NULL DEFAULT 0,
+          locked_by TEXT NOT NULL DEFAULT '',
+          dedupe_key TEXT,
+          last_error TEXT NOT NULL DEFAULT '',
+          result_json TEXT NOT NULL DEFAULT '{}',
+          progress_json TEXT NOT NULL DEFAULT '{}',
+          created_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          finished_at INTEGER,
+          FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_background_jobs_claim ON background_jobs(status, run_at_ms);
+        CREATE INDEX IF NOT EXISTS idx_background_jobs_clinic ON background_jobs(clinic_id, id DESC);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_dedupe ON background_jobs(dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running');
+
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+          bucket_key TEXT PRIMARY KEY,
+          available_at_ms INTEGER NOT NULL,
+          updated_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS import_fetch_cache (
+          url TEXT PRIMARY KEY,
+          final_url TEXT NOT NULL,
+          content_type TEXT NOT NULL DEFAULT '',
+          body TEXT NOT NULL,
+          etag TEXT NOT NULL DEFAULT '',
+          last_modified TEXT NOT NULL DEFAULT '',
+          fetch_mode TEXT NOT NULL DEFAULT 'direct',
+          fetched_at INTEGER NOT NULL,
+          validated_at INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_import_fetch_cache_validated ON import_fetch_cache(validated_at);
+
+        CREATE TABLE IF NOT EXISTS platform_metrics_daily (
+          metric_day TEXT PRIMARY KEY,
+          clinics_total INTEGER NOT NULL DEFAULT 0,
+          active_clinics INTEGER,
+          users_total INTEGER NOT NULL DEFAULT 0,
+          owners_total INTEGER NOT NULL DEFAULT 0,
+          staff_total INTEGER NOT NULL DEFAULT 0,
+          subscriptions_active INTEGER,
+          clinics_created INTEGER NOT NULL DEFAULT 0,
+          users_created INTEGER NOT NULL DEFAULT 0,
+          leads_created INTEGER NOT NULL DEFAULT 0,
+          leads_last_7_days INTEGER NOT NULL DEFAULT 0,
+          refreshed_at INTEGER NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS clinic_analytics_daily (
+          clinic_id INTEGER NOT NULL,
+          metric_day TEXT NOT NULL,
+          events_total INTEGER NOT NULL DEFAULT 0,
+          app_opens INTEGER NOT NULL DEFAULT 0,
+          offer_views INTEGER NOT NULL DEFAULT 0,
+          add_to_carts INTEGER NOT NULL DEFAULT 0,
+          purchases INTEGER NOT NULL DEFAULT 0,
+          membership_joins INTEGER NOT NULL DEFAULT 0,
+          gmv_cents INTEGER NOT NULL DEFAULT 0,
+          mrr_cents INTEGER,
+          active_memberships INTEGER,
+          PRIMARY KEY (clinic_id, metric_day)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_clinic_analytics_daily_day ON clinic_analytics_daily(metric_day, clinic_id);
+
+        CREATE TABLE IF NOT EXISTS clinic_analytics_monthly (
+          clinic_id INTEGER NOT NULL,
+          metric_month TEXT NOT NULL,
+          events_total INTEGER NOT NULL DEFAULT 0,
+          app_opens INTEGER NOT NULL DEFAULT 0,
+          offer_views INTEGER NOT NULL DEFAULT 0,
+          add_to_carts INTEGER NOT NULL DEFAULT 0,
+          purchases INTEGER NOT NULL DEFAULT 0,
+          membership_joins INTEGER NOT NULL DEFAULT 0,
+          gmv_cents INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (clinic_id, metric_month)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_clinic_analytics_monthly_month ON clinic_analytics_monthly(metric_month, clinic_id);
+
+        CREATE TABLE IF NOT EXISTS platform_analytics_daily (
+          metric_day TEXT PRIMARY KEY,
+          events_total INTEGER NOT NULL DEFAULT 0,
+          app_opens INTEGER NOT NULL DEFAULT 0,
+          offer_views INTEGER NOT NULL DEFAULT 0,
+          add_to_carts INTEGER NOT NULL DEFAULT 0,
+          purchases INTEGER NOT NULL DEFAULT 0,
+          membership_joins INTEGER NOT NULL DEFAULT 0,
+          gmv_cents INTEGER NOT NULL DEFAULT 0,
+          mrr_cents INTEGER,
+          active_memberships INTEGER
+        );
+
+        CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+          name TEXT PRIMARY KEY,
+          through_day TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS scheduler_leases (
+          name TEXT PRIMARY KEY,
+          holder TEXT NOT NULL,
+          lease_expires_ms INTEGER NOT NULL
+        );
         """
       )
 
@@ -1531,7 +2440,7 @@ def init_db() -> None:
         "phone": "TEXT",
         "email": "TEXT",
         "import_source_url": "TEXT",
-        "imported_at": "TEXT",
+        "imported_at": "TIMESTAMP",
         "notify_email": "TEXT NOT NULL DEFAULT ''",
         "slack_webhook_url": "TEXT NOT NULL DEFAULT ''",
         "calendar_feed_token": "TEXT NOT NULL DEFAULT ''",
@@ -1595,8 +2504,8 @@ def init_db() -> None:
       {
         "draft_theme_json": "TEXT NOT NULL DEFAULT '{}'",
         "published_theme_json": "TEXT NOT NULL DEFAULT '{}'",
-        "updated_at": "TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP",
-        "published_at": "TEXT",
+        "updated_at": "TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP",
+        "published_at": "TIMESTAMP",
       },
     )
 
@@ -1609,11 +2518,32 @@ def init_db() -> None:
         "monthly_amount_cents": "INTEGER NOT NULL DEFAULT 0",
         "currency": "TEXT NOT NULL DEFAULT 'eur'",
         "status": "TEXT NOT NULL DEFAULT 'inactive'",
-        "started_at": "TEXT",
-        "current_period_end": "TEXT",
-        "next_charge_at": "TEXT",
-        "canceled_at": "TEXT",
+        "started_at": "TIMESTAMP",
+        "current_period_end": "TIMESTAMP",
+        "next_charge_at": "TIMESTAMP",
+        "canceled_at": "TIMESTAMP",
         "last_payment_status": "TEXT NOT NULL DEFAULT 'pending'",
+        "patient_email_canonical": "TEXT NOT NULL DEFAULT ''",
+        "contact_keys_checked_at": "TIMESTAMP",
+      },
+    )
+
+    ensure_columns(
+      conn,
+      "patient_checkout_sessions",
+      {
+        "patient_email_canonical": "TEXT NOT NULL DEFAULT ''",
+        "contact_keys_checked_at": "TIMESTAMP",
+      },
+    )
+
+    ensure_columns(
+      conn,
+      "clinic_visits",
+      {
+        "patient_email_canonical": "TEXT NOT NULL DEFAULT ''",
+        "patient_phone_e164": "TEXT NOT NULL DEFAULT ''",
+        "contact_keys_checked_at": "TIMESTAMP",
       },
     )
 
@@ -1626,14 +2556,14 @@ def init_db() -> None:
         "treatment_name": "TEXT NOT NULL DEFAULT ''",
         "treatment_duration_minutes": "INTEGER NOT NULL DEFAULT 0",
         "practitioner_name": "TEXT NOT NULL DEFAULT ''",
-        "starts_at": "TEXT",
-        "ends_at": "TEXT",
+        "starts_at": "TIMESTAMP",
+        "ends_at": "TIMESTAMP",
         "location_label": "TEXT NOT NULL DEFAULT ''",
         "location_address": "TEXT NOT NULL DEFAULT ''",
         "status": "TEXT NOT NULL DEFAULT 'pending_confirmation'",
         "notes": "TEXT NOT NULL DEFAULT ''",
         "order_id": "TEXT NOT NULL DEFAULT ''",
-        "canceled_at": "TEXT",
+        "canceled_at": "TIMESTAMP",
       },
     )
 
@@ -1647,10 +2577,12 @@ def init_db() -> None:
         "template_title": "TEXT NOT NULL DEFAULT ''",
         "template_body": "TEXT NOT NULL DEFAULT ''",
         "points_bonus": "INTEGER NOT NULL DEFAULT 0",
-        "last_run_at": "TEXT",
-        "next_run_at": "TEXT",
+        "last_run_at": "TIMESTAMP",
+        "next_run_at": "TIMESTAMP",
         "total_runs": "INTEGER NOT NULL DEFAULT 0",
         "total_audience": "INTEGER NOT NULL DEFAULT 0",
+        "failed_runs": "INTEGER NOT NULL DEFAULT 0",
+        "last_error": "TEXT NOT NULL DEFAULT ''",
         "created_by_user_id": "INTEGER",
       },
     )
@@ -1664,6 +2596,14 @@ def init_db() -> None:
       },
     )
 
+    ensure_columns(
+      conn,
+      "background_jobs",
+      {
+        "progress_json": "TEXT NOT NULL DEFAULT '{}'",
+      },
+    )
+
     ensure_columns(
       conn,
       "campaign_deliveries",
@@ -1671,15 +2611,70 @@ def init_db() -> None:
         "provider_message_id": "TEXT",
         "error_message": "TEXT",
         "metadata_json": "TEXT NOT NULL DEFAULT '{}'",
+        "run_id": "INTEGER",
+        "recipient_email_canonical": "TEXT",
       },
     )
 
+    migrate_timestamp_columns(conn)
+
     conn.execute("CREATE INDEX IF NOT EXISTS idx_users_clinic_id ON users(clinic_id)")
+    # Grouped member counts per clinic page (admin clinic list) read this index only.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_clinic_role ON users(clinic_id, role, id)")
+    conn.execute(
+      "CREATE UNIQUE INDEX IF NOT EXISTS idx_campaign_deliveries_run_recipient "
+      "ON campaign_deliveries(run_id, recipient_key) WHERE run_id IS NOT NULL"
+    )
+    # Superseded by idx_campaign_deliveries_campaign_keyset (adds id for keyset paging).
+    conn.execute("DROP INDEX IF EXISTS idx_campaign_deliveries_campaign")
+    backfill_campaign_delivery_stats(conn)
+    backfill_clinic_ledger_entries(conn)
+    ensure_patient_contact_key_indexes(conn)
+    backfill_patient_contact_keys(conn)
+    backfill_clinic_analytics_daily(conn)
+    backfill_platform_metrics(conn)
+    # Customer-profile lookups go through the canonical keys, scoped per clinic.
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_patient_memberships_clinic_email_canonical "
+      "ON patient_memberships(clinic_id, patient_email_canonical)"
+    )
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_patient_checkout_sessions_clinic_email_canonical "
+      "ON patient_checkout_sessions(clinic_id, patient_email_canonical, created_at)"
+    )
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_clinic_visits_clinic_email_canonical "
+      "ON clinic_visits(clinic_id, patient_email_canonical, created_at)"
+    )
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_clinic_visits_clinic_phone_e164 "
+      "ON clinic_visits(clinic_id, patient_phone_e164, created_at)"
+    )
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_campaign_deliveries_clinic_email_canonical "
+      "ON campaign_deliveries(clinic_id, recipient_email_canonical, created_at)"
+    )
 
     ensure_clinic_memberships(conn)
     ensure_bootstrap_medspa(conn)
     ensure_clinic_catalog_rows(conn)
 
+  # Own transaction: a missing pg_trgm / FTS5 must not roll back the schema setup above.
+  try:
+    with get_db() as conn:
+      ensure_patient_directory_search(conn)
+    PATIENT_DIRECTORY_SEARCH_INDEX["ready"] = True
+  except Exception:
+    app.logger.warning("Patient directory search index unavailable, falling back to LIKE", exc_info=True)
+  if DB_BACKEND == "postgres":
+    try:
+      with get_db() as conn:
+        ensure_admin_clinic_search_indexes(conn)
+    except Exception:
+      app.logger.warning("Admin clinic search indexes unavailable", exc_info=True)
+  with get_db() as conn:
+    enqueue_patient_directory_backfill(conn)
+
 
 def serialize_user(row: sqlite3.Row) -> dict:
   return {
@@ -1754,19 +2749,17 @@ def parse_bearer_token() -> str:
   return token.strip()
 
 
-def token_is_expired(raw_expires_at: str) -> bool:
-  if not raw_expires_at:
-    return True
-  try:
-    parsed = datetime.fromisoformat(raw_expires_at)
-  except ValueError:
+def token_is_expired(raw_expires_at: object) -> bool:
+  parsed = parse_datetime_utc(raw_expires_at)
+  if parsed is None:
     return True
-  if parsed.tzinfo is None:
-    parsed = parsed.replace(tzinfo=timezone.utc)
   return parsed <= utc_now()
 
 
 def parse_datetime_utc(raw_value: object) -> datetime | None:
+  if isinstance(raw_value, datetime):
+    # Values read from the database are already aware datetimes.
+    return raw_value if raw_value.tzinfo is not None else raw_value.replace(tzinfo=timezone.utc)
   raw_text = str(raw_value or "").strip()
   if not raw_text:
     return None
@@ -1788,7 +2781,7 @@ def parse_datetime_utc(raw_value: object) -> datetime | None:
 def issue_api_token(user_id: int) -> str:
   raw_token = f"ax_{secrets.token_urlsafe(32)}"
   token_hash = hash_api_token(raw_token)
-  expires_at = (utc_now() + timedelta(days=API_TOKEN_TTL_DAYS)).isoformat()
+  expires_at = utc_now() + timedelta(days=API_TOKEN_TTL_DAYS)
 
   with get_db() as conn:
     conn.execute(
@@ -1811,7 +2804,7 @@ def resolve_user_id_from_api_token(raw_token: str) -> int | None:
     return None
 
   token_hash = hash_api_token(raw_token)
-  now_iso = utc_now_iso()
+  now = utc_now()
 
   with get_db() as conn:
     row = conn.execute(
@@ -1832,7 +2825,7 @@ def resolve_user_id_from_api_token(raw_token: str) -> int | None:
       return None
     if row["revoked_at"] is not None:
       return None
-    if token_is_expired(str(row["expires_at"] or "")):
+    if token_is_expired(row["expires_at"]):
       return None
 
     conn.execute(
@@ -1841,7 +2834,7 @@ def resolve_user_id_from_api_token(raw_token: str) -> int | None:
       SET last_used_at = ?
       WHERE id = ?
       """,
-      (now_iso, row["id"]),
+      (now, row["id"]),
     )
 
     return int(row["user_id"])
@@ -1859,7 +2852,7 @@ def revoke_api_token(raw_token: str) -> None:
       SET revoked_at = COALESCE(revoked_at, ?)
       WHERE token_hash = ?
       """,
-      (utc_now_iso(), token_hash),
+      (utc_now(), token_hash),
     )
 
 
@@ -1871,7 +2864,7 @@ def revoke_all_user_tokens(user_id: int) -> None:
       SET revoked_at = COALESCE(revoked_at, ?)
       WHERE user_id = ?
       """,
-      (utc_now_iso(), user_id),
+      (utc_now(), user_id),
     )
 
 
@@ -1931,6 +2924,19 @@ def require_superadmin() -> tuple[dict | None, tuple]:
   return {"email": SUPERADMIN_EMAIL}, ()
 
 
+def require_automation_secret() -> tuple[bool, tuple]:
+  if not AUTOMATION_RUNNER_SECRET:
+    return False, (jsonify({"error": "AUTOMATION_RUNNER_SECRET ist nicht konfiguriert."}), 503)
+  provided_secret = str(
+    request.headers.get("X-Automation-Secret")
+    or request.args.get("secret")
+    or ""
+  ).strip()
+  if not hmac.compare_digest(provided_secret, AUTOMATION_RUNNER_SECRET):
+    return False, (jsonify({"error": "Nicht autorisiert."}), 401)
+  return True, ()
+
+
 def is_unique_violation(exc: Exception) -> bool:
   if isinstance(exc, sqlite3.IntegrityError):
     return True
@@ -2885,42 +3891,104 @@ def mobile_otp_error_payload(message: str, error_code: str, **extra) -> dict:
   return payload
 
 
-def issue_mobile_phone_otp(clinic_id: int, phone_e164: str):
-  now = utc_now()
-  with get_db() as conn:
-    latest_row = conn.execute(
+class CooldownRateLimiter:
+  """Allows one action per key and cooldown window.
+
+  Rejections already known to this process are answered from memory; the
+  authoritative state lives in rate_limit_buckets so all workers share it.
+  """
+
+  def __init__(self, namespace: str, cooldown_seconds: int):
+    self.namespace = namespace
+    self.cooldown_ms = int(cooldown_seconds) * 1000
+    self._lock = threading.Lock()
+    self._available_at_ms: dict[str, int] = {}
+
+  def acquire(self, conn: DBConnectionAdapter, key: str) -> int:
+    """Take the slot for key; returns 0 on success, otherwise the seconds left."""
+    bucket_key = f"{self.namespace}:{key}"
+    now_ms = utc_now_ms()
+    with self._lock:
+      known_available_at = self._available_at_ms.get(bucket_key, 0)
+    if known_available_at > now_ms:
+      return max(1, -(-(known_available_at - now_ms) // 1000))
+
+    available_at_ms = now_ms + self.cooldown_ms
+    row = conn.execute(
       """
-      SELECT id, created_at
-      FROM mobile_phone_otps
-      WHERE clinic_id = ? AND phone_e164 = ?
-      ORDER BY id DESC
-      LIMIT 1
+      INSERT INTO rate_limit_buckets (bucket_key, available_at_ms, updated_at)
+      VALUES (?, ?, CURRENT_TIMESTAMP)
+      ON CONFLICT (bucket_key) DO UPDATE
+      SET available_at_ms = excluded.available_at_ms, updated_at = CURRENT_TIMESTAMP
+      WHERE rate_limit_buckets.available_at_ms <= ?
+      RETURNING available_at_ms
       """,
-      (clinic_id, phone_e164),
+      (bucket_key, available_at_ms, now_ms),
     ).fetchone()
+    if not row:
+      current = conn.execute(
+        "SELECT available_at_ms FROM rate_limit_buckets WHERE bucket_key = ?",
+        (bucket_key,),
+      ).fetchone()
+      available_at_ms = int(current["available_at_ms"]) if current else now_ms + self.cooldown_ms
+
+    with self._lock:
+      if len(self._available_at_ms) > 10000:
+        self._available_at_ms = {
+          cached_key: value for cached_key, value in self._available_at_ms.items() if value > now_ms
+        }
+      self._available_at_ms[bucket_key] = available_at_ms
+    if row:
+      return 0
+    return max(1, -(-(available_at_ms - now_ms) // 1000))
 
-  if latest_row:
-    latest_created = parse_datetime_utc(latest_row["created_at"])
-    if latest_created is not None:
-      cooldown_end = latest_created + timedelta(seconds=MOBILE_OTP_RESEND_COOLDOWN_SECONDS)
-      if cooldown_end > now:
-        seconds_left = max(1, int((cooldown_end - now).total_seconds()))
-        return (
-          mobile_otp_error_payload(
-            f"Bitte warte {seconds_left}s, bevor du einen neuen Code anforderst.",
-            "OTP_COOLDOWN",
-            retryAfterSeconds=seconds_left,
-            resendAfterSeconds=seconds_left,
-          ),
-          429,
-        )
 
+MOBILE_OTP_RESEND_LIMITER = CooldownRateLimiter("otp_resend", MOBILE_OTP_RESEND_COOLDOWN_SECONDS)
+
+
+def issue_mobile_phone_otp(clinic_id: int, phone_e164: str):
+  now = utc_now()
   request_id = f"otp_{secrets.token_urlsafe(18)}"
   raw_code = generate_mobile_otp_code()
   code_hash = hash_mobile_otp_code(request_id, raw_code)
-  expires_at = (now + timedelta(seconds=MOBILE_OTP_TTL_SECONDS)).isoformat()
+  expires_at = now + timedelta(seconds=MOBILE_OTP_TTL_SECONDS)
+
+  minutes = max(1, int(round(MOBILE_OTP_TTL_SECONDS / 60)))
+  sms_text = (
+    f"{MOBILE_OTP_BRAND_NAME}: Dein Login-Code lautet {raw_code}. "
+    f"Der Code ist {minutes} Minute{'n' if minutes != 1 else ''} gültig."
+  )
+  if MOBILE_OTP_DEBUG:
+    # In lokaler Entwicklung nie auf Twilio warten, sonst laufen Mobile-Requests in Timeouts.
+    delivery_status = "debug"
+    delivery_error = "Debug-Modus aktiv."
+  elif twilio_configured():
+    # The SMS is sent by the background worker; the client polls /otp/status or sees it on verify.
+    delivery_status = "pending"
+    delivery_error = ""
+  elif MOBILE_OTP_ALLOW_DEBUG_FALLBACK_ON_DELIVERY_FAILURE:
+    # Optional local fallback for pilots/dev environments without stable SMS provisioning.
+    delivery_status = "debug_fallback"
+    delivery_error = "Twilio nicht konfiguriert. Debug-Fallback aktiv."
+  else:
+    return (
+      mobile_otp_error_payload("Twilio nicht konfiguriert", "OTP_DELIVERY_FAILED"),
+      503,
+    )
 
   with get_db() as conn:
+    seconds_left = MOBILE_OTP_RESEND_LIMITER.acquire(conn, f"{clinic_id}:{phone_e164}")
+    if seconds_left:
+      return (
+        mobile_otp_error_payload(
+          f"Bitte warte {seconds_left}s, bevor du einen neuen Code anforderst.",
+          "OTP_COOLDOWN",
+          retryAfterSeconds=seconds_left,
+          resendAfterSeconds=seconds_left,
+        ),
+        429,
+      )
+
     # A newer request invalidates all previous unverified requests for this phone.
     conn.execute(
       """
@@ -2945,71 +4013,91 @@ def issue_mobile_phone_otp(clinic_id: int, phone_e164: str):
         delivery_error,
         provider_message_id
       )
-      VALUES (?, ?, ?, ?, 0, ?, ?, NULL, 'pending', '', '')
+      VALUES (?, ?, ?, ?, 0, ?, ?, NULL, ?, ?, '')
       """,
-      (clinic_id, request_id, phone_e164, code_hash, MOBILE_OTP_MAX_ATTEMPTS, expires_at),
+      (
+        clinic_id,
+        request_id,
+        phone_e164,
+        code_hash,
+        MOBILE_OTP_MAX_ATTEMPTS,
+        expires_at,
+        delivery_status,
+        delivery_error,
+      ),
     )
+    if delivery_status == "pending":
+      insert_background_job(
+        conn,
+        "otp.sms_send",
+        {"requestId": request_id, "phone": phone_e164, "text": sms_text},
+        clinic_id=clinic_id,
+        max_attempts=MOBILE_OTP_SMS_MAX_ATTEMPTS,
+      )
 
-  minutes = max(1, int(round(MOBILE_OTP_TTL_SECONDS / 60)))
-  sms_text = (
-    f"{MOBILE_OTP_BRAND_NAME}: Dein Login-Code lautet {raw_code}. "
-    f"Der Code ist {minutes} Minute{'n' if minutes != 1 else ''} gültig."
-  )
-  if MOBILE_OTP_DEBUG:
-    # In lokaler Entwicklung nie auf Twilio warten, sonst laufen Mobile-Requests in Timeouts.
-    delivery_status = "debug"
-    delivery_error = "Debug-Modus aktiv."
-    provider_message_id = ""
-    used_debug_delivery = True
-  else:
-    delivery_result = send_sms_via_twilio(phone_e164, sms_text)
-    delivery_status = str(delivery_result.get("status") or "").strip().lower() or "failed"
-    delivery_error = str(delivery_result.get("error") or "").strip()
-    provider_message_id = str(delivery_result.get("providerMessageId") or "").strip()
-    used_debug_delivery = False
-
-    if delivery_status != "sent":
-      if MOBILE_OTP_ALLOW_DEBUG_FALLBACK_ON_DELIVERY_FAILURE:
-        # Optional local fallback for pilots/dev environments without stable SMS provisioning.
-        delivery_status = "debug_fallback"
-        delivery_error = delivery_error or "SMS-Zustellung fehlgeschlagen. Debug-Fallback aktiv."
-        provider_message_id = ""
-        used_debug_delivery = True
-      else:
-        with get_db() as conn:
-          conn.execute("DELETE FROM mobile_phone_otps WHERE request_id = ?", (request_id,))
-        return (
-          mobile_otp_error_payload(
-            delivery_error or "OTP-SMS konnte nicht gesendet werden.",
-            "OTP_DELIVERY_FAILED",
-          ),
-          503,
-        )
-
-  with get_db() as conn:
-    conn.execute(
-      """
-      UPDATE mobile_phone_otps
-      SET delivery_status = ?, delivery_error = ?, provider_message_id = ?
-      WHERE request_id = ?
-      """,
-      (delivery_status, delivery_error, provider_message_id, request_id),
-    )
+  used_debug_delivery = delivery_status != "pending"
 
   response_payload = {
     "success": True,
     "requestId": request_id,
     "maskedPhone": mask_phone_for_display(phone_e164),
-    "expiresAt": expires_at,
+    "expiresAt": expires_at.isoformat(),
     "ttlSeconds": MOBILE_OTP_TTL_SECONDS,
     "resendAfterSeconds": MOBILE_OTP_RESEND_COOLDOWN_SECONDS,
-    "delivery": "debug" if used_debug_delivery else "sms",
+    "delivery": "debug" if used_debug_delivery else "pending",
   }
   if used_debug_delivery:
     response_payload["debugCode"] = raw_code
   return response_payload, 201
 
 
+def run_otp_sms_send_job(payload: dict) -> dict:
+  request_id = str(payload.get("requestId") or "")
+  with get_db() as conn:
+    otp_row = conn.execute(
+      "SELECT expires_at, verified_at FROM mobile_phone_otps WHERE request_id = ? LIMIT 1",
+      (request_id,),
+    ).fetchone()
+  if not otp_row or otp_row["verified_at"]:
+    # Superseded by a newer request (row deleted) or already verified.
+    return {"status": "skipped"}
+  expires_at = parse_datetime_utc(otp_row["expires_at"])
+  if expires_at is None or expires_at <= utc_now():
+    return {"status": "skipped", "error": "OTP abgelaufen"}
+
+  delivery_result = send_sms_via_twilio(str(payload.get("phone") or ""), str(payload.get("text") or ""))
+  delivery_status = str(delivery_result.get("status") or "").strip().lower() or "failed"
+  if delivery_status == "sent":
+    stored_status = "sent"
+  else:
+    # The app stops polling on "failed", so only the last attempt may report it.
+    stored_status = "pending" if background_job_has_retries_left() else "failed"
+  with get_db() as conn:
+    conn.execute(
+      """
+      UPDATE mobile_phone_otps
+      SET delivery_status = ?, delivery_error = ?, provider_message_id = ?
+      WHERE request_id = ?
+      """,
+      (
+        stored_status,
+        str(delivery_result.get("error") or "").strip(),
+        str(delivery_result.get("providerMessageId") or "").strip(),
+        request_id,
+      ),
+    )
+  if delivery_status != "sent":
+    raise RuntimeError(delivery_result.get("error") or "OTP-SMS konnte nicht gesendet werden.")
+  return {"status": "sent"}
+
+
+def serialize_mobile_otp_delivery(otp_row) -> dict:
+  return {
+    "delivery": str(otp_row["delivery_status"] or "pending"),
+    "deliveryError": str(otp_row["delivery_error"] or ""),
+  }
+
+
 def mobile_member_email_for_phone(clinic_id: int, phone_e164: str) -> str:
   digits = re.sub(r"\D", "", phone_e164)
   fingerprint = hashlib.sha256(f"{clinic_id}:{digits}".encode("utf-8")).hexdigest()[:18]
@@ -3054,14 +4142,13 @@ def normalize_patient_appointment_status(value: object, fallback: str = "pending
   return fallback
 
 
-def normalize_optional_datetime_value(value: object) -> str | None:
+def normalize_optional_datetime_value(value: object) -> datetime | None:
+  if isinstance(value, datetime):
+    return parse_datetime_utc(value)
   raw = str(value or "").strip()
   if not raw:
     return None
-  parsed = parse_datetime_utc(raw)
-  if not parsed:
-    return None
-  return parsed.isoformat()
+  return parse_datetime_utc(raw)
 
 
 def clinic_local_timezone():
@@ -3132,28 +4219,27 @@ def synchronize_patient_membership_row(clinic_row, membership_row):
     target_status = resolve_membership_status_for_payment(current_payment_status, current_status)
 
   now_dt = utc_now()
-  now_iso = now_dt.isoformat()
   current_period_end = membership_row["current_period_end"]
   next_charge_at = membership_row["next_charge_at"]
   canceled_at = membership_row["canceled_at"]
 
   if target_status in {"active", "past_due", "paused"}:
     if not current_period_end:
-      current_period_end = (now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)).isoformat()
+      current_period_end = now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)
     if not next_charge_at:
       next_charge_at = current_period_end
     canceled_at = None
   else:
     next_charge_at = None
-    canceled_at = canceled_at or now_iso
+    canceled_at = canceled_at or now_dt
 
   changes_detected = (
     str(membership_row["membership_name"] or "") != target_membership_name
     or int(membership_row["monthly_amount_cents"] or 0) != int(target_amount_cents or 0)
     or current_status != target_status
-    or str(membership_row["current_period_end"] or "") != str(current_period_end or "")
-    or str(membership_row["next_charge_at"] or "") != str(next_charge_at or "")
-    or str(membership_row["canceled_at"] or "") != str(canceled_at or "")
+    or parse_datetime_utc(membership_row["current_period_end"]) != parse_datetime_utc(current_period_end)
+    or parse_datetime_utc(membership_row["next_charge_at"]) != parse_datetime_utc(next_charge_at)
+    or parse_datetime_utc(membership_row["canceled_at"]) != parse_datetime_utc(canceled_at)
   )
   if not changes_detected:
     return membership_row
@@ -3179,10 +4265,11 @@ def synchronize_patient_membership_row(clinic_row, membership_row):
         current_period_end,
         next_charge_at,
         canceled_at,
-        now_iso,
+        now_dt,
         membership_row["id"],
       ),
     )
+    sync_clinic_ledger_entries(conn, "membership", ["src.id = ?"], (membership_row["id"],))
 
   return get_patient_membership_row(clinic_id, patient_email)
 
@@ -3308,13 +4395,12 @@ def activate_patient_membership(
   monthly_amount_cents = parse_amount_cents(membership_plan.get("priceCents")) or 0
 
   now_dt = utc_now()
-  now_iso = now_dt.isoformat()
-  next_charge_iso = (now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)).isoformat()
+  next_charge_dt = now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)
   normalized_payment = normalize_patient_payment_status(payment_status, "paid")
   normalized_status = resolve_membership_status_for_payment(normalized_payment, "active")
-  next_charge_value = next_charge_iso if normalized_status in {"active", "past_due", "paused"} else None
-  current_period_end_value = next_charge_iso if normalized_status in {"active", "past_due", "paused"} else None
-  canceled_at_value = now_iso if normalized_status in {"canceled", "inactive"} else None
+  next_charge_value = next_charge_dt if normalized_status in {"active", "past_due", "paused"} else None
+  current_period_end_value = next_charge_dt if normalized_status in {"active", "past_due", "paused"} else None
+  canceled_at_value = now_dt if normalized_status in {"canceled", "inactive"} else None
 
   with get_db() as conn:
     existing = conn.execute(
@@ -3328,7 +4414,7 @@ def activate_patient_membership(
     ).fetchone()
 
     if existing:
-      started_at = str(existing["started_at"] or now_iso)
+      started_at = existing["started_at"] or now_dt
       conn.execute(
         """
         UPDATE patient_memberships
@@ -3358,7 +4444,7 @@ def activate_patient_membership(
           next_charge_value,
           canceled_at_value,
           normalized_payment,
-          now_iso,
+          now_dt,
           existing["id"],
         ),
       )
@@ -3368,6 +4454,7 @@ def activate_patient_membership(
         INSERT INTO patient_memberships (
           clinic_id,
           patient_email,
+          patient_email_canonical,
           patient_name,
           membership_id,
           membership_name,
@@ -3382,25 +4469,32 @@ def activate_patient_membership(
           created_at,
           updated_at
         )
-        VALUES (?, ?, ?, ?, ?, ?, 'eur', ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'eur', ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
           clinic_id,
           safe_email,
+          safe_email,
           safe_name,
           membership_id,
           membership_name,
           monthly_amount_cents,
           normalized_status,
-          now_iso,
+          now_dt,
           current_period_end_value,
           next_charge_value,
           canceled_at_value,
           normalized_payment,
-          now_iso,
-          now_iso,
+          now_dt,
+          now_dt,
         ),
       )
+    sync_clinic_ledger_entries(
+      conn, "membership", ["src.clinic_id = ?", "src.patient_email = ?"], (clinic_id, safe_email)
+    )
+    upsert_patient_directory_entry(
+      conn, clinic_id, email=safe_email, name=raw_name, activity_at=now_dt, source="membership"
+    )
 
     row = conn.execute(
       """
@@ -3448,7 +4542,6 @@ def update_patient_membership_status(
   )
 
   now_dt = utc_now()
-  now_iso = now_dt.isoformat()
 
   with get_db() as conn:
     existing = conn.execute(
@@ -3472,7 +4565,7 @@ def update_patient_membership_status(
 
     if normalized_status == "active":
       if not current_period_end:
-        current_period_end = (now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)).isoformat()
+        current_period_end = now_dt + timedelta(days=PATIENT_MEMBERSHIP_BILLING_DAYS)
       if not next_charge_at:
         next_charge_at = current_period_end
     elif normalized_status in {"canceled", "inactive"}:
@@ -3498,12 +4591,13 @@ def update_patient_membership_status(
         current_period_end,
         next_charge_at,
         normalized_status,
-        now_iso,
+        now_dt,
         normalized_payment or existing["last_payment_status"] or "pending",
-        now_iso,
+        now_dt,
         existing["id"],
       ),
     )
+    sync_clinic_ledger_entries(conn, "membership", ["src.id = ?"], (existing["id"],))
 
     row = conn.execute(
       """
@@ -3636,6 +4730,17 @@ def get_patient_appointment_row(clinic_id: int, patient_email: str, appointment_
   return row
 
 
+def patient_appointment_display_key(row) -> tuple:
+  # Upcoming appointments first (soonest first), then the rest newest first.
+  segment = appointment_segment_for_row(row)
+  starts_at = parse_datetime_utc(row["starts_at"])
+  created_at = parse_datetime_utc(row["created_at"]) or utc_now()
+  if segment == "upcoming":
+    return (0, (starts_at or created_at).timestamp(), int(row["id"]))
+  base_dt = starts_at or created_at
+  return (1, -base_dt.timestamp(), -int(row["id"]))
+
+
 def list_patient_appointments(clinic_id: int, patient_email: str, limit: int = 80) -> list:
   safe_email = sanitize_patient_email(patient_email)
   if not safe_email:
@@ -3671,95 +4776,247 @@ def list_patient_appointments(clinic_id: int, patient_email: str, limit: int = 8
       (clinic_id, safe_email, safe_limit),
     ).fetchall()
 
-  def sort_key(row):
-    segment = appointment_segment_for_row(row)
-    starts_at = parse_datetime_utc(row["starts_at"])
-    created_at = parse_datetime_utc(row["created_at"]) or utc_now()
-    if segment == "upcoming":
-      return (0, starts_at or created_at, int(row["id"]))
-    base_dt = starts_at or created_at
-    return (1, -base_dt.timestamp(), -int(row["id"]))
+  return sorted(list(rows), key=patient_appointment_display_key)
+
+
+PATIENT_APPOINTMENT_CLOSED_STATUSES = ("completed", "canceled")
+PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL = ", ".join(f"'{status}'" for status in PATIENT_APPOINTMENT_CLOSED_STATUSES)
+# Listing order for the clinic view: open requests without a date, then upcoming
+# appointments (soonest first), then past ones (latest first), then closed undated rows.
+CLINIC_APPOINTMENT_SEGMENTS = {
+  "requested": (
+    f"starts_at IS NULL AND status NOT IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})",
+    "id DESC",
+    "id < ?",
+  ),
+  "upcoming": (
+    f"starts_at >= ? AND status NOT IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})",
+    "starts_at ASC, id ASC",
+    "(starts_at > ? OR (starts_at = ? AND id > ?))",
+  ),
+  "past": (
+    f"starts_at IS NOT NULL AND (starts_at < ? OR status IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL}))",
+    "starts_at DESC, id DESC",
+    "(starts_at < ? OR (starts_at = ? AND id < ?))",
+  ),
+  "archived": (
+    f"starts_at IS NULL AND status IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})",
+    "id DESC",
+    "id < ?",
+  ),
+}
+CLINIC_APPOINTMENT_SEGMENT_ORDER = {
+  "": ("requested", "upcoming", "past", "archived"),
+  "upcoming": ("requested", "upcoming"),
+  "past": ("past", "archived"),
+}
+
 
-  sorted_rows = sorted(list(rows), key=sort_key)
-  return sorted_rows
+def parse_appointment_range_bound(raw_value: object, end_of_day: bool = False) -> datetime | None:
+  raw = str(raw_value or "").strip()
+  if not raw:
+    return None
+  if re.fullmatch(r"\d{4}-\d{2}-\d{2}", raw):
+    try:
+      day = datetime.strptime(raw, "%Y-%m-%d")
+    except ValueError:
+      raise ValueError(raw) from None
+    if end_of_day:
+      day += timedelta(days=1)
+    return day.replace(tzinfo=clinic_local_timezone())
+  parsed = parse_datetime_utc(raw)
+  if not parsed:
+    raise ValueError(raw)
+  return parsed
+
+
+def parse_clinic_appointment_filters(args) -> tuple[dict, str]:
+  """Reads from/to/status/practitioner/segment query args. Returns (filters, error_message)."""
+  try:
+    date_from = parse_appointment_range_bound(args.get("from"))
+    date_to = parse_appointment_range_bound(args.get("to"), end_of_day=True)
+  except ValueError:
+    return {}, "Ungültiger Zeitraum (from/to erwarten YYYY-MM-DD oder ISO-Zeitpunkt)."
+
+  statuses = []
+  for raw_status in str(args.get("status") or "").split(","):
+    candidate = raw_status.strip().lower()
+    if not candidate:
+      continue
+    if candidate not in PATIENT_APPOINTMENT_STATUSES:
+      return {}, f"Unbekannter Terminstatus: {candidate}"
+    if candidate not in statuses:
+      statuses.append(candidate)
+
+  segment = str(args.get("segment") or "").strip().lower()
+  if segment not in CLINIC_APPOINTMENT_SEGMENT_ORDER:
+    return {}, "segment muss upcoming oder past sein."
+
+  return (
+    {
+      "date_from": date_from,
+      "date_to": date_to,
+      "statuses": statuses,
+      "practitioner": str(args.get("practitioner") or "").strip(),
+      "segment": segment,
+    },
+    "",
+  )
+
+
+def clinic_appointment_filter_sql(clinic_id: int, filters: dict) -> tuple[list[str], list]:
+  conditions = ["clinic_id = ?"]
+  params: list = [clinic_id]
+  if filters.get("date_from"):
+    conditions.append("starts_at >= ?")
+    params.append(filters["date_from"])
+  if filters.get("date_to"):
+    conditions.append("starts_at < ?")
+    params.append(filters["date_to"])
+  statuses = filters.get("statuses") or []
+  if statuses:
+    conditions.append(f"status IN ({', '.join('?' for _ in statuses)})")
+    params.extend(statuses)
+  if filters.get("practitioner"):
+    conditions.append("practitioner_name = ?")
+    params.append(filters["practitioner"])
+  return conditions, params
+
+
+def parse_clinic_appointment_cursor(raw_cursor: object) -> tuple[str, datetime | None, int] | None:
+  # Cursor "<segment>|<starts_at>|<id>" from the previous page's nextCursor.
+  segment, _, rest = str(raw_cursor or "").strip().partition("|")
+  raw_starts_at, _, raw_id = rest.rpartition("|")
+  if segment not in CLINIC_APPOINTMENT_SEGMENTS:
+    return None
+  starts_at = parse_datetime_utc(raw_starts_at)
+  if starts_at is None and segment in {"upcoming", "past"}:
+    return None
+  try:
+    return segment, starts_at, int(raw_id)
+  except ValueError:
+    return None
 
 
-def list_clinic_appointments(clinic_id: int, limit: int = 200) -> list:
+def list_clinic_appointments(
+  clinic_id: int,
+  limit: int = 200,
+  filters: dict | None = None,
+  cursor: tuple[str, datetime | None, int] | None = None,
+) -> tuple[list, str | None]:
+  """One page of clinic appointments in listing order. Returns (rows, next_cursor).
+  Each segment is a range scan on idx_patient_appointments_clinic_starts; a page that
+  exhausts one segment continues with the next."""
   safe_limit = max(1, min(limit, 500))
+  filters = filters or {}
+  base_conditions, base_params = clinic_appointment_filter_sql(clinic_id, filters)
+  segments = CLINIC_APPOINTMENT_SEGMENT_ORDER[filters.get("segment") or ""]
+  if cursor is not None and cursor[0] in segments:
+    segments = segments[segments.index(cursor[0]):]
+  elif cursor is not None:
+    return [], None
+
+  now_dt = utc_now()
+  page: list = []
+  page_segments: list[str] = []
   with get_db() as conn:
-    rows = conn.execute(
-      """
-      SELECT
-        id,
-        clinic_id,
-        patient_email,
-        patient_name,
-        treatment_id,
-        treatment_name,
-        treatment_duration_minutes,
-        practitioner_name,
-        starts_at,
-        ends_at,
-        location_label,
-        location_address,
-        status,
-        notes,
-        order_id,
-        canceled_at,
-        created_at,
-        updated_at
-      FROM patient_appointments
-      WHERE clinic_id = ?
-      ORDER BY starts_at DESC, id DESC
-      LIMIT ?
-      """,
-      (clinic_id, safe_limit),
-    ).fetchall()
-
-  def sort_key(row):
-    segment = appointment_segment_for_row(row)
-    starts_at = parse_datetime_utc(row["starts_at"])
-    created_at = parse_datetime_utc(row["created_at"]) or utc_now()
-    if segment == "upcoming":
-      return (0, starts_at or created_at, int(row["id"]))
-    base_dt = starts_at or created_at
-    return (1, -base_dt.timestamp(), -int(row["id"]))
+    for segment in segments:
+      remaining = safe_limit + 1 - len(page)
+      if remaining <= 0:
+        break
+      segment_condition, order_clause, keyset_condition = CLINIC_APPOINTMENT_SEGMENTS[segment]
+      conditions = [*base_conditions, segment_condition]
+      params = [*base_params]
+      if segment in {"upcoming", "past"}:
+        params.append(now_dt)
+      if cursor is not None and cursor[0] == segment:
+        conditions.append(keyset_condition)
+        if segment in {"upcoming", "past"}:
+          params.extend([cursor[1], cursor[1], cursor[2]])
+        else:
+          params.append(cursor[2])
+      params.append(remaining)
+      rows = conn.execute(
+        f"""
+        SELECT
+          id,
+          clinic_id,
+          patient_email,
+          patient_name,
+          treatment_id,
+          treatment_name,
+          treatment_duration_minutes,
+          practitioner_name,
+          starts_at,
+          ends_at,
+          location_label,
+          location_address,
+          status,
+          notes,
+          order_id,
+          canceled_at,
+          created_at,
+          updated_at
+        FROM patient_appointments
+        WHERE {" AND ".join(conditions)}
+        ORDER BY {order_clause}
+        LIMIT ?
+        """,
+        tuple(params),
+      ).fetchall()
+      page.extend(rows)
+      page_segments.extend(segment for _ in rows)
 
-  return sorted(list(rows), key=sort_key)
+  if len(page) <= safe_limit:
+    return page, None
+  last_row = page[safe_limit - 1]
+  return page[:safe_limit], f"{page_segments[safe_limit - 1]}|{format_db_timestamp(last_row['starts_at']) or ''}|{last_row['id']}"
 
 
-def summarize_clinic_appointments(rows) -> dict:
+def summarize_clinic_appointments(clinic_id: int | None, filters: dict | None = None) -> dict:
   summary = {
-    "total": len(rows),
+    "total": 0,
     "upcoming": 0,
     "today": 0,
     "confirmed": 0,
     "pending": 0,
     "canceled": 0,
   }
+  if clinic_id is None:
+    return summary
+
+  now_dt = utc_now()
   try:
-    today_local = utc_now().astimezone(clinic_local_timezone()).date()
+    local_tz = clinic_local_timezone()
+    today_start = datetime.combine(now_dt.astimezone(local_tz).date(), datetime.min.time(), tzinfo=local_tz)
   except Exception:
-    today_local = utc_now().date()
-  for row in rows:
-    status = normalize_patient_appointment_status(row["status"])
-    segment = appointment_segment_for_row(row)
-    if segment == "upcoming":
-      summary["upcoming"] += 1
-    if status == "canceled":
-      summary["canceled"] += 1
-    elif status == "confirmed":
-      summary["confirmed"] += 1
-    elif status == "pending_confirmation":
-      summary["pending"] += 1
-    starts_at = parse_datetime_utc(row["starts_at"])
-    if starts_at and status != "canceled":
-      try:
-        local_date = starts_at.astimezone(clinic_local_timezone()).date()
-      except Exception:
-        local_date = starts_at.date()
-      if local_date == today_local:
-        summary["today"] += 1
+    today_start = datetime.combine(now_dt.date(), datetime.min.time(), tzinfo=timezone.utc)
+  conditions, params = clinic_appointment_filter_sql(clinic_id, filters or {})
+  with get_db() as conn:
+    row = conn.execute(
+      f"""
+      SELECT
+        COUNT(*) AS total,
+        SUM(
+          CASE WHEN status NOT IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})
+            AND (starts_at IS NULL OR starts_at >= ?) THEN 1 ELSE 0 END
+        ) AS upcoming,
+        SUM(CASE WHEN status <> 'canceled' AND starts_at >= ? AND starts_at < ? THEN 1 ELSE 0 END) AS today,
+        SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END) AS confirmed,
+        SUM(CASE WHEN status = 'pending_confirmation' THEN 1 ELSE 0 END) AS pending,
+        SUM(CASE WHEN status = 'canceled' THEN 1 ELSE 0 END) AS canceled
+      FROM patient_appointments
+      WHERE {" AND ".join(conditions)}
+      """,
+      (
+        now_dt,
+        today_start,
+        today_start + timedelta(days=1),
+        *params,
+      ),
+    ).fetchone()
+  for key in summary:
+    summary[key] = int((row[key] if row else 0) or 0)
   return summary
 
 
@@ -3799,61 +5056,398 @@ def list_patient_appointments_by_order_id(clinic_id: int, order_id: str) -> list
   return list(rows)
 
 
-def generate_patient_appointment_slot_days(appointment_row, day_limit: int = PATIENT_APPOINTMENT_SLOT_DAY_LIMIT) -> dict:
-  local_tz = clinic_local_timezone()
-  now_local = utc_now().astimezone(local_tz)
-  selected_start = parse_datetime_utc(appointment_row["starts_at"])
-  selected_local_date = selected_start.astimezone(local_tz).date() if selected_start else None
-
-  days: list[dict] = []
-  for offset in range(PATIENT_APPOINTMENT_LOOKAHEAD_DAYS):
-    date_local = (now_local + timedelta(days=offset)).date()
-    if date_local.weekday() == 6:
-      continue
+def parse_clock_minutes(value) -> int | None:
+  match = re.fullmatch(r"(\d{1,2}):(\d{2})", str(value or "").strip())
+  if not match:
+    return None
+  hour_value, minute_value = int(match.group(1)), int(match.group(2))
+  if minute_value > 59 or hour_value > 24 or (hour_value == 24 and minute_value):
+    return None
+  return hour_value * 60 + minute_value
 
-    slots = []
-    for hour_value, minute_value in PATIENT_APPOINTMENT_SLOT_TIMES:
-      slot_local = datetime(
-        date_local.year,
-        date_local.month,
-        date_local.day,
-        hour_value,
-        minute_value,
-        tzinfo=local_tz,
-      )
-      if slot_local <= now_local + timedelta(hours=2):
+
+def parse_practitioner_weekly_hours(value) -> dict[int, list[tuple[int, int]]]:
+  # {"0": [["09:00", "17:00"]], ...} with 0 = Montag; invalid ranges are dropped.
+  if isinstance(value, str):
+    try:
+      value = json.loads(value or "{}")
+    except ValueError:
+      return {}
+  if not isinstance(value, dict):
+    return {}
+
+  hours: dict[int, list[tuple[int, int]]] = {}
+  for key, ranges in value.items():
+    try:
+      weekday = int(key)
+    except (TypeError, ValueError):
+      continue
+    if weekday < 0 or weekday > 6 or not isinstance(ranges, list):
+      continue
+    parsed = []
+    for item in ranges:
+      if not isinstance(item, (list, tuple)) or len(item) != 2:
         continue
-      slot_utc = slot_local.astimezone(timezone.utc)
-      slots.append(
-        {
-          "startsAt": slot_utc.isoformat(),
-          "label": slot_local.strftime("%H:%M"),
-          "isCurrent": selected_start is not None and slot_utc.isoformat() == selected_start.isoformat(),
-        }
-      )
+      start_minute = parse_clock_minutes(item[0])
+      end_minute = parse_clock_minutes(item[1])
+      if start_minute is None or end_minute is None or end_minute <= start_minute:
+        continue
+      parsed.append((start_minute, end_minute))
+    if parsed:
+      hours[weekday] = sorted(parsed)
+  return hours
+
+
+def format_practitioner_weekly_hours(hours: dict[int, list[tuple[int, int]]]) -> dict[str, list[list[str]]]:
+  return {
+    str(weekday): [
+      [f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}"]
+      for start, end in ranges
+    ]
+    for weekday, ranges in sorted(hours.items())
+  }
+
+
+def load_clinic_practitioners(conn: DBConnectionAdapter, clinic_id: int) -> list[dict]:
+  rows = conn.execute(
+    """
+    SELECT id, name, weekly_hours_json, capacity, updated_at
+    FROM clinic_practitioners
+    WHERE clinic_id = ?
+    ORDER BY name ASC
+    """,
+    (clinic_id,),
+  ).fetchall()
+  return [
+    {
+      "id": int(row["id"]),
+      "name": str(row["name"] or ""),
+      "capacity": max(1, int(row["capacity"] or 1)),
+      "hours": parse_practitioner_weekly_hours(row["weekly_hours_json"]),
+      "updatedAt": row["updated_at"],
+    }
+    for row in rows
+  ]
 
-    if not slots:
+
+def serialize_clinic_practitioner(practitioner: dict) -> dict:
+  return {
+    "id": practitioner["id"],
+    "name": practitioner["name"],
+    "capacity": practitioner["capacity"],
+    "weeklyHours": format_practitioner_weekly_hours(practitioner["hours"]),
+    "updatedAt": practitioner["updatedAt"],
+  }
+
+
+def appointment_booking_interval(starts_at, ends_at, duration_minutes) -> tuple[int, int] | None:
+  parsed_start = parse_datetime_utc(starts_at)
+  if not parsed_start:
+    return None
+  start_ms = datetime_to_epoch_ms(parsed_start)
+  parsed_end = parse_datetime_utc(ends_at)
+  end_ms = datetime_to_epoch_ms(parsed_end) if parsed_end else 0
+  if end_ms <= start_ms:
+    minutes = int(duration_minutes or 0) or PATIENT_APPOINTMENT_DEFAULT_DURATION_MINUTES
+    end_ms = start_ms + minutes * 60_000
+  return start_ms, end_ms
+
+
+def appointment_slot_candidates(
+  practitioners: list[dict],
+  date_local,
+  local_tz,
+  duration_minutes: int,
+  preferred_name: str = "",
+) -> list[datetime]:
+  day_start = datetime(date_local.year, date_local.month, date_local.day, tzinfo=local_tz)
+  if not practitioners:
+    if date_local.weekday() == 6:
+      return []
+    return [day_start + timedelta(hours=hour_value, minutes=minute_value) for hour_value, minute_value in PATIENT_APPOINTMENT_SLOT_TIMES]
+
+  pool = [entry for entry in practitioners if entry["name"] == preferred_name] or practitioners
+  minutes: set[int] = set()
+  for practitioner in pool:
+    for start_minute, end_minute in practitioner["hours"].get(date_local.weekday(), ()):
+      cursor = start_minute
+      while cursor + duration_minutes <= end_minute:
+        minutes.add(cursor)
+        cursor += PATIENT_APPOINTMENT_SLOT_STEP_MINUTES
+  return [day_start + timedelta(minutes=value) for value in sorted(minutes)]
+
+
+def resolve_appointment_slot(
+  practitioners: list[dict],
+  slot_local_start: datetime,
+  duration_minutes: int,
+  overlapping_names: list[str],
+  preferred_name: str = "",
+) -> tuple[bool, str]:
+  """Decides whether one more booking fits and who takes it.
+
+  overlapping_names holds the practitioner_name of every open booking that
+  overlaps the slot. Without practitioner calendars the clinic is a single pool
+  of APPOINTMENT_DEFAULT_SLOT_CAPACITY; otherwise a practitioner has to work the
+  whole slot and have capacity left, and unassigned bookings count against the
+  combined capacity.
+  """
+  if not practitioners:
+    return len(overlapping_names) < APPOINTMENT_DEFAULT_SLOT_CAPACITY, preferred_name
+  if len(overlapping_names) >= sum(entry["capacity"] for entry in practitioners):
+    return False, ""
+
+  pool = [entry for entry in practitioners if entry["name"] == preferred_name] or practitioners
+  start_minute = slot_local_start.hour * 60 + slot_local_start.minute
+  end_minute = start_minute + duration_minutes
+  for practitioner in pool:
+    ranges = practitioner["hours"].get(slot_local_start.weekday(), ())
+    if not any(start <= start_minute and end_minute <= end for start, end in ranges):
       continue
+    if overlapping_names.count(practitioner["name"]) < practitioner["capacity"]:
+      return True, practitioner["name"]
+  return False, ""
+
+
+def lock_clinic_schedule(conn: DBConnectionAdapter, clinic_id: int) -> None:
+  # Serializes capacity checks + writes per clinic until the transaction ends.
+  if conn.backend == "postgres":
+    conn.execute(
+      "SELECT pg_advisory_xact_lock(CAST(? AS INTEGER), CAST(? AS INTEGER))",
+      (AppointmentAvailabilityIndex.ADVISORY_LOCK_KEY, clinic_id),
+    ).fetchone()
+  else:
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def check_appointment_capacity(
+  conn: DBConnectionAdapter,
+  clinic_id: int,
+  starts_at: datetime,
+  ends_at: datetime | None,
+  duration_minutes: int,
+  preferred_name: str = "",
+  exclude_id: int | None = None,
+) -> tuple[bool, str]:
+  """Authoritative capacity check in SQL; the in-memory index may lag behind other processes.
+
+  Callers hold lock_clinic_schedule and write the booking in the same transaction.
+  Returns whether the booking fits and the practitioner who takes it.
+  """
+  start_ms, end_ms = appointment_booking_interval(starts_at, ends_at, duration_minutes)
+  candidate_rows = conn.execute(
+    f"""
+    SELECT starts_at, ends_at, treatment_duration_minutes, practitioner_name
+    FROM patient_appointments
+    WHERE clinic_id = ?
+      AND id <> ?
+      AND status NOT IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})
+      AND starts_at >= ? AND starts_at < ?
+    """,
+    (
+      clinic_id,
+      int(exclude_id or 0),
+      starts_at - timedelta(minutes=600),
+      epoch_ms_to_datetime(end_ms),
+    ),
+  ).fetchall()
+  overlapping = []
+  for row in candidate_rows:
+    interval = appointment_booking_interval(row["starts_at"], row["ends_at"], row["treatment_duration_minutes"])
+    if interval and interval[0] < end_ms and interval[1] > start_ms:
+      overlapping.append(str(row["practitioner_name"] or ""))
+  return resolve_appointment_slot(
+    load_clinic_practitioners(conn, clinic_id),
+    starts_at.astimezone(clinic_local_timezone()),
+    (end_ms - start_ms) // 60_000,
+    overlapping,
+    preferred_name,
+  )
+
+
+class AppointmentAvailabilityIndex:
+  """In-memory interval index of open bookings, one entry per clinic.
+
+  An entry holds the practitioner calendars and the open bookings of the
+  lookahead window as sorted (start_ms, end_ms, practitioner, id) tuples per
+  local day, so the slot picker never scans patient_appointments. Writes in
+  this process are applied immediately; writes from other processes show up
+  once the entry is older than APPOINTMENT_AVAILABILITY_TTL_SECONDS. The index
+  only proposes slots: reschedule_patient_appointment re-checks in SQL.
+  """
+
+  ADVISORY_LOCK_KEY = 730202
+
+  def __init__(self, ttl_seconds: int):
+    self.ttl_seconds = ttl_seconds
+    self._lock = threading.Lock()
+    self._entries: dict[int, dict] = {}
+
+  def invalidate(self, clinic_id: int) -> None:
+    with self._lock:
+      self._entries.pop(int(clinic_id), None)
+
+  def _load(self, clinic_id: int) -> dict:
+    now = utc_now()
+    window_start = now - timedelta(days=1)
+    window_end = now + timedelta(days=PATIENT_APPOINTMENT_LOOKAHEAD_DAYS + 1)
+    with get_db() as conn:
+      practitioners = load_clinic_practitioners(conn, clinic_id)
+      rows = conn.execute(
+        f"""
+        SELECT id, starts_at, ends_at, treatment_duration_minutes, practitioner_name
+        FROM patient_appointments
+        WHERE clinic_id = ?
+          AND status NOT IN ({PATIENT_APPOINTMENT_CLOSED_STATUSES_SQL})
+          AND starts_at >= ? AND starts_at < ?
+        """,
+        (clinic_id, window_start, window_end),
+      ).fetchall()
+
+    entry = {
+      "loadedAt": time.monotonic(),
+      "windowStartMs": datetime_to_epoch_ms(window_start),
+      "windowEndMs": datetime_to_epoch_ms(window_end),
+      "practitioners": practitioners,
+      "days": {},
+      "bookings": {},
+    }
+    for row in rows:
+      interval = appointment_booking_interval(row["starts_at"], row["ends_at"], row["treatment_duration_minutes"])
+      if interval:
+        self._insert(entry, int(row["id"]), interval, str(row["practitioner_name"] or ""))
+    return entry
+
+  def _entry(self, clinic_id: int) -> dict:
+    with self._lock:
+      entry = self._entries.get(clinic_id)
+      if entry is not None and time.monotonic() - entry["loadedAt"] < self.ttl_seconds:
+        return entry
+    entry = self._load(clinic_id)
+    with self._lock:
+      self._entries[clinic_id] = entry
+    return entry
+
+  @staticmethod
+  def _insert(entry: dict, appointment_id: int, interval: tuple[int, int], practitioner_name: str) -> None:
+    local_tz = clinic_local_timezone()
+    booking = (interval[0], interval[1], practitioner_name, appointment_id)
+    first_day = epoch_ms_to_datetime(interval[0]).astimezone(local_tz).date()
+    last_day = epoch_ms_to_datetime(interval[1] - 1).astimezone(local_tz).date()
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    for day in days:
+      bisect.insort(entry["days"].setdefault(day, []), booking)
+    entry["bookings"][appointment_id] = (booking, days)
+
+  @staticmethod
+  def _remove(entry: dict, appointment_id: int) -> None:
+    existing = entry["bookings"].pop(appointment_id, None)
+    if not existing:
+      return
+    booking, days = existing
+    for day in days:
+      bucket = entry["days"].get(day) or []
+      position = bisect.bisect_left(bucket, booking)
+      if position < len(bucket) and bucket[position] == booking:
+        del bucket[position]
+
+  def apply(self, row) -> None:
+    """Mirrors a changed patient_appointments row into a loaded clinic entry."""
+    if not row:
+      return
+    with self._lock:
+      entry = self._entries.get(int(row["clinic_id"]))
+      if entry is None:
+        return
+      appointment_id = int(row["id"])
+      self._remove(entry, appointment_id)
+      if str(row["status"] or "") in PATIENT_APPOINTMENT_CLOSED_STATUSES:
+        return
+      interval = appointment_booking_interval(row["starts_at"], row["ends_at"], row["treatment_duration_minutes"])
+      if interval and entry["windowStartMs"] <= interval[0] < entry["windowEndMs"]:
+        self._insert(entry, appointment_id, interval, str(row["practitioner_name"] or ""))
+
+  def slot_days(self, appointment_row, day_limit: int) -> dict:
+    entry = self._entry(int(appointment_row["clinic_id"]))
+    local_tz = clinic_local_timezone()
+    now_local = utc_now().astimezone(local_tz)
+    earliest_local = now_local + timedelta(hours=PATIENT_APPOINTMENT_MIN_LEAD_HOURS)
+    selected_start = parse_datetime_utc(appointment_row["starts_at"])
+    selected_local_date = selected_start.astimezone(local_tz).date() if selected_start else None
+    appointment_id = int(appointment_row["id"])
+    preferred_name = str(appointment_row["practitioner_name"] or "").strip()
+    duration_minutes = int(appointment_row["treatment_duration_minutes"] or 0) or PATIENT_APPOINTMENT_DEFAULT_DURATION_MINUTES
+    practitioners = entry["practitioners"]
+
+    days: list[dict] = []
+    with self._lock:
+      for offset in range(PATIENT_APPOINTMENT_LOOKAHEAD_DAYS):
+        date_local = (now_local + timedelta(days=offset)).date()
+        bucket = entry["days"].get(date_local, [])
+        slots = []
+        for slot_local in appointment_slot_candidates(practitioners, date_local, local_tz, duration_minutes, preferred_name):
+          if slot_local <= earliest_local:
+            continue
+          start_ms = datetime_to_epoch_ms(slot_local)
+          end_ms = start_ms + duration_minutes * 60_000
+          # Bookings are sorted by start, so only the prefix starting before end_ms can overlap.
+          overlapping = [
+            booking[2]
+            for booking in bucket[: bisect.bisect_left(bucket, (end_ms,))]
+            if booking[1] > start_ms and booking[3] != appointment_id
+          ]
+          fits, practitioner_name = resolve_appointment_slot(
+            practitioners, slot_local, duration_minutes, overlapping, preferred_name
+          )
+          if not fits:
+            continue
+          slot_utc = slot_local.astimezone(timezone.utc)
+          slots.append(
+            {
+              "startsAt": slot_utc.isoformat(),
+              "label": slot_local.strftime("%H:%M"),
+              "isCurrent": selected_start is not None and slot_utc == selected_start,
+              "practitionerName": practitioner_name,
+            }
+          )
+
+        if not slots:
+          continue
+
+        days.append(
+          {
+            "isoDate": date_local.isoformat(),
+            "weekdayShort": GERMAN_WEEKDAY_SHORT[date_local.weekday()],
+            "dayLabel": f"{date_local.day:02d}",
+            "monthShort": GERMAN_MONTH_SHORT[date_local.month - 1],
+            "selected": selected_local_date == date_local,
+            "slots": slots,
+          }
+        )
+        if len(days) >= day_limit:
+          break
+
+    month_label = ""
+    if days:
+      first_dt = datetime.fromisoformat(days[0]["isoDate"])
+      month_label = f"{GERMAN_MONTH_NAMES[first_dt.month - 1]} {first_dt.year}"
+
+    return {"monthLabel": month_label, "days": days}
+
+
+APPOINTMENT_AVAILABILITY = AppointmentAvailabilityIndex(APPOINTMENT_AVAILABILITY_TTL_SECONDS)
 
-    days.append(
-      {
-        "isoDate": date_local.isoformat(),
-        "weekdayShort": GERMAN_WEEKDAY_SHORT[date_local.weekday()],
-        "dayLabel": f"{date_local.day:02d}",
-        "monthShort": GERMAN_MONTH_SHORT[date_local.month - 1],
-        "selected": selected_local_date == date_local,
-        "slots": slots,
-      }
-    )
-    if len(days) >= day_limit:
-      break
 
-  month_label = ""
-  if days:
-    first_dt = datetime.fromisoformat(days[0]["isoDate"])
-    month_label = f"{GERMAN_MONTH_NAMES[first_dt.month - 1]} {first_dt.year}"
+def record_patient_appointment_change(row) -> None:
+  """Keep the derived per-clinic views (slot index, iCal feed) in step with an appointment write."""
+  if not row:
+    return
+  APPOINTMENT_AVAILABILITY.apply(row)
+  CLINIC_ICAL_FEEDS.invalidate(int(row["clinic_id"]))
 
-  return {"monthLabel": month_label, "days": days}
+
+def generate_patient_appointment_slot_days(appointment_row, day_limit: int = PATIENT_APPOINTMENT_SLOT_DAY_LIMIT) -> dict:
+  return APPOINTMENT_AVAILABILITY.slot_days(appointment_row, day_limit)
 
 
 def create_patient_appointments_from_checkout(
@@ -3873,10 +5467,11 @@ def create_patient_appointments_from_checkout(
   clinic_profile = serialize_public_clinic(clinic_row)
   location_label = str(clinic_profile.get("name") or clinic_row["name"] or "").strip()
   location_address = str(clinic_profile.get("address") or "").strip()
-  now_iso = utc_now_iso()
-  inserted_rows = []
+  now = utc_now()
+  inserted_ids: list[int] = []
 
   with get_db() as conn:
+    lock_clinic_schedule(conn, clinic_id)
     for item in line_items:
       treatment_id = str(item.get("treatmentId") or "").strip()
       treatment_name = str(item.get("name") or treatment_id or "Treatment").strip()
@@ -3886,12 +5481,32 @@ def create_patient_appointments_from_checkout(
       )
       ends_at = normalize_optional_datetime_value(item.get("endsAt"))
       if starts_at and not ends_at and duration_minutes > 0:
-        parsed_start = parse_datetime_utc(starts_at)
-        if parsed_start:
-          ends_at = (parsed_start + timedelta(minutes=duration_minutes)).isoformat()
+        ends_at = starts_at + timedelta(minutes=duration_minutes)
       quantity = max(1, min(int(item.get("units") or 1), 20))
+      status = normalize_patient_appointment_status(
+        item.get("appointmentStatus") or ("confirmed" if starts_at and payment_status == "paid" else "pending_confirmation"),
+        "pending_confirmation",
+      )
+      practitioner_name = str(item.get("practitionerName") or "").strip()
+      slot_taken = False
+      if starts_at and status not in PATIENT_APPOINTMENT_CLOSED_STATUSES:
+        # The order is already placed, so a slot that filled up meanwhile does not fail it:
+        # the appointment stays open without a time and the clinic proposes a new one.
+        fits, practitioner_name = check_appointment_capacity(
+          conn, clinic_id, starts_at, ends_at, duration_minutes, practitioner_name
+        )
+        if not fits:
+          slot_taken = True
+          starts_at = None
+          ends_at = None
+          status = "pending_confirmation"
+
       item_notes = str(item.get("notes") or "").strip()
-      if not item_notes:
+      if slot_taken:
+        item_notes = "\n".join(
+          part for part in ("Das gewählte Zeitfenster war bereits ausgebucht. Die Klinik schlägt dir einen neuen Termin vor.", item_notes) if part
+        )
+      elif not item_notes:
         item_notes = (
           "Die Klinik bestätigt deinen Termin separat."
           if not starts_at
@@ -3900,11 +5515,6 @@ def create_patient_appointments_from_checkout(
       if quantity > 1:
         item_notes = f"{item_notes}\nGebuchte Einheiten: {quantity}"
 
-      status = normalize_patient_appointment_status(
-        item.get("appointmentStatus") or ("confirmed" if starts_at and payment_status == "paid" else "pending_confirmation"),
-        "pending_confirmation",
-      )
-
       appointment_id = insert_and_get_id(
         conn,
         """
@@ -3936,7 +5546,7 @@ def create_patient_appointments_from_checkout(
           treatment_id,
           treatment_name,
           duration_minutes,
-          str(item.get("practitionerName") or "").strip(),
+          practitioner_name,
           starts_at,
           ends_at,
           location_label,
@@ -3944,16 +5554,23 @@ def create_patient_appointments_from_checkout(
           status,
           item_notes,
           order_id,
-          now_iso if status == "canceled" else None,
-          now_iso,
-          now_iso,
+          now if status == "canceled" else None,
+          now,
+          now,
         ),
       )
       if appointment_id > 0:
-        row = get_patient_appointment_row(clinic_id, safe_email, appointment_id)
-        if row:
-          inserted_rows.append(serialize_patient_appointment_row(row))
+        inserted_ids.append(appointment_id)
+    if inserted_ids:
+      upsert_patient_directory_entry(conn, clinic_id, email=safe_email, name=patient_name, source="appointment")
 
+  # Read back after commit: the schedule lock holds the write transaction open until here.
+  inserted_rows = []
+  for appointment_id in inserted_ids:
+    row = get_patient_appointment_row(clinic_id, safe_email, appointment_id)
+    if row:
+      record_patient_appointment_change(row)
+      inserted_rows.append(serialize_patient_appointment_row(row))
   return inserted_rows
 
 
@@ -3962,15 +5579,16 @@ def reschedule_patient_appointment(
   patient_email: str,
   appointment_id: int,
   starts_at: str,
-):
+) -> tuple[object | None, str]:
   safe_email = sanitize_patient_email(patient_email)
-  normalized_starts_at = normalize_optional_datetime_value(starts_at)
-  if not safe_email or appointment_id <= 0 or not normalized_starts_at:
-    return None
+  parsed_start = normalize_optional_datetime_value(starts_at)
+  if not safe_email or appointment_id <= 0 or not parsed_start:
+    return None, ""
 
-  now_iso = utc_now_iso()
+  now = utc_now()
 
   with get_db() as conn:
+    lock_clinic_schedule(conn, clinic_id)
     existing = conn.execute(
       """
       SELECT
@@ -3978,7 +5596,8 @@ def reschedule_patient_appointment(
         starts_at,
         ends_at,
         notes,
-        treatment_duration_minutes
+        treatment_duration_minutes,
+        practitioner_name
       FROM patient_appointments
       WHERE clinic_id = ? AND patient_email = ? AND id = ?
       LIMIT 1
@@ -3986,15 +5605,24 @@ def reschedule_patient_appointment(
       (clinic_id, safe_email, appointment_id),
     ).fetchone()
     if not existing:
-      return None
+      return None, ""
 
-    parsed_start = parse_datetime_utc(normalized_starts_at)
-    if not parsed_start:
-      return None
     duration_minutes = max(0, min(int(existing["treatment_duration_minutes"] or 0), 600))
     next_end = None
     if duration_minutes > 0:
-      next_end = (parsed_start + timedelta(minutes=duration_minutes)).isoformat()
+      next_end = parsed_start + timedelta(minutes=duration_minutes)
+
+    fits, practitioner_name = check_appointment_capacity(
+      conn,
+      clinic_id,
+      parsed_start,
+      next_end,
+      duration_minutes,
+      str(existing["practitioner_name"] or "").strip(),
+      exclude_id=int(existing["id"]),
+    )
+    if not fits:
+      return None, "Zeitfenster nicht mehr verfügbar."
 
     previous_notes = str(existing["notes"] or "").strip()
     change_note = f"Neuer Terminvorschlag bestätigt: {parsed_start.astimezone(clinic_local_timezone()).strftime('%d.%m.%Y %H:%M')}."
@@ -4006,6 +5634,7 @@ def reschedule_patient_appointment(
       SET
         starts_at = ?,
         ends_at = ?,
+        practitioner_name = ?,
         status = 'rescheduled',
         notes = ?,
         canceled_at = NULL,
@@ -4013,15 +5642,19 @@ def reschedule_patient_appointment(
       WHERE id = ?
       """,
       (
-        normalized_starts_at,
+        parsed_start,
         next_end,
+        practitioner_name,
         next_notes,
-        now_iso,
+        now,
         existing["id"],
       ),
     )
+    upsert_patient_directory_entry(conn, clinic_id, email=safe_email, source="appointment")
 
-  return get_patient_appointment_row(clinic_id, safe_email, appointment_id)
+  row = get_patient_appointment_row(clinic_id, safe_email, appointment_id)
+  record_patient_appointment_change(row)
+  return row, ""
 
 
 def update_patient_appointment_status(
@@ -4036,7 +5669,7 @@ def update_patient_appointment_status(
     return None
 
   normalized_status = normalize_patient_appointment_status(status, "pending_confirmation")
-  now_iso = utc_now_iso()
+  now = utc_now()
 
   with get_db() as conn:
     existing = conn.execute(
@@ -4063,7 +5696,7 @@ def update_patient_appointment_status(
 
     canceled_at = existing["canceled_at"]
     if normalized_status == "canceled":
-      canceled_at = canceled_at or now_iso
+      canceled_at = canceled_at or now
     elif normalized_status not in {"canceled"}:
       canceled_at = None
 
@@ -4081,12 +5714,15 @@ def update_patient_appointment_status(
         normalized_status,
         next_notes,
         canceled_at,
-        now_iso,
+        now,
         existing["id"],
       ),
     )
+    upsert_patient_directory_entry(conn, clinic_id, email=safe_email, source="appointment")
 
-  return get_patient_appointment_row(clinic_id, safe_email, appointment_id)
+  row = get_patient_appointment_row(clinic_id, safe_email, appointment_id)
+  record_patient_appointment_change(row)
+  return row
 
 
 def summarize_patient_memberships(rows: list) -> dict:
@@ -4132,7 +5768,7 @@ def serialize_event_metadata(raw_metadata: object) -> str:
   else:
     candidate = {}
   try:
-    return json.dumps(candidate, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(candidate, ensure_ascii=False, separators=(",", ":"), default=format_db_timestamp)
   except Exception:
     return "{}"
 
@@ -4372,7 +6008,7 @@ def load_published_clinic_theme(clinic_id: int) -> dict:
 
 
 def upsert_clinic_theme_draft(conn: DBConnectionAdapter, clinic_id: int, theme: object) -> None:
-  now_iso = utc_now_iso()
+  now = utc_now()
   draft_json = serialize_clinic_theme(theme)
   default_json = serialize_clinic_theme(DEFAULT_CLINIC_THEME)
   conn.execute(
@@ -4388,12 +6024,12 @@ def upsert_clinic_theme_draft(conn: DBConnectionAdapter, clinic_id: int, theme:
       draft_theme_json = excluded.draft_theme_json,
       updated_at = excluded.updated_at
     """,
-    (clinic_id, draft_json, default_json, now_iso),
+    (clinic_id, draft_json, default_json, now),
   )
 
 
 def publish_clinic_theme(conn: DBConnectionAdapter, clinic_id: int, theme: object) -> None:
-  now_iso = utc_now_iso()
+  now = utc_now()
   theme_json = serialize_clinic_theme(theme)
   conn.execute(
     """
@@ -4411,7 +6047,7 @@ def publish_clinic_theme(conn: DBConnectionAdapter, clinic_id: int, theme: objec
       updated_at = excluded.updated_at,
       published_at = excluded.published_at
     """,
-    (clinic_id, theme_json, theme_json, now_iso, now_iso),
+    (clinic_id, theme_json, theme_json, now, now),
   )
 
 
@@ -4458,6 +6094,8 @@ def serialize_campaign_row(row) -> dict:
     "nextRunAt": row["next_run_at"],
     "totalRuns": int(row["total_runs"] or 0),
     "totalAudience": int(row["total_audience"] or 0),
+    "failedRuns": int(row["failed_runs"] or 0),
+    "lastError": row["last_error"] or "",
     "createdByUserId": row["created_by_user_id"],
     "createdAt": row["created_at"],
     "updatedAt": row["updated_at"],
@@ -4536,7 +6174,7 @@ def estimate_campaign_audience(clinic_id: int, trigger_type: str) -> int:
       return inactive
 
     if normalized_trigger == "abandoned_cart_24h":
-      since = (utc_now() - timedelta(hours=24)).isoformat()
+      since = utc_now() - timedelta(hours=24)
       rows = conn.execute(
         """
         SELECT event_name, metadata_json
@@ -4871,70 +6509,773 @@ def resolve_campaign_recipients(clinic_id: int, trigger_type: str) -> list[dict]
   return profiles
 
 
+CAMPAIGN_PLACEHOLDER_PATTERN = re.compile(r"\{\{(name|email|clinic|membership_status)\}\}")
+
+
+class CompiledCampaignTemplate:
+  """A campaign template parsed once per run.
+
+  The text is split into literal parts and placeholder names; {{clinic}} is
+  constant for a run and folded into the literals at compile time. Templates
+  without per-recipient placeholders render to one cached string.
+  """
+
+  __slots__ = ("parts", "constant")
+
+  def __init__(self, template_text: str, clinic_name: str):
+    clinic_value = str(clinic_name or "deine Klinik")
+    parts: list[tuple[bool, str]] = []
+    literal = []
+    position = 0
+    for match in CAMPAIGN_PLACEHOLDER_PATTERN.finditer(str(template_text or "")):
+      literal.append(match.string[position:match.start()])
+      position = match.end()
+      if match.group(1) == "clinic":
+        literal.append(clinic_value)
+        continue
+      parts.append((False, "".join(literal)))
+      parts.append((True, match.group(1)))
+      literal = []
+    literal.append(str(template_text or "")[position:])
+    parts.append((False, "".join(literal)))
+    self.parts = tuple((is_field, value) for is_field, value in parts if is_field or value)
+    self.constant = self.parts[0][1] if len(self.parts) == 1 and not self.parts[0][0] else None
+    if not self.parts:
+      self.constant = ""
+
+  def render(self, profile: dict) -> str:
+    if self.constant is not None:
+      return self.constant
+    values = {
+      "name": str(profile.get("name") or "Patient"),
+      "email": str(profile.get("email") or ""),
+      "membership_status": str(profile.get("membershipStatus") or "inactive"),
+    }
+    return "".join(values[value] if is_field else value for is_field, value in self.parts)
+
+
 def render_campaign_text(template_text: str, profile: dict, clinic_name: str) -> str:
-  rendered = str(template_text or "")
-  replacements = {
-    "{{name}}": str(profile.get("name") or "Patient"),
-    "{{email}}": str(profile.get("email") or ""),
-    "{{clinic}}": str(clinic_name or "deine Klinik"),
-    "{{membership_status}}": str(profile.get("membershipStatus") or "inactive"),
-  }
-  for key, value in replacements.items():
-    rendered = rendered.replace(key, value)
-  return rendered
+  return CompiledCampaignTemplate(template_text, clinic_name).render(profile)
+
+
+class OutboundUnavailableError(requests.RequestException):
+  pass
+
+
+class ProviderCircuitBreaker:
+  """Fails fast while a provider is down; after the reset window a single probe
+  request is let through (half-open) and decides whether the circuit closes again."""
+
+  def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+    self.name = name
+    self.failure_threshold = failure_threshold
+    self.reset_seconds = reset_seconds
+    self._lock = threading.Lock()
+    self._state = "closed"
+    self._consecutive_failures = 0
+    self._opened_at = 0.0
+    self._probe_in_flight = False
+    self._rejected = 0
+    self._last_failure = ""
+
+  def allow_request(self) -> bool:
+    with self._lock:
+      if self._state == "closed":
+        return True
+      if self._state == "open" and (time.monotonic() - self._opened_at) >= self.reset_seconds:
+        self._state = "half_open"
+        self._probe_in_flight = False
+      if self._state == "half_open" and not self._probe_in_flight:
+        self._probe_in_flight = True
+        return True
+      self._rejected += 1
+      return False
+
+  def record_success(self) -> None:
+    with self._lock:
+      self._state = "closed"
+      self._consecutive_failures = 0
+      self._probe_in_flight = False
+
+  def record_failure(self, error: str) -> None:
+    with self._lock:
+      self._consecutive_failures += 1
+      self._last_failure = error[:300]
+      if self._state == "half_open" or self._consecutive_failures >= self.failure_threshold:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+      self._probe_in_flight = False
+
+  def snapshot(self) -> dict:
+    with self._lock:
+      retry_in = 0.0
+      if self._state == "open":
+        retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+      return {
+        "state": self._state,
+        "consecutiveFailures": self._consecutive_failures,
+        "failureThreshold": self.failure_threshold,
+        "rejectedRequests": self._rejected,
+        "retryInSeconds": round(retry_in, 1),
+        "lastFailure": self._last_failure,
+      }
 
 
-def resend_configured() -> bool:
-  return bool(RESEND_API_KEY) and bool(RESEND_FROM_EMAIL) and "@" in RESEND_FROM_EMAIL
+_outbound_budget_state = threading.local()
 
 
-def twilio_configured() -> bool:
-  return bool(TWILIO_ACCOUNT_SID) and bool(TWILIO_AUTH_TOKEN) and bool(TWILIO_FROM_NUMBER)
+def start_outbound_budget(seconds: float) -> None:
+  _outbound_budget_state.deadline = time.monotonic() + seconds
 
 
-def onesignal_configured() -> bool:
-  return bool(ONESIGNAL_APP_ID) and bool(ONESIGNAL_REST_API_KEY)
+def clear_outbound_budget() -> None:
+  _outbound_budget_state.deadline = None
 
 
-def send_email_via_resend(to_email: str, subject: str, body_text: str) -> dict:
-  if not resend_configured():
-    return {"status": "skipped", "error": "RESEND nicht konfiguriert", "providerMessageId": ""}
-  payload = {
-    "from": RESEND_FROM_EMAIL,
-    "to": [to_email],
-    "subject": subject or f"Update von {PLATFORM_BRAND_NAME}",
-    "html": f"<p>{body_text}</p>",
-  }
-  try:
-    response = requests.post(
-      "https://api.resend.com/emails",
-      headers={
-        "Authorization": f"Bearer {RESEND_API_KEY}",
-        "Content-Type": "application/json",
-      },
-      json=payload,
-      timeout=12,
+def outbound_budget_remaining() -> float | None:
+  deadline = getattr(_outbound_budget_state, "deadline", None)
+  if deadline is None:
+    return None
+  return deadline - time.monotonic()
+
+
+def clamp_timeout_to_budget(timeout, remaining: float | None):
+  if remaining is None:
+    return timeout
+  if isinstance(timeout, tuple):
+    return tuple(min(float(part), remaining) for part in timeout)
+  return min(float(timeout), remaining)
+
+
+class BudgetAwareRetry(Retry):
+  """urllib3 retries run inside one session.request() call, past the per-attempt timeout clamp;
+  this stops them once the caller's outbound budget has no room for another attempt."""
+
+  def increment(self, *args, **kwargs):
+    remaining = outbound_budget_remaining()
+    if remaining is not None and remaining < OUTBOUND_RETRY_MIN_BUDGET_SECONDS:
+      # Exhausted copy: urllib3 raises MaxRetryError, or returns the response if raise_on_status is off.
+      return super(BudgetAwareRetry, self.new(total=0)).increment(*args, **kwargs)
+    return super().increment(*args, **kwargs)
+
+class OutboundHttpClient:
+  """Pooled keep-alive sessions for provider calls and the import crawler. The crawler
+  gets its own pool, sized for its fan-out, so it can't exhaust the provider connections.
+  Only idempotent methods are retried after the request reached the server."""
+
+  def __init__(self, pool_maxsize: int, retries: int, import_pool_maxsize: int):
+    self._lock = threading.Lock()
+    self._metrics: dict[str, dict] = {}
+    self.breakers = {
+      provider: ProviderCircuitBreaker(provider, OUTBOUND_CIRCUIT_FAILURE_THRESHOLD, OUTBOUND_CIRCUIT_RESET_SECONDS)
+      for provider in OUTBOUND_CIRCUIT_BREAKER_PROVIDERS
+    }
+    self.pool_maxsize = pool_maxsize
+    self.import_pool_maxsize = import_pool_maxsize
+    retry = BudgetAwareRetry(
+      total=retries,
+      connect=retries,
+      read=retries,
+      status=retries,
+      backoff_factor=0.3,
+      status_forcelist=(502, 503, 504),
+      allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+      raise_on_status=False,
     )
-    response_text = response.text
-    parsed = {}
-    if response_text:
-      try:
-        parsed = json.loads(response_text)
-      except Exception:
-        parsed = {}
-    if response.status_code >= 400:
-      return {
-        "status": "failed",
-        "error": parsed.get("message") or f"RESEND HTTP {response.status_code}",
-        "providerMessageId": "",
-      }
+    self._session = self._build_session(pool_maxsize, retry)
+    self._import_session = self._build_session(import_pool_maxsize, retry)
+
+  @staticmethod
+  def _build_session(pool_maxsize: int, retry: Retry) -> requests.Session:
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    # Never persist cookies between unrelated providers/threads.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+  def request(self, provider: str, method: str, url: str, **kwargs) -> requests.Response:
+    remaining = outbound_budget_remaining()
+    if remaining is not None and remaining <= 0.05:
+      self._record_rejection(provider, "Zeitbudget für externe Aufrufe aufgebraucht")
+      raise OutboundUnavailableError(f"{provider}: Zeitbudget für externe Aufrufe aufgebraucht")
+    breaker = self._breaker_for(provider, url)
+    if breaker is not None and not breaker.allow_request():
+      self._record_rejection(provider, "Circuit offen")
+      raise OutboundUnavailableError(f"{provider} ist vorübergehend nicht erreichbar (Circuit offen)")
+
+    timeout = kwargs.pop("timeout", None) or OUTBOUND_PROVIDER_TIMEOUTS.get(provider, OUTBOUND_DEFAULT_TIMEOUT)
+    kwargs["timeout"] = clamp_timeout_to_budget(timeout, remaining)
+    started = time.monotonic()
+    try:
+      session = self._import_session if provider in OUTBOUND_IMPORT_PROVIDERS else self._session
+      response = session.request(method, url, **kwargs)
+    except Exception as exc:
+      self._record(provider, time.monotonic() - started, None, str(exc))
+      if breaker is not None:
+        breaker.record_failure(str(exc))
+      raise
+    status_code = int(response.status_code)
+    self._record(provider, time.monotonic() - started, status_code, "")
+    if breaker is not None:
+      if status_code >= 500 or status_code == 429:
+        breaker.record_failure(f"HTTP {status_code}")
+      else:
+        breaker.record_success()
+    return response
+
+  def _breaker_for(self, provider: str, url: str) -> ProviderCircuitBreaker | None:
+    if provider not in OUTBOUND_PER_TARGET_BREAKER_PROVIDERS:
+      return self.breakers.get(provider)
+    # Keyed by a hash of host + path: webhook paths are secrets and show up in metrics_snapshot().
+    parsed = urlparse(url)
+    digest = hashlib.sha256(f"{parsed.netloc.lower()}{parsed.path}".encode("utf-8")).hexdigest()[:12]
+    name = f"{provider}:{digest}"
+    with self._lock:
+      breaker = self.breakers.get(name)
+      if breaker is None:
+        breaker = ProviderCircuitBreaker(name, OUTBOUND_CIRCUIT_FAILURE_THRESHOLD, OUTBOUND_CIRCUIT_RESET_SECONDS)
+        self.breakers[name] = breaker
+    return breaker
+
+  def _record_rejection(self, provider: str, reason: str) -> None:
+    with self._lock:
+      entry = self._metrics.setdefault(provider, self._empty_metrics())
+      entry["rejected"] += 1
+      entry["lastError"] = reason
+
+  @staticmethod
+  def _empty_metrics() -> dict:
     return {
-      "status": "sent",
-      "error": "",
-      "providerMessageId": str(parsed.get("id") or ""),
+      "requests": 0,
+      "errors": 0,
+      "httpErrors": 0,
+      "rejected": 0,
+      "totalLatencyMs": 0.0,
+      "maxLatencyMs": 0.0,
+      "lastStatusCode": None,
+      "lastError": "",
     }
-  except Exception as exc:
-    return {"status": "failed", "error": str(exc), "providerMessageId": ""}
+
+  def _record(self, provider: str, elapsed_seconds: float, status_code: int | None, error: str) -> None:
+    elapsed_ms = elapsed_seconds * 1000.0
+    with self._lock:
+      entry = self._metrics.setdefault(provider, self._empty_metrics())
+      entry["requests"] += 1
+      entry["totalLatencyMs"] += elapsed_ms
+      entry["maxLatencyMs"] = max(entry["maxLatencyMs"], elapsed_ms)
+      entry["lastStatusCode"] = status_code
+      if status_code is None:
+        entry["errors"] += 1
+        entry["lastError"] = error[:300]
+      elif status_code >= 400:
+        entry["httpErrors"] += 1
+        entry["lastError"] = f"HTTP {status_code}"
+
+  def metrics_snapshot(self) -> dict:
+    with self._lock:
+      providers = {name: dict(entry) for name, entry in self._metrics.items()}
+    for entry in providers.values():
+      count = entry["requests"] or 1
+      entry["avgLatencyMs"] = round(entry["totalLatencyMs"] / count, 1)
+      entry["totalLatencyMs"] = round(entry["totalLatencyMs"], 1)
+      entry["maxLatencyMs"] = round(entry["maxLatencyMs"], 1)
+    return {
+      "poolMaxsize": self.pool_maxsize,
+      "importPoolMaxsize": self.import_pool_maxsize,
+      "requestBudgetSeconds": OUTBOUND_REQUEST_BUDGET_SECONDS,
+      "providers": providers,
+      "circuitBreakers": {name: breaker.snapshot() for name, breaker in list(self.breakers.items())},
+    }
+
+
+OUTBOUND_HTTP = OutboundHttpClient(OUTBOUND_HTTP_POOL_MAXSIZE, OUTBOUND_HTTP_RETRIES, IMPORT_HTTP_POOL_MAXSIZE)
+
+
+def outbound_http_request(provider: str, method: str, url: str, **kwargs) -> requests.Response:
+  return OUTBOUND_HTTP.request(provider, method, url, **kwargs)
+
+
+def utc_now_ms() -> int:
+  return int(time.time() * 1000)
+
+
+class BackgroundJobLeaseLost(RuntimeError):
+  """The job's lease expired and another worker reclaimed it; the current run must stop."""
+
+
+class BackgroundJobConflict(RuntimeError):
+  """A job with the same dedupe_key but a different payload is already running."""
+
+  def __init__(self, job_id: int):
+    super().__init__(f"Job {job_id} läuft bereits mit anderen Parametern.")
+    self.job_id = job_id
+
+
+class BackgroundJobStats:
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._by_type: dict[str, dict] = {}
+
+  def record(self, job_type: str, outcome: str, duration_seconds: float) -> None:
+    with self._lock:
+      entry = self._by_type.setdefault(
+        job_type,
+        {"succeeded": 0, "retried": 0, "dead": 0, "totalDurationMs": 0.0, "maxDurationMs": 0.0},
+      )
+      entry[outcome] = entry.get(outcome, 0) + 1
+      duration_ms = duration_seconds * 1000.0
+      entry["totalDurationMs"] += duration_ms
+      entry["maxDurationMs"] = max(entry["maxDurationMs"], duration_ms)
+
+  def snapshot(self) -> dict:
+    with self._lock:
+      output = {job_type: dict(entry) for job_type, entry in self._by_type.items()}
+    for entry in output.values():
+      runs = entry["succeeded"] + entry["retried"] + entry["dead"]
+      entry["avgDurationMs"] = round(entry["totalDurationMs"] / (runs or 1), 1)
+      entry["totalDurationMs"] = round(entry["totalDurationMs"], 1)
+      entry["maxDurationMs"] = round(entry["maxDurationMs"], 1)
+    return output
+
+
+BACKGROUND_JOB_STATS = BackgroundJobStats()
+# Payloads of these job types carry secrets (e.g. the OTP code) and are cleared once the job is finished.
+BACKGROUND_JOB_REDACTED_TYPES_SQL = "'otp.sms_send'"
+_inline_job_worker_lock = threading.Lock()
+_inline_job_worker_started = False
+_background_job_context = threading.local()
+
+
+def serialize_background_job_row(row) -> dict:
+  return {
+    "id": row["id"],
+    "jobType": row["job_type"],
+    "clinicId": row["clinic_id"],
+    "status": row["status"],
+    "attempts": int(row["attempts"] or 0),
+    "maxAttempts": int(row["max_attempts"] or 0),
+    "lastError": row["last_error"] or "",
+    "result": parse_json_dict(row["result_json"]),
+    "progress": parse_json_dict(row["progress_json"]),
+    "createdAt": row["created_at"],
+    "updatedAt": row["updated_at"],
+    "finishedAt": row["finished_at"],
+  }
+
+
+def load_background_job_row(job_id: int, clinic_id: int | None = None):
+  with get_db() as conn:
+    if clinic_id is None:
+      return conn.execute("SELECT * FROM background_jobs WHERE id = ? LIMIT 1", (job_id,)).fetchone()
+    return conn.execute(
+      "SELECT * FROM background_jobs WHERE id = ? AND clinic_id = ? LIMIT 1",
+      (job_id, clinic_id),
+    ).fetchone()
+
+
+def insert_background_job(
+  conn: DBConnectionAdapter,
+  job_type: str,
+  payload: dict,
+  *,
+  clinic_id: int | None = None,
+  dedupe_key: str | None = None,
+  delay_seconds: float = 0,
+  max_attempts: int | None = None,
+  replace_queued: bool = False,
+) -> int:
+  """With replace_queued, a queued job with the same dedupe_key but a different payload
+  gets the new payload instead of being reused as-is; if that job is already running,
+  BackgroundJobConflict is raised so the caller can tell the user."""
+  run_at_ms = utc_now_ms() + int(max(0.0, delay_seconds) * 1000)
+  payload_json = json.dumps(payload or {}, ensure_ascii=False, separators=(",", ":"))
+  params = (
+    job_type,
+    clinic_id,
+    payload_json,
+    int(max_attempts or BACKGROUND_JOB_MAX_ATTEMPTS),
+    run_at_ms,
+    dedupe_key,
+  )
+  if not dedupe_key:
+    return insert_and_get_id(
+      conn,
+      """
+      INSERT INTO background_jobs (job_type, clinic_id, payload_json, max_attempts, run_at_ms, dedupe_key)
+      VALUES (?, ?, ?, ?, ?, ?)
+      """,
+      params,
+    )
+
+  row = conn.execute(
+    """
+    INSERT INTO background_jobs (job_type, clinic_id, payload_json, max_attempts, run_at_ms, dedupe_key)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running') DO NOTHING
+    RETURNING id
+    """,
+    params,
+  ).fetchone()
+  if row:
+    return int(row["id"])
+
+  row = conn.execute(
+    """
+    SELECT id, status, payload_json
+    FROM background_jobs
+    WHERE dedupe_key = ? AND status IN ('queued', 'running')
+    ORDER BY id DESC
+    LIMIT 1
+    """,
+    (dedupe_key,),
+  ).fetchone()
+  if not replace_queued or parse_json_dict(row["payload_json"]) == json.loads(payload_json):
+    return int(row["id"])
+  replaced = str(row["status"]) == "queued" and conn.execute(
+    """
+    UPDATE background_jobs
+    SET payload_json = ?, max_attempts = ?, run_at_ms = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND status = 'queued'
+    """,
+    (payload_json, params[3], run_at_ms, row["id"]),
+  ).rowcount == 1
+  if not replaced:
+    raise BackgroundJobConflict(int(row["id"]))
+  return int(row["id"])
+
+
+def renew_background_job_lease(conn: DBConnectionAdapter) -> None:
+  """Heartbeat for long jobs: pushes the lease of the job running on this thread forward
+  (no-op outside a job). Raises BackgroundJobLeaseLost once another worker owns the job."""
+  job_row = getattr(_background_job_context, "job_row", None)
+  if job_row is None:
+    return
+  renewed = conn.execute(
+    """
+    UPDATE background_jobs
+    SET lease_expires_ms = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ? AND locked_by = ? AND status = 'running'
+    """,
+    (utc_now_ms() + BACKGROUND_JOB_LEASE_SECONDS * 1000, job_row["id"], job_row["locked_by"]),
+  ).rowcount
+  if renewed != 1:
+    raise BackgroundJobLeaseLost(f"Job {job_row['id']} wurde von einem anderen Worker übernommen.")
+
+
+def background_job_has_retries_left() -> bool:
+  """True while the job running on this thread will be retried if it fails now."""
+  job_row = getattr(_background_job_context, "job_row", None)
+  if job_row is None:
+    return False
+  return int(job_row["attempts"] or 0) < int(job_row["max_attempts"] or 1)
+
+
+def background_job_progress() -> dict:
+  """Progress stored by an earlier attempt of the job running on this thread ({} outside a job)."""
+  job_row = getattr(_background_job_context, "job_row", None)
+  if job_row is None:
+    return {}
+  return parse_json_dict(job_row["progress_json"])
+
+
+def report_background_job_progress(progress: dict) -> None:
+  """Stores intermediate state of the job running on this thread (no-op outside a job),
+  so pollers of /api/clinic/jobs/:id can show it before the final result exists."""
+  job_row = getattr(_background_job_context, "job_row", None)
+  if job_row is None:
+    return
+  with get_db() as conn:
+    conn.execute(
+      """
+      UPDATE background_jobs
+      SET progress_json = ?, updated_at = CURRENT_TIMESTAMP
+      WHERE id = ? AND locked_by = ? AND status = 'running'
+      """,
+      (
+        json.dumps(progress or {}, ensure_ascii=False, separators=(",", ":"), default=str),
+        job_row["id"],
+        job_row["locked_by"],
+      ),
+    )
+
+
+def enqueue_background_job(job_type: str, payload: dict, **options) -> int:
+  """Persist a job for the worker; with a dedupe_key an already queued/running job is reused.
+  Use insert_background_job() directly to enqueue inside a caller's transaction."""
+  with get_db() as conn:
+    job_id = insert_background_job(conn, job_type, payload, **options)
+  return job_id
+
+
+def claim_background_job(worker_id: str):
+  now_ms = utc_now_ms()
+  lease_expires_ms = now_ms + BACKGROUND_JOB_LEASE_SECONDS * 1000
+  claim_token = f"{worker_id}:{secrets.token_hex(8)}"
+  with get_db() as conn:
+    # Claimable: due queued jobs, or running jobs whose worker let the lease expire.
+    if conn.backend == "postgres":
+      return conn.execute(
+        """
+        UPDATE background_jobs
+        SET status = 'running', locked_by = ?, lease_expires_ms = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE id = (
+          SELECT id
+          FROM background_jobs
+          WHERE (status = 'queued' AND run_at_ms <= ?) OR (status = 'running' AND lease_expires_ms < ?)
+          ORDER BY run_at_ms ASC, id ASC
+          LIMIT 1
+          FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+        """,
+        (claim_token, lease_expires_ms, now_ms, now_ms),
+      ).fetchone()
+
+    # SQLite serializes writers, so a single conditional UPDATE is an atomic lease claim.
+    conn.execute(
+      """
+      UPDATE background_jobs
+      SET status = 'running', locked_by = ?, lease_expires_ms = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+      WHERE id = (
+        SELECT id
+        FROM background_jobs
+        WHERE (status = 'queued' AND run_at_ms <= ?) OR (status = 'running' AND lease_expires_ms < ?)
+        ORDER BY run_at_ms ASC, id ASC
+        LIMIT 1
+      )
+      """,
+      (claim_token, lease_expires_ms, now_ms, now_ms),
+    )
+    return conn.execute(
+      "SELECT * FROM background_jobs WHERE locked_by = ? AND status = 'running' LIMIT 1",
+      (claim_token,),
+    ).fetchone()
+
+
+def complete_background_job(job_row, result: dict | None) -> None:
+  with get_db() as conn:
+    conn.execute(
+      """
+      UPDATE background_jobs
+      SET status = 'succeeded', result_json = ?, last_error = '', lease_expires_ms = 0,
+          payload_json = CASE WHEN job_type IN ({redacted}) THEN '{{}}' ELSE payload_json END,
+          finished_at = ?, updated_at = CURRENT_TIMESTAMP
+      WHERE id = ? AND locked_by = ?
+      """.format(redacted=BACKGROUND_JOB_REDACTED_TYPES_SQL),
+      (
+        json.dumps(result or {}, ensure_ascii=False, separators=(",", ":"), default=str),
+        utc_now(),
+        job_row["id"],
+        job_row["locked_by"],
+      ),
+    )
+
+
+def fail_background_job(job_row, error: str) -> str:
+  attempts = int(job_row["attempts"] or 0)
+  is_dead = attempts >= int(job_row["max_attempts"] or 1)
+  retry_delay_ms = min(15 * 60 * 1000, 5000 * (2 ** max(0, attempts - 1)))
+  with get_db() as conn:
+    conn.execute(
+      """
+      UPDATE background_jobs
+      SET status = ?, last_error = ?, run_at_ms = ?, lease_expires_ms = 0,
+          payload_json = CASE WHEN ? AND job_type IN ({redacted}) THEN '{{}}' ELSE payload_json END,
+          finished_at = ?, updated_at = CURRENT_TIMESTAMP
+      WHERE id = ? AND locked_by = ?
+      """.format(redacted=BACKGROUND_JOB_REDACTED_TYPES_SQL),
+      (
+        "dead" if is_dead else "queued",
+        str(error or "Unbekannter Fehler")[:1000],
+        utc_now_ms() + retry_delay_ms,
+        is_dead,
+        utc_now() if is_dead else None,
+        job_row["id"],
+        job_row["locked_by"],
+      ),
+    )
+  return "dead" if is_dead else "retried"
+
+
+def handle_dead_background_job(job_row, error: str) -> None:
+  handler = BACKGROUND_JOB_DEAD_HANDLERS.get(str(job_row["job_type"]))
+  if handler is None:
+    return
+  try:
+    handler(parse_json_dict(job_row["payload_json"]), error)
+  except Exception:
+    app.logger.exception("Dead-job handler for background job %s failed", job_row["id"])
+
+
+def process_next_background_job(worker_id: str) -> bool:
+  job_row = claim_background_job(worker_id)
+  if not job_row:
+    return False
+
+  job_type = str(job_row["job_type"])
+  started = time.monotonic()
+  if int(job_row["attempts"] or 0) > int(job_row["max_attempts"] or 1):
+    # Reclaimed after the lease expired on its final attempt (worker crashed mid-run).
+    outcome = fail_background_job(job_row, str(job_row["last_error"] or "Lease abgelaufen"))
+    if outcome == "dead":
+      handle_dead_background_job(job_row, str(job_row["last_error"] or "Lease abgelaufen"))
+    BACKGROUND_JOB_STATS.record(job_type, outcome, time.monotonic() - started)
+    return True
+
+  handler = BACKGROUND_JOB_HANDLERS.get(job_type)
+  try:
+    if handler is None:
+      raise RuntimeError(f"Unbekannter Job-Typ: {job_type}")
+    _background_job_context.job_row = job_row
+    result = handler(parse_json_dict(job_row["payload_json"]))
+  except Exception as exc:
+    app.logger.warning("Background job %s (%s) failed", job_row["id"], job_type, exc_info=True)
+    outcome = fail_background_job(job_row, str(exc))
+    if outcome == "dead":
+      handle_dead_background_job(job_row, str(exc))
+  else:
+    complete_background_job(job_row, result if isinstance(result, dict) else {})
+    outcome = "succeeded"
+  finally:
+    _background_job_context.job_row = None
+  BACKGROUND_JOB_STATS.record(job_type, outcome, time.monotonic() - started)
+  return True
+
+
+def run_background_job_loop(worker_id: str, stop_event: threading.Event) -> None:
+  while not stop_event.is_set():
+    try:
+      processed = process_next_background_job(worker_id)
+    except Exception:
+      app.logger.exception("Background job loop error")
+      processed = False
+    if not processed:
+      stop_event.wait(BACKGROUND_JOB_POLL_SECONDS)
+
+
+def start_background_job_threads(worker_name: str, thread_count: int, stop_event: threading.Event) -> list[threading.Thread]:
+  threads = []
+  for index in range(max(1, thread_count)):
+    thread = threading.Thread(
+      target=run_background_job_loop,
+      args=(f"{worker_name}-{index}", stop_event),
+      name=f"{worker_name}-{index}",
+      daemon=True,
+    )
+    thread.start()
+    threads.append(thread)
+  return threads
+
+
+def run_background_worker(stop_event: threading.Event | None = None) -> None:
+  """Blocking entry point for the dedicated worker process (see worker.py)."""
+  stop_event = stop_event or threading.Event()
+  threads = start_background_job_threads(f"worker-{os.getpid()}", BACKGROUND_JOB_WORKER_THREADS, stop_event)
+  scheduler_thread = start_campaign_scheduler(stop_event)
+  if scheduler_thread:
+    threads.append(scheduler_thread)
+  app.logger.info("Background worker started with %s threads", len(threads))
+  while not stop_event.wait(1.0):
+    pass
+  for thread in threads:
+    thread.join(timeout=BACKGROUND_JOB_POLL_SECONDS + 5)
+
+
+def start_inline_job_worker() -> None:
+  """Fallback worker + scheduler threads for the web process. Only the web entry points
+  (wsgi.py, `python server.py`) call this; importing server never starts threads."""
+  global _inline_job_worker_started
+  if not BACKGROUND_JOB_WORKER_IN_WEB or _inline_job_worker_started:
+    return
+  with _inline_job_worker_lock:
+    if _inline_job_worker_started:
+      return
+    _inline_job_worker_started = True
+    stop_event = threading.Event()
+    start_background_job_threads(f"web-{os.getpid()}", BACKGROUND_JOB_WORKER_THREADS, stop_event)
+    start_campaign_scheduler(stop_event)
+
+
+def background_job_metrics_snapshot() -> dict:
+  with get_db() as conn:
+    rows = conn.execute(
+      """
+      SELECT job_type, status, COUNT(*) AS count
+      FROM background_jobs
+      GROUP BY job_type, status
+      """
+    ).fetchall()
+    oldest_row = conn.execute(
+      "SELECT MIN(run_at_ms) AS oldest FROM background_jobs WHERE status = 'queued' AND run_at_ms <= ?",
+      (utc_now_ms(),),
+    ).fetchone()
+
+  counts: dict[str, dict] = {}
+  for row in rows:
+    counts.setdefault(str(row["job_type"]), {})[str(row["status"])] = int(row["count"] or 0)
+  oldest_due = oldest_row["oldest"] if oldest_row else None
+  return {
+    "countsByType": counts,
+    "oldestDueLagSeconds": round((utc_now_ms() - int(oldest_due)) / 1000, 1) if oldest_due else 0,
+    "inlineWorker": BACKGROUND_JOB_WORKER_IN_WEB,
+    "processedInThisProcess": BACKGROUND_JOB_STATS.snapshot(),
+  }
+
+
+def resend_configured() -> bool:
+  return bool(RESEND_API_KEY) and bool(RESEND_FROM_EMAIL) and "@" in RESEND_FROM_EMAIL
+
+
+def twilio_configured() -> bool:
+  return bool(TWILIO_ACCOUNT_SID) and bool(TWILIO_AUTH_TOKEN) and bool(TWILIO_FROM_NUMBER)
+
+
+def onesignal_configured() -> bool:
+  return bool(ONESIGNAL_APP_ID) and bool(ONESIGNAL_REST_API_KEY)
+
+
+def send_email_via_resend(to_email: str, subject: str, body_text: str) -> dict:
+  if not resend_configured():
+    return {"status": "skipped", "error": "RESEND nicht konfiguriert", "providerMessageId": ""}
+  payload = {
+    "from": RESEND_FROM_EMAIL,
+    "to": [to_email],
+    "subject": subject or f"Update von {PLATFORM_BRAND_NAME}",
+    "html": f"<p>{body_text}</p>",
+  }
+  try:
+    response = outbound_http_request(
+      "resend",
+      "POST",
+      "https://api.resend.com/emails",
+      headers={
+        "Authorization": f"Bearer {RESEND_API_KEY}",
+        "Content-Type": "application/json",
+      },
+      json=payload,
+    )
+    response_text = response.text
+    parsed = {}
+    if response_text:
+      try:
+        parsed = json.loads(response_text)
+      except Exception:
+        parsed = {}
+    if response.status_code >= 400:
+      return {
+        "status": "failed",
+        "error": parsed.get("message") or f"RESEND HTTP {response.status_code}",
+        "providerMessageId": "",
+      }
+    return {
+      "status": "sent",
+      "error": "",
+      "providerMessageId": str(parsed.get("id") or ""),
+    }
+  except Exception as exc:
+    return {"status": "failed", "error": str(exc), "providerMessageId": ""}
 
 
 def send_sms_via_twilio(to_phone: str, body_text: str) -> dict:
@@ -4945,7 +7286,9 @@ def send_sms_via_twilio(to_phone: str, body_text: str) -> dict:
 
   endpoint = f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}/Messages.json"
   try:
-    response = requests.post(
+    response = outbound_http_request(
+      "twilio",
+      "POST",
       endpoint,
       auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
       data={
@@ -4953,7 +7296,6 @@ def send_sms_via_twilio(to_phone: str, body_text: str) -> dict:
         "From": TWILIO_FROM_NUMBER,
         "Body": body_text,
       },
-      timeout=12,
     )
     response_text = response.text
     parsed = {}
@@ -4991,14 +7333,15 @@ def send_push_via_onesignal(external_user_id: str, title: str, body_text: str) -
     "contents": {"en": body_text},
   }
   try:
-    response = requests.post(
+    response = outbound_http_request(
+      "onesignal",
+      "POST",
       "https://api.onesignal.com/notifications?c=push",
       headers={
         "Authorization": f"Key {ONESIGNAL_REST_API_KEY}",
         "Content-Type": "application/json",
       },
       json=payload,
-      timeout=12,
     )
     response_text = response.text
     parsed = {}
@@ -5022,43 +7365,673 @@ def send_push_via_onesignal(external_user_id: str, title: str, body_text: str) -
     return {"status": "failed", "error": str(exc), "providerMessageId": ""}
 
 
-def insert_campaign_delivery(
+def bump_campaign_delivery_stats(
+  conn: DBConnectionAdapter,
+  run_row,
+  status: str,
+  count: int = 1,
+  error_message: str = "",
+) -> None:
+  """Add finished deliveries to the run counters and the campaign-wide counters (run_id 0)."""
+  if status not in {"sent", "failed", "skipped"} or count <= 0:
+    return
+  channel = normalize_campaign_channel(run_row["channel"], "in_app")
+  error_text = sanitize_campaign_text(error_message, 500) if status == "failed" else ""
+  for run_id in (int(run_row["id"]), 0):
+    conn.execute(
+      """
+      INSERT INTO campaign_delivery_stats (
+        campaign_id, run_id, channel, clinic_id, sent_count, failed_count, skipped_count, last_error, last_error_at
+      )
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (campaign_id, run_id, channel) DO UPDATE SET
+        sent_count = campaign_delivery_stats.sent_count + excluded.sent_count,
+        failed_count = campaign_delivery_stats.failed_count + excluded.failed_count,
+        skipped_count = campaign_delivery_stats.skipped_count + excluded.skipped_count,
+        last_error = CASE WHEN excluded.last_error != '' THEN excluded.last_error ELSE campaign_delivery_stats.last_error END,
+        last_error_at = COALESCE(excluded.last_error_at, campaign_delivery_stats.last_error_at),
+        updated_at = CURRENT_TIMESTAMP
+      """,
+      (
+        int(run_row["campaign_id"]),
+        run_id,
+        channel,
+        int(run_row["clinic_id"]),
+        count if status == "sent" else 0,
+        count if status == "failed" else 0,
+        count if status == "skipped" else 0,
+        error_text,
+        utc_now() if error_text else None,
+      ),
+    )
+
+
+def backfill_campaign_delivery_stats(conn: DBConnectionAdapter) -> None:
+  # One-time seed for databases that have delivery history from before the stats table existed.
+  if conn.execute("SELECT 1 FROM campaign_delivery_stats LIMIT 1").fetchone():
+    return
+  if not conn.execute("SELECT 1 FROM campaign_deliveries LIMIT 1").fetchone():
+    return
+  for scope_column in ("0", "run_id"):
+    conn.execute(
+      f"""
+      INSERT INTO campaign_delivery_stats (campaign_id, run_id, channel, clinic_id, sent_count, failed_count, skipped_count)
+      SELECT
+        campaign_id,
+        {scope_column},
+        channel,
+        MIN(clinic_id),
+        SUM(CASE WHEN status = 'sent' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'skipped' THEN 1 ELSE 0 END)
+      FROM campaign_deliveries
+      WHERE {"1 = 1" if scope_column == "0" else "run_id IS NOT NULL"}
+      GROUP BY campaign_id, channel{"" if scope_column == "0" else ", run_id"}
+      """
+    )
+
+
+# Table -> (raw column, canonical column, canonicalizer) pairs filled by backfill_patient_contact_keys.
+PATIENT_CONTACT_KEY_COLUMNS = {
+  "patient_memberships": (("patient_email", "patient_email_canonical", sanitize_patient_email),),
+  "patient_checkout_sessions": (("patient_email", "patient_email_canonical", sanitize_patient_email),),
+  "clinic_visits": (
+    ("patient_email", "patient_email_canonical", sanitize_patient_email),
+    ("patient_phone", "patient_phone_e164", sanitize_phone_e164),
+  ),
+}
+
+
+def patient_contact_keys_pending_sql(table_name: str) -> str:
+  # Shared by the backfill query and its partial index, which SQLite only uses on an identical predicate.
+  missing = " OR ".join(
+    f"({canonical} = '' AND {raw} <> '')" for raw, canonical, _ in PATIENT_CONTACT_KEY_COLUMNS[table_name]
+  )
+  return f"contact_keys_checked_at IS NULL AND ({missing})"
+
+
+def ensure_patient_contact_key_indexes(conn: DBConnectionAdapter) -> None:
+  for table_name in PATIENT_CONTACT_KEY_COLUMNS:
+    conn.execute(
+      f"CREATE INDEX IF NOT EXISTS idx_{table_name}_contact_keys_pending "
+      f"ON {table_name}(id) WHERE {patient_contact_keys_pending_sql(table_name)}"
+    )
+
+
+def backfill_patient_contact_keys(conn: DBConnectionAdapter) -> None:
+  """Fill canonical email / E.164 phone keys for rows written before those columns existed."""
+  # Same canonicalizers as new writes (sanitize_patient_email / sanitize_phone_e164), so row by row.
+  # Values they reject stay ''; contact_keys_checked_at keeps those rows out of the next startup's scan.
+  checked_at = utc_now()
+  for table_name, key_columns in PATIENT_CONTACT_KEY_COLUMNS.items():
+    selected = ", ".join(column for raw, canonical, _ in key_columns for column in (raw, canonical))
+    rows = conn.execute(
+      f"SELECT id, {selected} FROM {table_name} WHERE {patient_contact_keys_pending_sql(table_name)}"
+    ).fetchall()
+    if not rows:
+      continue
+    assignments = ", ".join(f"{canonical} = ?" for _, canonical, _ in key_columns)
+    conn.executemany(
+      f"UPDATE {table_name} SET {assignments}, contact_keys_checked_at = ? WHERE id = ?",
+      [
+        (
+          *(row[canonical] or canonicalize(row[raw]) for raw, canonical, canonicalize in key_columns),
+          checked_at,
+          int(row["id"]),
+        )
+        for row in rows
+      ],
+    )
+
+  # NULL marks deliveries from before the column existed; new rows always store a value ('' if unknown).
+  rows = conn.execute(
+    "SELECT id, recipient_key, metadata_json FROM campaign_deliveries WHERE recipient_email_canonical IS NULL"
+  ).fetchall()
+  if rows:
+    conn.executemany(
+      "UPDATE campaign_deliveries SET recipient_email_canonical = ? WHERE id = ?",
+      [
+        (campaign_delivery_email_key(row["recipient_key"], parse_json_dict(row["metadata_json"])), int(row["id"]))
+        for row in rows
+      ],
+    )
+
+
+PATIENT_DIRECTORY_EVENT_TOUCH_SECONDS = 300
+PATIENT_DIRECTORY_FUZZY_THRESHOLD = 0.4
+# Set by init_db() once the FTS5 trigram table (SQLite) or pg_trgm GIN index (Postgres) exists.
+PATIENT_DIRECTORY_SEARCH_INDEX = {"ready": False}
+# FTS rowid = clinic_id * stride + entry id: one clinic is one contiguous rowid range,
+# and FTS5 seeks straight to it instead of filtering every clinic's matches.
+PATIENT_DIRECTORY_FTS_CLINIC_STRIDE = 1 << 32
+
+
+def normalize_directory_text(value: object) -> str:
+  # Casefolded, accent-free, single-spaced; stored in search_text and applied to queries alike.
+  decomposed = unicodedata.normalize("NFKD", str(value or "").replace("ß", "ss"))
+  stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+  return " ".join(stripped.casefold().split())
+
+
+def patient_directory_search_text(display_name: str, email: str, phone_e164: str) -> str:
+  return " ".join(part for part in (normalize_directory_text(display_name), email, phone_e164.lstrip("+")) if part)
+
+
+def directory_trigrams(value: str) -> set[str]:
+  padded = f"  {value} "
+  return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def directory_word_similarity(query: str, search_text: str) -> float:
+  # Python counterpart of pg_trgm word_similarity() for the SQLite fuzzy fallback.
+  query_trigrams = directory_trigrams(query)
+  if not query_trigrams:
+    return 0.0
+  best = 0.0
+  for word in search_text.split():
+    word_trigrams = directory_trigrams(word)
+    best = max(best, len(query_trigrams & word_trigrams) / len(query_trigrams | word_trigrams))
+  return best
+
+
+def ensure_patient_directory_search(conn: DBConnectionAdapter) -> None:
+  """Create the search index for clinic_patient_directory (FTS5 trigram table / pg_trgm GIN index)."""
+  if conn.backend == "postgres":
+    conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    conn.execute(
+      "CREATE INDEX IF NOT EXISTS idx_clinic_patient_directory_trgm "
+      "ON clinic_patient_directory USING gin (search_text gin_trgm_ops)"
+    )
+    return
+  # Rebuild tables from before the clinic-ranged rowids (see PATIENT_DIRECTORY_FTS_CLINIC_STRIDE).
+  fts_columns = [row["name"] for row in conn.execute("PRAGMA table_info(clinic_patient_directory_fts)").fetchall()]
+  if fts_columns and "entry_id" not in fts_columns:
+    conn.execute("DROP TABLE clinic_patient_directory_fts")
+  conn.execute(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clinic_patient_directory_fts "
+    "USING fts5(search_text, entry_id UNINDEXED, tokenize = 'trigram')"
+  )
+  if not conn.execute("SELECT 1 FROM clinic_patient_directory_fts LIMIT 1").fetchone():
+    conn.execute(
+      "INSERT INTO clinic_patient_directory_fts (rowid, search_text, entry_id) "
+      "SELECT clinic_id * ? + id, search_text, id FROM clinic_patient_directory",
+      (PATIENT_DIRECTORY_FTS_CLINIC_STRIDE,),
+    )
+
+
+def ensure_admin_clinic_search_indexes(conn: DBConnectionAdapter) -> None:
+  """pg_trgm indexes behind the substring search of /api/admin/clinics (Postgres only)."""
+  conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+  conn.execute("CREATE INDEX IF NOT EXISTS idx_clinics_name_trgm ON clinics USING gin (LOWER(name) gin_trgm_ops)")
+  conn.execute("CREATE INDEX IF NOT EXISTS idx_clinics_website_trgm ON clinics USING gin (LOWER(website) gin_trgm_ops)")
+  conn.execute(
+    "CREATE INDEX IF NOT EXISTS idx_users_owner_email_trgm "
+    "ON users USING gin (LOWER(email) gin_trgm_ops) WHERE role = 'owner'"
+  )
+
+
+def patient_directory_fts_rowid_range(clinic_id: int) -> tuple[int, int]:
+  first = int(clinic_id) * PATIENT_DIRECTORY_FTS_CLINIC_STRIDE
+  return first, first + PATIENT_DIRECTORY_FTS_CLINIC_STRIDE - 1
+
+
+def sync_patient_directory_fts(conn: DBConnectionAdapter, entry_id: int, clinic_id: int, search_text: str) -> None:
+  if conn.backend == "postgres" or not PATIENT_DIRECTORY_SEARCH_INDEX["ready"]:
+    return
+  rowid = patient_directory_fts_rowid_range(clinic_id)[0] + int(entry_id)
+  conn.execute("DELETE FROM clinic_patient_directory_fts WHERE rowid = ?", (rowid,))
+  conn.execute(
+    "INSERT INTO clinic_patient_directory_fts (rowid, search_text, entry_id) VALUES (?, ?, ?)",
+    (rowid, search_text, entry_id),
+  )
+
+
+def upsert_patient_directory_entry(
+  conn: DBConnectionAdapter,
+  clinic_id: int,
+  *,
+  email: object = "",
+  phone: object = "",
+  name: object = "",
+  activity_at: object = None,
+  source: str = "",
+) -> None:
+  """Merge one patient sighting into the clinic directory (keyed by canonical email, else E.164 phone)."""
+  safe_email = sanitize_patient_email(email)
+  safe_phone = sanitize_phone_e164(phone)
+  patient_key = safe_email or (f"tel:{safe_phone}" if safe_phone else "")
+  if not clinic_id or not patient_key:
+    return
+  safe_name = sanitize_patient_name(name)
+  activity = parse_datetime_utc(activity_at) or utc_now()
+
+  existing = conn.execute(
+    """
+    SELECT id, display_name, email_canonical, phone_e164, last_activity_at
+    FROM clinic_patient_directory
+    WHERE clinic_id = ? AND patient_key = ?
+    LIMIT 1
+    """,
+    (clinic_id, patient_key),
+  ).fetchone()
+  if existing is None:
+    display_name = safe_name or (safe_email.split("@")[0] if safe_email else safe_phone)
+    search_text = patient_directory_search_text(display_name, safe_email, safe_phone)
+    inserted = conn.execute(
+      """
+      INSERT INTO clinic_patient_directory (
+        clinic_id, patient_key, display_name, email_canonical, phone_e164, search_text,
+        last_activity_at, last_activity_source, created_at, updated_at
+      )
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (clinic_id, patient_key) DO NOTHING
+      RETURNING id
+      """,
+      (clinic_id, patient_key, display_name, safe_email, safe_phone, search_text, activity, source, utc_now(), utc_now()),
+    ).fetchone()
+    if inserted:
+      sync_patient_directory_fts(conn, int(inserted["id"]), clinic_id, search_text)
+      return
+    existing = conn.execute(
+      """
+      SELECT id, display_name, email_canonical, phone_e164, last_activity_at
+      FROM clinic_patient_directory
+      WHERE clinic_id = ? AND patient_key = ?
+      LIMIT 1
+      """,
+      (clinic_id, patient_key),
+    ).fetchone()
+    if existing is None:
+      return
+
+  previous_activity = parse_datetime_utc(existing["last_activity_at"])
+  is_newer = previous_activity is None or activity > previous_activity
+  display_name = str(existing["display_name"] or "")
+  if safe_name and (is_newer or not display_name):
+    display_name = safe_name
+  phone_e164 = str(existing["phone_e164"] or "")
+  if safe_phone and (is_newer or not phone_e164):
+    phone_e164 = safe_phone
+  if display_name == existing["display_name"] and phone_e164 == existing["phone_e164"] and not is_newer:
+    return
+
+  search_text = patient_directory_search_text(display_name, str(existing["email_canonical"] or ""), phone_e164)
+  conn.execute(
+    f"""
+    UPDATE clinic_patient_directory
+    SET
+      display_name = ?,
+      phone_e164 = ?,
+      search_text = ?,
+      {"last_activity_at = ?, last_activity_source = ?," if is_newer else ""}
+      updated_at = ?
+    WHERE id = ?
+    """,
+    (
+      display_name,
+      phone_e164,
+      search_text,
+      *((activity, source) if is_newer else ()),
+      utc_now(),
+      int(existing["id"]),
+    ),
+  )
+  sync_patient_directory_fts(conn, int(existing["id"]), clinic_id, search_text)
+
+
+class PatientDirectoryTouchThrottle:
+  """Skips directory writes for analytics events of a patient seen within the last few minutes."""
+
+  def __init__(self, window_seconds: int, max_entries: int = 50_000):
+    self.window_seconds = window_seconds
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._seen: dict[tuple[int, str], float] = {}
+
+  def should_touch(self, clinic_id: int, patient_key: str) -> bool:
+    now = time.monotonic()
+    with self._lock:
+      last_seen = self._seen.get((clinic_id, patient_key))
+      if last_seen is not None and now - last_seen < self.window_seconds:
+        return False
+      if len(self._seen) >= self.max_entries:
+        self._seen.clear()
+      self._seen[(clinic_id, patient_key)] = now
+      return True
+
+
+PATIENT_DIRECTORY_EVENT_THROTTLE = PatientDirectoryTouchThrottle(PATIENT_DIRECTORY_EVENT_TOUCH_SECONDS)
+
+
+def touch_patient_directory_from_event(conn: DBConnectionAdapter, clinic_id: int, metadata: dict | None) -> None:
+  if not isinstance(metadata, dict):
+    return
+  email = extract_email_from_metadata(metadata)
+  phone = sanitize_phone_e164(extract_phone_from_metadata(metadata))
+  patient_key = email or (f"tel:{phone}" if phone else "")
+  if not patient_key or not PATIENT_DIRECTORY_EVENT_THROTTLE.should_touch(clinic_id, patient_key):
+    return
+  upsert_patient_directory_entry(
+    conn,
+    clinic_id,
+    email=email,
+    phone=phone,
+    name=metadata.get("memberName") or metadata.get("name"),
+    source="app",
+  )
+
+
+# source -> (table, columns, extra condition) the directory is seeded from, walked in id order.
+PATIENT_DIRECTORY_BACKFILL_SOURCES = (
+  ("membership", "patient_memberships", "patient_email, '' AS patient_phone, patient_name, updated_at AS activity_at", ""),
+  ("checkout", "patient_checkout_sessions", "patient_email, '' AS patient_phone, patient_name, created_at AS activity_at", ""),
+  ("visit", "clinic_visits", "patient_email, patient_phone, patient_name, created_at AS activity_at", ""),
+  ("appointment", "patient_appointments", "patient_email, '' AS patient_phone, patient_name, updated_at AS activity_at", ""),
+  ("app", "analytics_events", "metadata_json, created_at AS activity_at", "AND metadata_json <> '{}'"),
+)
+PATIENT_DIRECTORY_BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_patient_directory(cursor: dict | None = None) -> dict:
+  """One-time seed from the existing patient tables; later writes keep the directory current.
+
+  Runs as the patient_directory.backfill job, one transaction per batch. cursor maps
+  each source to the last id it covered, so a retried job resumes where it stopped.
+  """
+  cursor = dict(cursor or {})
+  for source, table_name, columns, extra_condition in PATIENT_DIRECTORY_BACKFILL_SOURCES:
+    while True:
+      with get_db() as conn:
+        renew_background_job_lease(conn)
+        rows = conn.execute(
+          f"""
+          SELECT id, clinic_id, {columns}
+          FROM {table_name}
+          WHERE id > ? {extra_condition}
+          ORDER BY id ASC
+          LIMIT ?
+          """,
+          (int(cursor.get(source) or 0), PATIENT_DIRECTORY_BACKFILL_BATCH_SIZE),
+        ).fetchall()
+        for row in rows:
+          if source == "app":
+            metadata = parse_event_metadata(row["metadata_json"])
+            sighting = {
+              "email": extract_email_from_metadata(metadata),
+              "phone": extract_phone_from_metadata(metadata),
+              "name": metadata.get("memberName") or metadata.get("name"),
+            }
+          else:
+            sighting = {"email": row["patient_email"], "phone": row["patient_phone"], "name": row["patient_name"]}
+          upsert_patient_directory_entry(
+            conn,
+            int(row["clinic_id"]),
+            activity_at=row["activity_at"],
+            source=source,
+            **sighting,
+          )
+      if not rows:
+        break
+      cursor[source] = int(rows[-1]["id"])
+      report_background_job_progress({"cursor": cursor})
+      if len(rows) < PATIENT_DIRECTORY_BACKFILL_BATCH_SIZE:
+        break
+  return cursor
+
+
+def enqueue_patient_directory_backfill(conn: DBConnectionAdapter) -> None:
+  # Queued once per database: skipped after a successful run, and for directories an older
+  # version already seeded inline (entries exist, but no backfill job ever ran).
+  last_job = conn.execute(
+    "SELECT status FROM background_jobs WHERE job_type = 'patient_directory.backfill' ORDER BY id DESC LIMIT 1"
+  ).fetchone()
+  if last_job is not None and last_job["status"] == "succeeded":
+    return
+  if last_job is None and conn.execute("SELECT 1 FROM clinic_patient_directory LIMIT 1").fetchone():
+    return
+  insert_background_job(conn, "patient_directory.backfill", {}, dedupe_key="patient_directory.backfill")
+
+
+def parse_patient_directory_cursor(raw_cursor: object) -> tuple[datetime, int] | None:
+  # Cursor "<last_activity_at>|<id>" from the previous page's nextCursor.
+  raw_activity_at, _, raw_id = str(raw_cursor or "").strip().rpartition("|")
+  activity_at = parse_datetime_utc(raw_activity_at)
+  if activity_at is None:
+    return None
+  try:
+    return activity_at, int(raw_id)
+  except ValueError:
+    return None
+
+
+def serialize_patient_directory_row(row) -> dict:
+  return {
+    "key": row["patient_key"],
+    "name": row["display_name"] or "",
+    "email": row["email_canonical"] or "",
+    "phone": row["phone_e164"] or "",
+    "lastActivityAt": row["last_activity_at"],
+    "lastActivitySource": row["last_activity_source"] or "",
+  }
+
+
+def escape_like_pattern(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_patient_directory(
   clinic_id: int,
-  campaign_id: int,
-  recipient_key: str,
-  channel: str,
-  status: str,
-  provider_message_id: str = "",
-  error_message: str = "",
-  metadata: dict | None = None,
-) -> int:
+  query: str,
+  limit: int = 20,
+  cursor: tuple[datetime, int] | None = None,
+) -> tuple[list, str | None, str]:
+  """Directory page for q. Returns (rows, next_cursor, mode).
+
+  "match": every query term occurs in name/email/phone (substring, so prefixes
+  too), newest activity first with keyset paging. If the first page is empty,
+  "fuzzy" ranks near misses by trigram similarity (one page, no cursor).
+  """
+  safe_limit = max(1, min(limit, 100))
+  normalized_query = normalize_directory_text(query)
+  terms = normalized_query.replace("+", "").split()
+  columns = "d.id, d.patient_key, d.display_name, d.email_canonical, d.phone_e164, d.last_activity_at, d.last_activity_source"
+
+  conditions = ["d.clinic_id = ?"]
+  params: list = [clinic_id]
+  use_fts = DB_BACKEND != "postgres" and PATIENT_DIRECTORY_SEARCH_INDEX["ready"]
+  fts_terms = [term for term in terms if use_fts and len(term) >= 3]
+  if fts_terms:
+    conditions.append(
+      "d.id IN (SELECT entry_id FROM clinic_patient_directory_fts "
+      "WHERE clinic_patient_directory_fts MATCH ? AND rowid BETWEEN ? AND ?)"
+    )
+    params.extend(
+      [" ".join('"' + term.replace('"', '""') + '"' for term in fts_terms), *patient_directory_fts_rowid_range(clinic_id)]
+    )
+  for term in terms:
+    if term in fts_terms:
+      continue
+    # On Postgres the pg_trgm GIN index serves these LIKEs; on SQLite only short terms land here.
+    conditions.append("d.search_text LIKE ? ESCAPE '\\'")
+    params.append(f"%{escape_like_pattern(term)}%")
+  if cursor is not None:
+    conditions.append("(d.last_activity_at < ? OR (d.last_activity_at = ? AND d.id < ?))")
+    params.extend([cursor[0], cursor[0], cursor[1]])
+
   with get_db() as conn:
-    return insert_and_get_id(
-      conn,
-      """
-      INSERT INTO campaign_deliveries (
-        clinic_id,
-        campaign_id,
-        recipient_key,
-        channel,
-        status,
-        provider_message_id,
-        error_message,
-        metadata_json
-      )
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    rows = conn.execute(
+      f"""
+      SELECT {columns}
+      FROM clinic_patient_directory d
+      WHERE {" AND ".join(conditions)}
+      ORDER BY d.last_activity_at DESC, d.id DESC
+      LIMIT ?
+      """,
+      (*params, safe_limit + 1),
+    ).fetchall()
+    if rows or cursor is not None or len(normalized_query) < 3 or not PATIENT_DIRECTORY_SEARCH_INDEX["ready"]:
+      next_cursor = None
+      if len(rows) > safe_limit:
+        rows = rows[:safe_limit]
+        next_cursor = f"{format_db_timestamp(rows[-1]['last_activity_at'])}|{rows[-1]['id']}"
+      return list(rows), next_cursor, "match"
+
+    if conn.backend == "postgres":
+      fuzzy_rows = conn.execute(
+        f"""
+        SELECT {columns}
+        FROM clinic_patient_directory d
+        WHERE d.clinic_id = ? AND ? <%% d.search_text
+        ORDER BY word_similarity(?, d.search_text) DESC, d.last_activity_at DESC, d.id DESC
+        LIMIT ?
+        """,
+        (clinic_id, normalized_query, normalized_query, safe_limit),
+      ).fetchall()
+      return list(fuzzy_rows), None, "fuzzy"
+
+    # SQLite: any shared trigram makes a candidate; bm25 narrows, Python scores like pg_trgm.
+    trigrams = sorted({normalized_query[index : index + 3] for index in range(len(normalized_query) - 2)} - {""})[:32]
+    candidate_rows = conn.execute(
+      f"""
+      SELECT {columns}, d.search_text
+      FROM clinic_patient_directory_fts f
+      INNER JOIN clinic_patient_directory d ON d.id = f.entry_id
+      WHERE clinic_patient_directory_fts MATCH ? AND f.rowid BETWEEN ? AND ?
+      ORDER BY bm25(clinic_patient_directory_fts)
+      LIMIT ?
+      """,
+      (
+        " OR ".join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams),
+        *patient_directory_fts_rowid_range(clinic_id),
+        safe_limit * 10,
+      ),
+    ).fetchall()
+  scored = [
+    (directory_word_similarity(normalized_query, str(row["search_text"] or "")), row)
+    for row in candidate_rows
+  ]
+  scored = [item for item in scored if item[0] >= PATIENT_DIRECTORY_FUZZY_THRESHOLD]
+  scored.sort(key=lambda item: (-item[0], -datetime_to_epoch_ms(parse_datetime_utc(item[1]["last_activity_at"]) or utc_now())))
+  return [row for _, row in scored[:safe_limit]], None, "fuzzy"
+
+
+def load_campaign_delivery_stats(clinic_id: int, campaign_ids: list[int] | None = None, run_id: int = 0) -> dict[int, dict]:
+  """Delivery counters per campaign (summed over channels, with a per-channel breakdown)."""
+  params: list = [clinic_id, run_id]
+  campaign_filter = ""
+  if campaign_ids is not None:
+    if not campaign_ids:
+      return {}
+    campaign_filter = f" AND campaign_id IN ({', '.join('?' for _ in campaign_ids)})"
+    params.extend(campaign_ids)
+  with get_db() as conn:
+    rows = conn.execute(
+      f"""
+      SELECT campaign_id, channel, sent_count, failed_count, skipped_count, last_error, last_error_at
+      FROM campaign_delivery_stats
+      WHERE clinic_id = ? AND run_id = ?{campaign_filter}
       """,
+      tuple(params),
+    ).fetchall()
+
+  output: dict[int, dict] = {}
+  for row in rows:
+    entry = output.setdefault(
+      int(row["campaign_id"]),
+      {"sent": 0, "failed": 0, "skipped": 0, "lastError": "", "lastErrorAt": None, "byChannel": {}},
+    )
+    sent, failed, skipped = int(row["sent_count"]), int(row["failed_count"]), int(row["skipped_count"])
+    entry["sent"] += sent
+    entry["failed"] += failed
+    entry["skipped"] += skipped
+    entry["byChannel"][str(row["channel"])] = {"sent": sent, "failed": failed, "skipped": skipped}
+    if row["last_error_at"] and (entry["lastErrorAt"] is None or row["last_error_at"] > entry["lastErrorAt"]):
+      entry["lastError"] = str(row["last_error"] or "")
+      entry["lastErrorAt"] = row["last_error_at"]
+  return output
+
+
+def campaign_delivery_email_key(recipient_key: object, metadata: object) -> str:
+  # Canonical patient email of a delivery ('' when the recipient has none), used by customer lookups.
+  email = metadata.get("email") if isinstance(metadata, dict) else ""
+  return sanitize_patient_email(email) or sanitize_patient_email(recipient_key)
+
+
+def claim_campaign_deliveries(
+  conn: DBConnectionAdapter,
+  run_row,
+  recipients: list[tuple[str, dict]],
+) -> dict[str, int]:
+  """Reserve the (run, recipient) delivery slots of one chunk before any provider call.
+  Returns recipient_key -> delivery id; recipients already handled in this run are left out."""
+  if not recipients:
+    return {}
+  clinic_id = int(run_row["clinic_id"])
+  campaign_id = int(run_row["campaign_id"])
+  run_id = int(run_row["id"])
+  channel = normalize_campaign_channel(run_row["channel"], "in_app")
+  params: list = []
+  for recipient_key, metadata in recipients:
+    params.extend(
       (
         clinic_id,
         campaign_id,
+        run_id,
         sanitize_campaign_text(recipient_key, 180) or "unknown",
-        normalize_campaign_channel(channel, "in_app"),
-        sanitize_campaign_text(status, 40) or "unknown",
-        sanitize_campaign_text(provider_message_id, 180),
-        sanitize_campaign_text(error_message, 500),
+        channel,
         serialize_event_metadata(metadata or {}),
-      ),
+        campaign_delivery_email_key(recipient_key, metadata),
+      )
+    )
+  rows = conn.execute(
+    f"""
+    INSERT INTO campaign_deliveries (
+      clinic_id,
+      campaign_id,
+      run_id,
+      recipient_key,
+      channel,
+      metadata_json,
+      recipient_email_canonical,
+      status,
+      provider_message_id,
+      error_message
     )
+    VALUES {", ".join("(?, ?, ?, ?, ?, ?, ?, 'pending', '', '')" for _ in recipients)}
+    ON CONFLICT (run_id, recipient_key) WHERE run_id IS NOT NULL DO NOTHING
+    RETURNING id, recipient_key
+    """,
+    tuple(params),
+  ).fetchall()
+  return {str(row["recipient_key"]): int(row["id"]) for row in rows}
+
+
+def finish_campaign_deliveries(conn: DBConnectionAdapter, run_row, results: list[dict]) -> None:
+  """Store the provider results of one chunk and add them to the delivery stats."""
+  finished: dict[str, int] = {}
+  last_error = ""
+  for result in results:
+    # Only a still-pending claim counts: if the run was taken over, the new worker has already
+    # recorded this delivery as interrupted and counted it.
+    updated = conn.execute(
+      """
+      UPDATE campaign_deliveries
+      SET status = ?, provider_message_id = ?, error_message = ?
+      WHERE id = ? AND status = 'pending'
+      """,
+      (
+        sanitize_campaign_text(result["status"], 40) or "unknown",
+        sanitize_campaign_text(result["providerMessageId"], 180),
+        sanitize_campaign_text(result["error"], 500),
+        result["deliveryId"],
+      ),
+    ).rowcount
+    if updated == 1:
+      finished[result["status"]] = finished.get(result["status"], 0) + 1
+      if result["status"] == "failed" and result["error"]:
+        last_error = result["error"]
+  for status, count in finished.items():
+    bump_campaign_delivery_stats(conn, run_row, status, count=count, error_message=last_error)
 
 
 def _row_get(row, key, default=""):
@@ -5086,7 +8059,7 @@ def send_slack_webhook(webhook_url: str, text: str) -> dict:
   if not url.lower().startswith("https://"):
     return {"status": "skipped", "error": "Kein Slack-Webhook konfiguriert"}
   try:
-    response = requests.post(url, json={"text": text}, timeout=10)
+    response = outbound_http_request("slack", "POST", url, json={"text": text})
     if response.status_code >= 400:
       return {"status": "failed", "error": f"Slack HTTP {response.status_code}"}
     return {"status": "sent", "error": ""}
@@ -5105,7 +8078,7 @@ def notify_clinic_of_checkout(
   payment_status: str,
 ) -> dict:
   """Notify the clinic team when a customer books/buys in the app.
-  Best-effort: any failure is swallowed so it never blocks a checkout."""
+  Only enqueues email/Slack jobs; the background worker performs the delivery."""
   clinic_id = int(clinic_row["id"])
   fresh = get_clinic_row_by_id(clinic_id) or clinic_row
   clinic_name = str(_row_get(fresh, "name") or "deine Klinik").strip()
@@ -5146,11 +8119,19 @@ def notify_clinic_of_checkout(
   ]
   body = "\n".join(body_lines)
 
-  result = {"status": "sent", "email": None, "slack": None}
+  result = {"status": "queued", "emailJobId": None, "slackJobId": None}
   if recipient and "@" in recipient:
-    result["email"] = send_email_via_resend(recipient, subject, body.replace("\n", "<br>"))
+    result["emailJobId"] = enqueue_background_job(
+      "email.send",
+      {"to": recipient, "subject": subject, "body": body.replace("\n", "<br>")},
+      clinic_id=clinic_id,
+    )
   if slack_url:
-    result["slack"] = send_slack_webhook(slack_url, f"*{subject}*\n{body}")
+    result["slackJobId"] = enqueue_background_job(
+      "slack.send",
+      {"clinicId": clinic_id, "text": f"*{subject}*\n{body}"},
+      clinic_id=clinic_id,
+    )
   return result
 
 
@@ -5184,76 +8165,139 @@ def _ical_escape(text: str) -> str:
 
 def _ical_dt(iso_value) -> str:
   parsed = parse_datetime_utc(iso_value) if iso_value else None
-  return parsed.strftime("%Y%m%dT%H%M%SZ") if parsed else ""
+  return parsed.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ") if parsed else ""
+
 
+def clinic_ical_window_start(now: datetime | None = None) -> datetime:
+  # Day-aligned so the feed (and its validators) only shift once per day.
+  today = (now or utc_now()).astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+  return today - timedelta(days=CALENDAR_FEED_PAST_DAYS)
 
-def build_clinic_ical(clinic_id: int, clinic_name: str) -> str:
-  """Standard iCal (RFC 5545) feed of the clinic's scheduled appointments."""
+
+def load_clinic_ical_version(clinic_id: int, window_start: datetime) -> tuple[datetime | None, int]:
+  """Max updated_at and event count of the feed window — the cheap validator for each poll."""
   with get_db() as conn:
-    rows = conn.execute(
+    row = conn.execute(
+      """
+      SELECT MAX(updated_at) AS last_updated_at, COUNT(*) AS event_count
+      FROM patient_appointments
+      WHERE clinic_id = ? AND starts_at >= ?
+      """,
+      (clinic_id, window_start),
+    ).fetchone()
+  last_updated_at = parse_datetime_utc(row["last_updated_at"]) if row and row["last_updated_at"] else None
+  return last_updated_at, int((row["event_count"] if row else 0) or 0)
+
+
+def iter_clinic_ical(clinic_id: int, clinic_name: str, window_start: datetime):
+  """Standard iCal (RFC 5545) feed of the clinic's scheduled appointments, one event per chunk."""
+  yield "\r\n".join(
+    [
+      "BEGIN:VCALENDAR",
+      "VERSION:2.0",
+      f"PRODID:-//Curabo//Klinik {clinic_id}//DE",
+      "CALSCALE:GREGORIAN",
+      "METHOD:PUBLISH",
+      f"X-WR-CALNAME:{_ical_escape(clinic_name)} · Curabo",
+      "X-PUBLISHED-TTL:PT1H",
+    ]
+  ) + "\r\n"
+
+  with get_db() as conn:
+    rows = conn.iter_rows(
       """
       SELECT id, patient_name, treatment_name, practitioner_name,
-             starts_at, ends_at, treatment_duration_minutes, status, notes, location_label
+             starts_at, ends_at, treatment_duration_minutes, status, notes, location_label, updated_at
       FROM patient_appointments
-      WHERE clinic_id = ? AND starts_at IS NOT NULL AND starts_at != ''
-      ORDER BY starts_at ASC
-      LIMIT 1000
+      WHERE clinic_id = ? AND starts_at >= ?
+      ORDER BY starts_at ASC, id ASC
       """,
-      (clinic_id,),
-    ).fetchall()
+      (clinic_id, window_start),
+    )
+    for row in rows:
+      dtstart = _ical_dt(_row_get(row, "starts_at"))
+      if not dtstart:
+        continue
+      dtend = _ical_dt(_row_get(row, "ends_at"))
+      if not dtend:
+        parsed = parse_datetime_utc(_row_get(row, "starts_at"))
+        duration = max(0, int(_row_get(row, "treatment_duration_minutes", 0) or 0)) or 30
+        if parsed:
+          dtend = (parsed + timedelta(minutes=duration)).strftime("%Y%m%dT%H%M%SZ")
+      treatment = _row_get(row, "treatment_name") or "Termin"
+      patient = _row_get(row, "patient_name")
+      practitioner = _row_get(row, "practitioner_name")
+      status = str(_row_get(row, "status") or "")
+      summary = treatment + (f" — {patient}" if patient else "")
+      desc = []
+      if patient:
+        desc.append(f"Kunde: {patient}")
+      if practitioner:
+        desc.append(f"Behandler:in: {practitioner}")
+      if status:
+        desc.append(f"Status: {status}")
+      notes = _row_get(row, "notes")
+      if notes:
+        desc.append(str(notes))
+      ical_status = "CANCELLED" if status == "canceled" else ("CONFIRMED" if status == "confirmed" else "TENTATIVE")
+      # DTSTAMP follows updated_at so an unchanged event serializes byte-identically between polls.
+      lines = [
+        "BEGIN:VEVENT",
+        f"UID:curabo-{clinic_id}-{_row_get(row, 'id')}@curabo.app",
+        f"DTSTAMP:{_ical_dt(_row_get(row, 'updated_at')) or dtstart}",
+        f"DTSTART:{dtstart}",
+        f"DTEND:{dtend}",
+        f"SUMMARY:{_ical_escape(summary)}",
+        f"DESCRIPTION:{_ical_escape(' · '.join(desc))}",
+        f"STATUS:{ical_status}",
+      ]
+      location = _row_get(row, "location_label")
+      if location:
+        lines.append(f"LOCATION:{_ical_escape(location)}")
+      lines.append("END:VEVENT")
+      yield "\r\n".join(lines) + "\r\n"
 
-  now_stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-  lines = [
-    "BEGIN:VCALENDAR",
-    "VERSION:2.0",
-    f"PRODID:-//Curabo//Klinik {clinic_id}//DE",
-    "CALSCALE:GREGORIAN",
-    "METHOD:PUBLISH",
-    f"X-WR-CALNAME:{_ical_escape(clinic_name)} · Curabo",
-    "X-PUBLISHED-TTL:PT1H",
-  ]
-  for row in rows:
-    dtstart = _ical_dt(_row_get(row, "starts_at"))
-    if not dtstart:
-      continue
-    dtend = _ical_dt(_row_get(row, "ends_at"))
-    if not dtend:
-      parsed = parse_datetime_utc(_row_get(row, "starts_at"))
-      duration = max(0, int(_row_get(row, "treatment_duration_minutes", 0) or 0)) or 30
-      if parsed:
-        dtend = (parsed + timedelta(minutes=duration)).strftime("%Y%m%dT%H%M%SZ")
-    treatment = _row_get(row, "treatment_name") or "Termin"
-    patient = _row_get(row, "patient_name")
-    practitioner = _row_get(row, "practitioner_name")
-    status = str(_row_get(row, "status") or "")
-    summary = treatment + (f" — {patient}" if patient else "")
-    desc = []
-    if patient:
-      desc.append(f"Kunde: {patient}")
-    if practitioner:
-      desc.append(f"Behandler:in: {practitioner}")
-    if status:
-      desc.append(f"Status: {status}")
-    notes = _row_get(row, "notes")
-    if notes:
-      desc.append(str(notes))
-    ical_status = "CANCELLED" if status == "canceled" else ("CONFIRMED" if status == "confirmed" else "TENTATIVE")
-    lines += [
-      "BEGIN:VEVENT",
-      f"UID:curabo-{clinic_id}-{_row_get(row, 'id')}@curabo.app",
-      f"DTSTAMP:{now_stamp}",
-      f"DTSTART:{dtstart}",
-      f"DTEND:{dtend}",
-      f"SUMMARY:{_ical_escape(summary)}",
-      f"DESCRIPTION:{_ical_escape(' · '.join(desc))}",
-      f"STATUS:{ical_status}",
-    ]
-    location = _row_get(row, "location_label")
-    if location:
-      lines.append(f"LOCATION:{_ical_escape(location)}")
-    lines.append("END:VEVENT")
-  lines.append("END:VCALENDAR")
-  return "\r\n".join(lines) + "\r\n"
+  yield "END:VCALENDAR\r\n"
+
+
+def build_clinic_ical(clinic_id: int, clinic_name: str, window_start: datetime | None = None) -> str:
+  return "".join(iter_clinic_ical(clinic_id, clinic_name, window_start or clinic_ical_window_start()))
+
+
+class ClinicICalFeedCache:
+  """Serialized iCal feeds keyed by clinic, valid for exactly one ETag.
+
+  Appointment writes in this process drop the clinic's entry; writes from other
+  processes change the ETag (max updated_at + event count), so a stale entry is
+  never served. Bounded LRU so a large install does not keep every feed around.
+  """
+
+  def __init__(self, max_entries: int = 256):
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._entries: OrderedDict[int, tuple[str, bytes]] = OrderedDict()
+
+  def get(self, clinic_id: int, etag: str) -> bytes | None:
+    with self._lock:
+      entry = self._entries.get(clinic_id)
+      if entry is None or entry[0] != etag:
+        return None
+      self._entries.move_to_end(clinic_id)
+      return entry[1]
+
+  def put(self, clinic_id: int, etag: str, body: bytes) -> None:
+    with self._lock:
+      self._entries[clinic_id] = (etag, body)
+      self._entries.move_to_end(clinic_id)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def invalidate(self, clinic_id: int) -> None:
+    with self._lock:
+      self._entries.pop(int(clinic_id), None)
+
+
+CLINIC_ICAL_FEEDS = ClinicICalFeedCache()
 
 
 def deliver_campaign_message(clinic_name: str, channel: str, title: str, body: str, profile: dict) -> dict:
@@ -5288,79 +8332,221 @@ def deliver_campaign_message(clinic_name: str, channel: str, title: str, body: s
   return {"status": "skipped", "error": "Unbekannter Kanal", "providerMessageId": "", "recipientKey": recipient_key}
 
 
-def execute_campaign_delivery(
-  clinic_row,
-  campaign_row,
-  trigger_override: str | None = None,
-) -> dict:
-  clinic_id = int(clinic_row["id"])
+def load_active_campaign_run(campaign_id: int):
+  with get_db() as conn:
+    return conn.execute(
+      "SELECT * FROM campaign_runs WHERE campaign_id = ? AND status = 'running' LIMIT 1",
+      (campaign_id,),
+    ).fetchone()
+
+
+def start_campaign_run(campaign_row, actor_user_id: int | None, event_source: str):
+  """Return the campaign's unfinished run, or create one with a frozen recipient snapshot."""
   campaign_id = int(campaign_row["id"])
-  clinic_name = str(clinic_row["name"])
+  active_run = load_active_campaign_run(campaign_id)
+  if active_run:
+    return active_run
 
-  trigger_type = normalize_campaign_trigger(trigger_override or campaign_row["trigger_type"], "broadcast")
-  channel = normalize_campaign_channel(campaign_row["channel"], "in_app")
-  template_title = sanitize_campaign_text(campaign_row["template_title"], 180)
-  template_body = sanitize_campaign_text(campaign_row["template_body"], 3000)
-  points_bonus = int(campaign_row["points_bonus"] or 0)
+  clinic_id = int(campaign_row["clinic_id"])
+  trigger_type = normalize_campaign_trigger(campaign_row["trigger_type"], "broadcast")
+  recipients: dict[str, dict] = {}
+  for profile in resolve_campaign_recipients(clinic_id, trigger_type):
+    recipient_key = str(profile.get("key") or profile.get("email") or profile.get("externalUserId") or "").strip()
+    if recipient_key:
+      recipients.setdefault(recipient_key[:180], profile)
 
-  recipients = resolve_campaign_recipients(clinic_id, trigger_type)
-  summary = {
-    "attempted": 0,
-    "sent": 0,
-    "failed": 0,
-    "skipped": 0,
-  }
+  with get_db() as conn:
+    row = conn.execute(
+      """
+      INSERT INTO campaign_runs (
+        clinic_id,
+        campaign_id,
+        status,
+        trigger_type,
+        channel,
+        template_title,
+        template_body,
+        points_bonus,
+        total_recipients,
+        actor_user_id,
+        event_source,
+        started_at
+      )
+      VALUES (?, ?, 'running', ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (campaign_id) WHERE status = 'running' DO NOTHING
+      RETURNING id
+      """,
+      (
+        clinic_id,
+        campaign_id,
+        trigger_type,
+        normalize_campaign_channel(campaign_row["channel"], "in_app"),
+        sanitize_campaign_text(campaign_row["template_title"], 180),
+        sanitize_campaign_text(campaign_row["template_body"], 3000),
+        int(campaign_row["points_bonus"] or 0),
+        len(recipients),
+        actor_user_id,
+        event_source,
+        utc_now(),
+      ),
+    ).fetchone()
+    if row:
+      conn.executemany(
+        """
+        INSERT INTO campaign_run_recipients (run_id, position, recipient_key, profile_json)
+        VALUES (?, ?, ?, ?)
+        """,
+        [
+          (int(row["id"]), position, recipient_key, json.dumps(profile, ensure_ascii=False, default=str))
+          for position, (recipient_key, profile) in enumerate(recipients.items())
+        ],
+      )
+  # Losing the insert race means another worker just started the run; resume that one.
+  return load_active_campaign_run(campaign_id)
 
-  for profile in recipients:
-    rendered_title = render_campaign_text(template_title or "Update von {{clinic}}", profile, clinic_name)
-    rendered_body = render_campaign_text(template_body or "Wir haben ein neues Angebot für dich.", profile, clinic_name)
-    result = deliver_campaign_message(clinic_name, channel, rendered_title, rendered_body, profile)
 
-    status = str(result.get("status") or "skipped")
-    if status not in {"sent", "failed", "skipped"}:
-      status = "skipped"
+def summarize_campaign_run_deliveries(run_row) -> dict:
+  stats = load_campaign_delivery_stats(
+    int(run_row["clinic_id"]),
+    [int(run_row["campaign_id"])],
+    run_id=int(run_row["id"]),
+  ).get(int(run_row["campaign_id"]), {})
+  summary = {key: int(stats.get(key) or 0) for key in ("sent", "failed", "skipped")}
+  return {"attempted": sum(summary.values()), **summary}
 
-    summary["attempted"] += 1
-    summary[status] += 1
 
-    recipient_key = str(result.get("recipientKey") or profile.get("key") or profile.get("email") or "unknown")
-    provider_message_id = str(result.get("providerMessageId") or "")
-    error_message = str(result.get("error") or "")
+def execute_campaign_delivery(clinic_row, run_row, page_size: int = 50) -> dict:
+  """Deliver a campaign run from its checkpoint. Safe to call again after a crash:
+  recipients that already have a delivery row in this run are never contacted twice."""
+  run_id = int(run_row["id"])
+  clinic_name = str(clinic_row["name"])
+  trigger_type = str(run_row["trigger_type"])
+  channel = normalize_campaign_channel(run_row["channel"], "in_app")
+  title_template = CompiledCampaignTemplate(run_row["template_title"] or "Update von {{clinic}}", clinic_name)
+  body_template = CompiledCampaignTemplate(run_row["template_body"] or "Wir haben ein neues Angebot für dich.", clinic_name)
+  points_bonus = int(run_row["points_bonus"] or 0)
 
-    insert_campaign_delivery(
-      clinic_id=clinic_id,
-      campaign_id=campaign_id,
-      recipient_key=recipient_key,
-      channel=channel,
-      status=status,
-      provider_message_id=provider_message_id,
-      error_message=error_message,
-      metadata={
-        "triggerType": trigger_type,
-        "channel": channel,
-        "email": profile.get("email") or "",
-        "externalUserId": profile.get("externalUserId") or "",
-        "pointsBonus": points_bonus,
-      },
+  with get_db() as conn:
+    # Claims left 'pending' by an interrupted worker may or may not have reached the provider.
+    # Record them as failed instead of risking a duplicate message.
+    interrupted = conn.execute(
+      """
+      UPDATE campaign_deliveries
+      SET status = 'failed', error_message = 'Run unterbrochen, Zustellung unklar'
+      WHERE run_id = ? AND status = 'pending'
+      """,
+      (run_id,),
+    ).rowcount
+    bump_campaign_delivery_stats(
+      conn,
+      run_row,
+      "failed",
+      count=max(0, interrupted or 0),
+      error_message="Run unterbrochen, Zustellung unklar",
     )
 
+  cursor_position = int(run_row["cursor_position"] or 0)
+  while True:
+    # Per page: one transaction claims every recipient before the first provider call, one
+    # stores all results and the checkpoint. A killed worker leaves at most one page unclear.
+    with get_db() as conn:
+      # Heartbeat before any provider call: a run that outlives the job lease keeps it, and a
+      # run whose lease was reclaimed stops here instead of sending twice.
+      renew_background_job_lease(conn)
+      recipient_rows = conn.execute(
+        """
+        SELECT position, recipient_key, profile_json
+        FROM campaign_run_recipients
+        WHERE run_id = ? AND position >= ?
+        ORDER BY position ASC
+        LIMIT ?
+        """,
+        (run_id, cursor_position, page_size),
+      ).fetchall()
+      if not recipient_rows:
+        break
+      profiles = {
+        str(recipient_row["recipient_key"]): parse_json_dict(recipient_row["profile_json"])
+        for recipient_row in recipient_rows
+      }
+      claimed = claim_campaign_deliveries(
+        conn,
+        run_row,
+        [
+          (
+            recipient_key,
+            {
+              "triggerType": trigger_type,
+              "channel": channel,
+              "email": profile.get("email") or "",
+              "externalUserId": profile.get("externalUserId") or "",
+              "pointsBonus": points_bonus,
+            },
+          )
+          for recipient_key, profile in profiles.items()
+        ],
+      )
+
+    results = []
+    attempted_ids: set[int] = set()
+    page_done = False
+    try:
+      for recipient_key, profile in profiles.items():
+        delivery_id = claimed.get(sanitize_campaign_text(recipient_key, 180) or "unknown")
+        if delivery_id is None:
+          continue
+        attempted_ids.add(delivery_id)
+        rendered_title = title_template.render(profile)
+        rendered_body = body_template.render(profile)
+        result = deliver_campaign_message(clinic_name, channel, rendered_title, rendered_body, profile)
+        status = str(result.get("status") or "skipped")
+        if status not in {"sent", "failed", "skipped"}:
+          status = "skipped"
+        results.append(
+          {
+            "deliveryId": delivery_id,
+            "status": status,
+            "providerMessageId": str(result.get("providerMessageId") or ""),
+            "error": str(result.get("error") or ""),
+          }
+        )
+      page_done = True
+    finally:
+      # Also when a send raises: known results are stored and claims that never reached a
+      # provider are released, so only the failing send is left pending (unclear) for a resume.
+      with get_db() as conn:
+        finish_campaign_deliveries(conn, run_row, results)
+        unattempted_ids = [delivery_id for delivery_id in claimed.values() if delivery_id not in attempted_ids]
+        if unattempted_ids:
+          conn.execute(
+            f"DELETE FROM campaign_deliveries WHERE status = 'pending' AND id IN ({', '.join('?' for _ in unattempted_ids)})",
+            tuple(unattempted_ids),
+          )
+        if page_done:
+          cursor_position = int(recipient_rows[-1]["position"]) + 1
+          conn.execute(
+            "UPDATE campaign_runs SET cursor_position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (cursor_position, run_id),
+          )
+
   return {
-    **summary,
+    **summarize_campaign_run_deliveries(run_row),
+    "runId": run_id,
     "triggerType": trigger_type,
     "channel": channel,
     "pointsBonus": points_bonus,
   }
 
 
-def compute_campaign_next_run_iso(trigger_type: str, reference_time: datetime | None = None) -> str | None:
+def compute_campaign_next_run_at(trigger_type: str, reference_time: datetime | None = None) -> datetime | None:
   normalized = normalize_campaign_trigger(trigger_type, "broadcast")
   if normalized == "broadcast":
     return None
 
   now_time = reference_time or utc_now()
   if normalized == "abandoned_cart_24h":
-    return (now_time + timedelta(days=1)).isoformat()
-  return (now_time + timedelta(days=7)).isoformat()
+    return now_time + timedelta(days=1)
+  return now_time + timedelta(days=7)
 
 
 def load_campaign_row_by_id(clinic_id: int, campaign_id: int):
@@ -5381,6 +8567,8 @@ def load_campaign_row_by_id(clinic_id: int, campaign_id: int):
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -5395,35 +8583,54 @@ def load_campaign_row_by_id(clinic_id: int, campaign_id: int):
 def run_campaign_once(campaign_row, actor_user_id: int | None, event_source: str) -> dict:
   clinic_id = int(campaign_row["clinic_id"])
   campaign_id = int(campaign_row["id"])
-  trigger_type = normalize_campaign_trigger(campaign_row["trigger_type"], "broadcast")
-  now_dt = utc_now()
-  now_iso = now_dt.isoformat()
-  next_run_iso = compute_campaign_next_run_iso(trigger_type, now_dt)
+  run_row = start_campaign_run(campaign_row, actor_user_id, event_source)
+  actor_user_id = int(run_row["actor_user_id"]) if run_row["actor_user_id"] else None
+  event_source = str(run_row["event_source"] or event_source)
+  trigger_type = str(run_row["trigger_type"])
 
   delivery = execute_campaign_delivery(
     clinic_row=get_clinic_row_by_id(clinic_id) or {"id": clinic_id, "name": ""},
-    campaign_row=campaign_row,
-    trigger_override=trigger_type,
+    run_row=run_row,
   )
   audience_count = int(delivery.get("attempted") or 0)
+  now_dt = utc_now()
+  now_iso = now_dt.isoformat()
+  next_run_at = compute_campaign_next_run_at(trigger_type, now_dt)
 
   with get_db() as conn:
-    conn.execute(
+    finalized = conn.execute(
       """
-      UPDATE clinic_campaigns
-      SET
-        status = CASE WHEN status = 'draft' THEN 'active' ELSE status END,
-        last_run_at = ?,
-        next_run_at = ?,
-        total_runs = total_runs + 1,
-        total_audience = total_audience + ?,
-        updated_at = CURRENT_TIMESTAMP
-      WHERE id = ? AND clinic_id = ?
+      UPDATE campaign_runs
+      SET status = 'completed', summary_json = ?, finished_at = ?, updated_at = CURRENT_TIMESTAMP
+      WHERE id = ? AND status = 'running'
       """,
-      (now_iso, next_run_iso, audience_count, campaign_id, clinic_id),
-    )
+      (json.dumps(delivery, separators=(",", ":")), now_dt, int(run_row["id"])),
+    ).rowcount == 1
+    if finalized:
+      conn.execute(
+        """
+        UPDATE clinic_campaigns
+        SET
+          status = CASE WHEN status = 'draft' THEN 'active' ELSE status END,
+          last_run_at = ?,
+          next_run_at = ?,
+          total_runs = total_runs + 1,
+          total_audience = total_audience + ?,
+          failed_runs = 0,
+          last_error = '',
+          updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND clinic_id = ?
+        """,
+        (now_dt, next_run_at, audience_count, campaign_id, clinic_id),
+      )
 
   updated_row = load_campaign_row_by_id(clinic_id, campaign_id)
+  if not finalized:
+    # A concurrent worker finished this run and already recorded it.
+    return {
+      "campaign": serialize_campaign_row(updated_row) if updated_row else serialize_campaign_row(campaign_row),
+      "run": {"id": int(run_row["id"]), "executedAt": now_iso, "audienceCount": audience_count, "delivery": delivery},
+    }
 
   create_analytics_event(
     clinic_id=clinic_id,
@@ -5477,6 +8684,7 @@ def run_campaign_once(campaign_row, actor_user_id: int | None, event_source: str
   return {
     "campaign": serialize_campaign_row(updated_row) if updated_row else serialize_campaign_row(campaign_row),
     "run": {
+      "id": int(run_row["id"]),
       "executedAt": now_iso,
       "audienceCount": audience_count,
       "delivery": delivery,
@@ -5521,6 +8729,7 @@ def create_analytics_event(
   metadata: dict | None = None,
   event_source: str = "unknown",
 ) -> int:
+  created_at = utc_now()
   with get_db() as conn:
     event_id = insert_and_get_id(
       conn,
@@ -5532,9 +8741,10 @@ def create_analytics_event(
         treatment_id,
         amount_cents,
         metadata_json,
-        event_source
+        event_source,
+        created_at
       )
-      VALUES (?, ?, ?, ?, ?, ?, ?)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
       """,
       (
         clinic_id,
@@ -5544,11 +8754,164 @@ def create_analytics_event(
         amount_cents,
         serialize_event_metadata(metadata),
         event_source,
+        created_at,
       ),
     )
+    record_clinic_analytics_event(conn, clinic_id, event_name, amount_cents, created_at)
+    touch_patient_directory_from_event(conn, clinic_id, metadata)
   return event_id
 
 
+# Event name -> clinic_analytics_daily counter; every event also counts towards events_total.
+CLINIC_ANALYTICS_DAILY_COUNTERS = {
+  "app_open": "app_opens",
+  "offer_view": "offer_views",
+  "add_to_cart": "add_to_carts",
+  "purchase_success": "purchases",
+  "membership_join": "membership_joins",
+}
+
+
+def record_clinic_analytics_event(
+  conn: DBConnectionAdapter,
+  clinic_id: int,
+  event_name: str,
+  amount_cents: int | None,
+  occurred_at: datetime,
+) -> None:
+  """Add one event to its clinic's UTC-day row in clinic_analytics_daily (same transaction as the event)."""
+  normalized_name = str(event_name or "").lower()
+  counter = CLINIC_ANALYTICS_DAILY_COUNTERS.get(normalized_name)
+  increments = {column: int(column == counter) for column in CLINIC_ANALYTICS_DAILY_COUNTERS.values()}
+  increments["gmv_cents"] = int(amount_cents or 0) if normalized_name == "purchase_success" else 0
+  columns = ["events_total", *increments]
+  conn.execute(
+    f"""
+    INSERT INTO clinic_analytics_daily (clinic_id, metric_day, {", ".join(columns)})
+    VALUES (?, ?, 1, {", ".join("?" for _ in increments)})
+    ON CONFLICT (clinic_id, metric_day) DO UPDATE SET
+      {", ".join(f"{column} = clinic_analytics_daily.{column} + excluded.{column}" for column in columns)}
+    """,
+    (clinic_id, occurred_at.astimezone(timezone.utc).date().isoformat(), *increments.values()),
+  )
+
+
+def backfill_clinic_analytics_daily(conn: DBConnectionAdapter) -> None:
+  # One set-based pass over the event history; afterwards create_analytics_event keeps the rows current.
+  if conn.execute("SELECT 1 FROM clinic_analytics_daily LIMIT 1").fetchone():
+    return
+  if conn.backend == "postgres":
+    day_expression = "to_char(created_at, 'YYYY-MM-DD')"  # session time zone is UTC
+  else:
+    day_expression = "strftime('%Y-%m-%d', created_at / 1000, 'unixepoch')"
+  counter_sums = ", ".join(
+    f"SUM(CASE WHEN LOWER(event_name) = '{name}' THEN 1 ELSE 0 END)"
+    for name in CLINIC_ANALYTICS_DAILY_COUNTERS
+  )
+  conn.execute(
+    f"""
+    INSERT INTO clinic_analytics_daily (
+      clinic_id, metric_day, events_total, {", ".join(CLINIC_ANALYTICS_DAILY_COUNTERS.values())}, gmv_cents
+    )
+    SELECT
+      clinic_id,
+      {day_expression},
+      COUNT(*),
+      {counter_sums},
+      SUM(CASE WHEN LOWER(event_name) = 'purchase_success' THEN COALESCE(amount_cents, 0) ELSE 0 END)
+    FROM analytics_events
+    GROUP BY clinic_id, {day_expression}
+    """
+  )
+  rollup_clinic_analytics(conn)
+
+
+def refresh_clinic_membership_snapshots(conn: DBConnectionAdapter, metric_day: str) -> None:
+  """Store each clinic's current MRR and active membership count on its row for metric_day."""
+  conn.execute(
+    """
+    INSERT INTO clinic_analytics_daily (clinic_id, metric_day, mrr_cents, active_memberships)
+    SELECT
+      clinic_id,
+      ?,
+      SUM(CASE WHEN status = 'active' THEN monthly_amount_cents ELSE 0 END),
+      SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END)
+    FROM patient_memberships
+    WHERE clinic_id IS NOT NULL
+    GROUP BY clinic_id
+    ON CONFLICT (clinic_id, metric_day) DO UPDATE SET
+      mrr_cents = excluded.mrr_cents,
+      active_memberships = excluded.active_memberships
+    """,
+    (metric_day,),
+  )
+
+
+CLINIC_ANALYTICS_SUM_COLUMNS = ("events_total", *CLINIC_ANALYTICS_DAILY_COUNTERS.values(), "gmv_cents")
+
+
+def rollup_clinic_analytics(conn: DBConnectionAdapter, since_day: str = "") -> None:
+  """Re-aggregate clinic_analytics_daily from since_day on into the monthly and platform-wide rollups.
+
+  Called from the rollup watermark on every platform metrics refresh and with
+  "" once to seed the rollups.
+  """
+  sums = ", ".join(f"SUM({column})" for column in CLINIC_ANALYTICS_SUM_COLUMNS)
+  updates = ", ".join(f"{column} = excluded.{column}" for column in CLINIC_ANALYTICS_SUM_COLUMNS)
+  conn.execute(
+    f"""
+    INSERT INTO clinic_analytics_monthly (clinic_id, metric_month, {", ".join(CLINIC_ANALYTICS_SUM_COLUMNS)})
+    SELECT clinic_id, SUBSTR(metric_day, 1, 7), {sums}
+    FROM clinic_analytics_daily
+    WHERE metric_day >= ?
+    GROUP BY clinic_id, SUBSTR(metric_day, 1, 7)
+    ON CONFLICT (clinic_id, metric_month) DO UPDATE SET {updates}
+    """,
+    (since_day[:7] + "-01" if since_day else "",),
+  )
+  conn.execute(
+    f"""
+    INSERT INTO platform_analytics_daily (metric_day, {", ".join(CLINIC_ANALYTICS_SUM_COLUMNS)}, mrr_cents, active_memberships)
+    SELECT metric_day, {sums}, SUM(mrr_cents), SUM(active_memberships)
+    FROM clinic_analytics_daily
+    WHERE metric_day >= ?
+    GROUP BY metric_day
+    ON CONFLICT (metric_day) DO UPDATE SET
+      {updates},
+      mrr_cents = excluded.mrr_cents,
+      active_memberships = excluded.active_memberships
+    """,
+    (since_day,),
+  )
+
+
+def rollup_clinic_analytics_since_watermark(conn: DBConnectionAdapter, today: str) -> None:
+  """Roll up every day since the last rollup (at least yesterday), then move the watermark to today.
+
+  Refreshes can be days apart, so starting at yesterday would skip the days in
+  between. Without a watermark (first run, or a database from before it
+  existed) the rollups are rebuilt from the full history once. The watermark
+  only moves forward, so a process with a lagging clock can't rewind it.
+  """
+  row = conn.execute(
+    "SELECT through_day FROM analytics_rollup_state WHERE name = 'clinic_analytics' LIMIT 1"
+  ).fetchone()
+  yesterday = (datetime.fromisoformat(today) - timedelta(days=1)).date().isoformat()
+  # Today is still open, so the watermark day itself is always rolled up again.
+  rollup_clinic_analytics(conn, min(row["through_day"], yesterday) if row else "")
+  conn.execute(
+    """
+    INSERT INTO analytics_rollup_state (name, through_day)
+    VALUES ('clinic_analytics', ?)
+    ON CONFLICT (name) DO UPDATE SET through_day = CASE
+      WHEN excluded.through_day > analytics_rollup_state.through_day THEN excluded.through_day
+      ELSE analytics_rollup_state.through_day
+    END
+    """,
+    (today,),
+  )
+
+
 def parse_non_negative_int(value: object, fallback: int = 0) -> int:
   try:
     parsed = int(value)
@@ -5692,10 +9055,10 @@ def build_clinic_analytics_summary(
         metadata_json,
         created_at
       FROM analytics_events
-      WHERE clinic_id = ?
+      WHERE clinic_id = ? AND created_at >= ? AND created_at < ?
       ORDER BY created_at DESC
       """,
-      (clinic_id,),
+      (clinic_id, since_dt, end_dt),
     ).fetchall()
     membership_rows = conn.execute(
       """
@@ -5729,11 +9092,11 @@ def build_clinic_analytics_summary(
         action,
         created_at
       FROM audit_logs
-      WHERE clinic_id = ?
+      WHERE clinic_id = ? AND created_at >= ? AND created_at < ?
       ORDER BY created_at DESC
       LIMIT 10000
       """,
-      (clinic_id,),
+      (clinic_id, since_dt, end_dt),
     ).fetchall()
 
   counters = {
@@ -5778,11 +9141,7 @@ def build_clinic_analytics_summary(
   day_buckets = {}
 
   for row in rows:
-    parsed_created_at = parse_datetime_utc(row["created_at"])
-    if parsed_created_at is None:
-      continue
-    if parsed_created_at < since_dt or parsed_created_at >= end_dt:
-      continue
+    created_at = row["created_at"]
     counters["eventsTotal"] += 1
 
     event_name = str(row["event_name"] or "").lower()
@@ -5803,7 +9162,7 @@ def build_clinic_analytics_summary(
     if session_id:
       session_keys.add(session_id)
 
-    day_key = parsed_created_at.date().isoformat()
+    day_key = created_at.date().isoformat()
     bucket = day_buckets.setdefault(
       day_key,
       {
@@ -5876,11 +9235,6 @@ def build_clinic_analytics_summary(
         treatment["revenueCents"] += amount
 
   for row in audit_rows:
-    parsed_created_at = parse_datetime_utc(row["created_at"])
-    if parsed_created_at is None:
-      continue
-    if parsed_created_at < since_dt or parsed_created_at >= end_dt:
-      continue
     raw_actor = row["actor_user_id"]
     try:
       actor_id = int(raw_actor)
@@ -6353,78 +9707,280 @@ def extract_brand_color_candidates_from_text(text: str) -> list[str]:
   return candidates
 
 
-def fetch_import_stylesheet_texts(root_url: str, soup: BeautifulSoup) -> list[str]:
-  stylesheet_texts: list[str] = []
+class ImportFetchPool:
+  """Runs import fetches on worker threads with at most IMPORT_CRAWL_CONCURRENCY requests
+  per host. Each worker inherits the shared deadline as its outbound budget, so every
+  request timeout is clamped to the time the whole crawl has left."""
+
+  def __init__(self, max_workers: int, deadline: float):
+    self.deadline = deadline
+    self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="import-fetch")
+    self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+    self._lock = threading.Lock()
+
+  @classmethod
+  def for_current_request(cls, max_workers: int) -> "ImportFetchPool":
+    seconds = IMPORT_CRAWL_DEADLINE_SECONDS
+    remaining = outbound_budget_remaining()
+    if remaining is not None:
+      seconds = min(seconds, max(0.0, remaining))
+    return cls(max_workers, time.monotonic() + seconds)
+
+  def remaining(self) -> float:
+    return self.deadline - time.monotonic()
+
+  def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+    host = (urlparse(url).hostname or "").lower()
+    with self._lock:
+      slot = self._host_slots.get(host)
+      if slot is None:
+        slot = threading.BoundedSemaphore(IMPORT_CRAWL_CONCURRENCY)
+        self._host_slots[host] = slot
+      return slot
+
+  def _run(self, fetch, url: str):
+    with self._host_slot(url):
+      start_outbound_budget(self.remaining())
+      try:
+        return fetch(url)
+      finally:
+        clear_outbound_budget()
+
+  def submit(self, fetch, url: str):
+    return self._executor.submit(self._run, fetch, url)
+
+  def close(self) -> None:
+    # Queued fetches are dropped; in-flight ones end at the latest with the deadline.
+    self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_import_fetch_cache(url: str):
+  with get_db() as conn:
+    return conn.execute("SELECT * FROM import_fetch_cache WHERE url = ? LIMIT 1", (url,)).fetchone()
+
+
+def import_fetch_cache_age_seconds(cached) -> float:
+  validated_at = parse_datetime_utc(cached["validated_at"])
+  if validated_at is None:
+    return float("inf")
+  return (utc_now() - validated_at).total_seconds()
+
+
+def import_fetch_cache_is_fresh(cached) -> bool:
+  return cached is not None and import_fetch_cache_age_seconds(cached) < IMPORT_FETCH_CACHE_FRESH_SECONDS
+
+
+def import_fetch_cache_is_usable(cached) -> bool:
+  return cached is not None and import_fetch_cache_age_seconds(cached) < IMPORT_FETCH_CACHE_MAX_AGE_SECONDS
+
+
+def import_revalidation_headers(cached) -> dict:
+  if not import_fetch_cache_is_usable(cached):
+    return {}
+  headers = {}
+  if cached["etag"]:
+    headers["If-None-Match"] = str(cached["etag"])
+  if cached["last_modified"]:
+    headers["If-Modified-Since"] = str(cached["last_modified"])
+  return headers
+
+
+def store_import_fetch_cache(
+  url: str,
+  *,
+  final_url: str,
+  content_type: str,
+  body: str,
+  etag: str = "",
+  last_modified: str = "",
+  fetch_mode: str = "direct",
+) -> None:
+  # Best effort: crawl threads write concurrently, and a locked cache write must not fail the import.
+  try:
+    now = utc_now()
+    with get_db() as conn:
+      conn.execute(
+        """
+        INSERT INTO import_fetch_cache (
+          url, final_url, content_type, body, etag, last_modified, fetch_mode, fetched_at, validated_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET
+          final_url = excluded.final_url,
+          content_type = excluded.content_type,
+          body = excluded.body,
+          etag = excluded.etag,
+          last_modified = excluded.last_modified,
+          fetch_mode = excluded.fetch_mode,
+          fetched_at = excluded.fetched_at,
+          validated_at = excluded.validated_at
+        """,
+        (
+          url,
+          final_url,
+          content_type[:200],
+          # Postgres TEXT cannot hold NUL characters.
+          body.replace("\x00", ""),
+          str(etag or "")[:300],
+          str(last_modified or "")[:100],
+          fetch_mode,
+          now,
+          now,
+        ),
+      )
+  except Exception:
+    app.logger.warning("Import fetch cache write failed for %s", url, exc_info=True)
+
+
+def touch_import_fetch_cache(url: str) -> None:
+  try:
+    with get_db() as conn:
+      conn.execute("UPDATE import_fetch_cache SET validated_at = ? WHERE url = ?", (utc_now(), url))
+  except Exception:
+    app.logger.warning("Import fetch cache touch failed for %s", url, exc_info=True)
+
+
+def prune_import_fetch_cache() -> None:
+  try:
+    with get_db() as conn:
+      conn.execute(
+        "DELETE FROM import_fetch_cache WHERE validated_at < ?",
+        (utc_now() - timedelta(seconds=IMPORT_FETCH_CACHE_MAX_AGE_SECONDS),),
+      )
+  except Exception:
+    app.logger.warning("Import fetch cache prune failed", exc_info=True)
+
+
+def cached_import_page_result(url: str, cached, cache_state: str) -> dict:
+  return {
+    "ok": True,
+    "url": str(cached["final_url"] or url),
+    "error": "",
+    "status_code": 200,
+    "html": str(cached["body"] or ""),
+    "fetch_mode": str(cached["fetch_mode"] or "direct"),
+    "cache": cache_state,
+  }
+
+
+def fetch_import_stylesheet_text(target_url: str) -> str:
+  cached = load_import_fetch_cache(target_url)
+  if import_fetch_cache_is_fresh(cached):
+    return str(cached["body"] or "")
+
+  headers = {"User-Agent": IMPORT_USER_AGENT, "Accept": "text/css,*/*;q=0.1"}
+  headers.update(import_revalidation_headers(cached))
+  try:
+    response = outbound_http_request(
+      "import",
+      "GET",
+      target_url,
+      headers=headers,
+      allow_redirects=True,
+    )
+  except Exception:
+    return str(cached["body"] or "") if import_fetch_cache_is_usable(cached) else ""
+
+  if response.status_code == 304 and import_fetch_cache_is_usable(cached):
+    touch_import_fetch_cache(target_url)
+    return str(cached["body"] or "")
+  if response.status_code >= 400:
+    if response.status_code >= 500 and import_fetch_cache_is_usable(cached):
+      return str(cached["body"] or "")
+    return ""
+
+  content_type = str(response.headers.get("content-type") or "").lower()
+  if "css" not in content_type and not target_url.lower().endswith(".css"):
+    return ""
+  stylesheet_text = response.text[:IMPORT_MAX_STYLESHEET_BYTES]
+  store_import_fetch_cache(
+    target_url,
+    final_url=str(response.url or target_url),
+    content_type=content_type,
+    body=stylesheet_text,
+    etag=str(response.headers.get("ETag") or ""),
+    last_modified=str(response.headers.get("Last-Modified") or ""),
+  )
+  return stylesheet_text
+
+
+def extract_import_branding_inputs(soup: BeautifulSoup, root_url: str) -> dict:
+  """Everything branding needs from the root page, so its tree can be released right after parsing."""
+  meta_color = ""
+  for node in (
+    soup.find("meta", attrs={"name": "theme-color"}),
+    soup.find("meta", attrs={"name": "msapplication-TileColor"}),
+  ):
+    if not node:
+      continue
+    candidate = to_hex_color(str(node.get("content") or "").strip(), "")
+    if candidate and not is_neutral_hex_color(candidate):
+      meta_color = candidate
+      break
+
+  stylesheet_urls: list[str] = []
+  google_font_families: list[str] = []
   seen_urls: set[str] = set()
-  stylesheet_links = soup.find_all("link", href=True)
-  for node in stylesheet_links:
-    rel_values = node.get("rel") or []
-    rel_tokens = {str(value).strip().lower() for value in rel_values}
+  for node in soup.find_all("link", href=True):
     href = str(node.get("href") or "").strip()
     if not href:
       continue
+    if "fonts.googleapis.com" in href:
+      for entry in parse_qs(urlparse(href).query).get("family", []):
+        google_font_families.append(entry.split(":")[0].replace("+", " ").strip())
+    rel_tokens = {str(value).strip().lower() for value in (node.get("rel") or [])}
     if "stylesheet" not in rel_tokens and not href.lower().endswith(".css"):
       continue
+    if len(stylesheet_urls) >= IMPORT_MAX_STYLESHEETS:
+      continue
     target_url = normalize_import_visit_url(urljoin(root_url, href))
     if not target_url or target_url in seen_urls:
       continue
     seen_urls.add(target_url)
-    if len(stylesheet_texts) >= IMPORT_MAX_STYLESHEETS:
-      break
+    stylesheet_urls.append(target_url)
 
-    try:
-      response = requests.get(
-        target_url,
-        headers={"User-Agent": IMPORT_USER_AGENT, "Accept": "text/css,*/*;q=0.1"},
-        timeout=IMPORT_FETCH_TIMEOUT,
-        allow_redirects=True,
-      )
-    except Exception:
-      continue
+  return {
+    "metaColor": meta_color,
+    "styleTexts": [
+      clean_import_text(style_node.get_text(" ", strip=False), IMPORT_MAX_STYLESHEET_BYTES)
+      for style_node in soup.find_all("style")
+    ],
+    "stylesheetUrls": stylesheet_urls,
+    "googleFontFamilies": google_font_families,
+  }
 
-    if response.status_code >= 400:
-      continue
 
-    content_type = str(response.headers.get("content-type") or "").lower()
-    if "css" not in content_type and not target_url.lower().endswith(".css"):
-      continue
+def fetch_import_stylesheet_texts(target_urls: list[str]) -> list[str]:
+  if not target_urls:
+    return []
 
-    stylesheet_texts.append(response.text[:IMPORT_MAX_STYLESHEET_BYTES])
-  return stylesheet_texts
+  pool = ImportFetchPool.for_current_request(len(target_urls))
+  try:
+    futures = [pool.submit(fetch_import_stylesheet_text, target_url) for target_url in target_urls]
+    wait(futures, timeout=max(0.0, pool.remaining()))
+  finally:
+    pool.close()
+  # Keep document order so later stylesheets cannot outvote earlier ones by finishing first.
+  return [
+    future.result()
+    for future in futures
+    if future.done() and not future.cancelled() and future.exception() is None and future.result()
+  ]
 
 
 def extract_branding_from_import_pages(pages: list[dict]) -> dict:
   if not pages:
     return {"brandColor": "", "accentColor": "", "fontFamily": ""}
 
-  root_page = pages[0]
-  root_soup = root_page["soup"]
-  root_url = str(root_page["url"])
-  brand_color = ""
+  branding_inputs = pages[0]["facts"].get("branding") or {}
+  brand_color = str(branding_inputs.get("metaColor") or "")
   accent_color = ""
   font_family = ""
   color_votes: dict[str, int] = {}
   font_votes: dict[str, int] = {}
 
-  meta_candidates = [
-    root_soup.find("meta", attrs={"name": "theme-color"}),
-    root_soup.find("meta", attrs={"name": "msapplication-TileColor"}),
-  ]
-  for node in meta_candidates:
-    if not node:
-      continue
-    candidate = to_hex_color(str(node.get("content") or "").strip(), "")
-    if candidate and not is_neutral_hex_color(candidate):
-      brand_color = candidate
-      break
-
-  stylesheet_texts = fetch_import_stylesheet_texts(root_url, root_soup)
-  combined_sources = [str(root_page.get("html") or "")]
-  combined_sources.extend(
-    clean_import_text(style_node.get_text(" ", strip=False), IMPORT_MAX_STYLESHEET_BYTES)
-    for style_node in root_soup.find_all("style")
-  )
-  combined_sources.extend(stylesheet_texts)
+  combined_sources = list(branding_inputs.get("styleTexts") or [])
+  combined_sources.extend(fetch_import_stylesheet_texts(list(branding_inputs.get("stylesheetUrls") or [])))
 
   for source in combined_sources:
     for color in extract_brand_color_candidates_from_text(source):
@@ -6435,17 +9991,10 @@ def extract_branding_from_import_pages(pages: list[dict]) -> dict:
       if candidate:
         font_votes[candidate] = font_votes.get(candidate, 0) + 1
 
-  for link in root_soup.find_all("link", href=True):
-    href = str(link.get("href") or "").strip()
-    if "fonts.googleapis.com" not in href:
-      continue
-    parsed = urlparse(href)
-    families = parse_qs(parsed.query).get("family", [])
-    for entry in families:
-      family_name = entry.split(":")[0].replace("+", " ").strip()
-      candidate = normalize_font_family_candidate(family_name)
-      if candidate:
-        font_votes[candidate] = font_votes.get(candidate, 0) + 5
+  for family_name in branding_inputs.get("googleFontFamilies") or []:
+    candidate = normalize_font_family_candidate(family_name)
+    if candidate:
+      font_votes[candidate] = font_votes.get(candidate, 0) + 5
 
   if not brand_color and color_votes:
     brand_color = sorted(color_votes.items(), key=lambda item: item[1], reverse=True)[0][0]
@@ -6486,24 +10035,49 @@ def is_service_like_import_url(candidate_url: str) -> bool:
 
 
 def fetch_import_html(url: str) -> dict:
+  """Fetches one import page through import_fetch_cache: recently validated entries are served
+  without network access, older ones are revalidated with a conditional GET, and a cached copy
+  stands in when the site fails (network error or 5xx) within IMPORT_FETCH_CACHE_MAX_AGE_SECONDS."""
+  cached = load_import_fetch_cache(url)
+  if import_fetch_cache_is_fresh(cached):
+    return cached_import_page_result(url, cached, "fresh")
+
+  headers = {"User-Agent": IMPORT_USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+  headers.update(import_revalidation_headers(cached))
   try:
-    response = requests.get(
+    response = outbound_http_request(
+      "import",
+      "GET",
       url,
-      headers={"User-Agent": IMPORT_USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
-      timeout=IMPORT_FETCH_TIMEOUT,
+      headers=headers,
       stream=True,
       allow_redirects=True,
     )
   except Exception as exc:
+    if import_fetch_cache_is_usable(cached):
+      return cached_import_page_result(url, cached, "stale")
     return {"ok": False, "url": url, "error": str(exc), "status_code": None, "html": ""}
 
   status_code = int(response.status_code)
+  if status_code == 304 and import_fetch_cache_is_usable(cached):
+    response.close()
+    touch_import_fetch_cache(url)
+    return cached_import_page_result(url, cached, "revalidated")
   if status_code >= 400:
     response.close()
     if status_code == 403:
       fallback_result = fetch_import_reader_html(url)
       if fallback_result["ok"]:
+        store_import_fetch_cache(
+          url,
+          final_url=fallback_result["url"],
+          content_type="text/html",
+          body=fallback_result["html"],
+          fetch_mode="reader_fallback",
+        )
         return fallback_result
+    if status_code >= 500 and import_fetch_cache_is_usable(cached):
+      return cached_import_page_result(url, cached, "stale")
     return {"ok": False, "url": url, "error": f"HTTP {status_code}", "status_code": status_code, "html": ""}
 
   content_type = str(response.headers.get("Content-Type", "")).lower()
@@ -6543,6 +10117,14 @@ def fetch_import_html(url: str) -> dict:
   raw_bytes = b"".join(chunks)
   encoding = response.encoding or response.apparent_encoding or "utf-8"
   html_text = raw_bytes.decode(encoding, errors="replace")
+  store_import_fetch_cache(
+    url,
+    final_url=str(response.url or url),
+    content_type=content_type,
+    body=html_text,
+    etag=str(response.headers.get("ETag") or ""),
+    last_modified=str(response.headers.get("Last-Modified") or ""),
+  )
   return {
     "ok": True,
     "url": str(response.url or url),
@@ -6550,6 +10132,7 @@ def fetch_import_html(url: str) -> dict:
     "status_code": status_code,
     "html": html_text,
     "fetch_mode": "direct",
+    "cache": "miss",
   }
 
 
@@ -6652,10 +10235,11 @@ def fetch_import_reader_html(url: str) -> dict:
     return {"ok": False, "url": url, "error": "Reader-Fallback URL ungültig", "status_code": None, "html": ""}
 
   try:
-    response = requests.get(
+    response = outbound_http_request(
+      "import_reader",
+      "GET",
       reader_url,
       headers={"User-Agent": IMPORT_USER_AGENT, "Accept": "text/plain,text/markdown,*/*"},
-      timeout=IMPORT_FETCH_TIMEOUT,
       allow_redirects=True,
     )
   except Exception as exc:
@@ -6681,11 +10265,43 @@ def fetch_import_reader_html(url: str) -> dict:
   }
 
 
-def crawl_import_pages(root_url: str, entry_url: str, canonical_domain: str) -> dict:
+def ordered_import_pages(root_page: dict, discovered_pages: list[tuple[int, dict]]) -> list[dict]:
+  # Completion order depends on server latency; discovery order keeps extraction deterministic.
+  return [root_page] + [page for _index, page in sorted(discovered_pages, key=lambda item: item[0])]
+
+
+def fetch_import_page(url: str, is_root: bool = False) -> dict:
+  """Fetches, parses and extracts one page on the fetch worker. Only the extracted facts and
+  links are kept; the HTML and the parse tree are released before the next page arrives."""
+  result = fetch_import_html(url)
+  if not result["ok"]:
+    return result
+  final_url = normalize_import_visit_url(result["url"])
+  soup = BeautifulSoup(result.pop("html"), IMPORT_HTML_PARSER)
+  try:
+    hrefs = extract_import_link_hrefs(soup)
+    result["hrefs"] = hrefs
+    result["final_url"] = final_url
+    result["facts"] = extract_import_page_facts(soup, final_url, hrefs, is_root) if final_url else None
+  finally:
+    soup.decompose()
+  return result
+
+
+def fetch_import_root_page(url: str) -> dict:
+  return fetch_import_page(url, is_root=True)
+
+
+def crawl_import_pages(root_url: str, entry_url: str, canonical_domain: str, on_progress=None) -> dict:
   pages: list[dict] = []
+  discovered_pages: list[tuple[int, dict]] = []
   pages_attempted = 0
+  pages_cached = 0
+  service_pages = 0
+  stop_reason = "exhausted"
   seen_urls: set[str] = set()
-  queue: deque[str] = deque()
+  fetched_urls: set[str] = set()
+  queue: deque[tuple[int, str]] = deque()
 
   def push(url: str, force: bool = False) -> None:
     normalized = normalize_import_visit_url(url)
@@ -6698,70 +10314,104 @@ def crawl_import_pages(root_url: str, entry_url: str, canonical_domain: str) ->
     if (not force) and (not should_follow_import_link(normalized)):
       return
     seen_urls.add(normalized)
-    queue.append(normalized)
+    queue.append((len(seen_urls), normalized))
 
-  root_result = fetch_import_html(root_url)
-  pages_attempted += 1
-  if not root_result["ok"]:
-    return {
-      "root_ok": False,
-      "root_error": root_result["error"],
-      "pages": [],
-      "pages_attempted": pages_attempted,
-      "pages_fetched": 0,
-    }
-
-  root_final_url = normalize_import_visit_url(root_result["url"])
-  if not root_final_url or not is_same_import_domain(root_final_url, canonical_domain):
-    return {
-      "root_ok": False,
-      "root_error": "Root-URL liegt nicht auf der erwarteten Domain.",
-      "pages": [],
-      "pages_attempted": pages_attempted,
-      "pages_fetched": 0,
-    }
+  def push_links(hrefs: list[str], base_url: str) -> None:
+    for href in hrefs:
+      push(urljoin(base_url, href), force=False)
 
-  root_soup = BeautifulSoup(root_result["html"], "html.parser")
-  pages.append({"url": root_final_url, "soup": root_soup})
-  seen_urls.add(root_final_url)
+  pool = ImportFetchPool.for_current_request(IMPORT_CRAWL_CONCURRENCY)
+  try:
+    root_future = pool.submit(fetch_import_root_page, root_url)
+    pages_attempted += 1
+    done, _pending = wait([root_future], timeout=max(0.0, pool.remaining()))
+    if done:
+      root_result = root_future.result()
+    else:
+      root_result = {"ok": False, "error": "Zeitlimit für den Website-Import überschritten."}
+    if not root_result["ok"]:
+      return {
+        "root_ok": False,
+        "root_error": root_result["error"],
+        "pages": [],
+        "pages_attempted": pages_attempted,
+        "pages_fetched": 0,
+      }
 
-  push(entry_url, force=True)
-  for link in root_soup.find_all("a", href=True):
-    href = str(link.get("href") or "").strip()
-    if not href:
-      continue
-    push(urljoin(root_final_url, href), force=False)
+    root_final_url = root_result["final_url"]
+    if not root_final_url or not is_same_import_domain(root_final_url, canonical_domain):
+      return {
+        "root_ok": False,
+        "root_error": "Root-URL liegt nicht auf der erwarteten Domain.",
+        "pages": [],
+        "pages_attempted": pages_attempted,
+        "pages_fetched": 0,
+      }
 
-  while queue and (pages_attempted < IMPORT_MAX_PAGES) and (len(pages) < IMPORT_MAX_PAGES):
-    current_url = queue.popleft()
-    page_result = fetch_import_html(current_url)
-    pages_attempted += 1
-    if not page_result["ok"]:
-      continue
+    pages.append({"url": root_final_url, "facts": root_result["facts"]})
+    if root_result.get("cache") in IMPORT_FETCH_CACHE_HIT_STATES:
+      pages_cached += 1
+    seen_urls.add(root_final_url)
+    fetched_urls.add(root_final_url)
+    if is_service_like_import_url(root_final_url):
+      service_pages += 1
+
+    push(entry_url, force=True)
+    push_links(root_result["hrefs"], root_final_url)
+
+    in_flight: dict = {}
+    while True:
+      if service_pages >= IMPORT_CRAWL_SERVICE_PAGE_TARGET:
+        stop_reason = "service_pages"
+        break
+      while queue and (pages_attempted < IMPORT_MAX_PAGES) and (len(in_flight) < IMPORT_CRAWL_CONCURRENCY):
+        discovery_index, current_url = queue.popleft()
+        in_flight[pool.submit(fetch_import_page, current_url)] = discovery_index
+        pages_attempted += 1
+      if not in_flight:
+        if queue:
+          stop_reason = "max_pages"
+        break
 
-    final_url = normalize_import_visit_url(page_result["url"])
-    if not final_url or not is_same_import_domain(final_url, canonical_domain):
-      continue
+      done, _pending = wait(list(in_flight), timeout=max(0.0, pool.remaining()), return_when=FIRST_COMPLETED)
+      if not done:
+        stop_reason = "deadline"
+        break
 
-    if any(page["url"] == final_url for page in pages):
-      continue
+      for future in done:
+        discovery_index = in_flight.pop(future)
+        page_result = future.result()
+        if not page_result["ok"]:
+          continue
 
-    soup = BeautifulSoup(page_result["html"], "html.parser")
-    pages.append({"url": final_url, "soup": soup})
+        final_url = page_result["final_url"]
+        if not final_url or not is_same_import_domain(final_url, canonical_domain):
+          continue
+        if final_url in fetched_urls:
+          continue
 
-    for link in soup.find_all("a", href=True):
-      href = str(link.get("href") or "").strip()
-      if not href:
-        continue
-      push(urljoin(final_url, href), force=False)
+        fetched_urls.add(final_url)
+        discovered_pages.append((discovery_index, {"url": final_url, "facts": page_result["facts"]}))
+        if page_result.get("cache") in IMPORT_FETCH_CACHE_HIT_STATES:
+          pages_cached += 1
+        if is_service_like_import_url(final_url):
+          service_pages += 1
+        push_links(page_result["hrefs"], final_url)
+      if on_progress is not None:
+        on_progress(ordered_import_pages(pages[0], discovered_pages), pages_attempted)
+  finally:
+    pool.close()
 
+  pages = ordered_import_pages(pages[0], discovered_pages)
   return {
     "root_ok": True,
     "root_error": "",
     "pages": pages,
     "pages_attempted": pages_attempted,
     "pages_fetched": len(pages),
+    "pages_cached": pages_cached,
     "fetch_mode": str(root_result.get("fetch_mode") or "direct"),
+    "stop_reason": stop_reason,
   }
 
 
@@ -6797,16 +10447,21 @@ def extract_address_from_import_soup(soup: BeautifulSoup) -> str | None:
     if text:
       return text
 
-  direct = soup.find(attrs={"itemprop": "address"})
+  # One pass over all itemprop nodes instead of a full-tree find() per property.
+  itemprop_nodes: dict[str, object] = {}
+  for node in soup.find_all(attrs={"itemprop": True}):
+    itemprop_nodes.setdefault(str(node.get("itemprop")), node)
+
+  direct = itemprop_nodes.get("address")
   if direct:
     text = clean_import_text(direct.get_text(" ", strip=True), 220)
     if text:
       return text
 
-  street_node = soup.find(attrs={"itemprop": "streetAddress"})
-  locality_node = soup.find(attrs={"itemprop": "addressLocality"})
-  postal_code_node = soup.find(attrs={"itemprop": "postalCode"})
-  country_node = soup.find(attrs={"itemprop": "addressCountry"})
+  street_node = itemprop_nodes.get("streetAddress")
+  locality_node = itemprop_nodes.get("addressLocality")
+  postal_code_node = itemprop_nodes.get("postalCode")
+  country_node = itemprop_nodes.get("addressCountry")
 
   street = clean_import_text(street_node.get_text(" ", strip=True), 120) if street_node else ""
   locality = clean_import_text(locality_node.get_text(" ", strip=True), 80) if locality_node else ""
@@ -6832,14 +10487,22 @@ def normalize_phone_for_import(raw_value: object) -> str:
   return candidate
 
 
-def extract_contacts_from_import_soup(soup: BeautifulSoup) -> tuple[list[str], list[str]]:
+def extract_import_link_hrefs(soup: BeautifulSoup) -> list[str]:
+  hrefs: list[str] = []
+  for link in soup.find_all("a", href=True):
+    href = str(link.get("href") or "").strip()
+    if href:
+      hrefs.append(href)
+  return hrefs
+
+
+def extract_contacts_from_import_soup(soup: BeautifulSoup, hrefs: list[str] | None = None) -> tuple[list[str], list[str]]:
   phones: list[str] = []
   emails: list[str] = []
   seen_phones: set[str] = set()
   seen_emails: set[str] = set()
 
-  for link in soup.find_all("a", href=True):
-    href = str(link.get("href") or "").strip()
+  for href in extract_import_link_hrefs(soup) if hrefs is None else hrefs:
     if href.lower().startswith("tel:"):
       phone = normalize_phone_for_import(href[4:])
       if phone and phone not in seen_phones:
@@ -6964,8 +10627,8 @@ def normalize_priced_service_title_for_import(raw_value: object) -> str:
 def extract_services_from_import_soup(soup: BeautifulSoup, source_url: str) -> list[dict]:
   candidates: list[dict] = []
   seen_titles: set[str] = set()
-  nodes = soup.select("h1,h2,h3,h4,li")
-  for node in nodes[:600]:
+  # find_all with a name list matches select("h1,h2,h3,h4,li") in document order without soupsieve.
+  for node in soup.find_all(["h1", "h2", "h3", "h4", "li"], limit=600):
     title = normalize_service_title_for_import(node.get_text(" ", strip=True))
     if not title:
       continue
@@ -6980,8 +10643,7 @@ def extract_services_from_import_soup(soup: BeautifulSoup, source_url: str) -> l
 def extract_prices_from_import_soup(soup: BeautifulSoup, source_url: str) -> list[dict]:
   prices: list[dict] = []
   seen_pairs: set[tuple[str, str]] = set()
-  nodes = soup.select("li,p,tr,div")
-  for node in nodes[:800]:
+  for node in soup.find_all(["li", "p", "tr", "div"], limit=800):
     text = clean_import_text(node.get_text(" ", strip=True), 200)
     if not text:
       continue
@@ -7005,6 +10667,23 @@ def extract_prices_from_import_soup(soup: BeautifulSoup, source_url: str) -> lis
   return prices
 
 
+def extract_import_page_facts(soup: BeautifulSoup, page_url: str, hrefs: list[str], is_root: bool) -> dict:
+  phones, emails = extract_contacts_from_import_soup(soup, hrefs)
+  # Services only ever come from service-like pages, or from the root page of a site without any.
+  include_services = is_root or is_service_like_import_url(page_url)
+  facts = {
+    "name": extract_name_from_import_soup(soup),
+    "address": extract_address_from_import_soup(soup),
+    "phones": phones,
+    "emails": emails,
+    "services": extract_services_from_import_soup(soup, page_url) if include_services else [],
+    "prices": extract_prices_from_import_soup(soup, page_url) if include_services else [],
+  }
+  if is_root:
+    facts["branding"] = extract_import_branding_inputs(soup, page_url)
+  return facts
+
+
 def extract_import_data_from_pages(pages: list[dict]) -> dict:
   extracted_name: str | None = None
   extracted_address: str | None = None
@@ -7020,26 +10699,21 @@ def extract_import_data_from_pages(pages: list[dict]) -> dict:
   has_service_like_pages = any(is_service_like_import_url(str(page.get("url", ""))) for page in pages)
 
   for page in pages:
-    soup = page["soup"]
+    facts = page["facts"]
     page_url = str(page["url"])
 
-    if extracted_name is None:
-      candidate_name = extract_name_from_import_soup(soup)
-      if candidate_name:
-        extracted_name = candidate_name
-    if extracted_address is None:
-      candidate_address = extract_address_from_import_soup(soup)
-      if candidate_address:
-        extracted_address = candidate_address
-
-    page_phones, page_emails = extract_contacts_from_import_soup(soup)
-    for phone in page_phones:
+    if extracted_name is None and facts["name"]:
+      extracted_name = facts["name"]
+    if extracted_address is None and facts["address"]:
+      extracted_address = facts["address"]
+
+    for phone in facts["phones"]:
       normalized = normalize_phone_for_import(phone)
       if not normalized or normalized in seen_phone:
         continue
       seen_phone.add(normalized)
       phones.append(normalized)
-    for email in page_emails:
+    for email in facts["emails"]:
       normalized = clean_import_text(email, 180).lower()
       if not EMAIL_PATTERN.fullmatch(normalized) or normalized in seen_email:
         continue
@@ -7050,14 +10724,14 @@ def extract_import_data_from_pages(pages: list[dict]) -> dict:
       (not has_service_like_pages) and (page_url == root_page_url or len(pages) == 1)
     )
     if include_services:
-      for service_item in extract_services_from_import_soup(soup, page_url):
+      for service_item in facts["services"]:
         service_key = normalize_keyword_text(service_item["title"])
         if service_key in seen_service:
           continue
         seen_service.add(service_key)
         services.append(service_item)
 
-      for price_item in extract_prices_from_import_soup(soup, page_url):
+      for price_item in facts["prices"]:
         price_key = (normalize_keyword_text(price_item["title"]), str(price_item["price"]).lower())
         if price_key in seen_price:
           continue
@@ -7077,7 +10751,7 @@ def extract_import_data_from_pages(pages: list[dict]) -> dict:
   }
 
 
-def collect_import_bundle_from_website(raw_url: object) -> dict:
+def resolve_import_target(raw_url: object) -> tuple[str, str, str]:
   normalized_url = normalize_import_input_url(raw_url)
   if not normalized_url:
     raise ValueError("Bitte eine gültige Website-URL mit http:// oder https:// angeben.")
@@ -7089,13 +10763,88 @@ def collect_import_bundle_from_website(raw_url: object) -> dict:
   website_url = build_import_website_url(normalized_url)
   if not website_url:
     raise ValueError("Website-URL ist ungültig.")
+  return normalized_url, canonical_domain, website_url
+
+
+def import_services_payload(extracted: dict) -> list[str]:
+  return [
+    str(item["title"])
+    for item in extracted.get("services", [])
+    if isinstance(item, dict) and str(item.get("title", "")).strip()
+  ]
+
+
+def import_prices_payload(extracted: dict) -> list[dict]:
+  return [
+    {
+      "title": str(item["title"]),
+      "price": str(item["price"]),
+    }
+    for item in extracted.get("prices", [])
+    if isinstance(item, dict)
+    and str(item.get("title", "")).strip()
+    and str(item.get("price", "")).strip()
+  ]
+
+
+def build_import_progress(phase: str, pages_fetched: int, pages_attempted: int, extracted: dict | None) -> dict:
+  extracted = extracted or {}
+  services = import_services_payload(extracted)
+  prices = import_prices_payload(extracted)
+  return {
+    "phase": phase,
+    "pagesFetched": pages_fetched,
+    "pagesAttempted": pages_attempted,
+    "servicesFound": len(services),
+    "pricesFound": len(prices),
+    "partial": {
+      "name": extracted.get("name"),
+      "services": services[:IMPORT_PROGRESS_PARTIAL_ITEMS],
+      "prices": prices[:IMPORT_PROGRESS_PARTIAL_ITEMS],
+    },
+  }
+
+
+def import_bundle_progress(phase: str, import_bundle: dict) -> dict:
+  crawl_result = import_bundle["crawlResult"]
+  return build_import_progress(
+    phase,
+    int(crawl_result["pages_fetched"]),
+    int(crawl_result["pages_attempted"]),
+    import_bundle["extracted"],
+  )
+
+
+def collect_import_bundle_from_website(raw_url: object, on_progress=None, include_branding: bool = True) -> dict:
+  normalized_url, canonical_domain, website_url = resolve_import_target(raw_url)
+  prune_import_fetch_cache()
 
-  crawl_result = crawl_import_pages(website_url, normalized_url, canonical_domain)
+  report_crawl = None
+  if on_progress is not None:
+    on_progress(build_import_progress("crawling", 0, 0, None))
+    last_reported = [time.monotonic()]
+
+    def _crawl_progress(pages: list[dict], pages_attempted: int) -> None:
+      # Throttled so a fast crawl does not turn into one job-row UPDATE per page.
+      now = time.monotonic()
+      if now - last_reported[0] < IMPORT_PROGRESS_INTERVAL_SECONDS:
+        return
+      last_reported[0] = now
+      on_progress(build_import_progress("crawling", len(pages), pages_attempted, extract_import_data_from_pages(pages)))
+
+    report_crawl = _crawl_progress
+
+  crawl_result = crawl_import_pages(website_url, normalized_url, canonical_domain, on_progress=report_crawl)
   if not crawl_result["root_ok"]:
     raise RuntimeError(f"Root-Seite konnte nicht geladen werden: {crawl_result['root_error']}")
 
   extracted = extract_import_data_from_pages(crawl_result["pages"])
-  branding = extract_branding_from_import_pages(crawl_result["pages"])
+  if on_progress is not None:
+    on_progress(
+      build_import_progress("branding", crawl_result["pages_fetched"], crawl_result["pages_attempted"], extracted)
+    )
+  # Bulk onboarding skips branding: it only stores clinic data and the stylesheet fetches cost a round trip each.
+  branding = extract_branding_from_import_pages(crawl_result["pages"]) if include_branding else {}
   return {
     "sourceUrl": normalized_url,
     "websiteUrl": website_url,
@@ -7356,6 +11105,19 @@ def upsert_imported_clinic_record(
   canonical_domain: str,
   extracted: dict,
 ) -> tuple[int, bool]:
+  with get_db() as conn:
+    return write_imported_clinic_record(conn, source_url, website_url, canonical_domain, extracted)
+
+
+def write_imported_clinic_record(
+  conn: DBConnectionAdapter,
+  source_url: str,
+  website_url: str,
+  canonical_domain: str,
+  extracted: dict,
+) -> tuple[int, bool]:
+  """Creates or updates the clinic for canonical_domain inside the caller's transaction
+  (bulk onboarding writes several clinics per transaction)."""
   extracted_name = clean_import_text(extracted.get("name"), 180) or None
   extracted_address = clean_import_text(extracted.get("address"), 220) or None
   extracted_phone = normalize_phone_for_import(extracted.get("phone")) or None
@@ -7363,92 +11125,91 @@ def upsert_imported_clinic_record(
   extracted_email = extracted_email_raw if EMAIL_PATTERN.fullmatch(extracted_email_raw) else None
   services = extracted.get("services") if isinstance(extracted.get("services"), list) else []
   prices = extracted.get("prices") if isinstance(extracted.get("prices"), list) else []
-  imported_at = utc_now_iso()
+  imported_at = utc_now()
 
-  with get_db() as conn:
-    existing = find_existing_clinic_by_import_domain(conn, canonical_domain)
-    if existing:
-      clinic_id = int(existing["id"])
-      db_name = extracted_name or clean_import_text(existing["name"], 180) or canonical_domain
-      conn.execute(
-        """
-        UPDATE clinics
-        SET
-          name = ?,
-          website = ?,
-          import_name = ?,
-          address = ?,
-          phone = ?,
-          email = ?,
-          import_source_url = ?,
-          imported_at = ?
-        WHERE id = ?
-        """,
-        (
-          db_name,
-          website_url,
-          extracted_name,
-          extracted_address,
-          extracted_phone,
-          extracted_email,
-          source_url,
-          imported_at,
-          clinic_id,
-        ),
-      )
-      conn.execute(
-        """
-        UPDATE users
-        SET
-          clinic_name = ?,
-          website = ?
-        WHERE clinic_id = ?
-        """,
-        (db_name, website_url, clinic_id),
-      )
-      replace_clinic_import_services(conn, clinic_id, services, prices)
-      apply_imported_services_to_clinic_catalog(conn, clinic_id, db_name, extracted)
-      return clinic_id, False
-
-    fallback_name = extracted_name or canonical_domain
-    clinic_id = insert_and_get_id(
-      conn,
+  existing = find_existing_clinic_by_import_domain(conn, canonical_domain)
+  if existing:
+    clinic_id = int(existing["id"])
+    db_name = extracted_name or clean_import_text(existing["name"], 180) or canonical_domain
+    conn.execute(
       """
-      INSERT INTO clinics (
-        name,
-        logo_url,
-        website,
-        brand_color,
-        accent_color,
-        font_family,
-        design_preset,
-        calendly_url,
-        subscription_status,
-        import_name,
-        address,
-        phone,
-        email,
-        import_source_url,
-        imported_at
-      )
-      VALUES (?, '', ?, '#16A34A', '#EB6C13', 'Gabarito, DM Sans, sans-serif', 'clean', ?, 'inactive', ?, ?, ?, ?, ?, ?)
+      UPDATE clinics
+      SET
+        name = ?,
+        website = ?,
+        import_name = ?,
+        address = ?,
+        phone = ?,
+        email = ?,
+        import_source_url = ?,
+        imported_at = ?
+      WHERE id = ?
       """,
       (
-        fallback_name,
+        db_name,
         website_url,
-        resolved_calendly_url(),
         extracted_name,
         extracted_address,
         extracted_phone,
         extracted_email,
         source_url,
         imported_at,
+        clinic_id,
       ),
     )
-    ensure_clinic_catalog_row(conn, int(clinic_id), fallback_name)
-    replace_clinic_import_services(conn, int(clinic_id), services, prices)
-    apply_imported_services_to_clinic_catalog(conn, int(clinic_id), fallback_name, extracted)
-    return int(clinic_id), True
+    conn.execute(
+      """
+      UPDATE users
+      SET
+        clinic_name = ?,
+        website = ?
+      WHERE clinic_id = ?
+      """,
+      (db_name, website_url, clinic_id),
+    )
+    replace_clinic_import_services(conn, clinic_id, services, prices)
+    apply_imported_services_to_clinic_catalog(conn, clinic_id, db_name, extracted)
+    return clinic_id, False
+
+  fallback_name = extracted_name or canonical_domain
+  clinic_id = insert_and_get_id(
+    conn,
+    """
+    INSERT INTO clinics (
+      name,
+      logo_url,
+      website,
+      brand_color,
+      accent_color,
+      font_family,
+      design_preset,
+      calendly_url,
+      subscription_status,
+      import_name,
+      address,
+      phone,
+      email,
+      import_source_url,
+      imported_at
+    )
+    VALUES (?, '', ?, '#16A34A', '#EB6C13', 'Gabarito, DM Sans, sans-serif', 'clean', ?, 'inactive', ?, ?, ?, ?, ?, ?)
+    """,
+    (
+      fallback_name,
+      website_url,
+      resolved_calendly_url(),
+      extracted_name,
+      extracted_address,
+      extracted_phone,
+      extracted_email,
+      source_url,
+      imported_at,
+    ),
+  )
+  ensure_clinic_catalog_row(conn, int(clinic_id), fallback_name)
+  replace_clinic_import_services(conn, int(clinic_id), services, prices)
+  apply_imported_services_to_clinic_catalog(conn, int(clinic_id), fallback_name, extracted)
+  return int(clinic_id), True
 
 
 def is_placeholder_calendly_url(value: str) -> bool:
@@ -7524,14 +11285,14 @@ def resolve_user_id_by_subscription(stripe_subscription_id: str | None) -> int |
   return int(row["id"]) if row else None
 
 
-def unix_to_iso(value: object) -> str | None:
+def unix_to_datetime(value: object) -> datetime | None:
   if value is None:
     return None
   try:
     timestamp = int(value)
   except (TypeError, ValueError):
     return None
-  return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+  return datetime.fromtimestamp(timestamp, tz=timezone.utc)
 
 
 def resolve_user_id_by_customer(customer_id: str | None) -> int | None:
@@ -7554,7 +11315,7 @@ def upsert_subscription_record(
   amount_cents: int,
   currency: str,
   status: str,
-  current_period_end: str | None,
+  current_period_end: datetime | None,
 ) -> None:
   with get_db() as conn:
     if stripe_subscription_id:
@@ -7673,6 +11434,17 @@ def update_user_billing_state(
       )
 
 
+def enqueue_stripe_subscription_sync(stripe_subscription_id: object) -> None:
+  """Webhook handlers record the event payload; the authoritative subscription state is fetched by the worker."""
+  subscription_id = str(stripe_subscription_id or "").strip()
+  if not subscription_id or not stripe_runtime_ready():
+    return
+  enqueue_background_job(
+    "stripe.subscription_sync",
+    {"subscriptionId": subscription_id},
+  )
+
+
 def handle_checkout_session_completed(checkout_session: dict) -> None:
   if checkout_session.get("mode") != "subscription":
     return
@@ -7699,19 +11471,6 @@ def handle_checkout_session_completed(checkout_session: dict) -> None:
   stripe_subscription_id = checkout_session.get("subscription")
   current_period_end = None
 
-  if stripe_runtime_ready() and stripe_subscription_id:
-    try:
-      subscription = stripe.Subscription.retrieve(stripe_subscription_id)
-      status = map_stripe_subscription_status(subscription.get("status"), fallback=status)
-      current_period_end = unix_to_iso(subscription.get("current_period_end"))
-      items = ((subscription.get("items") or {}).get("data") or [])
-      if items:
-        first_price = items[0].get("price") or {}
-        amount_cents = int(first_price.get("unit_amount") or amount_cents)
-        currency = str(first_price.get("currency") or currency).lower()
-    except Exception:
-      current_period_end = None
-
   if user_id is not None:
     update_user_billing_state(user_id, status, stripe_customer_id, stripe_subscription_id)
     user_row = get_user_row_by_id(user_id)
@@ -7741,13 +11500,14 @@ def handle_checkout_session_completed(checkout_session: dict) -> None:
     status=status,
     current_period_end=current_period_end,
   )
+  enqueue_stripe_subscription_sync(stripe_subscription_id)
 
 
 def handle_subscription_changed(subscription: dict) -> None:
   stripe_subscription_id = subscription.get("id")
   stripe_customer_id = subscription.get("customer")
   status = map_stripe_subscription_status(subscription.get("status"), fallback="inactive")
-  current_period_end = unix_to_iso(subscription.get("current_period_end"))
+  current_period_end = unix_to_datetime(subscription.get("current_period_end"))
 
   amount_cents = APPOINTMENTIX_MONTHLY_AMOUNT_CENTS
   items = ((subscription.get("items") or {}).get("data") or [])
@@ -7783,7 +11543,7 @@ def handle_subscription_changed(subscription: dict) -> None:
         metadata={
           "status": status,
           "amountCents": amount_cents,
-          "currentPeriodEnd": current_period_end,
+          "currentPeriodEnd": format_db_timestamp(current_period_end),
         },
       )
 
@@ -7807,7 +11567,7 @@ def handle_invoice_event(invoice: dict, default_status: str) -> None:
     return
 
   status = map_stripe_subscription_status(default_status, fallback="inactive")
-  current_period_end = unix_to_iso(invoice.get("period_end"))
+  current_period_end = unix_to_datetime(invoice.get("period_end"))
   amount_cents = int(
     invoice.get("amount_paid")
     or invoice.get("amount_due")
@@ -7816,19 +11576,6 @@ def handle_invoice_event(invoice: dict, default_status: str) -> None:
   )
   currency = str(invoice.get("currency") or "eur").lower()
 
-  if stripe_runtime_ready() and stripe_subscription_id:
-    try:
-      subscription = stripe.Subscription.retrieve(stripe_subscription_id)
-      status = map_stripe_subscription_status(subscription.get("status"), fallback=status)
-      current_period_end = unix_to_iso(subscription.get("current_period_end")) or current_period_end
-      items = ((subscription.get("items") or {}).get("data") or [])
-      if items:
-        first_price = items[0].get("price") or {}
-        amount_cents = int(first_price.get("unit_amount") or amount_cents)
-        currency = str(first_price.get("currency") or currency).lower()
-    except Exception:
-      pass
-
   user_id = resolve_user_id_by_customer(stripe_customer_id)
   if user_id is None:
     user_id = resolve_user_id_by_subscription(stripe_subscription_id)
@@ -7846,7 +11593,7 @@ def handle_invoice_event(invoice: dict, default_status: str) -> None:
         metadata={
           "status": status,
           "amountCents": amount_cents,
-          "currentPeriodEnd": current_period_end,
+          "currentPeriodEnd": format_db_timestamp(current_period_end),
         },
       )
 
@@ -7861,6 +11608,330 @@ def handle_invoice_event(invoice: dict, default_status: str) -> None:
     status=status,
     current_period_end=current_period_end,
   )
+  enqueue_stripe_subscription_sync(stripe_subscription_id)
+
+
+def run_email_send_job(payload: dict) -> dict:
+  result = send_email_via_resend(
+    str(payload.get("to") or ""),
+    str(payload.get("subject") or ""),
+    str(payload.get("body") or ""),
+  )
+  if result.get("status") == "failed":
+    raise RuntimeError(result.get("error") or "E-Mail-Versand fehlgeschlagen")
+  return result
+
+
+def run_slack_send_job(payload: dict) -> dict:
+  clinic_row = get_clinic_row_by_id(int(payload.get("clinicId") or 0))
+  if not clinic_row:
+    return {"status": "skipped", "error": "Klinik nicht gefunden"}
+  result = send_slack_webhook(str(_row_get(clinic_row, "slack_webhook_url")), str(payload.get("text") or ""))
+  if result.get("status") == "failed":
+    raise RuntimeError(result.get("error") or "Slack-Versand fehlgeschlagen")
+  return result
+
+
+def run_campaign_job(payload: dict) -> dict:
+  clinic_id = int(payload.get("clinicId") or 0)
+  campaign_row = load_campaign_row_by_id(clinic_id, int(payload.get("campaignId") or 0))
+  if not campaign_row:
+    return {"status": "skipped", "error": "Kampagne nicht gefunden"}
+  # An unfinished run is always resumed from its checkpoint, even if the campaign is no longer due.
+  if payload.get("dueOnly") and not load_active_campaign_run(int(campaign_row["id"])):
+    next_run = parse_datetime_utc(campaign_row["next_run_at"]) if campaign_row["next_run_at"] else None
+    if str(campaign_row["status"]) != "active" or not next_run or next_run > utc_now():
+      return {"status": "skipped", "error": "Kampagne nicht mehr fällig"}
+  actor_user_id = payload.get("actorUserId")
+  run_result = run_campaign_once(
+    campaign_row=campaign_row,
+    actor_user_id=int(actor_user_id) if actor_user_id else None,
+    event_source=str(payload.get("eventSource") or "system_automation"),
+  )
+  return {"status": "completed", **run_result}
+
+
+def record_campaign_run_failure(payload: dict, error: str) -> None:
+  """Push next_run_at out with exponential backoff after a dead campaign.run job and
+  pause the campaign after CAMPAIGN_MAX_CONSECUTIVE_FAILURES dead jobs in a row, so the
+  scheduler stops re-enqueueing a campaign that can't run."""
+  clinic_id = int(payload.get("clinicId") or 0)
+  campaign_id = int(payload.get("campaignId") or 0)
+  with get_db() as conn:
+    row = conn.execute(
+      "SELECT failed_runs, status FROM clinic_campaigns WHERE id = ? AND clinic_id = ? LIMIT 1",
+      (campaign_id, clinic_id),
+    ).fetchone()
+    if not row:
+      return
+    failed_runs = int(row["failed_runs"] or 0) + 1
+    backoff_minutes = min(
+      CAMPAIGN_FAILURE_BACKOFF_MAX_MINUTES,
+      CAMPAIGN_FAILURE_BACKOFF_BASE_MINUTES * (2 ** min(failed_runs - 1, 16)),
+    )
+    pause = failed_runs >= CAMPAIGN_MAX_CONSECUTIVE_FAILURES and str(row["status"]) == "active"
+    conn.execute(
+      """
+      UPDATE clinic_campaigns
+      SET
+        failed_runs = ?,
+        last_error = ?,
+        next_run_at = ?,
+        status = CASE WHEN ? THEN 'paused' ELSE status END,
+        updated_at = CURRENT_TIMESTAMP
+      WHERE id = ? AND clinic_id = ?
+      """,
+      (
+        failed_runs,
+        str(error or "Unbekannter Fehler")[:1000],
+        utc_now() + timedelta(minutes=backoff_minutes),
+        pause,
+        campaign_id,
+        clinic_id,
+      ),
+    )
+
+  if pause:
+    app.logger.warning("Campaign %s paused after %s failed runs", campaign_id, failed_runs)
+    create_audit_log(
+      clinic_id=clinic_id,
+      actor_user_id=None,
+      action="campaign.auto_paused",
+      entity_type="campaign",
+      entity_id=str(campaign_id),
+      metadata={"failedRuns": failed_runs, "error": str(error or "")[:300]},
+    )
+
+
+def run_stripe_subscription_sync_job(payload: dict) -> dict:
+  subscription_id = str(payload.get("subscriptionId") or "").strip()
+  if not subscription_id or not stripe_runtime_ready():
+    return {"status": "skipped"}
+  subscription = stripe.Subscription.retrieve(subscription_id)
+  handle_subscription_changed(subscription)
+  return {"status": "synced", "subscriptionStatus": subscription.get("status")}
+
+
+def run_campaign_audience_refresh_job(payload: dict) -> dict:
+  clinic_id = int(payload.get("clinicId") or 0)
+  campaign_id = int(payload.get("campaignId") or 0)
+  campaign_row = load_campaign_row_by_id(clinic_id, campaign_id)
+  if not campaign_row:
+    return {"status": "skipped"}
+  trigger_type = normalize_campaign_trigger(campaign_row["trigger_type"] or "broadcast", "broadcast")
+  snapshot_row = refresh_campaign_audience_snapshot(clinic_id, campaign_id, trigger_type)
+  return {"status": "refreshed", "count": int(snapshot_row["total_count"])}
+
+
+def run_patient_directory_backfill_job(payload: dict) -> dict:
+  cursor = backfill_patient_directory(background_job_progress().get("cursor"))
+  return {"status": "seeded", "cursor": cursor}
+
+
+def run_platform_metrics_refresh_job(payload: dict) -> dict:
+  with get_db() as conn:
+    refresh_platform_metrics(conn)
+  return {"status": "refreshed"}
+
+
+def run_clinic_import_job(payload: dict) -> dict:
+  result, _created = run_clinic_import(str(payload.get("url") or ""), on_progress=report_background_job_progress)
+  return result
+
+
+def run_catalog_website_import_job(payload: dict) -> dict:
+  actor_user_id = payload.get("actorUserId")
+  return run_catalog_website_import(
+    int(payload.get("clinicId") or 0),
+    int(actor_user_id) if actor_user_id else None,
+    on_progress=report_background_job_progress,
+    adopt_branding=payload.get("adoptBranding") if isinstance(payload.get("adoptBranding"), dict) else None,
+  )
+
+
+BACKGROUND_JOB_HANDLERS = {
+  "email.send": run_email_send_job,
+  "otp.sms_send": run_otp_sms_send_job,
+  "slack.send": run_slack_send_job,
+  "campaign.run": run_campaign_job,
+  "stripe.subscription_sync": run_stripe_subscription_sync_job,
+  "platform_metrics.refresh": run_platform_metrics_refresh_job,
+  "campaign_audience.refresh": run_campaign_audience_refresh_job,
+  "patient_directory.backfill": run_patient_directory_backfill_job,
+  "import.clinic": run_clinic_import_job,
+  "import.catalog_website": run_catalog_website_import_job,
+}
+
+
+BACKGROUND_JOB_DEAD_HANDLERS = {
+  "campaign.run": record_campaign_run_failure,
+}
+
+
+def enqueue_campaign_run(campaign_row, actor_user_id: int | None, event_source: str, due_only: bool) -> int:
+  campaign_id = int(campaign_row["id"])
+  return enqueue_background_job(
+    "campaign.run",
+    {
+      "clinicId": int(campaign_row["clinic_id"]),
+      "campaignId": campaign_id,
+      "actorUserId": actor_user_id,
+      "eventSource": event_source,
+      "dueOnly": due_only,
+    },
+    clinic_id=int(campaign_row["clinic_id"]),
+    dedupe_key=f"campaign.run:{campaign_id}",
+  )
+
+
+class CampaignScheduler:
+  """Enqueues due campaigns on a fixed interval.
+
+  Every web/worker process runs one, but only the elected leader dispatches:
+  Postgres uses a session advisory lock held on a dedicated connection,
+  SQLite a lease row in scheduler_leases that the leader keeps renewing.
+  The campaign.run jobs are executed in parallel by the job worker threads.
+  The leader also queues the platform_metrics.refresh job once it is due.
+  """
+
+  ADVISORY_LOCK_KEY = 730201
+  LEASE_NAME = "campaign_scheduler"
+
+  def __init__(self, holder: str):
+    self.holder = holder
+    self.is_leader = False
+    self._lock_conn: DBConnectionAdapter | None = None
+    self._stats_lock = threading.Lock()
+    self._stats = {"ticks": 0, "dispatched": 0, "lastTickAt": None, "lastDispatched": 0, "lastError": ""}
+
+  def _drop_lock_conn(self) -> None:
+    if self._lock_conn is not None:
+      try:
+        self._lock_conn.close()
+      except Exception:
+        pass
+      self._lock_conn = None
+
+  def _try_lead(self) -> bool:
+    if DB_BACKEND == "postgres":
+      if self._lock_conn is not None:
+        try:
+          self._lock_conn.execute("SELECT 1").fetchone()
+          self._lock_conn.commit()
+          return True
+        except Exception:
+          # Connection lost: the server already released the session lock.
+          self._drop_lock_conn()
+      conn = get_db()
+      try:
+        row = conn.execute("SELECT pg_try_advisory_lock(?) AS locked", (self.ADVISORY_LOCK_KEY,)).fetchone()
+        conn.commit()
+      except Exception:
+        conn.close()
+        raise
+      if row and row["locked"]:
+        self._lock_conn = conn
+        return True
+      conn.close()
+      return False
+
+    now_ms = utc_now_ms()
+    lease_expires_ms = now_ms + CAMPAIGN_SCHEDULER_INTERVAL_SECONDS * 3 * 1000
+    with get_db() as conn:
+      row = conn.execute(
+        """
+        INSERT INTO scheduler_leases (name, holder, lease_expires_ms)
+        VALUES (?, ?, ?)
+        ON CONFLICT (name) DO UPDATE
+        SET holder = excluded.holder, lease_expires_ms = excluded.lease_expires_ms
+        WHERE scheduler_leases.holder = excluded.holder OR scheduler_leases.lease_expires_ms < ?
+        RETURNING holder
+        """,
+        (self.LEASE_NAME, self.holder, lease_expires_ms, now_ms),
+      ).fetchone()
+    return bool(row)
+
+  def release(self) -> None:
+    try:
+      if DB_BACKEND == "postgres":
+        if self._lock_conn is not None:
+          self._lock_conn.execute("SELECT pg_advisory_unlock(?)", (self.ADVISORY_LOCK_KEY,))
+          self._lock_conn.commit()
+      elif self.is_leader:
+        with get_db() as conn:
+          conn.execute(
+            "DELETE FROM scheduler_leases WHERE name = ? AND holder = ?",
+            (self.LEASE_NAME, self.holder),
+          )
+    except Exception:
+      app.logger.warning("Campaign scheduler could not release leadership", exc_info=True)
+    finally:
+      self._drop_lock_conn()
+      self.is_leader = False
+
+  def tick(self) -> int:
+    self.is_leader = self._try_lead()
+    if not self.is_leader:
+      return 0
+
+    dispatched = 0
+    after = None
+    while True:
+      due_rows = list_due_campaign_rows(None, 300, after)
+      for row in due_rows:
+        enqueue_campaign_run(row, actor_user_id=None, event_source="system_automation", due_only=True)
+        dispatched += 1
+      if len(due_rows) < 300:
+        break
+      after = (due_rows[-1]["next_run_at"], int(due_rows[-1]["id"]))
+    enqueue_platform_metrics_refresh_if_stale()
+
+    with self._stats_lock:
+      self._stats["ticks"] += 1
+      self._stats["dispatched"] += dispatched
+      self._stats["lastDispatched"] = dispatched
+      self._stats["lastTickAt"] = utc_now_iso()
+    return dispatched
+
+  def run(self, stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
+      try:
+        self.tick()
+      except Exception as exc:
+        self.is_leader = False
+        self._drop_lock_conn()
+        with self._stats_lock:
+          self._stats["lastError"] = str(exc)[:300]
+        app.logger.exception("Campaign scheduler tick failed")
+      stop_event.wait(CAMPAIGN_SCHEDULER_INTERVAL_SECONDS)
+    self.release()
+
+  def snapshot(self) -> dict:
+    with self._stats_lock:
+      stats = dict(self._stats)
+    return {
+      "enabled": CAMPAIGN_SCHEDULER_ENABLED,
+      "holder": self.holder,
+      "isLeader": self.is_leader,
+      "intervalSeconds": CAMPAIGN_SCHEDULER_INTERVAL_SECONDS,
+      **stats,
+    }
+
+
+CAMPAIGN_SCHEDULER = CampaignScheduler(f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}")
+
+
+def start_campaign_scheduler(stop_event: threading.Event) -> threading.Thread | None:
+  if not CAMPAIGN_SCHEDULER_ENABLED:
+    return None
+  thread = threading.Thread(
+    target=CAMPAIGN_SCHEDULER.run,
+    args=(stop_event,),
+    name="campaign-scheduler",
+    daemon=True,
+  )
+  thread.start()
+  return thread
 
 
 @app.get("/")
@@ -7883,205 +11954,549 @@ def serve_catalog():
   return send_from_directory(BASE_DIR, "catalog.html")
 
 
-@app.get("/api/admin/config")
-def admin_config():
-  return jsonify({"configured": superadmin_configured()})
+@app.get("/api/admin/config")
+def admin_config():
+  return jsonify({"configured": superadmin_configured()})
+
+
+@app.post("/api/admin/login")
+def admin_login():
+  if not superadmin_configured():
+    return jsonify({"error": "Super-Admin ist nicht konfiguriert."}), 503
+
+  payload = request.get_json(silent=True) or {}
+  email = str(payload.get("email", "")).strip().lower()
+  password = str(payload.get("password", ""))
+
+  if not email or not password:
+    return jsonify({"error": "E-Mail und Passwort sind erforderlich."}), 400
+
+  if email != SUPERADMIN_EMAIL or not verify_superadmin_password(password):
+    return jsonify({"error": "Ungültige Admin-Zugangsdaten."}), 401
+
+  session.clear()
+  session["superadmin_authenticated"] = True
+  session["superadmin_email"] = SUPERADMIN_EMAIL
+
+  return jsonify({"admin": {"email": SUPERADMIN_EMAIL}})
+
+
+@app.post("/api/admin/logout")
+def admin_logout():
+  session.pop("superadmin_authenticated", None)
+  session.pop("superadmin_email", None)
+  return jsonify({"success": True})
+
+
+@app.get("/api/admin/me")
+def admin_me():
+  admin, auth_error = require_superadmin()
+  if not admin:
+    return auth_error
+  return jsonify({"admin": admin})
+
+
+def run_clinic_import(raw_url: object, on_progress=None) -> tuple[dict, bool]:
+  import_bundle = collect_import_bundle_from_website(raw_url, on_progress=on_progress)
+  if on_progress is not None:
+    on_progress(import_bundle_progress("saving", import_bundle))
+
+  normalized_url = import_bundle["sourceUrl"]
+  website_url = import_bundle["websiteUrl"]
+  canonical_domain = import_bundle["canonicalDomain"]
+  crawl_result = import_bundle["crawlResult"]
+  extracted = import_bundle["extracted"]
+  branding = import_bundle["branding"]
+  clinic_id, created = upsert_imported_clinic_record(
+    source_url=normalized_url,
+    website_url=website_url,
+    canonical_domain=canonical_domain,
+    extracted=extracted,
+  )
+
+  with get_db() as conn:
+    clinic_row = conn.execute(
+      """
+      SELECT imported_at
+      FROM clinics
+      WHERE id = ?
+      LIMIT 1
+      """,
+      (clinic_id,),
+    ).fetchone()
+
+  services_payload = import_services_payload(extracted)
+  prices_payload = import_prices_payload(extracted)
+
+  missing_fields = [
+    field_name
+    for field_name in ("name", "address", "phone", "email")
+    if not extracted.get(field_name)
+  ]
+
+  return {
+    "clinic": {
+      "id": clinic_id,
+      "domain": canonical_domain,
+      "website": website_url,
+      "name": extracted.get("name"),
+      "address": extracted.get("address"),
+      "phone": extracted.get("phone"),
+      "email": extracted.get("email"),
+      "services": services_payload,
+      "prices": prices_payload,
+      "imported_at": clinic_row["imported_at"] if clinic_row else utc_now_iso(),
+    },
+    "branding": branding,
+    "import_summary": {
+      "created": created,
+      "pages_fetched": int(crawl_result["pages_fetched"]),
+      "pages_attempted": int(crawl_result["pages_attempted"]),
+      "pages_cached": int(crawl_result.get("pages_cached") or 0),
+      "crawl_stop_reason": str(crawl_result.get("stop_reason") or ""),
+      "services_found": len(services_payload),
+      "prices_found": len(prices_payload),
+      "missing_fields": missing_fields,
+    },
+  }, created
+
+
+@app.post("/api/import-clinic")
+def import_clinic():
+  admin, auth_error = require_superadmin()
+  if not admin:
+    return auth_error
+
+  payload = request.get_json(silent=True) or {}
+  raw_url = str(payload.get("url", "")).strip()
+  try:
+    normalized_url, canonical_domain, _website_url = resolve_import_target(raw_url)
+  except ValueError as exc:
+    return jsonify({"error": str(exc)}), 400
+
+  # Crawling takes up to IMPORT_CRAWL_DEADLINE_SECONDS; the job worker does it and the admin polls the job.
+  job_id = enqueue_background_job(
+    "import.clinic",
+    {"url": normalized_url},
+    dedupe_key=f"import.clinic:{canonical_domain}",
+    max_attempts=1,
+  )
+  job_row = load_background_job_row(job_id)
+  return jsonify(
+    {
+      "success": True,
+      "queued": True,
+      "job": serialize_background_job_row(job_row) if job_row else {"id": job_id},
+    }
+  ), 202
+
+
+@app.get("/api/admin/jobs/<int:job_id>")
+def admin_background_job(job_id: int):
+  admin, auth_error = require_superadmin()
+  if not admin:
+    return auth_error
+
+  job_row = load_background_job_row(job_id)
+  if not job_row:
+    return jsonify({"error": "Job nicht gefunden."}), 404
+  return jsonify({"job": serialize_background_job_row(job_row)})
+
+
+PLATFORM_METRICS_COLUMNS = (
+  "metric_day, clinics_total, active_clinics, users_total, owners_total, staff_total, subscriptions_active, "
+  "clinics_created, users_created, leads_created, leads_last_7_days, refreshed_at"
+)
+
+
+def platform_metrics_day_bounds(day: datetime) -> tuple[datetime, datetime]:
+  start = day.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+  return start, start + timedelta(days=1)
+
+
+def refresh_platform_metrics(conn: DBConnectionAdapter) -> None:
+  """Write today's platform_metrics_daily row (UTC day) from one multi-count statement.
+
+  Yesterday's row gets its per-day counters recomputed once more, so signups
+  between its last refresh and midnight are not lost. The per-clinic MRR
+  snapshot in clinic_analytics_daily and the analytics rollups are
+  refreshed on the same schedule; the scheduler tick queues the refresh,
+  so it does not depend on admins opening the overview.
+  """
+  now = utc_now()
+  today_start, today_end = platform_metrics_day_bounds(now)
+  row = conn.execute(
+    """
+    SELECT
+      (SELECT COUNT(*) FROM clinics) AS clinics_total,
+      (SELECT COUNT(*) FROM clinics WHERE subscription_status IN ('active', 'trialing')) AS active_clinics,
+      (SELECT COUNT(*) FROM users) AS users_total,
+      (SELECT COUNT(*) FROM users WHERE role = 'owner') AS owners_total,
+      (SELECT COUNT(*) FROM users WHERE role = 'staff') AS staff_total,
+      (SELECT COUNT(*) FROM subscriptions WHERE status IN ('active', 'trialing')) AS subscriptions_active,
+      (SELECT COUNT(*) FROM clinics WHERE created_at >= ? AND created_at < ?) AS clinics_created,
+      (SELECT COUNT(*) FROM users WHERE created_at >= ? AND created_at < ?) AS users_created,
+      (SELECT COUNT(*) FROM leads WHERE created_at >= ? AND created_at < ?) AS leads_created,
+      (SELECT COUNT(*) FROM leads WHERE created_at >= ?) AS leads_last_7_days
+    """,
+    (today_start, today_end, today_start, today_end, today_start, today_end, now - timedelta(days=7)),
+  ).fetchone()
+  conn.execute(
+    f"""
+    INSERT INTO platform_metrics_daily ({PLATFORM_METRICS_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (metric_day) DO UPDATE SET
+      clinics_total = excluded.clinics_total,
+      active_clinics = excluded.active_clinics,
+      users_total = excluded.users_total,
+      owners_total = excluded.owners_total,
+      staff_total = excluded.staff_total,
+      subscriptions_active = excluded.subscriptions_active,
+      clinics_created = excluded.clinics_created,
+      users_created = excluded.users_created,
+      leads_created = excluded.leads_created,
+      leads_last_7_days = excluded.leads_last_7_days,
+      refreshed_at = excluded.refreshed_at
+    """,
+    (
+      today_start.date().isoformat(),
+      *(int(row[column] or 0) for column in (
+        "clinics_total", "active_clinics", "users_total", "owners_total", "staff_total", "subscriptions_active",
+        "clinics_created", "users_created", "leads_created", "leads_last_7_days",
+      )),
+      now,
+    ),
+  )
+
+  yesterday_start = today_start - timedelta(days=1)
+  conn.execute(
+    """
+    UPDATE platform_metrics_daily
+    SET
+      clinics_created = (SELECT COUNT(*) FROM clinics WHERE created_at >= ? AND created_at < ?),
+      users_created = (SELECT COUNT(*) FROM users WHERE created_at >= ? AND created_at < ?),
+      leads_created = (SELECT COUNT(*) FROM leads WHERE created_at >= ? AND created_at < ?),
+      refreshed_at = ?
+    WHERE metric_day = ? AND refreshed_at < ?
+    """,
+    (
+      yesterday_start, today_start, yesterday_start, today_start, yesterday_start, today_start,
+      today_start, yesterday_start.date().isoformat(), today_start,
+    ),
+  )
+  refresh_clinic_membership_snapshots(conn, today_start.date().isoformat())
+  rollup_clinic_analytics_since_watermark(conn, today_start.date().isoformat())
+
+
+def backfill_platform_metrics(conn: DBConnectionAdapter) -> None:
+  # History from created_at only: cumulative clinic/user totals and per-day signups and leads.
+  # Subscription states are not historized, so those columns stay NULL for past days.
+  if conn.execute("SELECT 1 FROM platform_metrics_daily LIMIT 1").fetchone():
+    return
+  daily: dict[str, dict[str, int]] = {}
+  sources = (
+    ("clinics_created", "SELECT created_at, '' AS role FROM clinics"),
+    ("users_created", "SELECT created_at, role FROM users"),
+    ("leads_created", "SELECT created_at, '' AS role FROM leads"),
+  )
+  for counter, query in sources:
+    for row in conn.iter_rows(query):
+      created_at = parse_datetime_utc(row["created_at"])
+      if created_at is None:
+        continue
+      bucket = daily.setdefault(created_at.date().isoformat(), {})
+      bucket[counter] = bucket.get(counter, 0) + 1
+      if counter == "users_created" and row["role"] in {"owner", "staff"}:
+        bucket[row["role"]] = bucket.get(row["role"], 0) + 1
+
+  today = utc_now().date().isoformat()
+  totals = {"clinics_created": 0, "users_created": 0, "owner": 0, "staff": 0}
+  recent_leads: deque = deque()
+  rows = []
+  for day in sorted(daily):
+    if day >= today:
+      break
+    bucket = daily[day]
+    for key in totals:
+      totals[key] += bucket.get(key, 0)
+    # Days without signups or leads get no row; the series simply has gaps there.
+    day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+    recent_leads.append((day_start, bucket.get("leads_created", 0)))
+    while recent_leads and recent_leads[0][0] <= day_start - timedelta(days=7):
+      recent_leads.popleft()
+    rows.append(
+      (
+        day,
+        totals["clinics_created"],
+        totals["users_created"],
+        totals["owner"],
+        totals["staff"],
+        bucket.get("clinics_created", 0),
+        bucket.get("users_created", 0),
+        bucket.get("leads_created", 0),
+        sum(count for _, count in recent_leads),
+        day_start + timedelta(days=1),
+      )
+    )
+  if rows:
+    conn.executemany(
+      """
+      INSERT INTO platform_metrics_daily (
+        metric_day, clinics_total, users_total, owners_total, staff_total,
+        clinics_created, users_created, leads_created, leads_last_7_days, refreshed_at
+      )
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      """,
+      rows,
+    )
+  refresh_platform_metrics(conn)
+
 
+def load_latest_platform_metrics():
+  with get_db() as conn:
+    return conn.execute(
+      f"SELECT {PLATFORM_METRICS_COLUMNS} FROM platform_metrics_daily ORDER BY metric_day DESC LIMIT 1"
+    ).fetchone()
 
-@app.post("/api/admin/login")
-def admin_login():
-  if not superadmin_configured():
-    return jsonify({"error": "Super-Admin ist nicht konfiguriert."}), 503
 
-  payload = request.get_json(silent=True) or {}
-  email = str(payload.get("email", "")).strip().lower()
-  password = str(payload.get("password", ""))
+def platform_metrics_row_is_stale(row) -> bool:
+  if row is None or row["metric_day"] != utc_now().date().isoformat():
+    return True
+  refreshed_at = parse_datetime_utc(row["refreshed_at"])
+  return refreshed_at is None or utc_now() - refreshed_at > timedelta(seconds=PLATFORM_METRICS_REFRESH_SECONDS)
 
-  if not email or not password:
-    return jsonify({"error": "E-Mail und Passwort sind erforderlich."}), 400
 
-  if email != SUPERADMIN_EMAIL or not verify_superadmin_password(password):
-    return jsonify({"error": "Ungültige Admin-Zugangsdaten."}), 401
+def enqueue_platform_metrics_refresh_if_stale() -> None:
+  # Called from the scheduler tick, so metrics and rollups stay current without admin page views.
+  if platform_metrics_row_is_stale(load_latest_platform_metrics()):
+    enqueue_background_job("platform_metrics.refresh", {}, dedupe_key="platform_metrics.refresh")
 
-  session.clear()
-  session["superadmin_authenticated"] = True
-  session["superadmin_email"] = SUPERADMIN_EMAIL
 
-  return jsonify({"admin": {"email": SUPERADMIN_EMAIL}})
+def current_platform_metrics():
+  """Latest snapshot row; a stale one is served as-is while a platform_metrics.refresh job updates it."""
+  row = load_latest_platform_metrics()
+  today = utc_now().date().isoformat()
+  if row is None or row["metric_day"] != today:
+    # New UTC day (or empty table): refresh inline so the overview never shows yesterday as today.
+    with get_db() as conn:
+      refresh_platform_metrics(conn)
+    return load_latest_platform_metrics()
+  if platform_metrics_row_is_stale(row):
+    enqueue_background_job("platform_metrics.refresh", {}, dedupe_key="platform_metrics.refresh")
+  return row
 
 
-@app.post("/api/admin/logout")
-def admin_logout():
-  session.pop("superadmin_authenticated", None)
-  session.pop("superadmin_email", None)
-  return jsonify({"success": True})
+def serialize_platform_metrics_row(row) -> dict:
+  return {
+    "day": row["metric_day"],
+    "clinicsTotal": int(row["clinics_total"] or 0),
+    "activeClinics": int(row["active_clinics"]) if row["active_clinics"] is not None else None,
+    "usersTotal": int(row["users_total"] or 0),
+    "ownersTotal": int(row["owners_total"] or 0),
+    "staffTotal": int(row["staff_total"] or 0),
+    "subscriptionsActive": int(row["subscriptions_active"]) if row["subscriptions_active"] is not None else None,
+    "clinicsCreated": int(row["clinics_created"] or 0),
+    "usersCreated": int(row["users_created"] or 0),
+    "leadsCreated": int(row["leads_created"] or 0),
+    "leadsLast7Days": int(row["leads_last_7_days"] or 0),
+    "refreshedAt": row["refreshed_at"],
+  }
 
 
-@app.get("/api/admin/me")
-def admin_me():
+@app.get("/api/admin/overview")
+def admin_overview():
   admin, auth_error = require_superadmin()
   if not admin:
     return auth_error
-  return jsonify({"admin": admin})
+  return jsonify({"overview": serialize_platform_metrics_row(current_platform_metrics())})
 
 
-@app.post("/api/import-clinic")
-def import_clinic():
+@app.get("/api/admin/metrics")
+def admin_platform_metrics():
   admin, auth_error = require_superadmin()
   if not admin:
     return auth_error
-
-  payload = request.get_json(silent=True) or {}
-  raw_url = str(payload.get("url", "")).strip()
   try:
-    import_bundle = collect_import_bundle_from_website(raw_url)
-  except ValueError as exc:
-    return jsonify({"error": str(exc)}), 400
-  except RuntimeError as exc:
-    return jsonify({"error": str(exc)}), 502
-
-  normalized_url = import_bundle["sourceUrl"]
-  website_url = import_bundle["websiteUrl"]
-  canonical_domain = import_bundle["canonicalDomain"]
-  crawl_result = import_bundle["crawlResult"]
-  extracted = import_bundle["extracted"]
-  branding = import_bundle["branding"]
-  clinic_id, created = upsert_imported_clinic_record(
-    source_url=normalized_url,
-    website_url=website_url,
-    canonical_domain=canonical_domain,
-    extracted=extracted,
-  )
+    days = max(1, min(int(request.args.get("days", "90")), 3650))
+  except ValueError:
+    days = 90
 
+  current_platform_metrics()
+  first_day = (utc_now() - timedelta(days=days - 1)).date().isoformat()
   with get_db() as conn:
-    clinic_row = conn.execute(
-      """
-      SELECT imported_at
-      FROM clinics
-      WHERE id = ?
-      LIMIT 1
-      """,
-      (clinic_id,),
-    ).fetchone()
+    rows = conn.execute(
+      f"SELECT {PLATFORM_METRICS_COLUMNS} FROM platform_metrics_daily WHERE metric_day >= ? ORDER BY metric_day ASC",
+      (first_day,),
+    ).fetchall()
+  return jsonify({"days": days, "series": [serialize_platform_metrics_row(row) for row in rows]})
 
-  services_payload = [
-    str(item["title"])
-    for item in extracted.get("services", [])
-    if isinstance(item, dict) and str(item.get("title", "")).strip()
-  ]
-  prices_payload = [
-    {
-      "title": str(item["title"]),
-      "price": str(item["price"]),
-    }
-    for item in extracted.get("prices", [])
-    if isinstance(item, dict)
-    and str(item.get("title", "")).strip()
-    and str(item.get("price", "")).strip()
-  ]
 
-  missing_fields = [
-    field_name
-    for field_name in ("name", "address", "phone", "email")
-    if not extracted.get(field_name)
-  ]
+def month_key_after(month_key: str) -> str:
+  year, month = int(month_key[:4]), int(month_key[5:7])
+  return f"{year + month // 12:04d}-{month % 12 + 1:02d}"
 
-  return jsonify(
-    {
-      "clinic": {
-        "id": clinic_id,
-        "domain": canonical_domain,
-        "website": website_url,
-        "name": extracted.get("name"),
-        "address": extracted.get("address"),
-        "phone": extracted.get("phone"),
-        "email": extracted.get("email"),
-        "services": services_payload,
-        "prices": prices_payload,
-        "imported_at": clinic_row["imported_at"] if clinic_row else utc_now_iso(),
-      },
-      "branding": branding,
-      "import_summary": {
-        "created": created,
-        "pages_fetched": int(crawl_result["pages_fetched"]),
-        "pages_attempted": int(crawl_result["pages_attempted"]),
-        "services_found": len(services_payload),
-        "prices_found": len(prices_payload),
-        "missing_fields": missing_fields,
-      },
-    }
-  ), (201 if created else 200)
 
+def month_key_before(month_key: str) -> str:
+  year, month = int(month_key[:4]), int(month_key[5:7])
+  return f"{year - (month == 1):04d}-{(month - 2) % 12 + 1:02d}"
 
-@app.get("/api/admin/overview")
-def admin_overview():
+
+def parse_metric_day(raw_value: object) -> str:
+  raw_text = str(raw_value or "").strip()
+  if not DATE_ONLY_PATTERN.match(raw_text):
+    raise ValueError(raw_text)
+  return datetime.fromisoformat(raw_text).date().isoformat()
+
+
+def serialize_platform_analytics_row(row) -> dict:
+  offer_views = int(row["offer_views"] or 0)
+  purchases = int(row["purchases"] or 0)
+  return {
+    "gmvCents": int(row["gmv_cents"] or 0),
+    "events": int(row["events_total"] or 0),
+    "appOpens": int(row["app_opens"] or 0),
+    "offerViews": offer_views,
+    "addToCarts": int(row["add_to_carts"] or 0),
+    "purchases": purchases,
+    "membershipJoins": int(row["membership_joins"] or 0),
+    "conversionRate": round(purchases / offer_views * 100.0, 2) if offer_views else 0.0,
+    "mrrCents": int(row["mrr_cents"]) if row["mrr_cents"] is not None else None,
+    "activeMemberships": int(row["active_memberships"]) if row["active_memberships"] is not None else None,
+  }
+
+
+@app.get("/api/admin/analytics")
+def admin_platform_analytics():
   admin, auth_error = require_superadmin()
   if not admin:
     return auth_error
+  today = utc_now().date()
+  try:
+    date_to = parse_metric_day(request.args.get("to")) if request.args.get("to") else today.isoformat()
+    date_from = (
+      parse_metric_day(request.args.get("from"))
+      if request.args.get("from")
+      else (datetime.fromisoformat(date_to) - timedelta(days=364)).date().isoformat()
+    )
+  except ValueError:
+    return jsonify({"error": "Ungültiger Zeitraum (from/to erwarten YYYY-MM-DD)."}), 400
+  if date_from > date_to:
+    return jsonify({"error": "from muss vor to liegen."}), 400
+  try:
+    clinic_limit = max(1, min(int(request.args.get("clinicLimit", "50")), 500))
+  except ValueError:
+    clinic_limit = 50
+
+  # Also finalizes yesterday's rollups on the first request of a day.
+  current_platform_metrics()
+  today_key = today.isoformat()
+  columns = ", ".join(CLINIC_ANALYTICS_SUM_COLUMNS)
+  sums = ", ".join(f"SUM({column}) AS {column}" for column in CLINIC_ANALYTICS_SUM_COLUMNS)
+  # Whole months strictly before the current one come from clinic_analytics_monthly,
+  # the partial months at either end of the window from clinic_analytics_daily.
+  first_full_month = date_from[:7] if date_from.endswith("-01") else month_key_after(date_from[:7])
+  last_full_month = month_key_before(date_to[:7])
+  if (datetime.fromisoformat(date_to) + timedelta(days=1)).day == 1:
+    last_full_month = date_to[:7]
+  last_full_month = min(last_full_month, month_key_before(today_key[:7]))
+  use_months = first_full_month <= last_full_month
+  monthly_start = f"{first_full_month}-01"
+  monthly_end = f"{month_key_after(last_full_month)}-01"
 
   with get_db() as conn:
-    clinics_total = int(conn.execute("SELECT COUNT(*) AS count FROM clinics").fetchone()["count"])
-    users_total = int(conn.execute("SELECT COUNT(*) AS count FROM users").fetchone()["count"])
-    owners_total = int(
-      conn.execute(
-        "SELECT COUNT(*) AS count FROM users WHERE role = 'owner'"
-      ).fetchone()["count"]
-    )
-    staff_total = int(
-      conn.execute(
-        "SELECT COUNT(*) AS count FROM users WHERE role = 'staff'"
-      ).fetchone()["count"]
-    )
-    active_clinics = int(
-      conn.execute(
-        """
-        SELECT COUNT(*) AS count
-        FROM clinics
-        WHERE subscription_status IN ('active', 'trialing')
-        """
-      ).fetchone()["count"]
-    )
-    subscriptions_active = int(
-      conn.execute(
-        """
-        SELECT COUNT(*) AS count
-        FROM subscriptions
-        WHERE status IN ('active', 'trialing')
-        """
-      ).fetchone()["count"]
-    )
-    lead_rows = conn.execute("SELECT created_at FROM leads").fetchall()
+    # Past days come from the platform rollup, today is summed live from the per-clinic rows.
+    day_rows = conn.execute(
+      f"""
+      SELECT metric_day, {columns}, mrr_cents, active_memberships
+      FROM platform_analytics_daily
+      WHERE metric_day >= ? AND metric_day <= ? AND metric_day < ?
+      UNION ALL
+      SELECT metric_day, {sums}, SUM(mrr_cents), SUM(active_memberships)
+      FROM clinic_analytics_daily
+      WHERE metric_day = ? AND metric_day >= ? AND metric_day <= ?
+      GROUP BY metric_day
+      ORDER BY metric_day ASC
+      """,
+      (date_from, date_to, today_key, today_key, date_from, date_to),
+    ).fetchall()
+    snapshot_day = next((row["metric_day"] for row in reversed(day_rows) if row["mrr_cents"] is not None), None)
+    clinic_rows = conn.execute(
+      f"""
+      WITH window_rows AS (
+        SELECT clinic_id, {columns}
+        FROM clinic_analytics_monthly
+        WHERE ? AND metric_month >= ? AND metric_month <= ?
+        UNION ALL
+        SELECT clinic_id, {columns}
+        FROM clinic_analytics_daily
+        WHERE metric_day >= ? AND metric_day <= ? AND NOT (? AND metric_day >= ? AND metric_day < ?)
+      ),
+      clinic_totals AS (
+        SELECT clinic_id, {sums}
+        FROM window_rows
+        GROUP BY clinic_id
+      )
+      SELECT t.*, c.name AS clinic_name, s.mrr_cents, s.active_memberships
+      FROM clinic_totals t
+      LEFT JOIN clinics c ON c.id = t.clinic_id
+      LEFT JOIN clinic_analytics_daily s ON s.clinic_id = t.clinic_id AND s.metric_day = ?
+      ORDER BY t.gmv_cents DESC, t.events_total DESC, t.clinic_id ASC
+      LIMIT ?
+      """,
+      (
+        use_months, first_full_month, last_full_month,
+        date_from, date_to, use_months, monthly_start, monthly_end,
+        snapshot_day, clinic_limit,
+      ),
+    ).fetchall()
 
-  seven_days_ago = utc_now() - timedelta(days=7)
-  leads_last_7_days = 0
-  for row in lead_rows:
-    raw_created_at = str(row["created_at"] or "").strip()
-    if not raw_created_at:
-      continue
-    try:
-      parsed = datetime.fromisoformat(raw_created_at)
-    except ValueError:
-      continue
-    if parsed.tzinfo is None:
-      parsed = parsed.replace(tzinfo=timezone.utc)
-    if parsed >= seven_days_ago:
-      leads_last_7_days += 1
+  totals = {column: sum(int(row[column] or 0) for row in day_rows) for column in CLINIC_ANALYTICS_SUM_COLUMNS}
+  snapshot_row = next((row for row in day_rows if row["metric_day"] == snapshot_day), None)
+  totals["mrr_cents"] = snapshot_row["mrr_cents"] if snapshot_row else None
+  totals["active_memberships"] = snapshot_row["active_memberships"] if snapshot_row else None
 
   return jsonify(
     {
-      "overview": {
-        "clinicsTotal": clinics_total,
-        "usersTotal": users_total,
-        "ownersTotal": owners_total,
-        "staffTotal": staff_total,
-        "activeClinics": active_clinics,
-        "subscriptionsActive": subscriptions_active,
-        "leadsLast7Days": leads_last_7_days,
-      }
+      "window": {"from": date_from, "to": date_to, "mrrSnapshotDay": snapshot_day},
+      "totals": serialize_platform_analytics_row(totals),
+      "byDay": [{"date": row["metric_day"], **serialize_platform_analytics_row(row)} for row in day_rows],
+      "byClinic": [
+        {
+          "clinicId": row["clinic_id"],
+          "clinicName": row["clinic_name"] or "",
+          **serialize_platform_analytics_row(row),
+        }
+        for row in clinic_rows
+      ],
     }
   )
 
 
+def build_system_diagnostics_payload() -> dict:
+  return {
+    "generatedAt": utc_now_iso(),
+    "outboundHttp": OUTBOUND_HTTP.metrics_snapshot(),
+    "jobs": background_job_metrics_snapshot(),
+    "campaignScheduler": CAMPAIGN_SCHEDULER.snapshot(),
+  }
+
+
+@app.get("/api/admin/diagnostics")
+def admin_diagnostics():
+  admin, auth_error = require_superadmin()
+  if not admin:
+    return auth_error
+  return jsonify({"diagnostics": build_system_diagnostics_payload()})
+
+
+@app.get("/api/system/diagnostics")
+def system_diagnostics():
+  authorized, auth_error = require_automation_secret()
+  if not authorized:
+    return auth_error
+  return jsonify({"diagnostics": build_system_diagnostics_payload()})
+
+
 @app.get("/api/admin/clinics")
 def admin_clinics():
   admin, auth_error = require_superadmin()
@@ -8094,58 +12509,78 @@ def admin_clinics():
   except ValueError:
     limit = 100
   limit = max(1, min(limit, 250))
-
-  pattern = f"%{search_query}%"
+  before_id = None
+  if request.args.get("before"):
+    try:
+      before_id = int(str(request.args.get("before")).strip())
+    except ValueError:
+      return jsonify({"error": "Ungültiger Cursor."}), 400
+
+  conditions = []
+  params: list = []
+  if search_query:
+    # Postgres serves these LIKEs from the pg_trgm indexes (see ensure_admin_clinic_search_indexes).
+    pattern = f"%{escape_like_pattern(search_query)}%"
+    conditions.append(
+      """
+      (
+        LOWER(c.name) LIKE ? ESCAPE '\\'
+        OR LOWER(c.website) LIKE ? ESCAPE '\\'
+        OR c.id IN (
+          SELECT o.clinic_id
+          FROM users o
+          WHERE o.role = 'owner' AND LOWER(o.email) LIKE ? ESCAPE '\\'
+        )
+      )
+      """
+    )
+    params.extend([pattern, pattern, pattern])
+  if before_id is not None:
+    conditions.append("c.id < ?")
+    params.append(before_id)
+  where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
   with get_db() as conn:
+    # Page first (keyset on id), then one grouped pass over the members of just those clinics.
     rows = conn.execute(
-      """
+      f"""
+      WITH page AS (
+        SELECT c.id, c.name, c.website, c.brand_color, c.accent_color, c.subscription_status, c.created_at
+        FROM clinics c
+        {where_clause}
+        ORDER BY c.id DESC
+        LIMIT ?
+      ),
+      member_stats AS (
+        SELECT
+          u.clinic_id,
+          COUNT(*) AS members_count,
+          SUM(CASE WHEN u.role = 'owner' THEN 1 ELSE 0 END) AS owners_count,
+          SUM(CASE WHEN u.role = 'staff' THEN 1 ELSE 0 END) AS staff_count,
+          MIN(CASE WHEN u.role = 'owner' THEN u.id END) AS owner_user_id
+        FROM users u
+        WHERE u.clinic_id IN (SELECT id FROM page)
+        GROUP BY u.clinic_id
+      )
       SELECT
-        c.id,
-        c.name,
-        c.website,
-        c.brand_color,
-        c.accent_color,
-        c.subscription_status,
-        c.created_at,
-        (
-          SELECT COUNT(*)
-          FROM users u
-          WHERE u.clinic_id = c.id
-        ) AS members_count,
-        (
-          SELECT COUNT(*)
-          FROM users u
-          WHERE u.clinic_id = c.id AND u.role = 'owner'
-        ) AS owners_count,
-        (
-          SELECT COUNT(*)
-          FROM users u
-          WHERE u.clinic_id = c.id AND u.role = 'staff'
-        ) AS staff_count,
-        (
-          SELECT u.email
-          FROM users u
-          WHERE u.clinic_id = c.id AND u.role = 'owner'
-          ORDER BY u.id ASC
-          LIMIT 1
-        ) AS owner_email
-      FROM clinics c
-      WHERE
-        (? = '')
-        OR LOWER(c.name) LIKE ?
-        OR LOWER(c.website) LIKE ?
-        OR EXISTS (
-          SELECT 1
-          FROM users u
-          WHERE u.clinic_id = c.id AND LOWER(u.email) LIKE ?
-        )
-      ORDER BY c.id DESC
-      LIMIT ?
+        page.*,
+        COALESCE(s.members_count, 0) AS members_count,
+        COALESCE(s.owners_count, 0) AS owners_count,
+        COALESCE(s.staff_count, 0) AS staff_count,
+        o.email AS owner_email
+      FROM page
+      LEFT JOIN member_stats s ON s.clinic_id = page.id
+      LEFT JOIN users o ON o.id = s.owner_user_id
+      ORDER BY page.id DESC
       """,
-      (search_query, pattern, pattern, pattern, limit),
+      (*params, limit + 1),
     ).fetchall()
 
+  next_cursor = None
+  if len(rows) > limit:
+    rows = rows[:limit]
+    next_cursor = str(rows[-1]["id"])
+
   clinics = []
   for row in rows:
     clinics.append(
@@ -8157,14 +12592,14 @@ def admin_clinics():
         "accentColor": row["accent_color"],
         "subscriptionStatus": row["subscription_status"],
         "createdAt": row["created_at"],
-        "membersCount": row["members_count"],
-        "ownersCount": row["owners_count"],
-        "staffCount": row["staff_count"],
+        "membersCount": int(row["members_count"] or 0),
+        "ownersCount": int(row["owners_count"] or 0),
+        "staffCount": int(row["staff_count"] or 0),
         "ownerEmail": row["owner_email"],
       }
     )
 
-  return jsonify({"clinics": clinics})
+  return jsonify({"clinics": clinics, "nextCursor": next_cursor})
 
 
 @app.get("/api/admin/clinics/<int:clinic_id>")
@@ -8818,7 +13253,9 @@ def mobile_auth_otp_verify():
         attempt_count,
         max_attempts,
         expires_at,
-        verified_at
+        verified_at,
+        delivery_status,
+        delivery_error
       FROM mobile_phone_otps
       WHERE clinic_id = ? AND phone_e164 = ? AND request_id = ?
       LIMIT 1
@@ -8883,6 +13320,7 @@ def mobile_auth_otp_verify():
           "Code ungültig.",
           "OTP_INVALID",
           attemptsRemaining=remaining,
+          **serialize_mobile_otp_delivery(otp_row),
         )
       ), 401
 
@@ -8892,7 +13330,7 @@ def mobile_auth_otp_verify():
       SET verified_at = ?
       WHERE id = ?
       """,
-      (utc_now_iso(), otp_row["id"]),
+      (utc_now(), otp_row["id"]),
     )
 
   member_email = mobile_member_email_for_phone(clinic_id, phone_e164)
@@ -8905,6 +13343,49 @@ def mobile_auth_otp_verify():
       "clinicName": str(clinic_row["name"] or clinic_name),
       "phone": phone_e164,
       "isGuest": False,
+      **serialize_mobile_otp_delivery(otp_row),
+    }
+  )
+
+
+@app.get("/api/mobile/auth/otp/status")
+def mobile_auth_otp_status():
+  clinic_row, clinic_name = resolve_mobile_clinic_from_payload(request.args)
+  phone_e164 = sanitize_phone_e164(request.args.get("phone"))
+  request_id = str(request.args.get("requestId", "")).strip()
+
+  if clinic_row is None and len(clinic_name) < 2 and not request.args.get("clinicId"):
+    return jsonify({"error": "clinicName oder clinicId ist erforderlich."}), 400
+  if not phone_e164 or len(request_id) < 8:
+    return jsonify({"error": "phone und requestId sind erforderlich."}), 400
+  if not clinic_row:
+    return jsonify({"error": "MedSpa nicht gefunden."}), 404
+
+  with get_db() as conn:
+    otp_row = conn.execute(
+      """
+      SELECT request_id, expires_at, verified_at, delivery_status, delivery_error
+      FROM mobile_phone_otps
+      WHERE clinic_id = ? AND phone_e164 = ? AND request_id = ?
+      LIMIT 1
+      """,
+      (int(clinic_row["id"]), phone_e164, request_id),
+    ).fetchone()
+  if not otp_row:
+    return jsonify(
+      mobile_otp_error_payload(
+        "Kein OTP-Request gefunden. Bitte fordere einen neuen Code an.",
+        "OTP_REQUEST_NOT_FOUND",
+      )
+    ), 404
+
+  return jsonify(
+    {
+      "success": True,
+      "requestId": otp_row["request_id"],
+      "expiresAt": otp_row["expires_at"],
+      "verified": bool(otp_row["verified_at"]),
+      **serialize_mobile_otp_delivery(otp_row),
     }
   )
 
@@ -9165,12 +13646,14 @@ def mobile_reschedule_appointment(appointment_id: int):
   if not clinic_row:
     return jsonify({"error": "Klinik nicht gefunden."}), 404
 
-  appointment_row = reschedule_patient_appointment(
+  appointment_row, conflict_error = reschedule_patient_appointment(
     clinic_id=int(clinic_row["id"]),
     patient_email=patient_email,
     appointment_id=appointment_id,
     starts_at=starts_at,
   )
+  if conflict_error:
+    return jsonify({"error": conflict_error}), 409
   if not appointment_row:
     return jsonify({"error": "Termin nicht gefunden oder Zeit ungültig."}), 404
 
@@ -9316,9 +13799,7 @@ def resolve_mobile_checkout_request(payload: dict):
     ends_at = normalize_optional_datetime_value(entry.get("endsAt"))
     duration_minutes = max(0, min(int(treatment.get("durationMinutes") or 0), 600))
     if starts_at and not ends_at and duration_minutes > 0:
-      parsed_start = parse_datetime_utc(starts_at)
-      if parsed_start:
-        ends_at = (parsed_start + timedelta(minutes=duration_minutes)).isoformat()
+      ends_at = starts_at + timedelta(minutes=duration_minutes)
     line_items.append(
       {
         "treatmentId": treatment_id,
@@ -9328,8 +13809,8 @@ def resolve_mobile_checkout_request(payload: dict):
         "totalCents": line_total_cents,
         "priceSource": pricing["priceSource"],
         "durationMinutes": duration_minutes,
-        "startsAt": starts_at,
-        "endsAt": ends_at,
+        "startsAt": starts_at.isoformat() if starts_at else None,
+        "endsAt": ends_at.isoformat() if ends_at else None,
         "notes": str(entry.get("notes") or "").strip(),
         "appointmentStatus": str(entry.get("appointmentStatus") or "").strip(),
       }
@@ -9500,6 +13981,7 @@ def create_patient_checkout_session_record(checkout_data: dict, order_id: str, s
         stripe_session_id,
         stripe_payment_intent_id,
         patient_email,
+        patient_email_canonical,
         patient_name,
         analytics_session_id,
         payment_method,
@@ -9510,11 +13992,12 @@ def create_patient_checkout_session_record(checkout_data: dict, order_id: str, s
         line_items_json,
         updated_at
       )
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
       ON CONFLICT(order_id) DO UPDATE SET
         stripe_session_id = excluded.stripe_session_id,
         stripe_payment_intent_id = excluded.stripe_payment_intent_id,
         patient_email = excluded.patient_email,
+        patient_email_canonical = excluded.patient_email_canonical,
         patient_name = excluded.patient_name,
         analytics_session_id = excluded.analytics_session_id,
         payment_method = excluded.payment_method,
@@ -9532,6 +14015,7 @@ def create_patient_checkout_session_record(checkout_data: dict, order_id: str, s
         str(stripe_session.get("id") or ""),
         str(stripe_session.get("payment_intent") or ""),
         checkout_data["patientEmail"],
+        sanitize_patient_email(checkout_data["patientEmail"]),
         checkout_data["patientName"],
         checkout_data["analyticsSessionId"],
         checkout_data["paymentMethod"],
@@ -9540,9 +14024,17 @@ def create_patient_checkout_session_record(checkout_data: dict, order_id: str, s
         "eur",
         int(checkout_data["totalCents"] or 0),
         serialize_json_list(checkout_data["lineItems"]),
-        utc_now_iso(),
+        utc_now(),
       ),
     )
+    sync_clinic_ledger_entries(conn, "checkout", ["src.order_id = ?"], (order_id,))
+    upsert_patient_directory_entry(
+      conn,
+      int(checkout_data["clinicRow"]["id"]),
+      email=checkout_data["patientEmail"],
+      name=checkout_data["patientName"],
+      source="checkout",
+    )
 
 
 def get_patient_checkout_session_row(stripe_session_id: str):
@@ -9591,7 +14083,7 @@ def update_patient_checkout_session_state(
   safe_session_id = str(stripe_session_id or "").strip()
   if not safe_session_id:
     return
-  now_iso = utc_now_iso()
+  now = utc_now()
   with get_db() as conn:
     conn.execute(
       """
@@ -9608,12 +14100,13 @@ def update_patient_checkout_session_state(
         normalize_patient_payment_status(payment_status, "pending") if payment_status is not None else None,
         str(checkout_status or "").strip() or None,
         str(stripe_payment_intent_id or "").strip() or None,
-        now_iso,
+        now,
         1 if finalized else 0,
-        now_iso,
+        now,
         safe_session_id,
       ),
     )
+    sync_clinic_ledger_entries(conn, "checkout", ["src.stripe_session_id = ?"], (safe_session_id,))
 
 
 def resolve_payment_status_from_checkout_session(session_object: dict, fallback: str = "pending") -> str:
@@ -10196,19 +14689,103 @@ def import_clinic_catalog():
     },
   )
 
-  return jsonify(
-    {
+  return jsonify(
+    {
+      "success": True,
+      "catalog": {
+        "categories": categories,
+        "treatments": treatments,
+        "memberships": memberships,
+        "rewardActions": reward_actions,
+        "rewardRedeems": reward_redeems,
+        "homeArticles": home_articles,
+      },
+    }
+  )
+
+
+def adopt_imported_clinic_branding(conn: DBConnectionAdapter, clinic_row, branding: dict, adopt: dict) -> None:
+  brand_color = safe_public_text(clinic_row["brand_color"], "#8A5A2F")
+  accent_color = safe_public_text(clinic_row["accent_color"], "#EB6C13")
+  font_family = safe_public_text(clinic_row["font_family"], "Manrope, sans-serif")
+  suggested_brand_color = to_hex_color(branding.get("brandColor", ""), "")
+  suggested_accent_color = to_hex_color(branding.get("accentColor", ""), "")
+  suggested_font_family = safe_public_text(branding.get("fontFamily"))
+  if adopt.get("brandColor") and suggested_brand_color:
+    brand_color = suggested_brand_color
+  if adopt.get("accentColor") and suggested_accent_color:
+    accent_color = suggested_accent_color
+  if adopt.get("fontFamily") and suggested_font_family:
+    font_family = suggested_font_family
+
+  clinic_id = int(clinic_row["id"])
+  conn.execute(
+    "UPDATE clinics SET brand_color = ?, accent_color = ?, font_family = ? WHERE id = ?",
+    (brand_color, accent_color, font_family, clinic_id),
+  )
+  # Keep mirrored user fields in sync for existing clients.
+  conn.execute(
+    "UPDATE users SET brand_color = ?, accent_color = ?, font_family = ? WHERE clinic_id = ?",
+    (brand_color, accent_color, font_family, clinic_id),
+  )
+
+
+def run_catalog_website_import(
+  clinic_id: int,
+  actor_user_id: int | None,
+  on_progress=None,
+  adopt_branding: dict | None = None,
+) -> dict:
+  clinic_row = get_clinic_row_by_id(clinic_id)
+  if not clinic_row:
+    raise RuntimeError("Klinik nicht gefunden.")
+
+  website = normalize_url(safe_public_text(clinic_row["website"]))
+  if not website:
+    raise RuntimeError("Bitte zuerst eine Klinik-Website in den Einstellungen speichern.")
+
+  import_bundle = collect_import_bundle_from_website(website, on_progress=on_progress)
+  if on_progress is not None:
+    on_progress(import_bundle_progress("saving", import_bundle))
+
+  with get_db() as conn:
+    extracted = import_bundle["extracted"]
+    replace_clinic_import_services(conn, clinic_id, extracted.get("services", []), extracted.get("prices", []))
+    updated_catalog = apply_imported_services_to_clinic_catalog(conn, clinic_id, str(clinic_row["name"]), extracted)
+    if adopt_branding:
+      adopt_imported_clinic_branding(conn, clinic_row, import_bundle["branding"], adopt_branding)
+
+  create_audit_log(
+    clinic_id=clinic_id,
+    actor_user_id=actor_user_id,
+    action="catalog.imported_from_website",
+    entity_type="catalog",
+    entity_id=str(clinic_id),
+    metadata={
+      "website": website,
+      "pagesFetched": int(import_bundle["crawlResult"]["pages_fetched"]),
+      "pagesAttempted": int(import_bundle["crawlResult"]["pages_attempted"]),
+      "treatments": len(updated_catalog.get("treatments", [])),
+    },
+  )
+
+  return {
+    "success": True,
+    "catalog": updated_catalog,
+    "websiteSync": {
       "success": True,
-      "catalog": {
-        "categories": categories,
-        "treatments": treatments,
-        "memberships": memberships,
-        "rewardActions": reward_actions,
-        "rewardRedeems": reward_redeems,
-        "homeArticles": home_articles,
+      "importMode": str(import_bundle["crawlResult"].get("fetch_mode") or "direct"),
+      "pagesFetched": int(import_bundle["crawlResult"]["pages_fetched"]),
+      "pagesAttempted": int(import_bundle["crawlResult"]["pages_attempted"]),
+      "pagesCached": int(import_bundle["crawlResult"].get("pages_cached") or 0),
+      "importedTreatments": len(updated_catalog.get("treatments", [])),
+      "suggestedBranding": {
+        "brandColor": safe_public_text(import_bundle["branding"].get("brandColor")),
+        "accentColor": safe_public_text(import_bundle["branding"].get("accentColor")),
+        "fontFamily": safe_public_text(import_bundle["branding"].get("fontFamily")),
       },
-    }
-  )
+    },
+  }
 
 
 @app.post("/api/clinic/catalog/import-from-website")
@@ -10228,51 +14805,35 @@ def import_clinic_catalog_from_website():
   website = normalize_url(safe_public_text(clinic_row["website"]))
   if not website:
     return jsonify({"error": "Bitte zuerst eine Klinik-Website in den Einstellungen speichern."}), 400
-
   try:
-    import_bundle = collect_import_bundle_from_website(website)
+    resolve_import_target(website)
   except ValueError as exc:
     return jsonify({"error": str(exc)}), 400
-  except RuntimeError as exc:
-    return jsonify({"error": str(exc)}), 502
-
-  with get_db() as conn:
-    extracted = import_bundle["extracted"]
-    replace_clinic_import_services(conn, clinic_id, extracted.get("services", []), extracted.get("prices", []))
-    updated_catalog = apply_imported_services_to_clinic_catalog(conn, clinic_id, str(clinic_row["name"]), extracted)
-
-  create_audit_log(
-    clinic_id=clinic_id,
-    actor_user_id=int(user_row["id"]),
-    action="catalog.imported_from_website",
-    entity_type="catalog",
-    entity_id=str(clinic_id),
-    metadata={
-      "website": website,
-      "pagesFetched": int(import_bundle["crawlResult"]["pages_fetched"]),
-      "pagesAttempted": int(import_bundle["crawlResult"]["pages_attempted"]),
-      "treatments": len(updated_catalog.get("treatments", [])),
-    },
-  )
 
+  try:
+    job_id = enqueue_background_job(
+      "import.catalog_website",
+      {"clinicId": clinic_id, "actorUserId": int(user_row["id"]), "website": website},
+      clinic_id=clinic_id,
+      dedupe_key=f"import.catalog_website:{clinic_id}",
+      max_attempts=1,
+      replace_queued=True,
+    )
+  except BackgroundJobConflict as exc:
+    return jsonify(
+      {
+        "error": "Es läuft bereits ein Website-Import mit anderen Einstellungen. Bitte warte, bis er abgeschlossen ist.",
+        "job": {"id": exc.job_id, "status": "running"},
+      }
+    ), 409
+  job_row = load_background_job_row(job_id, clinic_id)
   return jsonify(
     {
       "success": True,
-      "catalog": updated_catalog,
-      "websiteSync": {
-        "success": True,
-        "importMode": str(import_bundle["crawlResult"].get("fetch_mode") or "direct"),
-        "pagesFetched": int(import_bundle["crawlResult"]["pages_fetched"]),
-        "pagesAttempted": int(import_bundle["crawlResult"]["pages_attempted"]),
-        "importedTreatments": len(updated_catalog.get("treatments", [])),
-        "suggestedBranding": {
-          "brandColor": safe_public_text(import_bundle["branding"].get("brandColor")),
-          "accentColor": safe_public_text(import_bundle["branding"].get("accentColor")),
-          "fontFamily": safe_public_text(import_bundle["branding"].get("fontFamily")),
-        },
-      },
+      "queued": True,
+      "job": serialize_background_job_row(job_row) if job_row else {"id": job_id},
     }
-  )
+  ), 202
 
 
 @app.post("/api/clinic/catalog/auto-gallery")
@@ -10375,6 +14936,8 @@ def clinic_campaigns():
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -10385,9 +14948,14 @@ def clinic_campaigns():
       (clinic_id,),
     ).fetchall()
 
+  delivery_stats = load_campaign_delivery_stats(clinic_id)
+  empty_stats = {"sent": 0, "failed": 0, "skipped": 0, "lastError": "", "lastErrorAt": None, "byChannel": {}}
   return jsonify(
     {
-      "campaigns": [serialize_campaign_row(row) for row in rows],
+      "campaigns": [
+        {**serialize_campaign_row(row), "deliveryStats": delivery_stats.get(int(row["id"]), empty_stats)}
+        for row in rows
+      ],
       "options": {
         "triggers": sorted(CAMPAIGN_TRIGGER_CHOICES),
         "channels": sorted(CAMPAIGN_CHANNEL_CHOICES),
@@ -10468,6 +15036,8 @@ def create_clinic_campaign():
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -10519,6 +15089,8 @@ def update_clinic_campaign(campaign_id: int):
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -10558,6 +15130,7 @@ def update_clinic_campaign(campaign_id: int):
         template_title = ?,
         template_body = ?,
         points_bonus = ?,
+        failed_runs = CASE WHEN ? = 'active' AND status <> 'active' THEN 0 ELSE failed_runs END,
         updated_at = CURRENT_TIMESTAMP
       WHERE id = ? AND clinic_id = ?
       """,
@@ -10569,6 +15142,7 @@ def update_clinic_campaign(campaign_id: int):
         template_title,
         template_body,
         points_bonus,
+        status,
         campaign_id,
         clinic_id,
       ),
@@ -10589,6 +15163,8 @@ def update_clinic_campaign(campaign_id: int):
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -10638,6 +15214,8 @@ def run_clinic_campaign(campaign_id: int):
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
@@ -10650,55 +15228,39 @@ def run_clinic_campaign(campaign_id: int):
     if not campaign_row:
       return jsonify({"error": "Kampagne nicht gefunden."}), 404
 
-  run_result = run_campaign_once(
-    campaign_row=campaign_row,
+  job_id = enqueue_campaign_run(
+    campaign_row,
     actor_user_id=int(user_row["id"]),
     event_source="clinic_dashboard",
+    due_only=False,
   )
+  job_row = load_background_job_row(job_id, clinic_id)
   return jsonify(
     {
       "success": True,
-      "campaign": run_result["campaign"],
-      "run": run_result["run"],
+      "queued": True,
+      "campaign": serialize_campaign_row(campaign_row),
+      "job": serialize_background_job_row(job_row) if job_row else {"id": job_id},
     }
-  )
+  ), 202
 
 
-def list_due_campaign_rows(clinic_id: int | None, limit: int) -> list:
+def list_due_campaign_rows(clinic_id: int | None, limit: int, after: tuple[datetime, int] | None = None) -> list:
+  """Active campaigns whose next_run_at has passed, oldest first.
+  `after` is a (next_run_at, id) keyset cursor for paging through large backlogs."""
   safe_limit = max(1, min(int(limit), 300))
-  now_iso = utc_now_iso()
+  conditions = ["status = 'active'", "next_run_at IS NOT NULL", "next_run_at <= ?"]
+  params: list = [utc_now()]
+  if clinic_id is not None:
+    conditions.insert(0, "clinic_id = ?")
+    params.insert(0, clinic_id)
+  if after is not None:
+    conditions.append("(next_run_at > ? OR (next_run_at = ? AND id > ?))")
+    params.extend([after[0], after[0], int(after[1])])
+  params.append(safe_limit)
   with get_db() as conn:
-    if clinic_id is None:
-      return conn.execute(
-        """
-        SELECT
-          id,
-          clinic_id,
-          name,
-          trigger_type,
-          channel,
-          status,
-          template_title,
-          template_body,
-          points_bonus,
-          last_run_at,
-          next_run_at,
-          total_runs,
-          total_audience,
-          created_by_user_id,
-          created_at,
-          updated_at
-        FROM clinic_campaigns
-        WHERE status = 'active'
-          AND next_run_at IS NOT NULL
-          AND next_run_at <= ?
-        ORDER BY next_run_at ASC, id ASC
-        LIMIT ?
-        """,
-        (now_iso, safe_limit),
-      ).fetchall()
     return conn.execute(
-      """
+      f"""
       SELECT
         id,
         clinic_id,
@@ -10713,18 +15275,17 @@ def list_due_campaign_rows(clinic_id: int | None, limit: int) -> list:
         next_run_at,
         total_runs,
         total_audience,
+        failed_runs,
+        last_error,
         created_by_user_id,
         created_at,
         updated_at
       FROM clinic_campaigns
-      WHERE clinic_id = ?
-        AND status = 'active'
-        AND next_run_at IS NOT NULL
-        AND next_run_at <= ?
+      WHERE {" AND ".join(conditions)}
       ORDER BY next_run_at ASC, id ASC
       LIMIT ?
       """,
-      (clinic_id, now_iso, safe_limit),
+      tuple(params),
     ).fetchall()
 
 
@@ -10746,39 +15307,28 @@ def run_due_campaigns_for_clinic():
 
   results = []
   for row in due_rows:
-    run_result = run_campaign_once(
-      campaign_row=row,
+    job_id = enqueue_campaign_run(
+      row,
       actor_user_id=int(user_row["id"]),
       event_source="clinic_dashboard",
+      due_only=True,
     )
-    results.append(
-      {
-        "campaign": run_result["campaign"],
-        "run": run_result["run"],
-      }
-    )
+    results.append({"campaign": serialize_campaign_row(row), "jobId": job_id})
 
   return jsonify(
     {
       "success": True,
-      "executed": len(results),
+      "queued": len(results),
       "runs": results,
     }
-  )
+  ), 202
 
 
 @app.post("/api/system/campaigns/run-due")
 def run_due_campaigns_system():
-  if not AUTOMATION_RUNNER_SECRET:
-    return jsonify({"error": "AUTOMATION_RUNNER_SECRET ist nicht konfiguriert."}), 503
-
-  provided_secret = str(
-    request.headers.get("X-Automation-Secret")
-    or request.args.get("secret")
-    or ""
-  ).strip()
-  if not hmac.compare_digest(provided_secret, AUTOMATION_RUNNER_SECRET):
-    return jsonify({"error": "Nicht autorisiert."}), 401
+  authorized, auth_error = require_automation_secret()
+  if not authorized:
+    return auth_error
 
   try:
     limit = int(request.args.get("limit", "100"))
@@ -10788,26 +15338,38 @@ def run_due_campaigns_system():
 
   results = []
   for row in due_rows:
-    run_result = run_campaign_once(
-      campaign_row=row,
+    job_id = enqueue_campaign_run(
+      row,
       actor_user_id=None,
       event_source="system_automation",
+      due_only=True,
     )
-    results.append(
-      {
-        "campaign": run_result["campaign"],
-        "run": run_result["run"],
-      }
-    )
+    results.append({"campaign": serialize_campaign_row(row), "jobId": job_id})
 
   return jsonify(
     {
       "success": True,
-      "executed": len(results),
+      "queued": len(results),
       "runs": results,
       "fetchedAt": utc_now_iso(),
     }
-  )
+  ), 202
+
+
+@app.get("/api/clinic/jobs/<int:job_id>")
+def clinic_background_job(job_id: int):
+  user_row, auth_error = require_auth_row()
+  if not user_row:
+    return auth_error
+
+  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
+  if clinic_id is None:
+    return jsonify({"error": "Klinikzuordnung fehlt."}), 400
+
+  job_row = load_background_job_row(job_id, clinic_id)
+  if not job_row:
+    return jsonify({"error": "Job nicht gefunden."}), 404
+  return jsonify({"job": serialize_background_job_row(job_row)})
 
 
 @app.get("/api/clinic/campaigns/<int:campaign_id>/deliveries")
@@ -10826,6 +15388,18 @@ def clinic_campaign_deliveries(campaign_id: int):
     limit = 120
   safe_limit = max(1, min(limit, 500))
 
+  # Keyset cursor "<created_at>|<id>" from the previous page's nextCursor.
+  raw_created_at, _, cursor_id_raw = str(request.args.get("before", "")).strip().rpartition("|")
+  cursor_created_at = parse_datetime_utc(raw_created_at)
+  cursor_id = None
+  if raw_created_at:
+    try:
+      cursor_id = int(cursor_id_raw)
+    except ValueError:
+      cursor_id = None
+    if cursor_created_at is None or cursor_id is None:
+      return jsonify({"error": "Ungültiger Cursor."}), 400
+
   with get_db() as conn:
     campaign_row = conn.execute(
       """
@@ -10839,8 +15413,14 @@ def clinic_campaign_deliveries(campaign_id: int):
     if not campaign_row:
       return jsonify({"error": "Kampagne nicht gefunden."}), 404
 
+    keyset_condition = ""
+    params: list = [campaign_id, clinic_id]
+    if cursor_id is not None:
+      keyset_condition = "AND (created_at < ? OR (created_at = ? AND id < ?))"
+      params.extend([cursor_created_at, cursor_created_at, cursor_id])
+    params.append(safe_limit + 1)
     rows = conn.execute(
-      """
+      f"""
       SELECT
         id,
         clinic_id,
@@ -10848,18 +15428,22 @@ def clinic_campaign_deliveries(campaign_id: int):
         recipient_key,
         channel,
         status,
+        run_id,
         provider_message_id,
         error_message,
         metadata_json,
         created_at
       FROM campaign_deliveries
-      WHERE clinic_id = ? AND campaign_id = ?
-      ORDER BY id DESC
+      WHERE campaign_id = ? AND clinic_id = ?
+        {keyset_condition}
+      ORDER BY created_at DESC, id DESC
       LIMIT ?
       """,
-      (clinic_id, campaign_id, safe_limit),
+      tuple(params),
     ).fetchall()
 
+  has_more = len(rows) > safe_limit
+  rows = rows[:safe_limit]
   deliveries = []
   for row in rows:
     deliveries.append(
@@ -10867,6 +15451,7 @@ def clinic_campaign_deliveries(campaign_id: int):
         "id": row["id"],
         "clinicId": row["clinic_id"],
         "campaignId": row["campaign_id"],
+        "runId": row["run_id"],
         "recipientKey": row["recipient_key"],
         "channel": row["channel"],
         "status": row["status"],
@@ -10877,7 +15462,93 @@ def clinic_campaign_deliveries(campaign_id: int):
       }
     )
 
-  return jsonify({"deliveries": deliveries})
+  stats = load_campaign_delivery_stats(clinic_id, [campaign_id]).get(campaign_id)
+  return jsonify(
+    {
+      "deliveries": deliveries,
+      "stats": stats or {"sent": 0, "failed": 0, "skipped": 0, "lastError": "", "lastErrorAt": None, "byChannel": {}},
+      "nextCursor": f"{format_db_timestamp(rows[-1]['created_at'])}|{rows[-1]['id']}" if has_more else None,
+    }
+  )
+
+
+def refresh_campaign_audience_snapshot(clinic_id: int, campaign_id: int, trigger_type: str):
+  members: dict[str, tuple] = {}
+  for profile in resolve_campaign_recipients(clinic_id, trigger_type):
+    recipient_key = str(profile.get("key") or profile.get("email") or profile.get("externalUserId") or "").strip()[:180]
+    if not recipient_key or recipient_key in members:
+      continue
+    members[recipient_key] = (
+      campaign_id,
+      recipient_key,
+      safe_public_text(profile.get("name"))[:120],
+      safe_public_text(profile.get("email"))[:180],
+      str(profile.get("phone") or "").strip()[:40],
+      str(profile.get("externalUserId") or "").strip()[:180],
+    )
+
+  with get_db() as conn:
+    # The snapshot upsert goes first: it locks the campaign's snapshot row until commit, so a
+    # concurrent refresh waits here instead of interleaving its member DELETE/INSERT with ours.
+    snapshot_row = conn.execute(
+      """
+      INSERT INTO campaign_audience_snapshots (
+        campaign_id, clinic_id, trigger_type, total_count, email_count, phone_count, push_count, refreshed_at, expires_at_ms
+      )
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (campaign_id) DO UPDATE SET
+        trigger_type = excluded.trigger_type,
+        total_count = excluded.total_count,
+        email_count = excluded.email_count,
+        phone_count = excluded.phone_count,
+        push_count = excluded.push_count,
+        refreshed_at = excluded.refreshed_at,
+        expires_at_ms = excluded.expires_at_ms
+      RETURNING *
+      """,
+      (
+        campaign_id,
+        clinic_id,
+        trigger_type,
+        len(members),
+        sum(1 for member in members.values() if member[3]),
+        sum(1 for member in members.values() if member[4]),
+        sum(1 for member in members.values() if member[5]),
+        utc_now(),
+        utc_now_ms() + CAMPAIGN_AUDIENCE_SNAPSHOT_TTL_SECONDS * 1000,
+      ),
+    ).fetchone()
+    conn.execute("DELETE FROM campaign_audience_members WHERE campaign_id = ?", (campaign_id,))
+    conn.executemany(
+      """
+      INSERT INTO campaign_audience_members (campaign_id, recipient_key, name, email, phone, external_user_id)
+      VALUES (?, ?, ?, ?, ?, ?)
+      ON CONFLICT (campaign_id, recipient_key) DO NOTHING
+      """,
+      list(members.values()),
+    )
+  return snapshot_row
+
+
+def load_campaign_audience_snapshot(clinic_id: int, campaign_id: int, trigger_type: str, refresh: bool = False):
+  """The campaign's materialized audience. Missing, built for another trigger or explicitly
+  requested: rebuilt inline. Expired: served as-is while a deduped refresh job rebuilds it."""
+  if not refresh:
+    with get_db() as conn:
+      snapshot_row = conn.execute(
+        "SELECT * FROM campaign_audience_snapshots WHERE campaign_id = ? AND clinic_id = ?",
+        (campaign_id, clinic_id),
+      ).fetchone()
+    if snapshot_row and str(snapshot_row["trigger_type"]) == trigger_type:
+      if int(snapshot_row["expires_at_ms"]) <= utc_now_ms():
+        enqueue_background_job(
+          "campaign_audience.refresh",
+          {"clinicId": clinic_id, "campaignId": campaign_id},
+          clinic_id=clinic_id,
+          dedupe_key=f"campaign_audience.refresh:{campaign_id}",
+        )
+      return snapshot_row
+  return refresh_campaign_audience_snapshot(clinic_id, campaign_id, trigger_type)
 
 
 @app.get("/api/clinic/campaigns/<int:campaign_id>/audience")
@@ -10897,15 +15568,50 @@ def clinic_campaign_audience(campaign_id):
     ).fetchone()
   if not row:
     return jsonify({"error": "Kampagne nicht gefunden."}), 404
-  recipients = resolve_campaign_recipients(clinic_id, safe_row_value(row, "trigger_type") or "broadcast")
+
+  try:
+    limit = max(1, min(int(request.args.get("limit", "100")), 500))
+  except ValueError:
+    limit = 100
+  after = str(request.args.get("after", "")).strip()
+  refresh = str(request.args.get("refresh", "")).lower() in {"1", "true", "yes"}
+  trigger_type = normalize_campaign_trigger(safe_row_value(row, "trigger_type") or "broadcast", "broadcast")
+  snapshot_row = load_campaign_audience_snapshot(clinic_id, campaign_id, trigger_type, refresh=refresh)
+
+  with get_db() as conn:
+    member_rows = conn.execute(
+      """
+      SELECT recipient_key, name, email
+      FROM campaign_audience_members
+      WHERE campaign_id = ? AND recipient_key > ?
+      ORDER BY recipient_key ASC
+      LIMIT ?
+      """,
+      (campaign_id, after, limit + 1),
+    ).fetchall()
+
+  has_more = len(member_rows) > limit
+  member_rows = member_rows[:limit]
   out = [
     {
-      "name": safe_public_text(profile.get("name")) or (safe_public_text(profile.get("email")).split("@")[0] or "Gast"),
-      "email": safe_public_text(profile.get("email")),
+      "name": member["name"] or (str(member["email"]).split("@")[0] or "Gast"),
+      "email": member["email"],
     }
-    for profile in recipients
+    for member in member_rows
   ]
-  return jsonify({"count": len(out), "recipients": out[:100]})
+  return jsonify(
+    {
+      "count": int(snapshot_row["total_count"]),
+      "reachability": {
+        "email": int(snapshot_row["email_count"]),
+        "phone": int(snapshot_row["phone_count"]),
+        "push": int(snapshot_row["push_count"]),
+      },
+      "recipients": out,
+      "nextCursor": member_rows[-1]["recipient_key"] if has_more else None,
+      "snapshotAt": snapshot_row["refreshed_at"],
+    }
+  )
 
 
 @app.get("/api/clinic/audit-logs")
@@ -11060,12 +15766,31 @@ def clinic_calendar_feed(token: str):
     ).fetchone()
   if not row:
     return ("Not found", 404)
-  ics = build_clinic_ical(int(row["id"]), str(row["name"] or "Klinik"))
-  return app.response_class(
-    ics,
-    mimetype="text/calendar",
-    headers={"Content-Disposition": "inline; filename=curabo.ics", "Cache-Control": "no-cache"},
-  )
+
+  clinic_id = int(row["id"])
+  clinic_name = str(row["name"] or "Klinik")
+  window_start = clinic_ical_window_start()
+  last_updated_at, event_count = load_clinic_ical_version(clinic_id, window_start)
+  last_modified = max(last_updated_at or window_start, window_start).replace(microsecond=0)
+  etag = hashlib.sha256(
+    f"{clinic_id}|{clinic_name}|{window_start.date().isoformat()}|{last_updated_at.isoformat() if last_updated_at else ''}|{event_count}".encode("utf-8")
+  ).hexdigest()[:32]
+  headers = {"Content-Disposition": "inline; filename=curabo.ics", "Cache-Control": "no-cache"}
+
+  if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+    response = app.response_class(status=304, headers=headers)
+  else:
+    body = CLINIC_ICAL_FEEDS.get(clinic_id, etag)
+    if body is None and event_count <= CALENDAR_FEED_STREAM_THRESHOLD:
+      body = build_clinic_ical(clinic_id, clinic_name, window_start).encode("utf-8")
+      CLINIC_ICAL_FEEDS.put(clinic_id, etag, body)
+    if body is None:
+      # Large feeds are streamed straight from a DB cursor instead of being cached in memory.
+      body = iter_clinic_ical(clinic_id, clinic_name, window_start)
+    response = app.response_class(body, mimetype="text/calendar", headers=headers)
+  response.set_etag(etag)
+  response.last_modified = last_modified
+  return response
 
 
 @app.get("/api/clinic/settings")
@@ -11198,24 +15923,13 @@ def update_clinic_settings():
     return jsonify({"error": "Schriftart ist zu lang."}), 400
 
   website_sync: dict | None = None
-  import_bundle: dict | None = None
+  queue_website_import = False
   if website and sync_website_catalog and not skip_website_import:
     try:
-      import_bundle = collect_import_bundle_from_website(website)
-      extracted_branding = import_bundle["branding"]
-      suggested_brand_color = to_hex_color(extracted_branding.get("brandColor", ""), "")
-      suggested_accent_color = to_hex_color(extracted_branding.get("accentColor", ""), "")
-      suggested_font_family = safe_public_text(extracted_branding.get("fontFamily"))
-      if use_website_brand_color and suggested_brand_color:
-        brand_color = suggested_brand_color
-      if use_website_accent_color and suggested_accent_color:
-        accent_color = suggested_accent_color
-      if use_website_font_family and suggested_font_family:
-        font_family = suggested_font_family
+      resolve_import_target(website)
+      queue_website_import = True
     except ValueError as exc:
       website_sync = {"success": False, "error": str(exc)}
-    except RuntimeError as exc:
-      website_sync = {"success": False, "error": str(exc)}
 
   with get_db() as conn:
     conn.execute(
@@ -11283,22 +15997,37 @@ def update_clinic_settings():
       ),
     )
 
-    if import_bundle:
-      extracted = import_bundle["extracted"]
-      replace_clinic_import_services(conn, clinic_id, extracted.get("services", []), extracted.get("prices", []))
-      updated_catalog = apply_imported_services_to_clinic_catalog(conn, clinic_id, clinic_name, extracted)
-      website_sync = {
-        "success": True,
-        "importMode": str(import_bundle["crawlResult"].get("fetch_mode") or "direct"),
-        "pagesFetched": int(import_bundle["crawlResult"]["pages_fetched"]),
-        "pagesAttempted": int(import_bundle["crawlResult"]["pages_attempted"]),
-        "importedTreatments": len(updated_catalog.get("treatments", [])),
-        "suggestedBranding": {
-          "brandColor": safe_public_text(import_bundle["branding"].get("brandColor")),
-          "accentColor": safe_public_text(import_bundle["branding"].get("accentColor")),
-          "fontFamily": safe_public_text(import_bundle["branding"].get("fontFamily")),
-        },
-      }
+    if queue_website_import:
+      # Crawled by the job worker once the new website is committed; the dashboard polls the job.
+      try:
+        job_id = insert_background_job(
+          conn,
+          "import.catalog_website",
+          {
+            "clinicId": clinic_id,
+            "actorUserId": int(user_row["id"]),
+            "website": website,
+            "adoptBranding": {
+              "brandColor": use_website_brand_color,
+              "accentColor": use_website_accent_color,
+              "fontFamily": use_website_font_family,
+            },
+          },
+          clinic_id=clinic_id,
+          dedupe_key=f"import.catalog_website:{clinic_id}",
+          max_attempts=1,
+          replace_queued=True,
+        )
+      except BackgroundJobConflict as exc:
+        # The settings are still saved; only the new import could not be queued.
+        website_sync = {
+          "success": False,
+          "conflict": True,
+          "error": "Es läuft bereits ein Website-Import mit anderen Einstellungen. Bitte später erneut speichern.",
+          "job": {"id": exc.job_id, "status": "running"},
+        }
+      else:
+        website_sync = {"success": True, "queued": True, "job": {"id": job_id, "status": "queued"}}
 
   create_audit_log(
     clinic_id=clinic_id,
@@ -11535,20 +16264,30 @@ def clinic_appointments():
 
   clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
   if clinic_id is None:
-    return jsonify({"summary": summarize_clinic_appointments([]), "appointments": []})
+    return jsonify({"summary": summarize_clinic_appointments(None), "appointments": [], "nextCursor": None})
 
   try:
     limit = int(request.args.get("limit", "200"))
   except ValueError:
     limit = 200
 
-  rows = list_clinic_appointments(clinic_id, limit)
-  summary = summarize_clinic_appointments(rows)
+  filters, filter_error = parse_clinic_appointment_filters(request.args)
+  if filter_error:
+    return jsonify({"error": filter_error}), 400
+  cursor = None
+  if request.args.get("cursor"):
+    cursor = parse_clinic_appointment_cursor(request.args.get("cursor"))
+    if cursor is None:
+      return jsonify({"error": "Ungültiger Cursor."}), 400
+
+  rows, next_cursor = list_clinic_appointments(clinic_id, limit, filters, cursor)
+  summary = summarize_clinic_appointments(clinic_id, filters)
 
   return jsonify(
     {
       "summary": summary,
       "appointments": [serialize_patient_appointment_row(row) for row in rows],
+      "nextCursor": next_cursor,
     }
   )
 
@@ -11590,16 +16329,20 @@ def clinic_create_appointment():
     return jsonify({"error": "Startzeit ist erforderlich."}), 400
 
   duration = max(5, min(int(payload.get("durationMinutes") or 30), 600))
-  parsed_start = parse_datetime_utc(starts_at)
-  ends_at = (parsed_start + timedelta(minutes=duration)).isoformat() if parsed_start else None
+  ends_at = starts_at + timedelta(minutes=duration)
   treatment_name = str(payload.get("treatmentName") or "").strip() or "Termin"
   status = normalize_patient_appointment_status(payload.get("status") or "confirmed", "confirmed")
   notes = str(payload.get("notes") or "").strip()
   practitioner = str(payload.get("practitionerName") or "").strip()
   patient_email = sanitize_patient_email(payload.get("patientEmail")) or ""
-  now_iso = utc_now_iso()
+  now = utc_now()
 
   with get_db() as conn:
+    lock_clinic_schedule(conn, clinic_id)
+    if status not in PATIENT_APPOINTMENT_CLOSED_STATUSES:
+      fits, practitioner = check_appointment_capacity(conn, clinic_id, starts_at, ends_at, duration, practitioner)
+      if not fits:
+        return jsonify({"error": "Zeitfenster nicht mehr verfügbar."}), 409
     appointment_id = insert_and_get_id(
       conn,
       """
@@ -11614,13 +16357,15 @@ def clinic_create_appointment():
       (
         clinic_id, patient_email, patient_name, str(payload.get("treatmentId") or "").strip(),
         treatment_name, duration, practitioner, starts_at, ends_at, "", "", status, notes, "",
-        now_iso if status == "canceled" else None, now_iso, now_iso,
+        now if status == "canceled" else None, now, now,
       ),
     )
+    upsert_patient_directory_entry(conn, clinic_id, email=patient_email, name=patient_name, source="appointment")
 
   row = get_clinic_appointment_row(clinic_id, appointment_id)
   if not row:
     return jsonify({"error": "Termin konnte nicht erstellt werden."}), 500
+  record_patient_appointment_change(row)
   return jsonify({"appointment": serialize_patient_appointment_row(row)}), 201
 
 
@@ -11658,7 +16403,7 @@ def clinic_update_appointment(appointment_id):
   if "status" in payload:
     new_status = normalize_patient_appointment_status(payload.get("status"), row["status"] or "pending_confirmation")
     fields["status"] = new_status
-    fields["canceled_at"] = utc_now_iso() if new_status == "canceled" else None
+    fields["canceled_at"] = utc_now() if new_status == "canceled" else None
 
   if not fields:
     return jsonify({"appointment": serialize_patient_appointment_row(row)})
@@ -11668,9 +16413,9 @@ def clinic_update_appointment(appointment_id):
   if ("starts_at" in fields or "treatment_duration_minutes" in fields) and new_start:
     parsed_start = parse_datetime_utc(new_start)
     if parsed_start:
-      fields["ends_at"] = (parsed_start + timedelta(minutes=int(new_duration or 0))).isoformat()
+      fields["ends_at"] = parsed_start + timedelta(minutes=int(new_duration or 0))
 
-  fields["updated_at"] = utc_now_iso()
+  fields["updated_at"] = utc_now()
   set_clause = ", ".join(f"{column} = ?" for column in fields)
   with get_db() as conn:
     conn.execute(
@@ -11679,9 +16424,88 @@ def clinic_update_appointment(appointment_id):
     )
 
   row = get_clinic_appointment_row(clinic_id, appointment_id)
+  record_patient_appointment_change(row)
   return jsonify({"appointment": serialize_patient_appointment_row(row)})
 
 
+@app.get("/api/clinic/practitioners")
+def clinic_list_practitioners():
+  user_row, auth_error = require_auth_row()
+  if not user_row:
+    return auth_error
+  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
+  if not clinic_id:
+    return jsonify({"error": "Keine Klinik gefunden."}), 400
+  with get_db() as conn:
+    practitioners = load_clinic_practitioners(conn, clinic_id)
+  return jsonify(
+    {
+      "practitioners": [serialize_clinic_practitioner(entry) for entry in practitioners],
+      "defaultSlotCapacity": APPOINTMENT_DEFAULT_SLOT_CAPACITY,
+    }
+  )
+
+
+@app.put("/api/clinic/practitioners")
+def clinic_put_practitioners():
+  user_row, auth_error = require_owner_row()
+  if not user_row:
+    return auth_error
+  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
+  if not clinic_id:
+    return jsonify({"error": "Keine Klinik gefunden."}), 400
+
+  payload = request.get_json(silent=True) or {}
+  items = payload.get("practitioners")
+  if not isinstance(items, list) or len(items) > 50:
+    return jsonify({"error": "practitioners muss eine Liste mit höchstens 50 Einträgen sein."}), 400
+
+  entries = []
+  seen_names = set()
+  for item in items:
+    if not isinstance(item, dict):
+      return jsonify({"error": "Ungültiger Eintrag in practitioners."}), 400
+    name = str(item.get("name") or "").strip()[:80]
+    if len(name) < 2:
+      return jsonify({"error": "Name der Behandler:in ist erforderlich."}), 400
+    if name.lower() in seen_names:
+      return jsonify({"error": f"Behandler:in doppelt angegeben: {name}"}), 400
+    seen_names.add(name.lower())
+    hours = parse_practitioner_weekly_hours(item.get("weeklyHours") or {})
+    if not hours:
+      return jsonify({"error": f"Arbeitszeiten für {name} fehlen oder sind ungültig."}), 400
+    try:
+      capacity = max(1, min(int(item.get("capacity") or 1), 20))
+    except (TypeError, ValueError):
+      return jsonify({"error": "capacity muss eine Zahl sein."}), 400
+    entries.append((name, json.dumps(format_practitioner_weekly_hours(hours)), capacity))
+
+  now = utc_now()
+  with get_db() as conn:
+    lock_clinic_schedule(conn, clinic_id)
+    conn.execute("DELETE FROM clinic_practitioners WHERE clinic_id = ?", (clinic_id,))
+    if entries:
+      conn.executemany(
+        """
+        INSERT INTO clinic_practitioners (clinic_id, name, weekly_hours_json, capacity, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [(clinic_id, name, hours_json, capacity, now, now) for name, hours_json, capacity in entries],
+      )
+    practitioners = load_clinic_practitioners(conn, clinic_id)
+  APPOINTMENT_AVAILABILITY.invalidate(clinic_id)
+
+  create_audit_log(
+    clinic_id=clinic_id,
+    actor_user_id=int(user_row["id"]),
+    action="clinic.practitioners_updated",
+    entity_type="clinic",
+    entity_id=str(clinic_id),
+    metadata={"count": len(practitioners)},
+  )
+  return jsonify({"practitioners": [serialize_clinic_practitioner(entry) for entry in practitioners]})
+
+
 @app.get("/api/clinic/patient-notes")
 def clinic_get_patient_notes():
   user_row, auth_error = require_auth_row()
@@ -11705,31 +16529,191 @@ def clinic_get_patient_notes():
   )
 
 
-@app.put("/api/clinic/patient-notes")
-def clinic_put_patient_notes():
-  user_row, auth_error = require_auth_row()
-  if not user_row:
-    return auth_error
-  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
-  if not clinic_id:
-    return jsonify({"error": "Keine Klinik gefunden."}), 400
-  payload = request.get_json(silent=True) or {}
-  email = sanitize_patient_email(payload.get("patientEmail"))
-  if not email:
-    return jsonify({"error": "E-Mail ist für Kundennotizen erforderlich."}), 400
-  notes = str(payload.get("notes") or "").strip()
-  now_iso = utc_now_iso()
-  with get_db() as conn:
-    conn.execute(
-      """
-      INSERT INTO patient_notes (clinic_id, patient_email, notes, updated_at)
-      VALUES (?, ?, ?, ?)
-      ON CONFLICT (clinic_id, patient_email)
-      DO UPDATE SET notes = excluded.notes, updated_at = excluded.updated_at
-      """,
-      (clinic_id, email, notes, now_iso),
+@app.put("/api/clinic/patient-notes")
+def clinic_put_patient_notes():
+  user_row, auth_error = require_auth_row()
+  if not user_row:
+    return auth_error
+  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
+  if not clinic_id:
+    return jsonify({"error": "Keine Klinik gefunden."}), 400
+  payload = request.get_json(silent=True) or {}
+  email = sanitize_patient_email(payload.get("patientEmail"))
+  if not email:
+    return jsonify({"error": "E-Mail ist für Kundennotizen erforderlich."}), 400
+  notes = str(payload.get("notes") or "").strip()
+  now = utc_now()
+  with get_db() as conn:
+    conn.execute(
+      """
+      INSERT INTO patient_notes (clinic_id, patient_email, notes, updated_at)
+      VALUES (?, ?, ?, ?)
+      ON CONFLICT (clinic_id, patient_email)
+      DO UPDATE SET notes = excluded.notes, updated_at = excluded.updated_at
+      """,
+      (clinic_id, email, notes, now),
+    )
+  return jsonify({"patientEmail": email, "notes": notes, "updatedAt": now.isoformat()})
+
+
+@app.get("/api/clinic/patients/search")
+def clinic_patient_search():
+  user_row, auth_error = require_auth_row()
+  if not user_row:
+    return auth_error
+  clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
+  if clinic_id is None:
+    return jsonify({"patients": [], "nextCursor": None, "mode": "match"})
+
+  try:
+    limit = max(1, min(int(request.args.get("limit", "20")), 100))
+  except ValueError:
+    limit = 20
+  cursor = None
+  if request.args.get("before"):
+    cursor = parse_patient_directory_cursor(request.args.get("before"))
+    if cursor is None:
+      return jsonify({"error": "Ungültiger Cursor."}), 400
+
+  query = str(request.args.get("q") or "")[:120]
+  rows, next_cursor, mode = search_patient_directory(clinic_id, query, limit, cursor)
+  return jsonify(
+    {
+      "patients": [serialize_patient_directory_row(row) for row in rows],
+      "nextCursor": next_cursor,
+      "mode": mode,
+    }
+  )
+
+
+CUSTOMER_PROFILE_SECTIONS = ("membership", "transactions", "appointments", "notes", "checkins", "campaignContacts", "timeline")
+CUSTOMER_PROFILE_LIST_LIMIT = 50
+# Response section -> query branches it is built from; the timeline draws on every source.
+CUSTOMER_PROFILE_SECTION_BRANCHES = {
+  "membership": ("membership",),
+  "transactions": ("membership", "membership_charge", "checkouts"),
+  "appointments": ("appointments",),
+  "notes": ("notes",),
+  "checkins": ("visits",),
+  "campaignContacts": ("campaigns",),
+  "timeline": ("membership", "membership_charge", "checkouts", "appointments", "notes", "visits", "campaigns"),
+}
+# Branch -> (payload columns, sort_at expression, FROM/WHERE clause, ORDER BY + LIMIT of the branch).
+# Every WHERE takes one or more (clinic_id, email) placeholder pairs in that order.
+CUSTOMER_PROFILE_BRANCH_QUERIES = {
+  "directory": (
+    ("display_name",),
+    "last_activity_at",
+    "FROM clinic_patient_directory WHERE clinic_id = ? AND patient_key = ?",
+    "LIMIT 1",
+  ),
+  "membership": (
+    (
+      "id", "clinic_id", "patient_email", "patient_name", "membership_id", "membership_name",
+      "monthly_amount_cents", "currency", "status", "started_at", "current_period_end", "next_charge_at",
+      "canceled_at", "last_payment_status", "created_at", "updated_at",
+    ),
+    "COALESCE(updated_at, started_at)",
+    "FROM patient_memberships WHERE clinic_id = ? AND patient_email_canonical = ?",
+    "LIMIT 1",
+  ),
+  # Second timeline position of the membership (its billing date); the payload lives in "membership".
+  "membership_charge": (
+    (),
+    "COALESCE(next_charge_at, started_at)",
+    "FROM patient_memberships WHERE clinic_id = ? AND patient_email_canonical = ?",
+    "LIMIT 1",
+  ),
+  "checkouts": (
+    (
+      "id", "order_id", "patient_email", "patient_name", "payment_method", "payment_status",
+      "checkout_status", "currency", "total_cents", "line_items_json", "created_at", "finalized_at",
+    ),
+    "COALESCE(finalized_at, created_at)",
+    "FROM patient_checkout_sessions WHERE clinic_id = ? AND patient_email_canonical = ?",
+    f"ORDER BY created_at DESC LIMIT {CUSTOMER_PROFILE_LIST_LIMIT}",
+  ),
+  "appointments": (
+    (
+      "id", "clinic_id", "patient_email", "patient_name", "treatment_id", "treatment_name",
+      "treatment_duration_minutes", "practitioner_name", "starts_at", "ends_at", "location_label",
+      "location_address", "status", "notes", "order_id", "canceled_at", "created_at", "updated_at",
+    ),
+    "COALESCE(starts_at, created_at)",
+    "FROM patient_appointments WHERE clinic_id = ? AND patient_email = ?",
+    f"ORDER BY created_at DESC, id DESC LIMIT {CUSTOMER_PROFILE_LIST_LIMIT}",
+  ),
+  "notes": (
+    ("notes", "updated_at"),
+    "updated_at",
+    "FROM patient_notes WHERE clinic_id = ? AND patient_email = ?",
+    "LIMIT 1",
+  ),
+  "visits": (
+    ("id", "patient_phone", "patient_name", "patient_email", "source", "created_at"),
+    "created_at",
+    # Check-ins without an email still belong to the patient when the phone matches their directory entry.
+    # One index probe per key (email / E.164 phone); an OR would fall back to scanning the clinic's visits.
+    "FROM clinic_visits WHERE id IN ("
+    "SELECT id FROM clinic_visits WHERE clinic_id = ? AND patient_email_canonical = ? "
+    "UNION ALL SELECT v.id FROM clinic_patient_directory d "
+    "JOIN clinic_visits v ON v.clinic_id = d.clinic_id AND v.patient_phone_e164 = d.phone_e164 "
+    "WHERE d.clinic_id = ? AND d.patient_key = ? AND d.phone_e164 <> '')",
+    f"ORDER BY created_at DESC LIMIT {CUSTOMER_PROFILE_LIST_LIMIT}",
+  ),
+  "campaigns": (
+    (
+      "d.id", "d.recipient_key", "d.channel", "d.status", "d.error_message", "d.metadata_json",
+      "d.created_at", "c.name AS campaign_name", "c.trigger_type",
+    ),
+    "d.created_at",
+    "FROM campaign_deliveries d LEFT JOIN clinic_campaigns c ON c.id = d.campaign_id "
+    "WHERE d.clinic_id = ? AND d.recipient_email_canonical = ?",
+    f"ORDER BY d.created_at DESC LIMIT {CUSTOMER_PROFILE_LIST_LIMIT}",
+  ),
+}
+
+
+def decode_customer_profile_payload(raw_payload: object) -> dict:
+  # json_object() comes back as text on SQLite (timestamps as epoch ms), json_build_object() as a dict
+  # with ISO strings on Postgres; both end up like a regular adapter row.
+  payload = json.loads(raw_payload) if isinstance(raw_payload, str) else dict(raw_payload or {})
+  for key, value in payload.items():
+    if not is_timestamp_column(key) or value is None:
+      continue
+    payload[key] = epoch_ms_to_datetime(value) if isinstance(value, (int, float)) else parse_datetime_utc(value)
+  return payload
+
+
+def load_customer_profile_rows(clinic_id: int, email: str, branches: set[str]) -> list[tuple[str, datetime | None, dict]]:
+  """All profile rows of one patient in a single statement, newest first across every branch.
+
+  Each branch is a CTE that serializes its columns into one JSON payload, so
+  differently shaped rows can share one UNION ALL and one ORDER BY.
+  """
+  json_function = "json_build_object" if DB_BACKEND == "postgres" else "json_object"
+  ctes = []
+  selects = []
+  params: list = []
+  for branch in sorted(branches):
+    columns, sort_expression, from_where, order_limit = CUSTOMER_PROFILE_BRANCH_QUERIES[branch]
+    pairs = []
+    for column in columns:
+      expression, _, alias = column.partition(" AS ")
+      pairs.append(f"'{alias or expression.split('.')[-1]}', {expression}")
+    ctes.append(
+      f"profile_{branch} AS (SELECT {json_function}({', '.join(pairs)}) AS payload, {sort_expression} AS sort_at "
+      f"{from_where} {order_limit})"
     )
-  return jsonify({"patientEmail": email, "notes": notes, "updatedAt": now_iso})
+    selects.append(f"SELECT '{branch}' AS branch, sort_at, payload FROM profile_{branch}")
+    params.extend([clinic_id, email] * (from_where.count("?") // 2))
+
+  with get_db() as conn:
+    rows = conn.execute(
+      f"WITH {', '.join(ctes)} {' UNION ALL '.join(selects)} ORDER BY sort_at DESC NULLS LAST, branch",
+      tuple(params),
+    ).fetchall()
+  return [(row["branch"], row["sort_at"], decode_customer_profile_payload(row["payload"])) for row in rows]
 
 
 @app.get("/api/clinic/customer")
@@ -11743,85 +16727,28 @@ def clinic_customer_profile():
     return jsonify({"error": "Keine Klinik gefunden."}), 400
   if not email:
     return jsonify({"error": "E-Mail ist erforderlich."}), 400
-
-  with get_db() as conn:
-    membership_row = conn.execute(
-      """
-      SELECT
-        id,
-        clinic_id,
-        patient_email,
-        patient_name,
-        membership_id,
-        membership_name,
-        monthly_amount_cents,
-        currency,
-        status,
-        started_at,
-        current_period_end,
-        next_charge_at,
-        canceled_at,
-        last_payment_status,
-        created_at,
-        updated_at
-      FROM patient_memberships
-      WHERE clinic_id = ? AND LOWER(patient_email) = ?
-      LIMIT 1
-      """,
-      (clinic_id, email),
-    ).fetchone()
-    checkout_rows = conn.execute(
-      """
-      SELECT id, order_id, patient_email, patient_name, payment_method, payment_status,
-             checkout_status, currency, total_cents, line_items_json, created_at, finalized_at
-      FROM patient_checkout_sessions
-      WHERE clinic_id = ? AND LOWER(patient_email) = ?
-      ORDER BY created_at DESC
-      LIMIT 50
-      """,
-      (clinic_id, email),
-    ).fetchall()
-    note_row = conn.execute(
-      "SELECT notes, updated_at FROM patient_notes WHERE clinic_id = ? AND patient_email = ? LIMIT 1",
-      (clinic_id, email),
-    ).fetchone()
-    visit_rows = conn.execute(
-      """
-      SELECT id, patient_phone, patient_name, patient_email, source, created_at
-      FROM clinic_visits
-      WHERE clinic_id = ? AND LOWER(patient_email) = ?
-      ORDER BY created_at DESC
-      LIMIT 50
-      """,
-      (clinic_id, email),
-    ).fetchall()
-    campaign_rows = conn.execute(
-      """
-      SELECT
-        d.id,
-        d.recipient_key,
-        d.channel,
-        d.status,
-        d.error_message,
-        d.metadata_json,
-        d.created_at,
-        c.name AS campaign_name,
-        c.trigger_type
-      FROM campaign_deliveries d
-      LEFT JOIN clinic_campaigns c ON c.id = d.campaign_id
-      WHERE d.clinic_id = ?
-        AND (LOWER(d.recipient_key) = ? OR LOWER(d.metadata_json) LIKE ?)
-      ORDER BY d.created_at DESC
-      LIMIT 50
-      """,
-      (clinic_id, email, f"%{email}%"),
-    ).fetchall()
-
-  appointment_rows = list_patient_appointments(clinic_id, email, 50)
+  requested_sections = [part.strip() for part in str(request.args.get("sections") or "").split(",") if part.strip()]
+  unknown_sections = [part for part in requested_sections if part not in CUSTOMER_PROFILE_SECTIONS]
+  if unknown_sections:
+    return jsonify({"error": f"Unbekannter Abschnitt: {unknown_sections[0]}"}), 400
+  sections = set(requested_sections or CUSTOMER_PROFILE_SECTIONS)
+
+  branches = {"directory"}
+  for section in sections:
+    branches.update(CUSTOMER_PROFILE_SECTION_BRANCHES[section])
+  profile_rows = load_customer_profile_rows(clinic_id, email, branches)
+
+  rows_by_branch: dict[str, list[dict]] = {branch: [] for branch in branches}
+  for branch, _, payload in profile_rows:
+    rows_by_branch[branch].append(payload)
+  membership_row = next(iter(rows_by_branch.get("membership") or []), None)
+  note_row = next(iter(rows_by_branch.get("notes") or []), None)
+  checkout_rows = rows_by_branch.get("checkouts") or []
+  visit_rows = rows_by_branch.get("visits") or []
+  appointment_rows = sorted(rows_by_branch.get("appointments") or [], key=patient_appointment_display_key)
   appointments = [serialize_patient_appointment_row(row) for row in appointment_rows]
 
-  transactions = []
-  for row in checkout_rows:
+  def checkout_transaction(row: dict, occurred_at: object) -> dict:
     items = parse_json_list(safe_row_value(row, "line_items_json"))
     item_names = [
       safe_public_text(item.get("name") or item.get("title"))
@@ -11829,82 +16756,41 @@ def clinic_customer_profile():
       if isinstance(item, dict)
     ]
     item_names = [name for name in item_names if name]
-    transactions.append(
-      {
-        "id": f"co-{safe_row_value(row, 'id')}",
-        "date": safe_public_text(safe_row_value(row, "finalized_at")) or safe_public_text(safe_row_value(row, "created_at")),
-        "customerName": safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast",
-        "customerEmail": safe_public_text(safe_row_value(row, "patient_email")),
-        "type": "produkt",
-        "typeLabel": "App-Kauf",
-        "label": ", ".join(item_names[:3]) if item_names else "App-Kauf",
-        "amountCents": txn_amount_cents(safe_row_value(row, "total_cents", 0)),
-        "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
-        "status": normalize_txn_status(safe_row_value(row, "payment_status") or safe_row_value(row, "checkout_status")),
-        "source": "App",
-        "paymentMethod": safe_public_text(safe_row_value(row, "payment_method")),
-        "reference": safe_public_text(safe_row_value(row, "order_id")),
-        "items": item_names,
-      }
-    )
-
-  if membership_row:
-    transactions.append(
-      {
-        "id": f"mb-{safe_row_value(membership_row, 'id')}",
-        "date": safe_public_text(safe_row_value(membership_row, "next_charge_at")) or safe_public_text(safe_row_value(membership_row, "started_at")),
-        "customerName": safe_public_text(safe_row_value(membership_row, "patient_name"), "Gast") or "Gast",
-        "customerEmail": safe_public_text(safe_row_value(membership_row, "patient_email")),
-        "type": "mitgliedschaft",
-        "typeLabel": "Mitgliedschaft",
-        "label": safe_public_text(safe_row_value(membership_row, "membership_name"), "Mitgliedschaft") or "Mitgliedschaft",
-        "amountCents": txn_amount_cents(safe_row_value(membership_row, "monthly_amount_cents", 0)),
-        "currency": safe_public_text(safe_row_value(membership_row, "currency"), "eur") or "eur",
-        "status": normalize_txn_status(safe_row_value(membership_row, "last_payment_status") or safe_row_value(membership_row, "status")),
-        "membershipStatus": safe_public_text(safe_row_value(membership_row, "status")),
-        "source": "Abo",
-        "paymentMethod": "—",
-        "reference": "",
-        "items": [],
-      }
-    )
-
-  transactions.sort(key=lambda item: str(item.get("date") or ""), reverse=True)
-
-  checkins = [
-    {
-      "id": row["id"],
-      "patientName": safe_public_text(row["patient_name"], "Gast") or "Gast",
-      "patientPhone": safe_public_text(row["patient_phone"]),
-      "source": safe_public_text(row["source"], "qr") or "qr",
-      "checkedInAt": row["created_at"],
-    }
-    for row in visit_rows
-  ]
-  campaign_contacts = [
-    {
-      "id": row["id"],
-      "campaignName": safe_public_text(row["campaign_name"], "Kampagne") or "Kampagne",
-      "triggerType": safe_public_text(row["trigger_type"]),
-      "channel": safe_public_text(row["channel"]),
-      "status": safe_public_text(row["status"]),
-      "errorMessage": safe_public_text(row["error_message"]),
-      "createdAt": row["created_at"],
+    return {
+      "id": f"co-{safe_row_value(row, 'id')}",
+      "date": occurred_at,
+      "customerName": safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast",
+      "customerEmail": safe_public_text(safe_row_value(row, "patient_email")),
+      "type": "produkt",
+      "typeLabel": "App-Kauf",
+      "label": ", ".join(item_names[:3]) if item_names else "App-Kauf",
+      "amountCents": txn_amount_cents(safe_row_value(row, "total_cents", 0)),
+      "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
+      "status": normalize_txn_status(safe_row_value(row, "payment_status") or safe_row_value(row, "checkout_status")),
+      "source": "App",
+      "paymentMethod": safe_public_text(safe_row_value(row, "payment_method")),
+      "reference": safe_public_text(safe_row_value(row, "order_id")),
+      "items": item_names,
     }
-    for row in campaign_rows
-  ]
-
-  name_candidates = [
-    safe_row_value(membership_row, "patient_name") if membership_row else "",
-    *(safe_row_value(row, "patient_name") for row in appointment_rows[:2]),
-    *(safe_row_value(row, "patient_name") for row in checkout_rows[:2]),
-    *(safe_row_value(row, "patient_name") for row in visit_rows[:2]),
-  ]
-  customer_name = next((safe_public_text(value) for value in name_candidates if safe_public_text(value)), "")
-  if not customer_name:
-    customer_name = email.split("@")[0] if "@" in email else "Kunde"
 
-  timeline = []
+  def membership_transaction(row: dict, occurred_at: object) -> dict:
+    return {
+      "id": f"mb-{safe_row_value(row, 'id')}",
+      "date": occurred_at,
+      "customerName": safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast",
+      "customerEmail": safe_public_text(safe_row_value(row, "patient_email")),
+      "type": "mitgliedschaft",
+      "typeLabel": "Mitgliedschaft",
+      "label": safe_public_text(safe_row_value(row, "membership_name"), "Mitgliedschaft") or "Mitgliedschaft",
+      "amountCents": txn_amount_cents(safe_row_value(row, "monthly_amount_cents", 0)),
+      "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
+      "status": normalize_txn_status(safe_row_value(row, "last_payment_status") or safe_row_value(row, "status")),
+      "membershipStatus": safe_public_text(safe_row_value(row, "status")),
+      "source": "Abo",
+      "paymentMethod": "—",
+      "reference": "",
+      "items": [],
+    }
 
   def customer_amount_label(amount_cents: object, currency: object = "eur") -> str:
     try:
@@ -11915,91 +16801,131 @@ def clinic_customer_profile():
     amount = f"{cents / 100:.2f}".replace(".", ",")
     return f"{amount} {currency_label}"
 
+  # profile_rows is already newest-first across all branches, so every list below keeps the database order.
+  transactions = []
+  timeline = []
+  timeline_caps = {"membership": 1, "transaction": 20, "appointment": 20, "checkin": 12, "campaign": 12, "note": 1}
+  timeline_counts = dict.fromkeys(timeline_caps, 0)
+
   def add_timeline(kind: str, title: str, date_value: object, detail: str = "", tone: str = "muted"):
-    clean_date = safe_public_text(date_value)
-    if not clean_date:
+    if date_value is None or timeline_counts[kind] >= timeline_caps[kind]:
       return
+    timeline_counts[kind] += 1
     timeline.append(
       {
         "kind": kind,
         "title": safe_public_text(title, kind.title()) or kind.title(),
         "detail": safe_public_text(detail),
-        "date": clean_date,
+        "date": date_value,
         "tone": safe_public_text(tone, "muted") or "muted",
       }
     )
 
-  if membership_row:
-    membership_status = safe_public_text(safe_row_value(membership_row, "status"), "inactive")
-    add_timeline(
-      "membership",
-      f"Membership: {safe_public_text(safe_row_value(membership_row, 'membership_name'), 'Mitgliedschaft')}",
-      safe_row_value(membership_row, "updated_at") or safe_row_value(membership_row, "started_at"),
-      membership_status,
-      "ok" if membership_status == "active" else "warn" if membership_status == "past_due" else "muted",
-    )
-  for txn in transactions[:20]:
-    add_timeline("transaction", txn.get("label") or txn.get("typeLabel") or "Zahlung", txn.get("date"), customer_amount_label(txn.get("amountCents", 0), txn.get("currency", "eur")), txn.get("status") or "muted")
-  for appt in appointments[:20]:
-    appt_status = str(appt.get("status") or "")
-    add_timeline("appointment", f"Termin: {appt.get('treatmentName') or 'Behandlung'}", appt.get("startsAt") or appt.get("createdAt"), appt_status, "danger" if appt_status == "canceled" else "ok")
-  for visit in checkins[:12]:
-    add_timeline("checkin", "Check-in", visit.get("checkedInAt"), visit.get("source", "qr"), "brand")
-  for campaign in campaign_contacts[:12]:
-    add_timeline("campaign", f"Kampagne: {campaign.get('campaignName') or 'Kampagne'}", campaign.get("createdAt"), campaign.get("status") or "", "muted")
-  if note_row and safe_public_text(safe_row_value(note_row, "notes")):
-    add_timeline("note", "Notiz aktualisiert", safe_row_value(note_row, "updated_at"), "", "brand")
-
-  timeline.sort(key=lambda item: str(item.get("date") or ""), reverse=True)
-  parsed_dates = []
-  for item in timeline:
-    parsed_date = parse_datetime_utc(item.get("date"))
-    if parsed_date:
-      parsed_dates.append(parsed_date)
-  now_dt = utc_now()
-  past_dates = [item for item in parsed_dates if item <= now_dt]
+  checkins = []
+  campaign_contacts = []
+  for branch, sort_at, row in profile_rows:
+    if branch == "checkouts":
+      txn = checkout_transaction(row, sort_at)
+      transactions.append(txn)
+      add_timeline("transaction", txn["label"], sort_at, customer_amount_label(txn["amountCents"], txn["currency"]), txn["status"])
+    elif branch == "membership_charge" and membership_row:
+      txn = membership_transaction(membership_row, sort_at)
+      transactions.append(txn)
+      add_timeline("transaction", txn["label"], sort_at, customer_amount_label(txn["amountCents"], txn["currency"]), txn["status"])
+    elif branch == "membership":
+      membership_status = safe_public_text(safe_row_value(row, "status"), "inactive")
+      add_timeline(
+        "membership",
+        f"Membership: {safe_public_text(safe_row_value(row, 'membership_name'), 'Mitgliedschaft')}",
+        sort_at,
+        membership_status,
+        "ok" if membership_status == "active" else "warn" if membership_status == "past_due" else "muted",
+      )
+    elif branch == "appointments":
+      appt_status = str(row.get("status") or "")
+      add_timeline("appointment", f"Termin: {row.get('treatment_name') or 'Behandlung'}", sort_at, appt_status, "danger" if appt_status == "canceled" else "ok")
+    elif branch == "visits":
+      checkins.append(
+        {
+          "id": row["id"],
+          "patientName": safe_public_text(row["patient_name"], "Gast") or "Gast",
+          "patientPhone": safe_public_text(row["patient_phone"]),
+          "source": safe_public_text(row["source"], "qr") or "qr",
+          "checkedInAt": row["created_at"],
+        }
+      )
+      add_timeline("checkin", "Check-in", sort_at, safe_public_text(row["source"], "qr") or "qr", "brand")
+    elif branch == "campaigns":
+      contact = {
+        "id": row["id"],
+        "campaignName": safe_public_text(row["campaign_name"], "Kampagne") or "Kampagne",
+        "triggerType": safe_public_text(row["trigger_type"]),
+        "channel": safe_public_text(row["channel"]),
+        "status": safe_public_text(row["status"]),
+        "errorMessage": safe_public_text(row["error_message"]),
+        "createdAt": row["created_at"],
+      }
+      campaign_contacts.append(contact)
+      add_timeline("campaign", f"Kampagne: {contact['campaignName']}", sort_at, contact["status"], "muted")
+    elif branch == "notes" and safe_public_text(row.get("notes")):
+      add_timeline("note", "Notiz aktualisiert", sort_at, "", "brand")
 
-  paid_total_cents = sum(
-    int(txn.get("amountCents") or 0)
-    for txn in transactions
-    if str(txn.get("status") or "").lower() == "paid"
-  )
-  open_total_cents = sum(
-    int(txn.get("amountCents") or 0)
-    for txn in transactions
-    if str(txn.get("status") or "").lower() == "open"
-  )
+  directory_row = next(iter(rows_by_branch["directory"]), None)
+  name_candidates = [
+    safe_row_value(membership_row, "patient_name") if membership_row else "",
+    *(safe_row_value(row, "patient_name") for row in appointment_rows[:2]),
+    *(safe_row_value(row, "patient_name") for row in checkout_rows[:2]),
+    *(safe_row_value(row, "patient_name") for row in visit_rows[:2]),
+    safe_row_value(directory_row, "display_name") if directory_row else "",
+  ]
+  customer_name = next((safe_public_text(value) for value in name_candidates if safe_public_text(value)), "")
+  if not customer_name:
+    customer_name = email.split("@")[0] if "@" in email else "Kunde"
 
-  return jsonify(
-    {
-      "customer": {
-        "email": email,
-        "name": customer_name,
-        "firstSeenAt": min(parsed_dates).isoformat() if parsed_dates else None,
-        "lastSeenAt": max(past_dates).isoformat() if past_dates else None,
-      },
-      "membership": serialize_patient_membership_row(membership_row) if membership_row else None,
-      "transactions": transactions,
-      "appointments": appointments,
-      "notes": {
-        "patientEmail": email,
-        "notes": safe_public_text(safe_row_value(note_row, "notes")) if note_row else "",
-        "updatedAt": safe_public_text(safe_row_value(note_row, "updated_at")) if note_row else None,
-      },
-      "checkins": checkins,
-      "campaignContacts": campaign_contacts,
-      "timeline": timeline[:60],
-      "summary": {
+  now_dt = utc_now()
+  activity_dates = [sort_at for branch, sort_at, _ in profile_rows if sort_at is not None]
+  past_dates = [item for item in activity_dates if item <= now_dt]
+
+  response = {
+    "customer": {
+      "email": email,
+      "name": customer_name,
+      "firstSeenAt": min(activity_dates).isoformat() if activity_dates else None,
+      "lastSeenAt": max(past_dates).isoformat() if past_dates else None,
+    },
+    "sections": [section for section in CUSTOMER_PROFILE_SECTIONS if section in sections],
+    "summary": {"currency": "eur"},
+  }
+  # Only the requested sections (and their summary counters) are returned, so the drawer can load lazily.
+  if "membership" in sections:
+    response["membership"] = serialize_patient_membership_row(membership_row) if membership_row else None
+  if "transactions" in sections:
+    response["transactions"] = transactions
+    response["summary"].update(
+      {
         "transactions": len(transactions),
-        "paidCents": paid_total_cents,
-        "openCents": open_total_cents,
-        "currency": "eur",
-        "appointments": len(appointments),
-        "checkins": len(checkins),
-        "campaignContacts": len(campaign_contacts),
-      },
+        "paidCents": sum(int(txn["amountCents"] or 0) for txn in transactions if txn["status"] == "paid"),
+        "openCents": sum(int(txn["amountCents"] or 0) for txn in transactions if txn["status"] == "open"),
+      }
+    )
+  if "appointments" in sections:
+    response["appointments"] = appointments
+    response["summary"]["appointments"] = len(appointments)
+  if "notes" in sections:
+    response["notes"] = {
+      "patientEmail": email,
+      "notes": safe_public_text(safe_row_value(note_row, "notes")) if note_row else "",
+      "updatedAt": safe_row_value(note_row, "updated_at", None) if note_row else None,
     }
-  )
+  if "checkins" in sections:
+    response["checkins"] = checkins
+    response["summary"]["checkins"] = len(checkins)
+  if "campaignContacts" in sections:
+    response["campaignContacts"] = campaign_contacts
+    response["summary"]["campaignContacts"] = len(campaign_contacts)
+  if "timeline" in sections:
+    response["timeline"] = timeline[:60]
+  return jsonify(response)
 
 
 @app.post("/api/clinic/members")
@@ -12300,7 +17226,7 @@ def mobile_checkin_start():
   email = sanitize_patient_email(payload.get("email") or "")
   token = generate_checkin_token()
   code = f"{secrets.randbelow(1000000):06d}"
-  expires_at = (utc_now() + timedelta(minutes=15)).isoformat()
+  expires_at = utc_now() + timedelta(minutes=15)
   with get_db() as conn:
     conn.execute(
       """
@@ -12308,14 +17234,14 @@ def mobile_checkin_start():
         (clinic_id, token, code, patient_phone, patient_name, patient_email, expires_at, created_at)
       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
       """,
-      (clinic_id, token, code, phone, name, email, expires_at, utc_now_iso()),
+      (clinic_id, token, code, phone, name, email, expires_at, utc_now()),
     )
   return jsonify(
     {
       "token": token,
       "code": code,
       "qrMatrix": generate_checkin_qr_matrix(token),
-      "expiresAt": expires_at,
+      "expiresAt": expires_at.isoformat(),
       "ttlSeconds": 900,
     }
   )
@@ -12355,18 +17281,36 @@ def clinic_checkin_redeem():
     expires = parse_datetime_utc(row["expires_at"])
     if expires is None or expires <= now:
       return jsonify({"error": "Der Check-in-Code ist abgelaufen."}), 410
-    checked_in_at = utc_now_iso()
+    checked_in_at = utc_now()
     source = "qr" if token else "code"
     visit_id = insert_and_get_id(
       conn,
       """
       INSERT INTO clinic_visits
-        (clinic_id, patient_phone, patient_name, patient_email, source, created_at)
-      VALUES (?, ?, ?, ?, ?, ?)
+        (clinic_id, patient_phone, patient_name, patient_email, patient_email_canonical, patient_phone_e164, source, created_at)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
       """,
-      (clinic_id, row["patient_phone"], row["patient_name"], row["patient_email"], source, checked_in_at),
+      (
+        clinic_id,
+        row["patient_phone"],
+        row["patient_name"],
+        row["patient_email"],
+        sanitize_patient_email(row["patient_email"]),
+        sanitize_phone_e164(row["patient_phone"]),
+        source,
+        checked_in_at,
+      ),
     )
     conn.execute("UPDATE checkin_tokens SET used_at = ? WHERE id = ?", (checked_in_at, row["id"]))
+    upsert_patient_directory_entry(
+      conn,
+      clinic_id,
+      email=row["patient_email"],
+      phone=row["patient_phone"],
+      name=row["patient_name"],
+      activity_at=checked_in_at,
+      source="visit",
+    )
 
   create_audit_log(
     clinic_id=clinic_id,
@@ -12396,7 +17340,7 @@ def clinic_checkin_today():
   clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
   if clinic_id is None:
     return jsonify({"visits": [], "count": 0})
-  start_of_day = utc_now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+  start_of_day = utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
   with get_db() as conn:
     rows = conn.execute(
       "SELECT id, patient_phone, patient_name, patient_email, source, created_at FROM clinic_visits WHERE clinic_id = ? AND created_at >= ? ORDER BY id DESC LIMIT 200",
@@ -12436,6 +17380,215 @@ def txn_amount_cents(raw: object) -> int:
     return 0
 
 
+CLINIC_LEDGER_TXN_STATUSES = ("paid", "open", "failed", "refunded", "canceled")
+# source -> (id prefix, entry type, type label, source label)
+CLINIC_LEDGER_SOURCES = {
+  "checkout": ("co", "produkt", "App-Kauf", "App"),
+  "membership": ("mb", "mitgliedschaft", "Mitgliedschaft", "Abo"),
+  "payment": ("py", "zahlung", "Zahlung", "Dashboard"),
+}
+CLINIC_LEDGER_TYPE_LABELS = {entry_type: type_label for _, entry_type, type_label, _ in CLINIC_LEDGER_SOURCES.values()}
+CLINIC_LEDGER_TYPE_LABELS["billing"] = "Dashboard-Abo"
+# source -> (SELECT ... FROM <table> src, base conditions); rows are mapped by clinic_ledger_entry_from_row.
+CLINIC_LEDGER_SOURCE_QUERIES = {
+  "checkout": (
+    """
+    SELECT src.id, src.clinic_id, src.order_id, src.patient_email, src.patient_name, src.payment_method,
+           src.payment_status, src.checkout_status, src.currency, src.total_cents, src.line_items_json,
+           src.created_at, src.finalized_at
+    FROM patient_checkout_sessions src
+    """,
+    [],
+  ),
+  "membership": (
+    """
+    SELECT src.id, src.clinic_id, src.patient_email, src.patient_name, src.membership_name,
+           src.monthly_amount_cents, src.currency, src.status, src.last_payment_status,
+           src.next_charge_at, src.started_at, src.created_at
+    FROM patient_memberships src
+    """,
+    [],
+  ),
+  "payment": (
+    """
+    SELECT src.id, u.clinic_id, src.item_name, src.item_type, src.amount_cents, src.currency, src.status,
+           src.stripe_session_id, src.stripe_payment_intent_id, src.created_at,
+           u.email AS user_email, u.full_name AS user_name
+    FROM payments src
+    INNER JOIN users u ON u.id = src.user_id
+    """,
+    ["u.clinic_id IS NOT NULL", "LOWER(COALESCE(src.item_type, '')) != 'subscription'"],
+  ),
+}
+
+
+CLINIC_LEDGER_COLUMNS = (
+  "clinic_id",
+  "source",
+  "source_id",
+  "entry_type",
+  "occurred_at",
+  "customer_name",
+  "customer_email",
+  "label",
+  "item_names_json",
+  "amount_cents",
+  "currency",
+  "status",
+  "source_status",
+  "payment_method",
+  "reference",
+  "updated_at",
+)
+
+
+def clinic_ledger_entry_from_row(source: str, row) -> tuple | None:
+  """Denormalized ledger values for one source row, in CLINIC_LEDGER_COLUMNS order."""
+  _, entry_type, type_label, _ = CLINIC_LEDGER_SOURCES[source]
+  currency = safe_public_text(safe_row_value(row, "currency"), "eur") or "eur"
+  item_names: list[str] = []
+  if source == "checkout":
+    items = parse_json_list(safe_row_value(row, "line_items_json"))
+    item_names = [
+      name
+      for name in (safe_public_text(it.get("name") or it.get("title")) for it in items if isinstance(it, dict))
+      if name
+    ]
+    occurred_at = safe_row_value(row, "finalized_at") or safe_row_value(row, "created_at")
+    customer_name = safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast"
+    customer_email = safe_public_text(safe_row_value(row, "patient_email"))
+    label = ", ".join(item_names[:3]) if item_names else type_label
+    amount_cents = txn_amount_cents(safe_row_value(row, "total_cents", 0))
+    source_status = safe_row_value(row, "payment_status") or safe_row_value(row, "checkout_status")
+    payment_method = safe_public_text(safe_row_value(row, "payment_method"))
+    reference = safe_public_text(safe_row_value(row, "order_id"))
+  elif source == "membership":
+    occurred_at = (
+      safe_row_value(row, "next_charge_at") or safe_row_value(row, "started_at") or safe_row_value(row, "created_at")
+    )
+    customer_name = safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast"
+    customer_email = safe_public_text(safe_row_value(row, "patient_email"))
+    label = safe_public_text(safe_row_value(row, "membership_name"), type_label) or type_label
+    amount_cents = txn_amount_cents(safe_row_value(row, "monthly_amount_cents", 0))
+    # The ledger status follows the last charge; the membership state itself is kept as source_status.
+    source_status = safe_row_value(row, "status")
+    payment_method = "—"
+    reference = ""
+  else:
+    occurred_at = safe_row_value(row, "created_at")
+    customer_name = safe_public_text(safe_row_value(row, "user_name"), "Klinik") or "Klinik"
+    customer_email = safe_public_text(safe_row_value(row, "user_email"))
+    label = safe_public_text(safe_row_value(row, "item_name"), type_label) or type_label
+    amount_cents = txn_amount_cents(safe_row_value(row, "amount_cents", 0))
+    source_status = safe_row_value(row, "status")
+    payment_method = "Stripe"
+    reference = (
+      safe_public_text(safe_row_value(row, "stripe_payment_intent_id"))
+      or safe_public_text(safe_row_value(row, "stripe_session_id"))
+    )
+
+  if not occurred_at:
+    return None
+  status_input = source_status
+  if source == "membership":
+    status_input = safe_row_value(row, "last_payment_status") or source_status
+  return (
+    int(row["clinic_id"]),
+    source,
+    int(row["id"]),
+    entry_type,
+    occurred_at,
+    customer_name,
+    customer_email,
+    label,
+    serialize_json_list(item_names),
+    amount_cents,
+    currency,
+    normalize_txn_status(status_input),
+    safe_public_text(source_status),
+    payment_method,
+    reference,
+    utc_now(),
+  )
+
+
+def sync_clinic_ledger_entries(
+  conn: DBConnectionAdapter,
+  source: str,
+  conditions: list[str],
+  params: tuple = (),
+) -> int:
+  """Re-derive the ledger rows for the matching source rows inside the caller's transaction."""
+  select_from, base_conditions = CLINIC_LEDGER_SOURCE_QUERIES[source]
+  where = " AND ".join([*base_conditions, *conditions]) or "1 = 1"
+  values = [
+    entry
+    for entry in (clinic_ledger_entry_from_row(source, row) for row in conn.execute(f"{select_from} WHERE {where}", params).fetchall())
+    if entry is not None
+  ]
+  if not values:
+    return 0
+  conn.executemany(
+    f"""
+    INSERT INTO clinic_ledger_entries ({", ".join(CLINIC_LEDGER_COLUMNS)})
+    VALUES ({", ".join("?" for _ in CLINIC_LEDGER_COLUMNS)})
+    ON CONFLICT (source, source_id) DO UPDATE SET
+      {", ".join(f"{column} = excluded.{column}" for column in CLINIC_LEDGER_COLUMNS[3:])}
+    """,
+    values,
+  )
+  return len(values)
+
+
+def backfill_clinic_ledger_entries(conn: DBConnectionAdapter) -> None:
+  # Fills in source rows written before the ledger existed (anti-join on the unique source index).
+  for source in CLINIC_LEDGER_SOURCES:
+    sync_clinic_ledger_entries(
+      conn,
+      source,
+      [
+        "NOT EXISTS (SELECT 1 FROM clinic_ledger_entries l "
+        f"WHERE l.source = '{source}' AND l.source_id = src.id)"
+      ],
+    )
+
+
+def parse_clinic_ledger_cursor(raw_cursor: object) -> tuple[datetime, int] | None:
+  # Cursor "<occurred_at>|<id>" from the previous page's nextCursor.
+  raw_occurred_at, _, raw_id = str(raw_cursor or "").strip().rpartition("|")
+  occurred_at = parse_datetime_utc(raw_occurred_at)
+  if occurred_at is None:
+    return None
+  try:
+    return occurred_at, int(raw_id)
+  except ValueError:
+    return None
+
+
+def serialize_clinic_ledger_entry(row) -> dict:
+  prefix, _, _, source_label = CLINIC_LEDGER_SOURCES.get(row["source"], CLINIC_LEDGER_SOURCES["payment"])
+  entry_type = str(row["entry_type"] or "zahlung")
+  payload = {
+    "id": f"{prefix}-{row['source_id']}",
+    "date": format_db_timestamp(row["occurred_at"]) or "",
+    "customerName": row["customer_name"] or "",
+    "customerEmail": row["customer_email"] or "",
+    "type": entry_type,
+    "typeLabel": CLINIC_LEDGER_TYPE_LABELS.get(entry_type, "Zahlung"),
+    "label": row["label"] or "",
+    "amountCents": int(row["amount_cents"] or 0),
+    "currency": row["currency"] or "eur",
+    "status": row["status"],
+    "source": source_label,
+    "paymentMethod": row["payment_method"] or "",
+    "reference": row["reference"] or "",
+    "items": parse_json_list(row["item_names_json"]),
+  }
+  if row["source"] == "membership":
+    payload["membershipStatus"] = row["source_status"] or ""
+  return payload
+
+
 @app.get("/api/clinic/transactions")
 def clinic_transactions():
   user_row, auth_error = require_auth_row()
@@ -12443,153 +17596,111 @@ def clinic_transactions():
     return auth_error
   clinic_id = int(user_row["clinic_id"]) if user_row["clinic_id"] else None
   if clinic_id is None:
-    return jsonify({"transactions": [], "summary": {}})
+    return jsonify({"transactions": [], "summary": {}, "nextCursor": None})
+
+  try:
+    limit = max(1, min(int(request.args.get("limit", "100")), 500))
+  except ValueError:
+    limit = 100
+  try:
+    date_from = parse_appointment_range_bound(request.args.get("from"))
+    date_to = parse_appointment_range_bound(request.args.get("to"), end_of_day=True)
+  except ValueError:
+    return jsonify({"error": "Ungültiger Zeitraum (from/to erwarten YYYY-MM-DD oder ISO-Zeitpunkt)."}), 400
+  status_filter = str(request.args.get("status") or "").strip().lower()
+  if status_filter and status_filter not in CLINIC_LEDGER_TXN_STATUSES:
+    return jsonify({"error": f"Unbekannter Zahlungsstatus: {status_filter}"}), 400
+  type_filter = str(request.args.get("type") or "").strip().lower()
+  if type_filter and type_filter not in CLINIC_LEDGER_TYPE_LABELS:
+    return jsonify({"error": f"Unbekannter Transaktionstyp: {type_filter}"}), 400
+  cursor = None
+  if request.args.get("before"):
+    cursor = parse_clinic_ledger_cursor(request.args.get("before"))
+    if cursor is None:
+      return jsonify({"error": "Ungültiger Cursor."}), 400
+
+  conditions = ["clinic_id = ?"]
+  params: list = [clinic_id]
+  if date_from:
+    conditions.append("occurred_at >= ?")
+    params.append(date_from)
+  if date_to:
+    conditions.append("occurred_at < ?")
+    params.append(date_to)
+  if type_filter:
+    conditions.append("entry_type = ?")
+    params.append(type_filter)
+  # Totals cover the whole filtered range; status and cursor only narrow the listed page.
+  summary_where = " AND ".join(conditions)
+  summary_params = tuple(params)
+  if status_filter:
+    conditions.append("status = ?")
+    params.append(status_filter)
+  if cursor is not None:
+    conditions.append("(occurred_at < ? OR (occurred_at = ? AND id < ?))")
+    params.extend([cursor[0], cursor[0], cursor[1]])
 
   with get_db() as conn:
-    checkout_rows = conn.execute(
-      """
-      SELECT id, order_id, patient_email, patient_name, payment_method, payment_status,
-             checkout_status, currency, total_cents, line_items_json, created_at, finalized_at
-      FROM patient_checkout_sessions
-      WHERE clinic_id = ?
-      ORDER BY created_at DESC
-      LIMIT 500
-      """,
-      (clinic_id,),
-    ).fetchall()
-    membership_rows = conn.execute(
-      """
-      SELECT id, patient_email, patient_name, membership_name, monthly_amount_cents,
-             currency, status, last_payment_status, next_charge_at, started_at
-      FROM patient_memberships
-      WHERE clinic_id = ?
-      ORDER BY COALESCE(next_charge_at, started_at) DESC
-      LIMIT 500
+    rows = conn.execute(
+      f"""
+      SELECT id, source, source_id, entry_type, occurred_at, customer_name, customer_email, label,
+             item_names_json, amount_cents, currency, status, source_status, payment_method, reference
+      FROM clinic_ledger_entries
+      WHERE {" AND ".join(conditions)}
+      ORDER BY occurred_at DESC, id DESC
+      LIMIT ?
       """,
-      (clinic_id,),
+      (*params, limit + 1),
     ).fetchall()
-    payment_rows = conn.execute(
-      """
+    totals = conn.execute(
+      f"""
       SELECT
-        p.id,
-        p.item_name,
-        p.item_type,
-        p.amount_cents,
-        p.currency,
-        p.status,
-        p.stripe_session_id,
-        p.stripe_payment_intent_id,
-        p.created_at,
-        u.email AS user_email,
-        u.full_name AS user_name
-      FROM payments p
-      INNER JOIN users u ON u.id = p.user_id
-      WHERE u.clinic_id = ? AND LOWER(COALESCE(p.item_type, '')) != 'subscription'
-      ORDER BY p.created_at DESC
-      LIMIT 500
+        COUNT(*) AS total,
+        {", ".join(
+          f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END) AS {status}_count, "
+          f"SUM(CASE WHEN status = '{status}' THEN amount_cents ELSE 0 END) AS {status}_cents"
+          for status in CLINIC_LEDGER_TXN_STATUSES
+        )},
+        SUM(CASE WHEN entry_type = 'produkt' THEN 1 ELSE 0 END) AS app_count,
+        SUM(CASE WHEN entry_type = 'mitgliedschaft' THEN 1 ELSE 0 END) AS membership_count,
+        SUM(CASE WHEN entry_type = 'billing' THEN 1 ELSE 0 END) AS billing_count
+      FROM clinic_ledger_entries
+      WHERE {summary_where}
       """,
-      (clinic_id,),
-    ).fetchall()
-
-  transactions = []
-  for row in checkout_rows:
-    items = parse_json_list(safe_row_value(row, "line_items_json"))
-    item_names = [
-      safe_public_text(it.get("name") or it.get("title"))
-      for it in items
-      if isinstance(it, dict)
-    ]
-    item_names = [n for n in item_names if n]
-    transactions.append(
-      {
-        "id": f"co-{safe_row_value(row, 'id')}",
-        "date": safe_public_text(safe_row_value(row, "finalized_at")) or safe_public_text(safe_row_value(row, "created_at")),
-        "customerName": safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast",
-        "customerEmail": safe_public_text(safe_row_value(row, "patient_email")),
-        "type": "produkt",
-        "typeLabel": "App-Kauf",
-        "label": ", ".join(item_names[:3]) if item_names else "App-Kauf",
-        "amountCents": txn_amount_cents(safe_row_value(row, "total_cents", 0)),
-        "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
-        "status": normalize_txn_status(safe_row_value(row, "payment_status") or safe_row_value(row, "checkout_status")),
-        "source": "App",
-        "paymentMethod": safe_public_text(safe_row_value(row, "payment_method")),
-        "reference": safe_public_text(safe_row_value(row, "order_id")),
-        "items": item_names,
-      }
-    )
-
-  for row in membership_rows:
-    transactions.append(
-      {
-        "id": f"mb-{safe_row_value(row, 'id')}",
-        "date": safe_public_text(safe_row_value(row, "next_charge_at")) or safe_public_text(safe_row_value(row, "started_at")),
-        "customerName": safe_public_text(safe_row_value(row, "patient_name"), "Gast") or "Gast",
-        "customerEmail": safe_public_text(safe_row_value(row, "patient_email")),
-        "type": "mitgliedschaft",
-        "typeLabel": "Mitgliedschaft",
-        "label": safe_public_text(safe_row_value(row, "membership_name"), "Mitgliedschaft") or "Mitgliedschaft",
-        "amountCents": txn_amount_cents(safe_row_value(row, "monthly_amount_cents", 0)),
-        "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
-        "status": normalize_txn_status(safe_row_value(row, "last_payment_status") or safe_row_value(row, "status")),
-        "membershipStatus": safe_public_text(safe_row_value(row, "status")),
-        "source": "Abo",
-        "paymentMethod": "—",
-        "reference": "",
-        "items": [],
-      }
-    )
-
-  for row in payment_rows:
-    item_type = safe_public_text(safe_row_value(row, "item_type"), "payment").lower()
-    type_label = "Dashboard-Abo" if item_type == "subscription" else "Zahlung"
-    reference = (
-      safe_public_text(safe_row_value(row, "stripe_payment_intent_id"))
-      or safe_public_text(safe_row_value(row, "stripe_session_id"))
-    )
-    transactions.append(
-      {
-        "id": f"py-{safe_row_value(row, 'id')}",
-        "date": safe_public_text(safe_row_value(row, "created_at")),
-        "customerName": safe_public_text(safe_row_value(row, "user_name"), "Klinik") or "Klinik",
-        "customerEmail": safe_public_text(safe_row_value(row, "user_email")),
-        "type": "billing" if item_type == "subscription" else "zahlung",
-        "typeLabel": type_label,
-        "label": safe_public_text(safe_row_value(row, "item_name"), type_label) or type_label,
-        "amountCents": txn_amount_cents(safe_row_value(row, "amount_cents", 0)),
-        "currency": safe_public_text(safe_row_value(row, "currency"), "eur") or "eur",
-        "status": normalize_txn_status(safe_row_value(row, "status")),
-        "source": "Dashboard",
-        "paymentMethod": "Stripe",
-        "reference": reference,
-        "items": [],
-      }
-    )
-
-  transactions.sort(key=lambda t: str(t.get("date") or ""), reverse=True)
+      summary_params,
+    ).fetchone()
 
-  def status_count(status: str) -> int:
-    return sum(1 for t in transactions if t["status"] == status)
+  next_cursor = None
+  if len(rows) > limit:
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = f"{format_db_timestamp(last['occurred_at'])}|{last['id']}"
 
-  def status_cents(status: str) -> int:
-    return sum(t["amountCents"] for t in transactions if t["status"] == status)
+  def total(key: str) -> int:
+    return int((totals[key] if totals else 0) or 0)
 
   summary = {
-    "total": len(transactions),
-    "paidCount": status_count("paid"),
-    "paidCents": status_cents("paid"),
-    "openCount": status_count("open"),
-    "openCents": status_cents("open"),
-    "failedCount": status_count("failed"),
-    "failedCents": status_cents("failed"),
-    "refundedCount": status_count("refunded"),
-    "refundedCents": status_cents("refunded"),
-    "canceledCount": status_count("canceled"),
-    "appCount": sum(1 for t in transactions if t["type"] == "produkt"),
-    "membershipCount": sum(1 for t in transactions if t["type"] == "mitgliedschaft"),
-    "billingCount": sum(1 for t in transactions if t["type"] == "billing"),
+    "total": total("total"),
+    "paidCount": total("paid_count"),
+    "paidCents": total("paid_cents"),
+    "openCount": total("open_count"),
+    "openCents": total("open_cents"),
+    "failedCount": total("failed_count"),
+    "failedCents": total("failed_cents"),
+    "refundedCount": total("refunded_count"),
+    "refundedCents": total("refunded_cents"),
+    "canceledCount": total("canceled_count"),
+    "appCount": total("app_count"),
+    "membershipCount": total("membership_count"),
+    "billingCount": total("billing_count"),
   }
-  return jsonify({"transactions": transactions, "summary": summary})
+  return jsonify(
+    {
+      "transactions": [serialize_clinic_ledger_entry(row) for row in rows],
+      "summary": summary,
+      "nextCursor": next_cursor,
+    }
+  )
 
 
 @app.post("/api/analytics/events")
@@ -13077,4 +18188,5 @@ init_db()
 
 
 if __name__ == "__main__":
+  start_inline_job_worker()
   app.run(host="0.0.0.0", port=PORT, debug=os.getenv("FLASK_DEBUG", "0") == "1")
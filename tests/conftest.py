@@ -0,0 +1,55 @@
+import os
+import secrets
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# server runs init_db() on import, so the throwaway SQLite file has to be configured first.
+os.environ["SQLITE_DB_PATH"] = str(Path(tempfile.mkdtemp(prefix="clinicflow-tests-")) / "clinicflow.db")
+os.environ["DATABASE_URL"] = ""
+os.environ.setdefault("BACKGROUND_JOB_WORKER_IN_WEB", "false")
+os.environ.setdefault("CAMPAIGN_SCHEDULER_ENABLED", "false")
+os.environ["SUPERADMIN_EMAIL"] = "admin@example.de"
+os.environ["SUPERADMIN_PASSWORD"] = "Admin-Passwort-123"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def client():
+  return server.app.test_client()
+
+
+def register_owner(client) -> dict:
+  response = client.post(
+    "/api/auth/register",
+    json={
+      "email": f"owner-{secrets.token_hex(4)}@example.de",
+      "password": "Passwort123!",
+      "fullName": "Test Owner",
+      "clinicName": f"Klinik {secrets.token_hex(3)}",
+    },
+  )
+  assert response.status_code in (200, 201), response.get_json()
+  return response.get_json()["user"]
+
+
+@pytest.fixture
+def owner(client) -> dict:
+  """A freshly registered clinic owner; `client` is logged in as them."""
+  return register_owner(client)
+
+
+@pytest.fixture
+def admin_client():
+  admin = server.app.test_client()
+  response = admin.post(
+    "/api/admin/login",
+    json={"email": os.environ["SUPERADMIN_EMAIL"], "password": os.environ["SUPERADMIN_PASSWORD"]},
+  )
+  assert response.status_code == 200, response.get_json()
+  return admin
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def schedule_locks(monkeypatch) -> list[int]:
+  calls: list[int] = []
+  original = server.lock_clinic_schedule
+
+  def spy(conn, clinic_id):
+    calls.append(int(clinic_id))
+    original(conn, clinic_id)
+
+  monkeypatch.setattr(server, "lock_clinic_schedule", spy)
+  return calls
+
+
+def upcoming_slot(days: int) -> str:
+  local_now = server.utc_now().astimezone(server.clinic_local_timezone())
+  return (local_now + timedelta(days=days)).replace(hour=10, minute=0, second=0, microsecond=0).isoformat()
+
+
+def book_from_clinic(client, starts_at: str, index: int):
+  return client.post(
+    "/api/clinic/appointments",
+    json={
+      "patientName": f"Patient {index}",
+      "patientEmail": f"patient-{index}@example.de",
+      "startsAt": starts_at,
+      "durationMinutes": 30,
+    },
+  )
+
+
+def test_clinic_booking_of_full_slot_returns_409(client, owner, schedule_locks):
+  clinic_id = int(owner["clinicId"])
+  starts_at = upcoming_slot(3)
+  for index in range(server.APPOINTMENT_DEFAULT_SLOT_CAPACITY):
+    assert book_from_clinic(client, starts_at, index).status_code == 201
+
+  response = book_from_clinic(client, starts_at, 99)
+
+  assert response.status_code == 409
+  assert response.get_json()["error"] == "Zeitfenster nicht mehr verfügbar."
+  assert schedule_locks == [clinic_id] * (server.APPOINTMENT_DEFAULT_SLOT_CAPACITY + 1)
+
+
+def test_checkout_into_full_slot_leaves_appointment_pending(client, owner, schedule_locks):
+  clinic_id = int(owner["clinicId"])
+  starts_at = upcoming_slot(4)
+  for index in range(server.APPOINTMENT_DEFAULT_SLOT_CAPACITY):
+    assert book_from_clinic(client, starts_at, index).status_code == 201
+  schedule_locks.clear()
+
+  later = (server.parse_datetime_utc(starts_at) + timedelta(hours=2)).isoformat()
+  rows = server.create_patient_appointments_from_checkout(
+    server.get_clinic_row_by_id(clinic_id),
+    "buyer@example.de",
+    "Buyer",
+    [
+      {"treatmentId": "full", "name": "Botox", "durationMinutes": 30, "startsAt": starts_at},
+      {"treatmentId": "free", "name": "Peeling", "durationMinutes": 30, "startsAt": later},
+    ],
+    "paid",
+    "order-capacity",
+  )
+
+  by_treatment = {row["treatmentId"]: row for row in rows}
+  assert by_treatment["full"]["status"] == "pending_confirmation"
+  assert by_treatment["full"]["startsAt"] is None
+  assert "ausgebucht" in by_treatment["full"]["notes"]
+  assert by_treatment["free"]["status"] == "confirmed"
+  assert by_treatment["free"]["startsAt"] is not None
+  assert schedule_locks == [clinic_id]
@@ -0,0 +1,37 @@
+import server
+from conftest import register_owner
+
+
+def add_patients(clinic_id: int, *patients: tuple[str, str]) -> None:
+  with server.get_db() as conn:
+    for name, email in patients:
+      server.upsert_patient_directory_entry(conn, clinic_id, email=email, name=name, source="test")
+
+
+def search(client, query: str) -> dict:
+  response = client.get("/api/clinic/patients/search", query_string={"q": query})
+  assert response.status_code == 200, response.get_json()
+  return response.get_json()
+
+
+def test_search_never_returns_another_clinics_patients(client, owner):
+  other_client = server.app.test_client()
+  other_owner = register_owner(other_client)
+  add_patients(int(owner["clinicId"]), ("Anna Müller", "anna.mueller@example.de"))
+  add_patients(
+    int(other_owner["clinicId"]),
+    ("Anna Müller", "anna.mueller@praxis-b.de"),
+    ("Annabell Maier", "annabell@praxis-b.de"),
+  )
+
+  own = search(client, "anna müller")
+  assert own["mode"] == "match"
+  assert [patient["email"] for patient in own["patients"]] == ["anna.mueller@example.de"]
+
+  # Only the other clinic has an "Annabell", so the match page is empty and the fuzzy fallback runs.
+  fuzzy = search(client, "annabell")
+  assert fuzzy["mode"] == "fuzzy"
+  assert all(patient["email"].endswith("@example.de") for patient in fuzzy["patients"])
+
+  other = search(other_client, "anna")
+  assert sorted(patient["email"] for patient in other["patients"]) == ["anna.mueller@praxis-b.de", "annabell@praxis-b.de"]
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import server
+
+WATERMARK_SQL = "SELECT through_day FROM analytics_rollup_state WHERE name = 'clinic_analytics'"
+
+
+def record_event(clinic_id: int, event_name: str, occurred_at: datetime, amount_cents: int | None = None) -> None:
+  # create_analytics_event always stamps "now"; this writes the same two rows for a past day.
+  with server.get_db() as conn:
+    conn.execute(
+      "INSERT INTO analytics_events (clinic_id, event_name, amount_cents, event_source, created_at) VALUES (?, ?, ?, 'test', ?)",
+      (clinic_id, event_name, amount_cents, occurred_at),
+    )
+    server.record_clinic_analytics_event(conn, clinic_id, event_name, amount_cents, occurred_at)
+
+
+def set_watermark(day: str) -> None:
+  with server.get_db() as conn:
+    conn.execute(
+      """
+      INSERT INTO analytics_rollup_state (name, through_day) VALUES ('clinic_analytics', ?)
+      ON CONFLICT (name) DO UPDATE SET through_day = excluded.through_day
+      """,
+      (day,),
+    )
+
+
+def test_rollup_totals_match_live_summary(owner, admin_client):
+  clinic_id = int(owner["clinicId"])
+  today = server.utc_now().replace(hour=12, minute=0, second=0, microsecond=0)
+  from_day = (today - timedelta(days=3)).date()
+  # The last refresh ran before these days, so they only reach the rollups via the watermark.
+  set_watermark((today - timedelta(days=5)).date().isoformat())
+  for offset, names in ((3, ["offer_view"] * 3 + ["purchase_success"]), (1, ["app_open", "offer_view"]), (0, ["offer_view", "purchase_success"])):
+    for name in names:
+      record_event(clinic_id, name, today - timedelta(days=offset), 4900 if name == "purchase_success" else None)
+  with server.get_db() as conn:
+    server.refresh_platform_metrics(conn)
+
+  live = server.build_clinic_analytics_summary(
+    clinic_id,
+    4,
+    window_end=datetime.combine(today.date() + timedelta(days=1), datetime.min.time(), timezone.utc),
+    window_start=datetime.combine(from_day, datetime.min.time(), timezone.utc),
+  )["summary"]
+  payload = admin_client.get(
+    f"/api/admin/analytics?from={from_day.isoformat()}&to={today.date().isoformat()}&clinicLimit=500"
+  ).get_json()
+  rollup = next(entry for entry in payload["byClinic"] if entry["clinicId"] == clinic_id)
+
+  assert rollup["events"] == live["eventsTotal"]
+  assert rollup["appOpens"] == live["appOpen"]
+  assert rollup["offerViews"] == live["offerView"] == 5
+  assert rollup["purchases"] == live["purchaseSuccess"] == 2
+  assert rollup["gmvCents"] == live["revenueCents"] == 9800
+  assert rollup["conversionRate"] == live["conversionRate"] == 40.0
+  # Platform totals come from platform_analytics_daily and must agree with the per-clinic rows.
+  for column in ("events", "offerViews", "purchases", "gmvCents"):
+    assert payload["totals"][column] == sum(entry[column] for entry in payload["byClinic"])
+
+
+def test_rollup_watermark_only_moves_forward():
+  today = server.utc_now().date()
+  set_watermark((today - timedelta(days=4)).isoformat())
+  with server.get_db() as conn:
+    server.rollup_clinic_analytics_since_watermark(conn, today.isoformat())
+    assert conn.execute(WATERMARK_SQL).fetchone()["through_day"] == today.isoformat()
+
+  ahead = (today + timedelta(days=2)).isoformat()
+  set_watermark(ahead)
+  with server.get_db() as conn:
+    server.rollup_clinic_analytics_since_watermark(conn, today.isoformat())
+    assert conn.execute(WATERMARK_SQL).fetchone()["through_day"] == ahead
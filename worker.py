@@ -0,0 +1,15 @@
+import signal
+import threading
+
+from server import run_background_worker
+
+
+def main() -> None:
+  stop_event = threading.Event()
+  signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+  signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+  run_background_worker(stop_event)
+
+
+if __name__ == "__main__":
+  main()
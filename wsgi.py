@@ -1,4 +1,7 @@
-from server import app
+from server import app, start_inline_job_worker
+
+# Each gunicorn worker imports this module, so every web process gets its own fallback threads.
+start_inline_job_worker()
 
 
 if __name__ == "__main__":